@@ -3,7 +3,9 @@
 # ------------------------------------------------------------
 
 import uvicorn
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from starlette.middleware.sessions import SessionMiddleware
@@ -16,6 +18,7 @@ from pathlib import Path
 from util.config import APP_NAME, SECRET_KEY, HOST, PORT, RELOAD, VERSION
 from util.logger_config import logger
 from util.csrf_protection import MiddlewareProtecaoCSRF
+from util.rate_limit_middleware import MiddlewareRateLimit
 from util.exception_handlers import (
     http_exception_handler,
     validation_exception_handler,
@@ -23,7 +26,24 @@ from util.exception_handlers import (
     form_validation_exception_handler,
 )
 from util.exceptions import ErroValidacaoFormulario
+from util.auth_decorator import requer_autenticacao
+from util.perfis import Perfil
+from model.usuario_logado_model import UsuarioLogado
 from util.seed_data import inicializar_dados
+from util.db_util import (
+    fechar_conexoes,
+    obter_estatisticas_pool,
+    aplicar_perfil_pragmas,
+    agendador_checkpoint,
+)
+from util.db_async import encerrar_executor, obter_estatisticas_executor
+from util.cache_paginas import cache_paginas
+from util.contador_visualizacoes import contador_visualizacoes
+from util.config_cache import config
+from util.rate_limiter import registro_limiters
+from util.chat_escritor import escritor_mensagens
+from util.chat_manager import gerenciador_chat
+from util.chat_manutencao import agendador_retencao_chat
 
 # ------------------------------------------------------------
 # Repositórios
@@ -36,9 +56,12 @@ from repo import (
     chamado_repo,
     chamado_interacao_repo,
     indices_repo,
+    versao_dados_repo,
+    rate_limit_repo,
     chat_sala_repo,
     chat_participante_repo,
     chat_mensagem_repo,
+    chat_evento_repo,
 )
 
 # ------------------------------------------------------------
@@ -58,18 +81,45 @@ from routes.admin_categorias_routes import router as admin_categorias_router
 from routes.artigos_routes import router as artigos_router
 
 
+# ------------------------------------------------------------
+# Ciclo de vida (startup/shutdown)
+# ------------------------------------------------------------
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """Executa tarefas de startup e shutdown da aplicação."""
+    agendador_checkpoint.iniciar()
+    contador_visualizacoes.iniciar()
+    registro_limiters.iniciar_limpeza()
+    await gerenciador_chat.iniciar()
+    await escritor_mensagens.iniciar()
+    agendador_retencao_chat.iniciar()
+    yield
+    agendador_retencao_chat.parar()
+    await escritor_mensagens.parar()
+    await gerenciador_chat.parar()
+    registro_limiters.parar_limpeza()
+    contador_visualizacoes.parar()
+    logger.info("👁️ Visualizações pendentes gravadas")
+    agendador_checkpoint.parar()
+    encerrar_executor()
+    fechar_conexoes()
+    logger.info("🔌 Conexões do banco de dados encerradas")
+
+
 # ------------------------------------------------------------
 # Função de criação da aplicação
 # ------------------------------------------------------------
 def create_app() -> FastAPI:
     """Cria e configura a instância principal da aplicação."""
-    application = FastAPI(title=APP_NAME, version=VERSION)
+    application = FastAPI(title=APP_NAME, version=VERSION, lifespan=lifespan)
 
     # ------------------------------------------------------------
     # Middlewares
     # ------------------------------------------------------------
     application.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
     application.add_middleware(MiddlewareProtecaoCSRF)
+    # Último registrado = mais externo: bloqueia antes de sessão, CSRF e corpo
+    application.add_middleware(MiddlewareRateLimit)
     logger.info("✅ Middlewares registrados com sucesso")
 
     # ------------------------------------------------------------
@@ -97,7 +147,11 @@ def create_app() -> FastAPI:
     # Banco de dados e seeds
     # ------------------------------------------------------------
     try:
+        aplicar_perfil_pragmas()
         logger.info("🛠️ Criando/verificando tabelas do banco de dados...")
+        # versao_dados antes das tabelas cujas triggers atualizam versões
+        versao_dados_repo.criar_tabela()
+        rate_limit_repo.criar_tabela()
         usuario_repo.criar_tabela()
         configuracao_repo.criar_tabela()
         chamado_repo.criar_tabela()
@@ -105,13 +159,16 @@ def create_app() -> FastAPI:
         chat_sala_repo.criar_tabela()
         chat_participante_repo.criar_tabela()
         chat_mensagem_repo.criar_tabela()
-        indices_repo.criar_indices()
+        chat_evento_repo.criar_tabela()
         categoria_repo.criar_tabela()
         artigo_repo.criar_tabela()
+        indices_repo.criar_indices()
         logger.info("✅ Tabelas e índices criados/verificados com sucesso")
 
         inicializar_dados()
         logger.info("🌱 Dados iniciais carregados com sucesso")
+
+        config.precarregar()
     except Exception as e:
         logger.error(f"❌ Erro ao preparar banco de dados: {e}", exc_info=True)
         raise
@@ -146,6 +203,25 @@ def create_app() -> FastAPI:
     async def health_check():
         return {"status": "healthy"}
 
+    # Métricas internas (pool, executor, caches, limiters, chat): só para admin
+    @application.get("/health/detalhes")
+    @requer_autenticacao([Perfil.ADMIN.value])
+    async def health_detalhes(request: Request, usuario_logado: Optional[UsuarioLogado] = None):
+        return {
+            "status": "healthy",
+            "pool_conexoes": obter_estatisticas_pool(),
+            "checkpoint_wal": agendador_checkpoint.obter_estatisticas(),
+            "executor_db": obter_estatisticas_executor(),
+            "cache_paginas": cache_paginas.obter_estatisticas(),
+            "contador_visualizacoes": contador_visualizacoes.obter_estatisticas(),
+            "cache_categorias": categoria_repo.obter_estatisticas_cache(),
+            "config_cache": config.obter_estatisticas(),
+            "rate_limiters": registro_limiters.obter_estatisticas(),
+            "chat": gerenciador_chat.obter_estatisticas(),
+            "chat_escritor": escritor_mensagens.obter_estatisticas(),
+            "chat_retencao": agendador_retencao_chat.obter_estatisticas(),
+        }
+
     logger.info(f"🚀 {APP_NAME} inicializado com sucesso (v{VERSION})")
     return application
 
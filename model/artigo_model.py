@@ -29,3 +29,32 @@ class Artigo:
     usuario_nome: Optional[str] = None
     usuario_email: Optional[str] = None
     categoria_nome: Optional[str] = None
+
+
+@dataclass
+class ArtigoResumo:
+    """
+    Projeção de artigo para listagens (sem o conteúdo completo).
+
+    Usada por todas as consultas de listagem; o corpo do artigo só é
+    carregado em Artigo, via obter_por_id.
+    """
+    id: int
+    titulo: str
+    status: str
+    usuario_id: int
+    categoria_id: int
+    resumo: Optional[str] = None
+    qtde_visualizacoes: Optional[int] = 0
+    data_cadastro: Optional[datetime] = None
+    data_atualizacao: Optional[datetime] = None
+    data_publicacao: Optional[datetime] = None
+    data_pausa: Optional[datetime] = None
+    # Campos do JOIN (para exibição)
+    usuario_nome: Optional[str] = None
+    usuario_email: Optional[str] = None
+    categoria_nome: Optional[str] = None
+    # Início do conteúdo, apenas quando o artigo não tem resumo
+    previa: Optional[str] = None
+    # Trecho com os termos destacados (apenas em resultados de busca)
+    trecho_destacado: Optional[str] = None
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class ChatConversa:
+    """
+    Resumo de uma conversa para a listagem do chat (somente leitura).
+
+    Não corresponde a uma tabela: é montado por uma consulta que junta
+    chat_participante, chat_sala, usuario e chat_mensagem.
+
+    Attributes:
+        sala_id: ID da sala de chat
+        ultima_atividade: Timestamp da última atividade na sala
+        outro_usuario_id: ID do outro participante
+        outro_usuario_nome: Nome do outro participante
+        outro_usuario_email: E-mail do outro participante
+        ultima_mensagem: Texto da última mensagem (None se a sala está vazia)
+        ultima_mensagem_data_envio: Timestamp da última mensagem
+        ultima_mensagem_usuario_id: Autor da última mensagem
+        nao_lidas: Quantidade de mensagens não lidas pelo usuário
+    """
+    sala_id: str
+    ultima_atividade: Optional[datetime]
+    outro_usuario_id: int
+    outro_usuario_nome: str
+    outro_usuario_email: str
+    ultima_mensagem: Optional[str] = None
+    ultima_mensagem_data_envio: Optional[datetime] = None
+    ultima_mensagem_usuario_id: Optional[int] = None
+    nao_lidas: int = 0
@@ -0,0 +1,22 @@
+from dataclasses import dataclass, field
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Pagina(Generic[T]):
+    """
+    Página de resultados de uma listagem paginada por cursor (keyset).
+
+    Os cursores são opacos para quem consome: basta repassá-los na próxima
+    requisição (parâmetros `apos` / `antes`).
+
+    Attributes:
+        itens: Registros da página, já na ordem de exibição
+        cursor_proximo: Cursor para a página seguinte (None se esta é a última)
+        cursor_anterior: Cursor para a página anterior (None se esta é a primeira)
+    """
+    itens: list[T] = field(default_factory=list)
+    cursor_proximo: Optional[str] = None
+    cursor_anterior: Optional[str] = None
@@ -1,7 +1,19 @@
+import re
+from contextlib import AbstractContextManager
 from typing import Optional
-from model.artigo_model import Artigo
+from model.artigo_model import Artigo, ArtigoResumo
+from model.pagina_model import Pagina
 from sql.artigo_sql import *
+from util.cache_paginas import cache_paginas
+from util.contador_visualizacoes import contador_visualizacoes
 from util.db_util import obter_conexao as get_connection
+from util.paginacao import codificar_cursor, decodificar_cursor
+
+
+def _visualizacoes(row) -> int:
+    """Visualizações gravadas no banco mais as pendentes no contador em memória."""
+    gravadas = row["qtde_visualizacoes"] if "qtde_visualizacoes" in row.keys() else 0
+    return (gravadas or 0) + contador_visualizacoes.pendentes(row["id"])
 
 
 def _row_to_artigo(row) -> Artigo:
@@ -16,7 +28,7 @@ def _row_to_artigo(row) -> Artigo:
         status=row["status"],
         usuario_id=row["usuario_id"],
         categoria_id=row["categoria_id"],
-        qtde_visualizacoes=row["qtde_visualizacoes"] if "qtde_visualizacoes" in row.keys() else 0,
+        qtde_visualizacoes=_visualizacoes(row),
         data_cadastro=row["data_cadastro"] if "data_cadastro" in row.keys() else None,
         data_atualizacao=row["data_atualizacao"] if "data_atualizacao" in row.keys() else None,
         data_publicacao=row["data_publicacao"] if "data_publicacao" in row.keys() else None,
@@ -27,12 +39,67 @@ def _row_to_artigo(row) -> Artigo:
     )
 
 
+def _row_to_resumo(row) -> ArtigoResumo:
+    """
+    Converte uma linha de listagem (sem conteúdo) em ArtigoResumo.
+    """
+    return ArtigoResumo(
+        id=row["id"],
+        titulo=row["titulo"],
+        status=row["status"],
+        usuario_id=row["usuario_id"],
+        categoria_id=row["categoria_id"],
+        resumo=row["resumo"],
+        qtde_visualizacoes=_visualizacoes(row),
+        data_cadastro=row["data_cadastro"],
+        data_atualizacao=row["data_atualizacao"],
+        data_publicacao=row["data_publicacao"],
+        data_pausa=row["data_pausa"],
+        usuario_nome=row["usuario_nome"],
+        usuario_email=row["usuario_email"],
+        categoria_nome=row["categoria_nome"],
+        previa=row["previa"] if "previa" in row.keys() else None,
+        trecho_destacado=row["trecho_destacado"] if "trecho_destacado" in row.keys() else None,
+    )
+
+
+def _montar_consulta_fts(termo: str) -> Optional[str]:
+    """
+    Converte o texto digitado em uma consulta FTS5 segura.
+
+    Cada palavra vira um termo entre aspas com busca por prefixo, unidos
+    por AND implícito. Operadores e aspas do usuário são descartados,
+    evitando erros de sintaxe do FTS5.
+
+    Returns:
+        Consulta FTS5 ou None se não houver palavras no termo
+    """
+    palavras = re.findall(r"\w+", termo)[:10]
+    if not palavras:
+        return None
+    return " ".join(f'"{palavra}"*' for palavra in palavras)
+
+
 def criar_tabela() -> bool:
-    """Cria a tabela de artigos se não existir."""
+    """
+    Cria a tabela de artigos e o índice de busca textual se não existirem.
+
+    Quando o índice FTS é criado pela primeira vez (banco já populado),
+    ele é reconstruído a partir dos artigos existentes.
+    """
     try:
         with get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(CRIAR_TABELA)
+            cursor.execute(PREENCHER_DATA_PUBLICACAO)
+
+            fts_existia = cursor.execute(VERIFICAR_TABELA_FTS).fetchone() is not None
+            cursor.execute(CRIAR_TABELA_FTS)
+            cursor.execute(CRIAR_TRIGGER_FTS_INSERT)
+            cursor.execute(CRIAR_TRIGGER_FTS_DELETE)
+            cursor.execute(CRIAR_TRIGGER_FTS_UPDATE)
+            if not fts_existia:
+                cursor.execute(RECONSTRUIR_FTS)
             return True
     except Exception as e:
         print(f"Erro ao criar tabela artigo: {e}")
@@ -50,9 +117,12 @@ def inserir(artigo: Artigo) -> Optional[int]:
                 artigo.conteudo,
                 artigo.status,
                 artigo.usuario_id,
-                artigo.categoria_id
+                artigo.categoria_id,
+                artigo.status
             ))
-            return cursor.lastrowid
+            artigo_id = cursor.lastrowid
+        cache_paginas.invalidar()
+        return artigo_id
     except Exception as e:
         print(f"Erro ao inserir artigo: {e}")
         return None
@@ -71,7 +141,10 @@ def alterar(artigo: Artigo) -> bool:
                 artigo.categoria_id,
                 artigo.id
             ))
-            return cursor.rowcount > 0
+            alterado = cursor.rowcount > 0
+        if alterado:
+            cache_paginas.invalidar()
+        return alterado
     except Exception as e:
         print(f"Erro ao alterar artigo: {e}")
         return False
@@ -83,7 +156,10 @@ def alterar_status(id: int, status: str) -> bool:
         with get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(ALTERAR_STATUS, (status, status, status, id))
-            return cursor.rowcount > 0
+            alterado = cursor.rowcount > 0
+        if alterado:
+            cache_paginas.invalidar()
+        return alterado
     except Exception as e:
         print(f"Erro ao alterar status do artigo: {e}")
         return False
@@ -95,7 +171,10 @@ def excluir(id: int) -> bool:
         with get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(EXCLUIR, (id,))
-            return cursor.rowcount > 0
+            excluido = cursor.rowcount > 0
+        if excluido:
+            cache_paginas.invalidar()
+        return excluido
     except Exception as e:
         print(f"Erro ao excluir artigo: {e}")
         return False
@@ -104,7 +183,7 @@ def excluir(id: int) -> bool:
 def obter_por_id(id: int) -> Optional[Artigo]:
     """Busca um artigo pelo ID."""
     try:
-        with get_connection() as conn:
+        with get_connection(somente_leitura=True) as conn:
             cursor = conn.cursor()
             cursor.execute(OBTER_POR_ID, (id,))
             row = cursor.fetchone()
@@ -116,79 +195,242 @@ def obter_por_id(id: int) -> Optional[Artigo]:
         return None
 
 
-def obter_todos() -> list[Artigo]:
+def obter_todos() -> list[ArtigoResumo]:
     """Retorna todos os artigos."""
     try:
-        with get_connection() as conn:
+        with get_connection(somente_leitura=True) as conn:
             cursor = conn.cursor()
             cursor.execute(OBTER_TODOS)
             rows = cursor.fetchall()
-            return [_row_to_artigo(row) for row in rows]
+            return [_row_to_resumo(row) for row in rows]
     except Exception as e:
         print(f"Erro ao obter todos os artigos: {e}")
         return []
 
 
-def obter_por_usuario(usuario_id: int) -> list[Artigo]:
+def obter_por_usuario(usuario_id: int) -> list[ArtigoResumo]:
     """Retorna todos os artigos de um usuário específico."""
     try:
-        with get_connection() as conn:
+        with get_connection(somente_leitura=True) as conn:
             cursor = conn.cursor()
             cursor.execute(OBTER_POR_USUARIO, (usuario_id,))
             rows = cursor.fetchall()
-            return [_row_to_artigo(row) for row in rows]
+            return [_row_to_resumo(row) for row in rows]
     except Exception as e:
         print(f"Erro ao obter artigos por usuário: {e}")
         return []
 
 
-def obter_publicados() -> list[Artigo]:
+def obter_publicados() -> list[ArtigoResumo]:
     """Retorna todos os artigos publicados."""
     try:
-        with get_connection() as conn:
+        with get_connection(somente_leitura=True) as conn:
             cursor = conn.cursor()
             cursor.execute(OBTER_PUBLICADOS)
             rows = cursor.fetchall()
-            return [_row_to_artigo(row) for row in rows]
+            return [_row_to_resumo(row) for row in rows]
     except Exception as e:
         print(f"Erro ao obter artigos publicados: {e}")
         return []
 
 
-def obter_ultimos_publicados(limite: int = 6) -> list[Artigo]:
+def obter_ultimos_publicados(limite: int = 6) -> list[ArtigoResumo]:
     """Retorna os últimos N artigos publicados."""
     try:
-        with get_connection() as conn:
+        with get_connection(somente_leitura=True) as conn:
             cursor = conn.cursor()
             cursor.execute(OBTER_ULTIMOS_PUBLICADOS, (limite,))
             rows = cursor.fetchall()
-            return [_row_to_artigo(row) for row in rows]
+            return [_row_to_resumo(row) for row in rows]
     except Exception as e:
         print(f"Erro ao obter últimos artigos publicados: {e}")
         return []
 
 
-def buscar_por_titulo(termo: str) -> list[Artigo]:
+def _listar_pagina(
+    consulta: str,
+    parametros: tuple,
+    ordenacao: tuple[str, str],
+    filtro: str,
+    limite: int,
+    apos: Optional[str],
+    antes: Optional[str],
+) -> Pagina[ArtigoResumo]:
+    """
+    Executa uma listagem paginada por cursor (keyset).
+
+    Busca limite + 1 linhas para saber se existe página seguinte. Para
+    voltar (`antes`), inverte a ordem e o operador e reverte o resultado,
+    de modo que o custo é o mesmo em qualquer profundidade.
+
+    Args:
+        consulta: LISTAR_*_PAGINA com os placeholders {coluna}, {direcao} e {filtro}
+        parametros: Parâmetros dos filtros fixos (antes do cursor)
+        ordenacao: (coluna, direção) de exibição
+        filtro: Filtros fixos adicionais (ex.: FILTRO_CATEGORIA)
+        limite: Artigos por página
+        apos: Cursor do último artigo da página anterior
+        antes: Cursor do primeiro artigo da página seguinte
+
+    Returns:
+        Página com os artigos e os cursores de navegação
+    """
+    coluna, direcao = ordenacao
+    posicao_antes = decodificar_cursor(antes)
+    voltando = posicao_antes is not None
+    posicao = posicao_antes if voltando else decodificar_cursor(apos)
+
+    if voltando:
+        direcao = "ASC" if direcao == "DESC" else "DESC"
+    if posicao is not None:
+        operador = "<" if direcao == "DESC" else ">"
+        filtro = f"{filtro} {FILTRO_CURSOR.format(coluna=coluna, operador=operador)}"
+        parametros = parametros + tuple(posicao)
+
+    sql = consulta.format(coluna=coluna, direcao=direcao, filtro=filtro)
+    with get_connection(somente_leitura=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, parametros + (limite + 1,))
+        rows = cursor.fetchall()
+
+    tem_mais = len(rows) > limite
+    rows = rows[:limite]
+    if voltando:
+        rows.reverse()
+    if not rows:
+        return Pagina()
+
+    primeiro = codificar_cursor(rows[0]["chave_ordem"], rows[0]["id"])
+    ultimo = codificar_cursor(rows[-1]["chave_ordem"], rows[-1]["id"])
+    if voltando:
+        cursor_anterior, cursor_proximo = (primeiro if tem_mais else None), ultimo
+    else:
+        cursor_anterior, cursor_proximo = (primeiro if posicao else None), (ultimo if tem_mais else None)
+
+    return Pagina(
+        itens=[_row_to_resumo(row) for row in rows],
+        cursor_proximo=cursor_proximo,
+        cursor_anterior=cursor_anterior,
+    )
+
+
+def obter_publicados_pagina(
+    ordem: str = "recentes",
+    categoria_id: int = 0,
+    limite: int = 12,
+    apos: Optional[str] = None,
+    antes: Optional[str] = None,
+) -> Pagina[ArtigoResumo]:
+    """
+    Retorna uma página de artigos publicados, paginada por cursor.
+
+    Args:
+        ordem: Chave de ORDENACOES_PUBLICADOS (valores desconhecidos usam "recentes")
+        categoria_id: Filtra pela categoria quando maior que zero
+        limite: Artigos por página
+        apos: Cursor para avançar (cursor_proximo da página atual)
+        antes: Cursor para voltar (cursor_anterior da página atual)
+
+    Returns:
+        Página de artigos com cursores de navegação
+    """
+    ordenacao = ORDENACOES_PUBLICADOS.get(ordem, ORDENACOES_PUBLICADOS["recentes"])
+    filtro, parametros = "", ()
+    if categoria_id > 0:
+        filtro, parametros = FILTRO_CATEGORIA, (categoria_id,)
+
+    try:
+        return _listar_pagina(
+            LISTAR_PUBLICADOS_PAGINA, parametros, ordenacao, filtro, limite, apos, antes
+        )
+    except Exception as e:
+        print(f"Erro ao obter página de artigos publicados: {e}")
+        return Pagina()
+
+
+def obter_por_usuario_pagina(
+    usuario_id: int,
+    limite: int = 12,
+    apos: Optional[str] = None,
+    antes: Optional[str] = None,
+) -> Pagina[ArtigoResumo]:
+    """
+    Retorna uma página dos artigos de um autor (mais recentes primeiro).
+
+    Args:
+        usuario_id: ID do autor
+        limite: Artigos por página
+        apos: Cursor para avançar
+        antes: Cursor para voltar
+
+    Returns:
+        Página de artigos com cursores de navegação
+    """
+    try:
+        return _listar_pagina(
+            LISTAR_POR_USUARIO_PAGINA, (usuario_id,), ORDENACAO_POR_USUARIO, "", limite, apos, antes
+        )
+    except Exception as e:
+        print(f"Erro ao obter página de artigos do usuário: {e}")
+        return Pagina()
+
+
+def buscar_por_titulo(termo: str) -> list[ArtigoResumo]:
     """Busca artigos publicados pelo título."""
     try:
-        with get_connection() as conn:
+        with get_connection(somente_leitura=True) as conn:
             cursor = conn.cursor()
             cursor.execute(BUSCAR_POR_TITULO, (f"%{termo}%",))
             rows = cursor.fetchall()
-            return [_row_to_artigo(row) for row in rows]
+            return [_row_to_resumo(row) for row in rows]
     except Exception as e:
         print(f"Erro ao buscar artigos por título: {e}")
         return []
 
 
-def obter_por_categoria(categoria_id: int) -> list[Artigo]:
+def buscar(termo: str, limite: int = 12, offset: int = 0) -> tuple[list[ArtigoResumo], int]:
+    """
+    Busca textual em título, resumo e conteúdo dos artigos publicados.
+
+    Insensível a acentos e maiúsculas, com busca por prefixo em cada
+    palavra. Resultados ordenados por relevância (BM25), com trecho destacado.
+
+    Args:
+        termo: Texto digitado pelo usuário
+        limite: Quantidade de resultados por página
+        offset: Quantidade de resultados a pular
+
+    Returns:
+        Tupla (artigos da página, total de resultados)
+    """
+    consulta = _montar_consulta_fts(termo)
+    if consulta is None:
+        return [], 0
+
+    try:
+        with get_connection(somente_leitura=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(CONTAR_BUSCA, (consulta,))
+            total = cursor.fetchone()["quantidade"]
+            if total == 0:
+                return [], 0
+
+            cursor.execute(BUSCAR, (consulta, limite, offset))
+            rows = cursor.fetchall()
+            return [_row_to_resumo(row) for row in rows], total
+    except Exception as e:
+        print(f"Erro ao buscar artigos: {e}")
+        return [], 0
+
+
+def obter_por_categoria(categoria_id: int) -> list[ArtigoResumo]:
     """Retorna artigos publicados de uma categoria específica."""
     try:
-        with get_connection() as conn:
+        with get_connection(somente_leitura=True) as conn:
             cursor = conn.cursor()
             cursor.execute(OBTER_POR_CATEGORIA, (categoria_id,))
             rows = cursor.fetchall()
-            return [_row_to_artigo(row) for row in rows]
+            return [_row_to_resumo(row) for row in rows]
     except Exception as e:
         print(f"Erro ao obter artigos por categoria: {e}")
         return []
@@ -206,10 +448,44 @@ def incrementar_visualizacoes(id: int) -> bool:
         return False
 
 
+def incrementar_visualizacoes_em_lote(
+    incrementos: dict[int, int],
+    ao_confirmar: Optional[AbstractContextManager] = None,
+) -> bool:
+    """
+    Soma visualizações de vários artigos em uma única transação.
+
+    Args:
+        incrementos: Dicionário {artigo_id: visualizações a somar}
+        ao_confirmar: Contexto mantido aberto durante o commit (ex.: o lock do
+                      contador), para o chamador observar a confirmação e
+                      atualizar seu estado sem intervalo entre os dois
+
+    Returns:
+        True se gravou, False se erro (nada é gravado)
+    """
+    if not incrementos:
+        return True
+    try:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                SOMAR_VISUALIZACOES,
+                [(quantidade, artigo_id) for artigo_id, quantidade in incrementos.items()],
+            )
+            if ao_confirmar is not None:
+                with ao_confirmar:
+                    conn.commit()
+            return True
+    except Exception as e:
+        print(f"Erro ao gravar lote de visualizações: {e}")
+        return False
+
+
 def obter_quantidade() -> int:
     """Retorna a quantidade total de artigos."""
     try:
-        with get_connection() as conn:
+        with get_connection(somente_leitura=True) as conn:
             cursor = conn.cursor()
             cursor.execute(OBTER_QUANTIDADE)
             row = cursor.fetchone()
@@ -219,10 +495,23 @@ def obter_quantidade() -> int:
         return 0
 
 
+def obter_quantidade_por_usuario(usuario_id: int) -> int:
+    """Retorna a quantidade de artigos de um autor."""
+    try:
+        with get_connection(somente_leitura=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(OBTER_QUANTIDADE_POR_USUARIO, (usuario_id,))
+            row = cursor.fetchone()
+            return row["quantidade"] if row else 0
+    except Exception as e:
+        print(f"Erro ao obter quantidade de artigos do usuário: {e}")
+        return 0
+
+
 def obter_quantidade_publicados() -> int:
     """Retorna a quantidade de artigos publicados."""
     try:
-        with get_connection() as conn:
+        with get_connection(somente_leitura=True) as conn:
             cursor = conn.cursor()
             cursor.execute(OBTER_QUANTIDADE_PUBLICADOS)
             row = cursor.fetchone()
@@ -235,7 +524,7 @@ def obter_quantidade_publicados() -> int:
 def titulo_existe(titulo: str, excluir_id: int = 0) -> bool:
     """Verifica se um título já existe (excluindo um ID específico)."""
     try:
-        with get_connection() as conn:
+        with get_connection(somente_leitura=True) as conn:
             cursor = conn.cursor()
             cursor.execute(VERIFICAR_TITULO_EXISTE, (titulo, excluir_id))
             row = cursor.fetchone()
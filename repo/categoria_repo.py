@@ -1,16 +1,51 @@
 from typing import Optional
 from model.categoria_model import Categoria
+from repo import versao_dados_repo
 from sql.categoria_sql import *
+from util.cache_paginas import cache_paginas
+from util.cache_versionado import CacheVersionado
 from util.db_util import obter_conexao as get_connection
 
+
+def _carregar_categorias() -> list[Categoria]:
+    """Lê todas as categorias (exceções propagam)."""
+    with get_connection(somente_leitura=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_TODOS)
+        return [
+            Categoria(
+                id=row["id"],
+                nome=row["nome"],
+                descricao=row["descricao"],
+                data_cadastro=row["data_cadastro"],
+                data_atualizacao=row["data_atualizacao"]
+            )
+            for row in cursor.fetchall()
+        ]
+
+
+# Lista de categorias em memória, validada pela versão "categoria" em versao_dados
+_cache_categorias = CacheVersionado("categoria", _carregar_categorias)
+
+
+def _invalidar_caches() -> None:
+    """Descarta caches que dependem das categorias após uma escrita."""
+    _cache_categorias.invalidar()
+    cache_paginas.invalidar()
+
+
 def criar_tabela():
     """
     Cria a tabela de categorias se ela não existir.
-    Deve ser chamada na inicialização do sistema.
+    Deve ser chamada na inicialização do sistema, após versao_dados_repo.criar_tabela().
     """
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+        versao_dados_repo.registrar("categoria")
+        cursor.execute(CRIAR_TRIGGER_VERSAO_INSERT)
+        cursor.execute(CRIAR_TRIGGER_VERSAO_UPDATE)
+        cursor.execute(CRIAR_TRIGGER_VERSAO_DELETE)
 
 
 def inserir(categoria: Categoria) -> Optional[Categoria]:
@@ -35,10 +70,11 @@ def inserir(categoria: Categoria) -> Optional[Categoria]:
             cursor.execute(INSERIR, (categoria.nome, categoria.descricao))
 
             # Pega o ID gerado automaticamente
-            if cursor.lastrowid:
-                categoria.id = cursor.lastrowid
-                return categoria
-            return None
+            if not cursor.lastrowid:
+                return None
+            categoria.id = cursor.lastrowid
+        _invalidar_caches()
+        return categoria
     except Exception as e:
         print(f"Erro ao inserir categoria: {e}")
         return None
@@ -67,7 +103,10 @@ def alterar(categoria: Categoria) -> bool:
                 ALTERAR,
                 (categoria.nome, categoria.descricao, categoria.id)
             )
-            return cursor.rowcount > 0
+            alterado = cursor.rowcount > 0
+        if alterado:
+            _invalidar_caches()
+        return alterado
     except Exception as e:
         print(f"Erro ao alterar categoria: {e}")
         return False
@@ -93,7 +132,10 @@ def excluir(id: int) -> bool:
         with get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(EXCLUIR, (id,))
-            return cursor.rowcount > 0
+            excluido = cursor.rowcount > 0
+        if excluido:
+            _invalidar_caches()
+        return excluido
     except Exception as e:
         print(f"Erro ao excluir categoria: {e}")
         return False
@@ -117,7 +159,7 @@ def obter_por_id(id: int) -> Optional[Categoria]:
             print("Categoria não existe")
     """
     try:
-        with get_connection() as conn:
+        with get_connection(somente_leitura=True) as conn:
             cursor = conn.cursor()
             cursor.execute(OBTER_POR_ID, (id,))
             row = cursor.fetchone()
@@ -140,6 +182,10 @@ def obter_todos() -> list[Categoria]:
     """
     Retorna todas as categorias do banco de dados.
 
+    Usa o cache em memória enquanto a versão das categorias não mudar
+    (ver util/cache_versionado.py); o custo por chamada é uma consulta
+    por chave primária em versao_dados.
+
     Returns:
         Lista de objetos Categoria (pode ser vazia)
 
@@ -149,26 +195,17 @@ def obter_todos() -> list[Categoria]:
             print(f"{cat.id} - {cat.nome}")
     """
     try:
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(OBTER_TODOS)
-            rows = cursor.fetchall()
-
-            return [
-                Categoria(
-                    id=row["id"],
-                    nome=row["nome"],
-                    descricao=row["descricao"],
-                    data_cadastro=row["data_cadastro"],
-                    data_atualizacao=row["data_atualizacao"]
-                )
-                for row in rows
-            ]
+        return list(_cache_categorias.obter())
     except Exception as e:
         print(f"Erro ao obter todas as categorias: {e}")
         return []
 
 
+def obter_estatisticas_cache() -> dict:
+    """Retorna as métricas do cache de categorias."""
+    return _cache_categorias.obter_estatisticas()
+
+
 def obter_por_nome(nome: str) -> Optional[Categoria]:
     """
     Busca uma categoria pelo nome exato.
@@ -187,7 +224,7 @@ def obter_por_nome(nome: str) -> Optional[Categoria]:
             print("Nome disponível")
     """
     try:
-        with get_connection() as conn:
+        with get_connection(somente_leitura=True) as conn:
             cursor = conn.cursor()
             cursor.execute(OBTER_POR_NOME, (nome,))
             row = cursor.fetchone()
@@ -78,7 +78,7 @@ def obter_por_chamado(chamado_id: int) -> list[ChamadoInteracao]:
     Returns:
         Lista de objetos ChamadoInteracao ordenados por data
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_CHAMADO, (chamado_id,))
         rows = cursor.fetchall()
@@ -95,7 +95,7 @@ def obter_por_id(id: int) -> Optional[ChamadoInteracao]:
     Returns:
         Objeto ChamadoInteracao ou None se não encontrado
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (id,))
         row = cursor.fetchone()
@@ -114,7 +114,7 @@ def contar_por_chamado(chamado_id: int) -> int:
     Returns:
         Número de interações
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(CONTAR_POR_CHAMADO, (chamado_id,))
         row = cursor.fetchone()
@@ -175,7 +175,7 @@ def obter_contador_nao_lidas(usuario_id: int) -> dict[int, int]:
     Returns:
         Dict {chamado_id: quantidade_nao_lidas}
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(CONTAR_NAO_LIDAS_POR_CHAMADO, (usuario_id,))
         rows = cursor.fetchall()
@@ -198,7 +198,7 @@ def tem_resposta_admin(chamado_id: int) -> bool:
     Returns:
         True se houver pelo menos uma resposta de admin, False caso contrário
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(TEM_RESPOSTA_ADMIN, (chamado_id,))
         row = cursor.fetchone()
@@ -44,7 +44,7 @@ def inserir(chamado: Chamado) -> Optional[int]:
 def obter_todos(usuario_logado_id: int) -> list[Chamado]:
     from repo import chamado_interacao_repo
 
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS)
         rows = cursor.fetchall()
@@ -63,7 +63,7 @@ def obter_todos(usuario_logado_id: int) -> list[Chamado]:
 def obter_por_usuario(usuario_id: int) -> list[Chamado]:
     from repo import chamado_interacao_repo
 
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_USUARIO, (usuario_id,))
         rows = cursor.fetchall()
@@ -81,7 +81,7 @@ def obter_por_usuario(usuario_id: int) -> list[Chamado]:
 
 
 def obter_por_id(id: int) -> Optional[Chamado]:
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (id,))
         row = cursor.fetchone()
@@ -116,7 +116,7 @@ def excluir(id: int) -> bool:
 
 
 def contar_abertos_por_usuario(usuario_id: int) -> int:
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(CONTAR_ABERTOS_POR_USUARIO, (usuario_id,))
         row = cursor.fetchone()
@@ -124,7 +124,7 @@ def contar_abertos_por_usuario(usuario_id: int) -> int:
 
 
 def contar_pendentes() -> int:
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(CONTAR_PENDENTES)
         row = cursor.fetchone()
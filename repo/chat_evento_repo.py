@@ -0,0 +1,82 @@
+"""
+Repositório para a tabela chat_evento (eventos de chat entre workers).
+"""
+import json
+import time
+
+from sql.chat_evento_sql import (
+    CRIAR_TABELA,
+    CRIAR_INDICE_CRIADO_EM,
+    INSERIR,
+    LISTAR_POSTERIORES,
+    OBTER_ULTIMO_ID,
+    EXCLUIR_ANTERIORES,
+)
+from util.db_util import obter_conexao
+
+
+def criar_tabela() -> bool:
+    """Cria a tabela chat_evento e seu índice se não existirem."""
+    try:
+        with obter_conexao() as conn:
+            conn.execute(CRIAR_TABELA)
+            conn.execute(CRIAR_INDICE_CRIADO_EM)
+            return True
+    except Exception as e:
+        print(f"Erro ao criar tabela chat_evento: {e}")
+        return False
+
+
+def inserir(sala_id: str, origem: str, evento: dict) -> int:
+    """
+    Publica um evento de chat.
+
+    Args:
+        sala_id: ID da sala do evento
+        origem: Identificador do worker que publicou
+        evento: Dados do evento (serializados em JSON)
+
+    Returns:
+        ID do evento
+    """
+    with obter_conexao() as conn:
+        cursor = conn.execute(INSERIR, (sala_id, origem, json.dumps(evento), time.time()))
+        return cursor.lastrowid
+
+
+def listar_posteriores(ultimo_id: int, limite: int) -> list[tuple[int, str, str, dict]]:
+    """
+    Lista eventos publicados depois de ultimo_id.
+
+    Args:
+        ultimo_id: Último ID já entregue
+        limite: Quantidade máxima de eventos
+
+    Returns:
+        Lista de (id, sala_id, origem, evento) em ordem de publicação
+    """
+    with obter_conexao(somente_leitura=True) as conn:
+        rows = conn.execute(LISTAR_POSTERIORES, (ultimo_id, limite)).fetchall()
+        return [(row["id"], row["sala_id"], row["origem"], json.loads(row["dados"])) for row in rows]
+
+
+def obter_ultimo_id() -> int:
+    """Retorna o maior ID de evento publicado (0 se não há eventos)."""
+    with obter_conexao(somente_leitura=True) as conn:
+        row = conn.execute(OBTER_ULTIMO_ID).fetchone()
+        return row["ultimo_id"] if row else 0
+
+
+def excluir_anteriores(instante: float) -> int:
+    """
+    Remove eventos publicados antes do instante indicado.
+
+    Args:
+        instante: Timestamp (segundos desde a época)
+
+    Returns:
+        Quantidade de eventos removidos
+    """
+    with obter_conexao() as conn:
+        cursor = conn.execute(EXCLUIR_ANTERIORES, (instante,))
+        return cursor.rowcount
@@ -1,23 +1,39 @@
 """
 Repositório para operações com a tabela chat_mensagem.
 """
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Union
 from sqlite3 import Row
 
 from model.chat_mensagem_model import ChatMensagem
 from sql.chat_mensagem_sql import (
     CRIAR_TABELA,
+    CRIAR_TABELA_ARQUIVO,
     INSERIR,
+    VERIFICAR_ENVIO,
     OBTER_POR_ID,
-    LISTAR_POR_SALA,
+    LISTAR_RECENTES_POR_SALA,
+    LISTAR_ANTERIORES_POR_SALA,
+    LISTAR_POSTERIORES_POR_SALA,
+    LISTAR_POSTERIORES_DO_USUARIO,
+    OBTER_ULTIMO_ID,
     CONTAR_POR_SALA,
     MARCAR_COMO_LIDAS,
     OBTER_ULTIMA_MENSAGEM_SALA,
-    EXCLUIR
+    EXCLUIR,
+    OBTER_FAIXA_LOTE_ARQUIVAMENTO,
+    COPIAR_PARA_ARQUIVO,
+    EXCLUIR_ARQUIVADAS,
+    CONTAR_ARQUIVADAS,
 )
+from repo import chat_participante_repo, chat_sala_repo
 from util.db_util import obter_conexao
 from util.datetime_util import agora
 
+# Resultados de enviar_em_lote para pedidos recusados
+SEM_ACESSO = "sem_acesso"
+SALA_INEXISTENTE = "sala_inexistente"
+
 
 def _row_to_mensagem(row: Row) -> ChatMensagem:
     """Converte uma row do banco em objeto ChatMensagem."""
@@ -41,10 +57,11 @@ def _row_to_mensagem(row: Row) -> ChatMensagem:
 
 
 def criar_tabela():
-    """Cria a tabela chat_mensagem se não existir."""
+    """Cria as tabelas chat_mensagem e chat_mensagem_arquivo se não existirem."""
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+        cursor.execute(CRIAR_TABELA_ARQUIVO)
 
 
 def inserir(sala_id: str, usuario_id: int, mensagem: str) -> ChatMensagem:
@@ -65,6 +82,8 @@ def inserir(sala_id: str, usuario_id: int, mensagem: str) -> ChatMensagem:
         cursor = conn.cursor()
         cursor.execute(INSERIR, (sala_id, usuario_id, mensagem, data_envio, None))
         mensagem_id = cursor.lastrowid
+        # Mesma transação: contador e mensagem nunca divergem
+        chat_participante_repo.incrementar_nao_lidas(sala_id, usuario_id)
 
     return ChatMensagem(
         id=mensagem_id,
@@ -76,9 +95,63 @@ def inserir(sala_id: str, usuario_id: int, mensagem: str) -> ChatMensagem:
     )
 
 
+def enviar_em_lote(pedidos: List[tuple[str, int, str]]) -> List[Union[ChatMensagem, str]]:
+    """
+    Processa envios de mensagens em uma única transação.
+
+    Para cada pedido: verifica se o remetente participa da sala e se a sala
+    existe, insere a mensagem, incrementa as não lidas dos demais e
+    atualiza a última atividade da sala. Pedidos recusados não afetam os
+    demais do lote.
+
+    Args:
+        pedidos: Lista de (sala_id, usuario_id, mensagem)
+
+    Returns:
+        Para cada pedido, na mesma ordem, o ChatMensagem criado ou
+        SEM_ACESSO / SALA_INEXISTENTE
+    """
+    resultados: List[Union[ChatMensagem, str]] = []
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        for sala_id, usuario_id, mensagem in pedidos:
+            verificacao = cursor.execute(VERIFICAR_ENVIO, (sala_id, usuario_id, sala_id)).fetchone()
+            if not verificacao["participante"]:
+                resultados.append(SEM_ACESSO)
+                continue
+            if not verificacao["sala"]:
+                resultados.append(SALA_INEXISTENTE)
+                continue
+
+            data_envio = agora()
+            cursor.execute(INSERIR, (sala_id, usuario_id, mensagem, data_envio, None))
+            mensagem_id = cursor.lastrowid
+            chat_participante_repo.incrementar_nao_lidas(sala_id, usuario_id)
+            chat_sala_repo.atualizar_ultima_atividade(sala_id)
+            resultados.append(ChatMensagem(
+                id=mensagem_id,
+                sala_id=sala_id,
+                usuario_id=usuario_id,
+                mensagem=mensagem,
+                data_envio=data_envio,
+                lida_em=None
+            ))
+    return resultados
+
+
+def enviar(sala_id: str, usuario_id: int, mensagem: str) -> Union[ChatMensagem, str]:
+    """
+    Envia uma mensagem (verificação, inserção e atualizações) em uma transação.
+
+    Returns:
+        ChatMensagem criado ou SEM_ACESSO / SALA_INEXISTENTE
+    """
+    return enviar_em_lote([(sala_id, usuario_id, mensagem)])[0]
+
+
 def obter_por_id(mensagem_id: int) -> Optional[ChatMensagem]:
     """
-    Obtém uma mensagem pelo ID.
+    Obtém uma mensagem pelo ID (na tabela principal ou no arquivo).
 
     Args:
         mensagem_id: ID da mensagem
@@ -86,9 +159,9 @@ def obter_por_id(mensagem_id: int) -> Optional[ChatMensagem]:
     Returns:
         Objeto ChatMensagem ou None se não encontrada
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
-        cursor.execute(OBTER_POR_ID, (mensagem_id,))
+        cursor.execute(OBTER_POR_ID, (mensagem_id, mensagem_id))
         row = cursor.fetchone()
 
         if row:
@@ -96,29 +169,85 @@ def obter_por_id(mensagem_id: int) -> Optional[ChatMensagem]:
         return None
 
 
-def listar_por_sala(sala_id: str, limit: int = 50, offset: int = 0) -> List[ChatMensagem]:
+def listar_por_sala(
+    sala_id: str,
+    limit: int = 50,
+    antes_de_id: Optional[int] = None,
+    depois_de_id: Optional[int] = None,
+) -> List[ChatMensagem]:
     """
-    Lista mensagens de uma sala com paginação.
+    Lista mensagens de uma sala paginando por cursor (id da mensagem).
+
+    Sem cursor, retorna as limit mensagens mais recentes. Com antes_de_id,
+    as limit mensagens imediatamente anteriores (rolagem para o passado);
+    com depois_de_id, as limit imediatamente posteriores. Mensagens movidas
+    para o arquivo pela retenção continuam aparecendo na mesma ordem.
 
     Args:
         sala_id: ID da sala
         limit: Número máximo de mensagens a retornar
-        offset: Número de mensagens a pular (para paginação)
+        antes_de_id: Retornar mensagens com ID menor que este
+        depois_de_id: Retornar mensagens com ID maior que este
 
     Returns:
         Lista de objetos ChatMensagem (ordenadas por ID crescente - mais antigas primeiro)
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
+        cursor = conn.cursor()
+        if depois_de_id is not None:
+            filtro = (sala_id, depois_de_id, limit)
+            cursor.execute(LISTAR_POSTERIORES_POR_SALA, filtro + filtro + (limit,))
+            return [_row_to_mensagem(row) for row in cursor.fetchall()]
+
+        if antes_de_id is not None:
+            filtro = (sala_id, antes_de_id, limit)
+            cursor.execute(LISTAR_ANTERIORES_POR_SALA, filtro + filtro + (limit,))
+        else:
+            filtro = (sala_id, limit)
+            cursor.execute(LISTAR_RECENTES_POR_SALA, filtro + filtro + (limit,))
+        rows = cursor.fetchall()
+
+        return [_row_to_mensagem(row) for row in reversed(rows)]
+
+
+def listar_posteriores_do_usuario(usuario_id: int, apos_id: int, limit: int) -> List[ChatMensagem]:
+    """
+    Lista mensagens de todas as salas do usuário com ID maior que apos_id.
+
+    Usada para reenviar ao stream SSE as mensagens perdidas durante uma
+    reconexão, em uma única consulta.
+
+    Args:
+        usuario_id: ID do usuário
+        apos_id: Último ID de mensagem recebido pelo cliente
+        limit: Número máximo de mensagens a retornar
+
+    Returns:
+        Lista de objetos ChatMensagem (ordenadas por ID crescente)
+    """
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
-        cursor.execute(LISTAR_POR_SALA, (sala_id, limit, offset))
+        cursor.execute(LISTAR_POSTERIORES_DO_USUARIO, (apos_id, usuario_id, limit))
         rows = cursor.fetchall()
 
         return [_row_to_mensagem(row) for row in rows]
 
 
+def obter_ultimo_id() -> int:
+    """
+    Obtém o id da mensagem mais recente (0 se não houver mensagens).
+
+    Usado para marcar o pedido de ressincronização do stream SSE: após
+    recarregar o estado, o cliente reconecta a partir deste id.
+    """
+    with obter_conexao(somente_leitura=True) as conn:
+        row = conn.execute(OBTER_ULTIMO_ID).fetchone()
+        return row["ultimo_id"] or 0
+
+
 def contar_por_sala(sala_id: str) -> int:
     """
-    Conta o total de mensagens em uma sala.
+    Conta o total de mensagens em uma sala (incluindo as arquivadas).
 
     Args:
         sala_id: ID da sala
@@ -126,9 +255,9 @@ def contar_por_sala(sala_id: str) -> int:
     Returns:
         Número total de mensagens
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
-        cursor.execute(CONTAR_POR_SALA, (sala_id,))
+        cursor.execute(CONTAR_POR_SALA, (sala_id, sala_id))
         row = cursor.fetchone()
 
         return row["total"] if row else 0
@@ -148,9 +277,63 @@ def marcar_como_lidas(sala_id: str, usuario_id: int) -> bool:
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(MARCAR_COMO_LIDAS, (agora(), sala_id, usuario_id))
+        chat_participante_repo.zerar_nao_lidas(sala_id, usuario_id)
         return cursor.rowcount >= 0  # Retorna True mesmo se nenhuma mensagem foi marcada
 
 
+def registrar_leitura(sala_id: str, usuario_id: int) -> bool:
+    """
+    Marca a sala como lida pelo usuário em uma única transação.
+
+    Verifica a participação, marca as mensagens dos outros como lidas, zera
+    o contador de não lidas e atualiza a última leitura do participante.
+
+    Args:
+        sala_id: ID da sala
+        usuario_id: ID do usuário que está lendo
+
+    Returns:
+        True se registrada, False se o usuário não participa da sala
+    """
+    with obter_conexao() as conn:
+        if not chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id):
+            return False
+        marcar_como_lidas(sala_id, usuario_id)
+        chat_participante_repo.atualizar_ultima_leitura(sala_id, usuario_id)
+        return True
+
+
+def arquivar_lote(antes_de: datetime, lote: int) -> int:
+    """
+    Move para chat_mensagem_arquivo um lote de mensagens antigas, em uma transação.
+
+    Só são arquivadas mensagens enviadas antes de antes_de, já lidas e que
+    não são a última mensagem da sala.
+
+    Args:
+        antes_de: Data de corte (mensagens enviadas antes dela)
+        lote: Máximo de mensagens movidas
+
+    Returns:
+        Quantidade de mensagens arquivadas (0 quando não há mais elegíveis)
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        faixa = cursor.execute(OBTER_FAIXA_LOTE_ARQUIVAMENTO, (antes_de, lote)).fetchone()
+        if faixa["fim"] is None:
+            return 0
+        cursor.execute(COPIAR_PARA_ARQUIVO, (agora(), faixa["inicio"], faixa["fim"], antes_de))
+        cursor.execute(EXCLUIR_ARQUIVADAS, (faixa["inicio"], faixa["fim"]))
+        return cursor.rowcount
+
+
+def contar_arquivadas() -> int:
+    """Conta as mensagens no arquivo."""
+    with obter_conexao(somente_leitura=True) as conn:
+        row = conn.execute(CONTAR_ARQUIVADAS).fetchone()
+        return row["total"] if row else 0
+
+
 def obter_ultima_mensagem_sala(sala_id: str) -> Optional[ChatMensagem]:
     """
     Obtém a última mensagem enviada em uma sala.
@@ -161,7 +344,7 @@ def obter_ultima_mensagem_sala(sala_id: str) -> Optional[ChatMensagem]:
     Returns:
         Objeto ChatMensagem ou None se não houver mensagens
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_ULTIMA_MENSAGEM_SALA, (sala_id,))
         row = cursor.fetchone()
@@ -4,19 +4,27 @@ Repositório para operações com a tabela chat_participante.
 from typing import Optional, List
 from sqlite3 import Row
 
+from model.chat_conversa_model import ChatConversa
 from model.chat_participante_model import ChatParticipante
 from sql.chat_participante_sql import (
     CRIAR_TABELA,
+    ADICIONAR_COLUNA_NAO_LIDAS,
     INSERIR,
     OBTER_POR_SALA_E_USUARIO,
     LISTAR_POR_SALA,
     LISTAR_POR_USUARIO,
     ATUALIZAR_ULTIMA_LEITURA,
     CONTAR_MENSAGENS_NAO_LIDAS,
+    SOMAR_NAO_LIDAS_POR_USUARIO,
+    INCREMENTAR_NAO_LIDAS,
+    ZERAR_NAO_LIDAS,
+    RECONTAR_NAO_LIDAS,
+    LISTAR_CONVERSAS,
     EXCLUIR
 )
 from util.db_util import obter_conexao
 from util.datetime_util import agora
+from util.logger_config import logger
 
 
 def _row_to_participante(row: Row) -> ChatParticipante:
@@ -29,16 +37,43 @@ def _row_to_participante(row: Row) -> ChatParticipante:
     return ChatParticipante(
         sala_id=row["sala_id"],
         usuario_id=row["usuario_id"],
-        ultima_leitura=ultima_leitura
+        ultima_leitura=ultima_leitura,
+        nao_lidas=row["nao_lidas"] if "nao_lidas" in row.keys() else 0
+    )
+
+
+def _row_to_conversa(row: Row) -> ChatConversa:
+    """Converte uma row da consulta de conversas em objeto ChatConversa."""
+    return ChatConversa(
+        sala_id=row["sala_id"],
+        ultima_atividade=row["ultima_atividade"],
+        outro_usuario_id=row["outro_usuario_id"],
+        outro_usuario_nome=row["outro_usuario_nome"],
+        outro_usuario_email=row["outro_usuario_email"],
+        ultima_mensagem=row["ultima_mensagem"],
+        ultima_mensagem_data_envio=row["ultima_mensagem_data_envio"],
+        ultima_mensagem_usuario_id=row["ultima_mensagem_usuario_id"],
+        nao_lidas=row["nao_lidas"] or 0
     )
 
 
 def criar_tabela():
-    """Cria a tabela chat_participante se não existir."""
+    """
+    Cria a tabela chat_participante se não existir.
+
+    Bancos criados antes do contador de não lidas recebem a coluna
+    nao_lidas e têm o contador recalculado a partir das mensagens.
+    """
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
 
+        colunas = [row["name"] for row in cursor.execute("PRAGMA table_info(chat_participante)")]
+        if "nao_lidas" not in colunas:
+            cursor.execute(ADICIONAR_COLUNA_NAO_LIDAS)
+            logger.info("Coluna chat_participante.nao_lidas adicionada")
+            recontar_nao_lidas()
+
 
 def adicionar_participante(sala_id: str, usuario_id: int) -> ChatParticipante:
     """
@@ -73,7 +108,7 @@ def obter_por_sala_e_usuario(sala_id: str, usuario_id: int) -> Optional[ChatPart
     Returns:
         Objeto ChatParticipante ou None se não encontrado
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_SALA_E_USUARIO, (sala_id, usuario_id))
         row = cursor.fetchone()
@@ -93,7 +128,7 @@ def listar_por_sala(sala_id: str) -> List[ChatParticipante]:
     Returns:
         Lista de objetos ChatParticipante
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(LISTAR_POR_SALA, (sala_id,))
         rows = cursor.fetchall()
@@ -111,7 +146,7 @@ def listar_por_usuario(usuario_id: int) -> List[ChatParticipante]:
     Returns:
         Lista de objetos ChatParticipante
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(LISTAR_POR_USUARIO, (usuario_id,))
         rows = cursor.fetchall()
@@ -147,15 +182,113 @@ def contar_mensagens_nao_lidas(sala_id: str, usuario_id: int) -> int:
     Returns:
         Número de mensagens não lidas
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
-        # Passar usuario_id 3 vezes: para sala_id, usuario_id != ?, e duas vezes na subquery
-        cursor.execute(CONTAR_MENSAGENS_NAO_LIDAS, (sala_id, usuario_id, usuario_id, usuario_id))
+        cursor.execute(CONTAR_MENSAGENS_NAO_LIDAS, (sala_id, usuario_id))
         row = cursor.fetchone()
 
         return row["total"] if row else 0
 
 
+def somar_nao_lidas(usuario_id: int) -> int:
+    """
+    Soma as mensagens não lidas do usuário em todas as salas.
+
+    Args:
+        usuario_id: ID do usuário
+
+    Returns:
+        Total de mensagens não lidas
+    """
+    with obter_conexao(somente_leitura=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(SOMAR_NAO_LIDAS_POR_USUARIO, (usuario_id,))
+        row = cursor.fetchone()
+
+        return row["total"] if row else 0
+
+
+def incrementar_nao_lidas(sala_id: str, remetente_id: int) -> int:
+    """
+    Incrementa o contador de não lidas dos demais participantes da sala.
+
+    Chamado por chat_mensagem_repo.inserir na mesma transação da mensagem.
+
+    Args:
+        sala_id: ID da sala
+        remetente_id: ID do usuário que enviou a mensagem
+
+    Returns:
+        Quantidade de participantes atualizados
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(INCREMENTAR_NAO_LIDAS, (sala_id, remetente_id))
+        return cursor.rowcount
+
+
+def zerar_nao_lidas(sala_id: str, usuario_id: int) -> bool:
+    """
+    Zera o contador de não lidas do usuário na sala.
+
+    Chamado por chat_mensagem_repo.marcar_como_lidas na mesma transação.
+
+    Args:
+        sala_id: ID da sala
+        usuario_id: ID do usuário
+
+    Returns:
+        True se o contador foi alterado, False se já estava zerado
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(ZERAR_NAO_LIDAS, (sala_id, usuario_id))
+        return cursor.rowcount > 0
+
+
+def recontar_nao_lidas() -> int:
+    """
+    Recalcula os contadores de não lidas a partir das mensagens.
+
+    Corrige divergências (ex.: mensagens inseridas fora do repositório
+    ou restauração de backup antigo). Pode ser executado a qualquer momento.
+
+    Returns:
+        Quantidade de participantes cujo contador estava divergente
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(RECONTAR_NAO_LIDAS)
+        corrigidos = cursor.rowcount
+
+    if corrigidos:
+        logger.warning(f"Contador de não lidas corrigido em {corrigidos} participante(s)")
+    return corrigidos
+
+
+def listar_conversas(usuario_id: int, limit: int = 12, offset: int = 0) -> List[ChatConversa]:
+    """
+    Lista as conversas do usuário, da mais recente para a mais antiga.
+
+    Uma única consulta retorna o outro participante, a última mensagem e o
+    contador de não lidas de cada sala, com a paginação feita no SQL.
+
+    Args:
+        usuario_id: ID do usuário
+        limit: Quantidade máxima de conversas
+        offset: Quantidade de conversas a pular
+
+    Returns:
+        Lista de objetos ChatConversa
+    """
+    with obter_conexao(somente_leitura=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_CONVERSAS, (usuario_id, limit, offset))
+        rows = cursor.fetchall()
+
+        return [_row_to_conversa(row) for row in rows]
+
+
 def excluir(sala_id: str, usuario_id: int) -> bool:
     """
     Remove um participante de uma sala.
@@ -107,7 +107,7 @@ def obter_por_id(sala_id: str) -> Optional[ChatSala]:
     Returns:
         Objeto ChatSala ou None se não encontrada
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (sala_id,))
         row = cursor.fetchone()
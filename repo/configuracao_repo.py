@@ -25,14 +25,20 @@ def _row_to_configuracao(row) -> Configuracao:
 
 
 def criar_tabela() -> bool:
+    from repo import versao_dados_repo
+
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+        versao_dados_repo.registrar("configuracao")
+        cursor.execute(CRIAR_TRIGGER_VERSAO_INSERT)
+        cursor.execute(CRIAR_TRIGGER_VERSAO_UPDATE)
+        cursor.execute(CRIAR_TRIGGER_VERSAO_DELETE)
         return True
 
 
 def obter_por_chave(chave: str) -> Optional[Configuracao]:
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_CHAVE, (chave,))
         row = cursor.fetchone()
@@ -42,7 +48,7 @@ def obter_por_chave(chave: str) -> Optional[Configuracao]:
 
 
 def obter_todos() -> list[Configuracao]:
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS)
         rows = cursor.fetchall()
@@ -24,6 +24,9 @@ def criar_indices() -> None:
                 except Exception as e:
                     logger.warning(f"Erro ao criar índice (pode já existir): {e}")
 
+            # Atualiza estatísticas do planejador apenas onde necessário
+            cursor.execute("PRAGMA optimize")
+
             logger.info("Todos os índices verificados/criados com sucesso")
 
     except Exception as e:
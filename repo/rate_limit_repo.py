@@ -0,0 +1,109 @@
+"""
+Repositório para a tabela rate_limit (estado compartilhado dos rate limiters).
+"""
+from typing import Optional
+
+from sql.rate_limit_sql import (
+    CRIAR_TABELA,
+    REMOVER_TABELA_ANTIGA,
+    REGISTRAR_TENTATIVA,
+    OBTER_CONTADORES,
+    EXCLUIR_IDENTIFICADOR,
+    EXCLUIR_LIMITER,
+    EXCLUIR_EXPIRADOS,
+    OBTER_QUANTIDADE,
+)
+from util.db_util import obter_conexao
+
+
+def criar_tabela() -> bool:
+    """Cria a tabela rate_limit se não existir."""
+    try:
+        with obter_conexao() as conn:
+            colunas = [row["name"] for row in conn.execute("PRAGMA table_info(rate_limit)")]
+            if "indice" in colunas:
+                conn.execute(REMOVER_TABELA_ANTIGA)
+            conn.execute(CRIAR_TABELA)
+            return True
+    except Exception as e:
+        print(f"Erro ao criar tabela rate_limit: {e}")
+        return False
+
+
+def registrar_tentativa(
+    limiter: str, identificador: str, inicio: int, janela: int, peso: float, max_tentativas: int
+) -> tuple[bool, int, int]:
+    """
+    Verifica e registra uma tentativa atomicamente (um único comando).
+
+    Args:
+        limiter: Nome do limiter
+        identificador: Identificador do cliente (geralmente IP)
+        inicio: Início da janela fixa atual (segundos desde a época)
+        janela: Tamanho da janela em segundos
+        peso: Fração da janela anterior ainda dentro da janela deslizante
+        max_tentativas: Máximo de tentativas na janela deslizante
+
+    Returns:
+        (permitido, atual, anterior) após a operação
+    """
+    parametros = {
+        "limiter": limiter,
+        "identificador": identificador,
+        "inicio": inicio,
+        "janela": janela,
+        "peso": peso,
+        "max_tentativas": max_tentativas,
+    }
+    with obter_conexao() as conn:
+        row = conn.execute(REGISTRAR_TENTATIVA, parametros).fetchone()
+        return bool(row["permitido"]), row["atual"], row["anterior"]
+
+
+def obter_contadores(
+    limiter: str, identificador: str, inicio: int, janela: int
+) -> Optional[tuple[int, int]]:
+    """
+    Retorna (atual, anterior) do identificador na janela iniciada em inicio.
+
+    Returns:
+        Contadores ou None se o identificador não tem registro
+    """
+    parametros = {"limiter": limiter, "identificador": identificador, "inicio": inicio, "janela": janela}
+    with obter_conexao(somente_leitura=True) as conn:
+        row = conn.execute(OBTER_CONTADORES, parametros).fetchone()
+        return (row["atual"], row["anterior"]) if row else None
+
+
+def excluir(limiter: str, identificador: Optional[str] = None) -> int:
+    """
+    Remove um identificador do limiter, ou todos se identificador for None.
+
+    Returns:
+        Quantidade de linhas removidas
+    """
+    with obter_conexao() as conn:
+        if identificador:
+            cursor = conn.execute(EXCLUIR_IDENTIFICADOR, (limiter, identificador))
+        else:
+            cursor = conn.execute(EXCLUIR_LIMITER, (limiter,))
+        return cursor.rowcount
+
+
+def excluir_expirados(limiter: str, inicio_minimo: int) -> int:
+    """
+    Remove identificadores cuja última janela começou antes de inicio_minimo.
+
+    Returns:
+        Quantidade de linhas removidas
+    """
+    with obter_conexao() as conn:
+        cursor = conn.execute(EXCLUIR_EXPIRADOS, (limiter, inicio_minimo))
+        return cursor.rowcount
+
+
+def obter_quantidade(limiter: str) -> int:
+    """Retorna quantos identificadores o limiter tem registrados."""
+    with obter_conexao(somente_leitura=True) as conn:
+        row = conn.execute(OBTER_QUANTIDADE, (limiter,)).fetchone()
+        return row["quantidade"] if row else 0
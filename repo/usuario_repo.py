@@ -81,7 +81,7 @@ def excluir(id: int) -> bool:
 
 
 def obter_por_id(id: int) -> Optional[Usuario]:
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (id,))
         row = cursor.fetchone()
@@ -91,7 +91,7 @@ def obter_por_id(id: int) -> Optional[Usuario]:
 
 
 def obter_todos() -> list[Usuario]:
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS)
         rows = cursor.fetchall()
@@ -99,7 +99,7 @@ def obter_todos() -> list[Usuario]:
 
 
 def obter_quantidade() -> int:
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_QUANTIDADE)
         row = cursor.fetchone()
@@ -107,7 +107,7 @@ def obter_quantidade() -> int:
 
 
 def obter_por_email(email: str) -> Optional[Usuario]:
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_EMAIL, (email,))
         row = cursor.fetchone()
@@ -124,7 +124,7 @@ def atualizar_token(email: str, token: str, data_expiracao: datetime) -> bool:
 
 
 def obter_por_token(token: str) -> Optional[Usuario]:
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_TOKEN, (token,))
         row = cursor.fetchone()
@@ -141,7 +141,7 @@ def limpar_token(id: int) -> bool:
 
 
 def obter_todos_por_perfil(perfil: str) -> list[Usuario]:
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS_POR_PERFIL, (perfil,))
         rows = cursor.fetchall()
@@ -159,7 +159,7 @@ def buscar_por_termo(termo: str, limit: int = 10) -> list[Usuario]:
     Returns:
         Lista de usuários que correspondem à busca
     """
-    with obter_conexao() as conn:
+    with obter_conexao(somente_leitura=True) as conn:
         cursor = conn.cursor()
         cursor.execute(
             """SELECT id, nome, email, senha, perfil,
@@ -0,0 +1,71 @@
+"""
+Repositório para a tabela versao_dados (versões dos dados em cache).
+"""
+from typing import Optional
+
+from sql.versao_dados_sql import CRIAR_TABELA, REGISTRAR, OBTER_VERSAO, INCREMENTAR
+from util.db_util import obter_conexao
+
+
+def criar_tabela() -> bool:
+    """
+    Cria a tabela versao_dados se não existir.
+
+    Deve ser chamada antes das tabelas cujas triggers atualizam versões.
+    """
+    try:
+        with obter_conexao() as conn:
+            conn.execute(CRIAR_TABELA)
+            return True
+    except Exception as e:
+        print(f"Erro ao criar tabela versao_dados: {e}")
+        return False
+
+
+def registrar(nome: str) -> None:
+    """
+    Garante a linha de versão de um conjunto de dados.
+
+    Args:
+        nome: Nome do conjunto (ex.: "categoria")
+    """
+    with obter_conexao() as conn:
+        conn.execute(REGISTRAR, (nome,))
+
+
+def obter_versao(nome: str) -> Optional[int]:
+    """
+    Retorna a versão atual de um conjunto de dados.
+
+    Args:
+        nome: Nome do conjunto
+
+    Returns:
+        Versão atual ou None se não registrada / erro de acesso
+    """
+    try:
+        with obter_conexao(somente_leitura=True) as conn:
+            row = conn.execute(OBTER_VERSAO, (nome,)).fetchone()
+            return row["versao"] if row else None
+    except Exception as e:
+        print(f"Erro ao obter versão de '{nome}': {e}")
+        return None
+
+
+def incrementar(nome: str) -> bool:
+    """
+    Incrementa a versão de um conjunto de dados.
+
+    Args:
+        nome: Nome do conjunto
+
+    Returns:
+        True se incrementou, False se não registrado / erro
+    """
+    try:
+        with obter_conexao() as conn:
+            cursor = conn.execute(INCREMENTAR, (nome,))
+            return cursor.rowcount > 0
+    except Exception as e:
+        print(f"Erro ao incrementar versão de '{nome}': {e}")
+        return False
@@ -5,16 +5,18 @@ Permite ao administrador criar, listar, restaurar e excluir backups do banco SQL
 """
 from typing import Optional
 from fastapi import APIRouter, Request, status
-from fastapi.responses import RedirectResponse, FileResponse
+from fastapi.responses import RedirectResponse, FileResponse, JSONResponse
 
 from model.usuario_logado_model import UsuarioLogado
 from util.auth_decorator import requer_autenticacao
 from util.template_util import criar_templates
-from util.flash_messages import informar_sucesso, informar_erro
+from util.config import BACKUP_ESPERA_SEGUNDOS
+from util.db_async import executar_db
+from util.flash_messages import informar_sucesso, informar_erro, informar_info
 from util.logger_config import logger
 from util.perfis import Perfil
 from util import backup_util
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente, registro_limiters
 
 
 router = APIRouter(prefix="/admin/backups")
@@ -38,6 +40,8 @@ backup_download_limiter = DynamicRateLimiter(
     nome="backup_download",
 )
 
+registro_limiters.registrar(admin_backups_limiter, backup_download_limiter)
+
 
 @router.get("/listar")
 @requer_autenticacao([Perfil.ADMIN.value])
@@ -50,7 +54,7 @@ async def get_listar(request: Request, usuario_logado: Optional[UsuarioLogado] =
     assert usuario_logado is not None
 
     # Obter lista de backups
-    backups = backup_util.listar_backups()
+    backups = await executar_db(backup_util.listar_backups)
 
     logger.debug(f"Admin {usuario_logado.id} acessou página de backups - {len(backups)} backup(s) encontrado(s)")
 
@@ -58,7 +62,8 @@ async def get_listar(request: Request, usuario_logado: Optional[UsuarioLogado] =
         "admin/backups/listar.html",
         {
             "request": request,
-            "backups": backups
+            "backups": backups,
+            "tarefa": backup_util.obter_tarefa_em_andamento(),
         }
     )
 
@@ -69,25 +74,35 @@ async def post_criar(request: Request, usuario_logado: Optional[UsuarioLogado] =
     """
     Cria um novo backup do banco de dados
 
-    Copia o arquivo database.db para backups/ com timestamp no nome.
+    A cópia (online, pela API de backup do SQLite) roda em segundo plano.
+    A rota aguarda até BACKUP_ESPERA_SEGUNDOS: bancos pequenos terminam
+    nesse tempo; nos maiores, a página de backups acompanha o progresso
+    por GET /admin/backups/tarefas/{id}.
     """
     assert usuario_logado is not None
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_backups_limiter.verificar(ip):
+    if not await admin_backups_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações de backup. Aguarde alguns minutos e tente novamente.")
         return RedirectResponse("/admin/backups/listar", status_code=status.HTTP_303_SEE_OTHER)
 
-    # Criar backup
-    sucesso, mensagem = backup_util.criar_backup()
-
-    if sucesso:
-        logger.info(f"Backup criado por admin {usuario_logado.id}: {mensagem}")
-        informar_sucesso(request, mensagem)
+    # Iniciar backup em segundo plano e aguardar um pouco pela conclusão
+    tarefa = backup_util.iniciar_backup()
+    if tarefa.operacao == "restauracao":
+        informar_erro(request, f"Há uma restauração em andamento ({tarefa.nome_arquivo}). Aguarde a conclusão.")
+        return RedirectResponse("/admin/backups/listar", status_code=status.HTTP_303_SEE_OTHER)
+    tarefa = await backup_util.aguardar_tarefa(tarefa.id, BACKUP_ESPERA_SEGUNDOS) or tarefa
+
+    if tarefa.status == "concluido":
+        logger.info(f"Backup criado por admin {usuario_logado.id}: {tarefa.mensagem}")
+        informar_sucesso(request, tarefa.mensagem)
+    elif tarefa.status == "erro":
+        logger.error(f"Erro ao criar backup por admin {usuario_logado.id}: {tarefa.mensagem}")
+        informar_erro(request, tarefa.mensagem)
     else:
-        logger.error(f"Erro ao criar backup por admin {usuario_logado.id}: {mensagem}")
-        informar_erro(request, mensagem)
+        logger.info(f"Backup em andamento iniciado por admin {usuario_logado.id}: {tarefa.nome_arquivo}")
+        informar_info(request, f"Backup em andamento: {tarefa.nome_arquivo}. O progresso é exibido abaixo.")
 
     return RedirectResponse(
         "/admin/backups/listar",
@@ -95,6 +110,24 @@ async def post_criar(request: Request, usuario_logado: Optional[UsuarioLogado] =
     )
 
 
+@router.get("/tarefas/{tarefa_id}")
+@requer_autenticacao([Perfil.ADMIN.value])
+async def get_tarefa(request: Request, tarefa_id: str, usuario_logado: Optional[UsuarioLogado] = None):
+    """
+    Retorna o status de um backup ou restauração em segundo plano (consultado pela página de backups)
+
+    Args:
+        tarefa_id: ID da tarefa
+    """
+    assert usuario_logado is not None
+
+    tarefa = backup_util.obter_tarefa(tarefa_id)
+    if not tarefa:
+        return JSONResponse({"erro": "Tarefa de backup não encontrada"}, status_code=status.HTTP_404_NOT_FOUND)
+
+    return JSONResponse(tarefa.para_dict())
+
+
 @router.post("/restaurar/{nome_arquivo}")
 @requer_autenticacao([Perfil.ADMIN.value])
 async def post_restaurar(
@@ -108,6 +141,10 @@ async def post_restaurar(
     IMPORTANTE: Esta operação sobrescreve o banco de dados atual!
     Um backup automático do estado atual é criado antes da restauração.
 
+    Como na criação, a restauração roda em segundo plano: a rota aguarda até
+    BACKUP_ESPERA_SEGUNDOS e, nos bancos maiores, a página de backups
+    acompanha o progresso por GET /admin/backups/tarefas/{id}.
+
     Args:
         nome_arquivo: Nome do arquivo de backup a restaurar
     """
@@ -115,7 +152,7 @@ async def post_restaurar(
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_backups_limiter.verificar(ip):
+    if not await admin_backups_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações de backup. Aguarde alguns minutos e tente novamente.")
         return RedirectResponse("/admin/backups/listar", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -124,32 +161,40 @@ async def post_restaurar(
         f"Admin {usuario_logado.id} iniciou restauração de backup: {nome_arquivo}"
     )
 
-    # Restaurar backup (com backup automático do estado atual)
-    sucesso, mensagem, nome_backup_automatico = backup_util.restaurar_backup(
+    # Restaurar backup em segundo plano (com backup automático do estado atual)
+    tarefa, mensagem = backup_util.iniciar_restauracao(
         nome_arquivo,
         criar_backup_antes=True
     )
+    if tarefa is None:
+        informar_erro(request, mensagem)
+        return RedirectResponse("/admin/backups/listar", status_code=status.HTTP_303_SEE_OTHER)
 
-    if sucesso:
+    tarefa = await backup_util.aguardar_tarefa(tarefa.id, BACKUP_ESPERA_SEGUNDOS) or tarefa
+
+    if tarefa.status == "concluido":
         logger.info(
             f"Backup restaurado com sucesso por admin {usuario_logado.id}: {nome_arquivo}"
         )
 
         # Mensagem com informação sobre o backup automático criado
-        if nome_backup_automatico:
+        if tarefa.backup_seguranca:
             mensagem_completa = (
-                f"{mensagem}. "
-                f"✓ Backup de segurança criado automaticamente: {nome_backup_automatico}"
+                f"{tarefa.mensagem}. "
+                f"✓ Backup de segurança criado automaticamente: {tarefa.backup_seguranca}"
             )
         else:
-            mensagem_completa = f"{mensagem} (Aviso: Não foi possível criar backup de segurança)"
+            mensagem_completa = f"{tarefa.mensagem} (Aviso: Não foi possível criar backup de segurança)"
 
         informar_sucesso(request, mensagem_completa)
-    else:
+    elif tarefa.status == "erro":
         logger.error(
-            f"Erro ao restaurar backup por admin {usuario_logado.id}: {mensagem}"
+            f"Erro ao restaurar backup por admin {usuario_logado.id}: {tarefa.mensagem}"
         )
-        informar_erro(request, mensagem)
+        informar_erro(request, tarefa.mensagem)
+    else:
+        logger.info(f"Restauração em andamento iniciada por admin {usuario_logado.id}: {nome_arquivo}")
+        informar_info(request, f"Restauração em andamento: {nome_arquivo}. O progresso é exibido abaixo.")
 
     return RedirectResponse(
         "/admin/backups/listar",
@@ -174,12 +219,12 @@ async def post_excluir(
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_backups_limiter.verificar(ip):
+    if not await admin_backups_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações de backup. Aguarde alguns minutos e tente novamente.")
         return RedirectResponse("/admin/backups/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Excluir backup
-    sucesso, mensagem = backup_util.excluir_backup(nome_arquivo)
+    sucesso, mensagem = await executar_db(backup_util.excluir_backup, nome_arquivo)
 
     if sucesso:
         logger.info(f"Backup excluído por admin {usuario_logado.id}: {nome_arquivo}")
@@ -214,7 +259,7 @@ async def get_download(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not backup_download_limiter.verificar(ip):
+    if not await backup_download_limiter.verificar_async(ip):
         informar_erro(
             request,
             "Muitas tentativas de download. Aguarde alguns minutos.",
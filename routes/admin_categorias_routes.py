@@ -14,8 +14,9 @@ from repo import categoria_repo
 
 # Utilitários
 from util.auth_decorator import requer_autenticacao
+from util.db_async import executar_db
 from util.flash_messages import informar_sucesso, informar_erro
-from util.rate_limiter import RateLimiter, obter_identificador_cliente
+from util.rate_limiter import RateLimiter, obter_identificador_cliente, registro_limiters
 from util.exceptions import ErroValidacaoFormulario
 from util.perfis import Perfil
 from util.template_util import criar_templates
@@ -33,6 +34,8 @@ admin_categorias_limiter = RateLimiter(
     nome="admin_categorias"
 )
 
+registro_limiters.registrar(admin_categorias_limiter)
+
 # ----------------------------------------------------------------------
 # Rotas
 # ----------------------------------------------------------------------
@@ -64,7 +67,7 @@ async def listar(
     Acessível em: GET /admin/categorias/listar
     """
     assert usuario_logado is not None
-    categorias = categoria_repo.obter_todos()
+    categorias = await executar_db(categoria_repo.obter_todos)
 
     return templates.TemplateResponse(
         "admin/categorias/listar.html",
@@ -108,7 +111,7 @@ async def post_cadastrar(
     assert usuario_logado is not None
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_categorias_limiter.verificar(ip):
+    if not await admin_categorias_limiter.verificar_async(ip):
         informar_erro(
             request,
             "Muitas operações em pouco tempo. Aguarde um momento e tente novamente.",
@@ -123,7 +126,7 @@ async def post_cadastrar(
         dto = CriarCategoriaDTO(nome=nome, descricao=descricao)
 
         # Verifica duplicidade
-        categoria_existente = categoria_repo.obter_por_nome(dto.nome)
+        categoria_existente = await executar_db(categoria_repo.obter_por_nome, dto.nome)
         if categoria_existente:
             informar_erro(request, "Já existe uma categoria com este nome.")
             return RedirectResponse(
@@ -132,7 +135,7 @@ async def post_cadastrar(
             )
 
         nova_categoria = Categoria(nome=dto.nome, descricao=dto.descricao)
-        categoria_inserida = categoria_repo.inserir(nova_categoria)
+        categoria_inserida = await executar_db(categoria_repo.inserir, nova_categoria)
 
         if categoria_inserida:
             informar_sucesso(request, "Categoria cadastrada com sucesso!")
@@ -168,7 +171,7 @@ async def get_editar(
     Acessível em: GET /admin/categorias/editar/<id>
     """
     assert usuario_logado is not None
-    categoria = categoria_repo.obter_por_id(id)
+    categoria = await executar_db(categoria_repo.obter_por_id, id)
 
     if not categoria:
         informar_erro(request, "Categoria não encontrada.")
@@ -203,7 +206,7 @@ async def post_editar(
     assert usuario_logado is not None
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_categorias_limiter.verificar(ip):
+    if not await admin_categorias_limiter.verificar_async(ip):
         informar_erro(
             request,
             "Muitas operações em pouco tempo. Aguarde um momento e tente novamente.",
@@ -214,7 +217,7 @@ async def post_editar(
         )
 
     # Busca a categoria
-    categoria_atual = categoria_repo.obter_por_id(id)
+    categoria_atual = await executar_db(categoria_repo.obter_por_id, id)
     if not categoria_atual:
         informar_erro(request, "Categoria não encontrada.")
         return RedirectResponse(
@@ -227,7 +230,7 @@ async def post_editar(
 
         # Se o nome mudou, verifica duplicidade
         if dto.nome != categoria_atual.nome:
-            categoria_existente = categoria_repo.obter_por_nome(dto.nome)
+            categoria_existente = await executar_db(categoria_repo.obter_por_nome, dto.nome)
             if categoria_existente:
                 informar_erro(request, "Já existe uma categoria com este nome.")
                 return RedirectResponse(
@@ -239,7 +242,7 @@ async def post_editar(
         categoria_atual.nome = dto.nome
         categoria_atual.descricao = dto.descricao
 
-        if categoria_repo.alterar(categoria_atual):
+        if await executar_db(categoria_repo.alterar, categoria_atual):
             informar_sucesso(request, "Categoria alterada com sucesso!")
             return RedirectResponse(
                 url="/admin/categorias/listar",
@@ -282,7 +285,7 @@ async def post_excluir(
     assert usuario_logado is not None
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_categorias_limiter.verificar(ip):
+    if not await admin_categorias_limiter.verificar_async(ip):
         informar_erro(
             request,
             "Muitas operações em pouco tempo. Aguarde um momento e tente novamente."
@@ -293,7 +296,7 @@ async def post_excluir(
         )
 
     # Busca a categoria
-    categoria = categoria_repo.obter_por_id(id)
+    categoria = await executar_db(categoria_repo.obter_por_id, id)
     if not categoria:
         informar_erro(request, "Categoria não encontrada.")
         return RedirectResponse(
@@ -302,7 +305,7 @@ async def post_excluir(
         )
 
     # Exclui do banco
-    if categoria_repo.excluir(id):
+    if await executar_db(categoria_repo.excluir, id):
         informar_sucesso(request, f"Categoria '{categoria.nome}' excluída com sucesso!")
     else:
         informar_erro(request, "Erro ao excluir categoria.")
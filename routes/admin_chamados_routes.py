@@ -36,11 +36,12 @@ from repo import chamado_repo, chamado_interacao_repo
 # Utilities
 from util.auth_decorator import requer_autenticacao
 from util.datetime_util import agora
+from util.db_async import executar_db
 from util.exceptions import ErroValidacaoFormulario
 from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
 from util.perfis import Perfil
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente, registro_limiters
 from util.repository_helpers import obter_ou_404
 from util.template_util import criar_templates
 
@@ -63,6 +64,8 @@ admin_chamado_responder_limiter = DynamicRateLimiter(
     nome="admin_chamado_responder",
 )
 
+registro_limiters.registrar(admin_chamado_responder_limiter)
+
 
 @router.get("/listar")
 @requer_autenticacao([Perfil.ADMIN.value])
@@ -70,7 +73,7 @@ async def listar(request: Request, usuario_logado: Optional[UsuarioLogado] = Non
     """Lista todos os chamados do sistema (apenas administradores)."""
     assert usuario_logado is not None
     # Passa ID do admin para contar apenas mensagens de OUTROS usuários
-    chamados = chamado_repo.obter_todos(usuario_logado.id)
+    chamados = await executar_db(chamado_repo.obter_todos, usuario_logado.id)
     return templates.TemplateResponse(
         "admin/chamados/listar.html",
         {"request": request, "chamados": chamados}
@@ -85,7 +88,7 @@ async def get_responder(request: Request, id: int, usuario_logado: Optional[Usua
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await executar_db(chamado_repo.obter_por_id, id),
         request,
         "Chamado não encontrado",
         "/admin/chamados/listar"
@@ -94,10 +97,10 @@ async def get_responder(request: Request, id: int, usuario_logado: Optional[Usua
         return chamado
 
     # Marcar mensagens como lidas (apenas as de outros usuários)
-    chamado_interacao_repo.marcar_como_lidas(id, usuario_logado.id)
+    await executar_db(chamado_interacao_repo.marcar_como_lidas, id, usuario_logado.id)
 
     # Obter histórico de interações
-    interacoes = chamado_interacao_repo.obter_por_chamado(id)
+    interacoes = await executar_db(chamado_interacao_repo.obter_por_chamado, id)
 
     return templates.TemplateResponse(
         "admin/chamados/responder.html",
@@ -119,7 +122,7 @@ async def post_responder(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not admin_chamado_responder_limiter.verificar(ip):
+    if not await admin_chamado_responder_limiter.verificar_async(ip):
         informar_erro(
             request,
             "Muitas tentativas de resposta. Aguarde alguns minutos.",
@@ -129,7 +132,7 @@ async def post_responder(
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await executar_db(chamado_repo.obter_por_id, id),
         request,
         "Chamado não encontrado",
         "/admin/chamados/listar"
@@ -138,7 +141,7 @@ async def post_responder(
         return chamado
 
     # Obter interações para reexibir em caso de erro
-    interacoes = chamado_interacao_repo.obter_por_chamado(id)
+    interacoes = await executar_db(chamado_interacao_repo.obter_por_chamado, id)
 
     # Armazena os dados do formulário para reexibição em caso de erro
     dados_formulario: dict = {
@@ -163,11 +166,12 @@ async def post_responder(
             data_interacao=agora(),
             status_resultante=dto_status.status
         )
-        chamado_interacao_repo.inserir(interacao)
+        await executar_db(chamado_interacao_repo.inserir, interacao)
 
         # Atualizar status do chamado
         fechar = (dto_status.status == StatusChamado.FECHADO.value)
-        sucesso = chamado_repo.atualizar_status(
+        sucesso = await executar_db(
+            chamado_repo.atualizar_status,
             id=id,
             status=dto_status.status,
             fechar=fechar
@@ -200,7 +204,7 @@ async def fechar(request: Request, id: int, usuario_logado: Optional[UsuarioLoga
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await executar_db(chamado_repo.obter_por_id, id),
         request,
         "Chamado não encontrado",
         "/admin/chamados/listar"
@@ -208,7 +212,8 @@ async def fechar(request: Request, id: int, usuario_logado: Optional[UsuarioLoga
     if isinstance(chamado, RedirectResponse):
         return chamado
 
-    sucesso = chamado_repo.atualizar_status(
+    sucesso = await executar_db(
+        chamado_repo.atualizar_status,
         id=id,
         status=StatusChamado.FECHADO.value,
         fechar=True
@@ -231,7 +236,7 @@ async def reabrir(request: Request, id: int, usuario_logado: Optional[UsuarioLog
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await executar_db(chamado_repo.obter_por_id, id),
         request,
         "Chamado não encontrado",
         "/admin/chamados/listar"
@@ -244,7 +249,8 @@ async def reabrir(request: Request, id: int, usuario_logado: Optional[UsuarioLog
         informar_erro(request, "Apenas chamados fechados podem ser reabertos")
         return RedirectResponse("/admin/chamados/listar", status_code=status.HTTP_303_SEE_OTHER)
 
-    sucesso = chamado_repo.atualizar_status(
+    sucesso = await executar_db(
+        chamado_repo.atualizar_status,
         id=id,
         status=StatusChamado.EM_ANALISE.value,
         fechar=False
@@ -25,10 +25,11 @@ from repo import configuracao_repo
 from util.auth_decorator import requer_autenticacao
 from util.config_cache import config
 from util.datetime_util import agora
+from util.db_async import executar_db
 from util.flash_messages import informar_sucesso, informar_erro, informar_aviso
 from util.logger_config import logger
 from util.perfis import Perfil
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente, registro_limiters
 from util.template_util import criar_templates
 from util.validation_util import processar_erros_validacao
 
@@ -51,6 +52,8 @@ admin_config_limiter = DynamicRateLimiter(
     nome="admin_config",
 )
 
+registro_limiters.registrar(admin_config_limiter)
+
 
 # === CRUD de Configurações ===
 
@@ -61,7 +64,7 @@ async def get_listar_configuracoes(request: Request, usuario_logado: Optional[Us
     assert usuario_logado is not None
     try:
         # Obter configurações agrupadas por categoria
-        configs_por_categoria = configuracao_repo.obter_por_categoria()
+        configs_por_categoria = await executar_db(configuracao_repo.obter_por_categoria)
 
         # Calcular total de configurações
         total_configs = sum(len(configs) for configs in configs_por_categoria.values())
@@ -110,7 +113,7 @@ async def post_salvar_lote_configuracoes(
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_config_limiter.verificar(ip):
+    if not await admin_config_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/configuracoes", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -132,7 +135,7 @@ async def post_salvar_lote_configuracoes(
         dto = SalvarConfiguracaoLoteDTO(configs=configs)
 
         # Atualizar configurações no banco
-        quantidade_atualizada, chaves_nao_encontradas = configuracao_repo.atualizar_multiplas(dto.configs)
+        quantidade_atualizada, chaves_nao_encontradas = await executar_db(configuracao_repo.atualizar_multiplas, dto.configs)
 
         # Limpar cache de configurações
         config.limpar()
@@ -198,7 +201,7 @@ async def get_tema(request: Request, usuario_logado: Optional[UsuarioLogado] = N
     """Exibe seletor de temas visuais da aplicação"""
     assert usuario_logado is not None
     # Obter tema atual do banco de dados
-    config_tema = configuracao_repo.obter_por_chave("theme")
+    config_tema = await executar_db(configuracao_repo.obter_por_chave, "theme")
     tema_atual = config_tema.valor if config_tema else "original"
 
     # Listar todos os arquivos PNG na pasta de imagens dos temas
@@ -245,13 +248,13 @@ async def post_aplicar_tema(
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_config_limiter.verificar(ip):
+    if not await admin_config_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/tema", status_code=status.HTTP_303_SEE_OTHER)
 
     try:
         # Obter tema anterior para o log
-        config_existente = configuracao_repo.obter_por_chave("theme")
+        config_existente = await executar_db(configuracao_repo.obter_por_chave, "theme")
 
         # Validar se o tema existe
         css_origem = Path(f"static/css/bootswatch/{tema}.bootstrap.min.css")
@@ -266,7 +269,8 @@ async def post_aplicar_tema(
         shutil.copy2(css_origem, css_destino)
 
         # Atualizar ou inserir configuração no banco (upsert)
-        sucesso = configuracao_repo.inserir_ou_atualizar(
+        sucesso = await executar_db(
+            configuracao_repo.inserir_ou_atualizar,
             chave="theme",
             valor=tema,
             descricao="Tema visual da aplicação (Bootswatch)"
@@ -382,7 +386,7 @@ async def post_filtrar_auditoria(
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_config_limiter.verificar(ip):
+    if not await admin_config_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/auditoria", status_code=status.HTTP_303_SEE_OTHER)
 
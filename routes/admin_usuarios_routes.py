@@ -23,11 +23,12 @@ from repo import usuario_repo
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
+from util.db_async import executar_db
 from util.exceptions import ErroValidacaoFormulario
 from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
 from util.perfis import Perfil
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente, registro_limiters
 from util.repository_helpers import obter_ou_404
 from util.security import criar_hash_senha
 from util.template_util import criar_templates
@@ -52,6 +53,8 @@ admin_usuarios_limiter = DynamicRateLimiter(
     nome="admin_usuarios",
 )
 
+registro_limiters.registrar(admin_usuarios_limiter)
+
 
 @router.get("/")
 @requer_autenticacao([Perfil.ADMIN.value])
@@ -66,7 +69,7 @@ async def index(request: Request, usuario_logado: Optional[UsuarioLogado] = None
 async def listar(request: Request, usuario_logado: Optional[UsuarioLogado] = None):
     """Lista todos os usuários do sistema"""
     assert usuario_logado is not None
-    usuarios = usuario_repo.obter_todos()
+    usuarios = await executar_db(usuario_repo.obter_todos)
     return templates.TemplateResponse(
         "admin/usuarios/listar.html",
         {"request": request, "usuarios": usuarios}
@@ -100,7 +103,7 @@ async def post_cadastrar(
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_usuarios_limiter.verificar(ip):
+    if not await admin_usuarios_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -142,7 +145,7 @@ async def post_cadastrar(
             perfil=dto.perfil
         )
 
-        usuario_repo.inserir(usuario)
+        await executar_db(usuario_repo.inserir, usuario)
         logger.info(f"Usuário '{dto.email}' cadastrado por admin {usuario_logado.id}")
 
         informar_sucesso(request, "Usuário cadastrado com sucesso!")
@@ -166,7 +169,7 @@ async def get_editar(request: Request, id: int, usuario_logado: Optional[Usuario
     assert usuario_logado is not None
     # Obter usuário ou retornar 404
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(id),
+        await executar_db(usuario_repo.obter_por_id, id),
         request,
         "Usuário não encontrado",
         "/admin/usuarios/listar"
@@ -205,13 +208,13 @@ async def post_editar(
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_usuarios_limiter.verificar(ip):
+    if not await admin_usuarios_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Obter usuário ou retornar 404
     usuario_atual = obter_ou_404(
-        usuario_repo.obter_por_id(id),
+        await executar_db(usuario_repo.obter_por_id, id),
         request,
         "Usuário não encontrado",
         "/admin/usuarios/listar"
@@ -255,7 +258,7 @@ async def post_editar(
             perfil=dto.perfil
         )
 
-        usuario_repo.alterar(usuario_atualizado)
+        await executar_db(usuario_repo.alterar, usuario_atualizado)
         logger.info(f"Usuário {id} alterado por admin {usuario_logado.id}")
 
         informar_sucesso(request, "Usuário alterado com sucesso!")
@@ -264,7 +267,7 @@ async def post_editar(
     except ValidationError as e:
         # Adicionar perfis e usuario aos dados para renderizar o template
         dados_formulario["perfis"] = Perfil.valores()
-        dados_formulario["usuario"] = usuario_repo.obter_por_id(id)
+        dados_formulario["usuario"] = await executar_db(usuario_repo.obter_por_id, id)
         raise ErroValidacaoFormulario(
             validation_error=e,
             template_path="admin/usuarios/editar.html",
@@ -281,13 +284,13 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[Usuar
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_usuarios_limiter.verificar(ip):
+    if not await admin_usuarios_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Obter usuário ou retornar 404
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(id),
+        await executar_db(usuario_repo.obter_por_id, id),
         request,
         "Usuário não encontrado",
         "/admin/usuarios/listar"
@@ -301,7 +304,7 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[Usuar
         logger.warning(f"Admin {usuario_logado.id} tentou excluir a si mesmo")
         return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
 
-    usuario_repo.excluir(id)
+    await executar_db(usuario_repo.excluir, id)
     logger.info(f"Usuário {id} ({usuario.email}) excluído por admin {usuario_logado.id}")
     informar_sucesso(request, "Usuário excluído com sucesso!")
     return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
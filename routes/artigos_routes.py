@@ -1,4 +1,3 @@
-from datetime import datetime
 from typing import Optional
 
 from fastapi import APIRouter, Request, Form, status
@@ -10,8 +9,11 @@ from model.usuario_logado_model import UsuarioLogado
 from model.artigo_model import Artigo, StatusArtigo
 from repo import artigo_repo, categoria_repo
 from util.auth_decorator import requer_autenticacao
+from util.db_async import executar_db
+from util.cache_paginas import cache_paginas
+from util.contador_visualizacoes import contador_visualizacoes
 from util.flash_messages import informar_sucesso, informar_erro
-from util.rate_limiter import RateLimiter, obter_identificador_cliente
+from util.rate_limiter import RateLimiter, obter_identificador_cliente, registro_limiters
 from util.exceptions import ErroValidacaoFormulario
 from util.perfis import Perfil
 from util.template_util import criar_templates
@@ -20,6 +22,9 @@ from util.logger_config import logger
 router = APIRouter(prefix="/artigos")
 templates = criar_templates("templates")
 
+# Artigos por página (busca textual e listagens por cursor)
+ARTIGOS_POR_PAGINA = 12
+
 # Rate limiter: máximo 20 operações por minuto
 artigos_limiter = RateLimiter(
     max_tentativas=20,
@@ -27,23 +32,35 @@ artigos_limiter = RateLimiter(
     nome="artigos"
 )
 
+registro_limiters.registrar(artigos_limiter)
+
 
 @router.get("/meus")
 @requer_autenticacao([Perfil.AUTOR.value, Perfil.ADMIN.value])
 async def meus_artigos(
     request: Request,
+    apos: str = "",
+    antes: str = "",
     usuario_logado: Optional[UsuarioLogado] = None,
 ):
-    """Lista os artigos do autor logado."""
+    """Lista os artigos do autor logado, paginados por cursor."""
     assert usuario_logado is not None
-    artigos = artigo_repo.obter_por_usuario(usuario_logado.id)
+    pagina = await executar_db(
+        artigo_repo.obter_por_usuario_pagina,
+        usuario_logado.id,
+        limite=ARTIGOS_POR_PAGINA,
+        apos=apos,
+        antes=antes,
+    )
 
     return templates.TemplateResponse(
         "artigos/listar.html",
         {
             "request": request,
             "usuario_logado": usuario_logado,
-            "artigos": artigos,
+            "artigos": pagina.itens,
+            "cursor_proximo": pagina.cursor_proximo,
+            "cursor_anterior": pagina.cursor_anterior,
             "status_artigo": StatusArtigo,
         },
     )
@@ -57,7 +74,7 @@ async def get_cadastrar(
 ):
     """Exibe o formulário de cadastro de artigo."""
     assert usuario_logado is not None
-    categorias = categoria_repo.obter_todos()
+    categorias = await executar_db(categoria_repo.obter_todos)
 
     return templates.TemplateResponse(
         "artigos/cadastrar.html",
@@ -84,7 +101,7 @@ async def post_cadastrar(
     """Processa o cadastro de um novo artigo."""
     assert usuario_logado is not None
     ip = obter_identificador_cliente(request)
-    if not artigos_limiter.verificar(ip):
+    if not await artigos_limiter.verificar_async(ip):
         informar_erro(
             request,
             "Muitas operações em pouco tempo. Aguarde um momento e tente novamente.",
@@ -94,7 +111,7 @@ async def post_cadastrar(
             status_code=status.HTTP_303_SEE_OTHER,
         )
 
-    categorias = categoria_repo.obter_todos()
+    categorias = await executar_db(categoria_repo.obter_todos)
 
     # Define status baseado na ação do botão
     status_artigo = "Finalizado" if acao == "finalizar" else "Rascunho"
@@ -109,7 +126,7 @@ async def post_cadastrar(
         )
 
         # Verifica se título já existe
-        if artigo_repo.titulo_existe(dto.titulo):
+        if await executar_db(artigo_repo.titulo_existe, dto.titulo):
             informar_erro(request, "Já existe um artigo com este título.")
             return RedirectResponse(
                 url="/artigos/cadastrar",
@@ -126,7 +143,7 @@ async def post_cadastrar(
             categoria_id=dto.categoria_id
         )
 
-        artigo_id = artigo_repo.inserir(novo_artigo)
+        artigo_id = await executar_db(artigo_repo.inserir, novo_artigo)
 
         if artigo_id:
             logger.info(f"Artigo '{dto.titulo}' criado por usuário {usuario_logado.id}")
@@ -168,7 +185,7 @@ async def get_editar(
 ):
     """Exibe o formulário de edição de artigo."""
     assert usuario_logado is not None
-    artigo = artigo_repo.obter_por_id(id)
+    artigo = await executar_db(artigo_repo.obter_por_id, id)
 
     if not artigo:
         informar_erro(request, "Artigo não encontrado.")
@@ -185,7 +202,7 @@ async def get_editar(
             status_code=status.HTTP_303_SEE_OTHER,
         )
 
-    categorias = categoria_repo.obter_todos()
+    categorias = await executar_db(categoria_repo.obter_todos)
 
     return templates.TemplateResponse(
         "artigos/editar.html",
@@ -214,7 +231,7 @@ async def post_editar(
     """Processa a edição de um artigo."""
     assert usuario_logado is not None
     ip = obter_identificador_cliente(request)
-    if not artigos_limiter.verificar(ip):
+    if not await artigos_limiter.verificar_async(ip):
         informar_erro(
             request,
             "Muitas operações em pouco tempo. Aguarde um momento e tente novamente.",
@@ -224,7 +241,7 @@ async def post_editar(
             status_code=status.HTTP_303_SEE_OTHER,
         )
 
-    artigo_atual = artigo_repo.obter_por_id(id)
+    artigo_atual = await executar_db(artigo_repo.obter_por_id, id)
     if not artigo_atual:
         informar_erro(request, "Artigo não encontrado.")
         return RedirectResponse(
@@ -240,7 +257,7 @@ async def post_editar(
             status_code=status.HTTP_303_SEE_OTHER,
         )
 
-    categorias = categoria_repo.obter_todos()
+    categorias = await executar_db(categoria_repo.obter_todos)
 
     # Define status baseado na ação e status atual
     if artigo_atual.status == "Publicado":
@@ -261,7 +278,7 @@ async def post_editar(
         )
 
         # Verifica duplicidade de título
-        if dto.titulo != artigo_atual.titulo and artigo_repo.titulo_existe(dto.titulo, id):
+        if dto.titulo != artigo_atual.titulo and await executar_db(artigo_repo.titulo_existe, dto.titulo, id):
             informar_erro(request, "Já existe um artigo com este título.")
             return RedirectResponse(
                 url=f"/artigos/editar/{id}",
@@ -274,7 +291,7 @@ async def post_editar(
         artigo_atual.status = dto.status
         artigo_atual.categoria_id = dto.categoria_id
 
-        if artigo_repo.alterar(artigo_atual):
+        if await executar_db(artigo_repo.alterar, artigo_atual):
             logger.info(f"Artigo {id} alterado por usuário {usuario_logado.id}")
             informar_sucesso(request, "Artigo alterado com sucesso!")
             return RedirectResponse(
@@ -317,7 +334,7 @@ async def post_excluir(
     """Exclui um artigo."""
     assert usuario_logado is not None
     ip = obter_identificador_cliente(request)
-    if not artigos_limiter.verificar(ip):
+    if not await artigos_limiter.verificar_async(ip):
         informar_erro(
             request,
             "Muitas operações em pouco tempo. Aguarde um momento e tente novamente."
@@ -327,7 +344,7 @@ async def post_excluir(
             status_code=status.HTTP_303_SEE_OTHER,
         )
 
-    artigo = artigo_repo.obter_por_id(id)
+    artigo = await executar_db(artigo_repo.obter_por_id, id)
     if not artigo:
         informar_erro(request, "Artigo não encontrado.")
         return RedirectResponse(
@@ -343,7 +360,7 @@ async def post_excluir(
             status_code=status.HTTP_303_SEE_OTHER,
         )
 
-    if artigo_repo.excluir(id):
+    if await executar_db(artigo_repo.excluir, id):
         logger.info(f"Artigo {id} excluído por usuário {usuario_logado.id}")
         informar_sucesso(request, f"Artigo '{artigo.titulo}' excluído com sucesso!")
     else:
@@ -364,7 +381,7 @@ async def post_publicar(
 ):
     """Publica um artigo."""
     assert usuario_logado is not None
-    artigo = artigo_repo.obter_por_id(id)
+    artigo = await executar_db(artigo_repo.obter_por_id, id)
     if not artigo:
         informar_erro(request, "Artigo não encontrado.")
         return RedirectResponse(
@@ -380,7 +397,7 @@ async def post_publicar(
             status_code=status.HTTP_303_SEE_OTHER,
         )
 
-    if artigo_repo.alterar_status(id, StatusArtigo.PUBLICADO.value):
+    if await executar_db(artigo_repo.alterar_status, id, StatusArtigo.PUBLICADO.value):
         logger.info(f"Artigo {id} publicado por usuário {usuario_logado.id}")
         informar_sucesso(request, "Artigo publicado com sucesso!")
     else:
@@ -402,28 +419,51 @@ async def listar_artigos(
     q: str = "",
     categoria: int = 0,
     ordem: str = "recentes",
+    pagina: int = 1,
+    apos: str = "",
+    antes: str = "",
 ):
-    """Lista artigos publicados com busca e filtros."""
+    """
+    Lista artigos publicados com busca e filtros.
+
+    A busca textual é paginada por número de página (ordem por relevância);
+    as listagens por data/visualizações usam cursores (apos/antes), com a
+    ordenação feita no banco e custo constante em qualquer profundidade.
+    """
     from util.auth_decorator import obter_usuario_logado
     usuario_logado = obter_usuario_logado(request)
 
+    # Visitantes anônimos recebem a página já renderizada
+    if (resposta := cache_paginas.obter_resposta(request)) is not None:
+        return resposta
+
+    pagina = max(1, pagina)
+    total_resultados = 0
+    total_paginas = 1
+    cursor_proximo = cursor_anterior = None
+
     if q:
-        artigos = artigo_repo.buscar_por_titulo(q)
-    elif categoria > 0:
-        artigos = artigo_repo.obter_por_categoria(categoria)
+        # Busca textual: resultados por relevância, paginados no banco
+        artigos, total_resultados = await executar_db(
+            artigo_repo.buscar, q, ARTIGOS_POR_PAGINA, (pagina - 1) * ARTIGOS_POR_PAGINA
+        )
+        total_paginas = max(1, -(-total_resultados // ARTIGOS_POR_PAGINA))
     else:
-        artigos = artigo_repo.obter_publicados()
-
-    # Ordenação
-    if ordem == "antigos":
-        artigos = sorted(artigos, key=lambda a: a.data_publicacao or a.data_cadastro or datetime.min)
-    elif ordem == "visualizacoes":
-        artigos = sorted(artigos, key=lambda a: a.qtde_visualizacoes or 0, reverse=True)
-    # Default é "recentes" (já vem ordenado do banco)
+        resultado = await executar_db(
+            artigo_repo.obter_publicados_pagina,
+            ordem=ordem,
+            categoria_id=categoria,
+            limite=ARTIGOS_POR_PAGINA,
+            apos=apos,
+            antes=antes,
+        )
+        artigos = resultado.itens
+        cursor_proximo = resultado.cursor_proximo
+        cursor_anterior = resultado.cursor_anterior
 
-    categorias = categoria_repo.obter_todos()
+    categorias = await executar_db(categoria_repo.obter_todos)
 
-    return templates.TemplateResponse(
+    resposta = templates.TemplateResponse(
         "artigos/buscar.html",
         {
             "request": request,
@@ -433,8 +473,15 @@ async def listar_artigos(
             "termo_busca": q,
             "categoria_selecionada": categoria,
             "ordem_selecionada": ordem,
+            "pagina": pagina,
+            "total_paginas": total_paginas,
+            "total_resultados": total_resultados,
+            "cursor_proximo": cursor_proximo,
+            "cursor_anterior": cursor_anterior,
         },
     )
+    cache_paginas.armazenar_resposta(request, resposta)
+    return resposta
 
 
 @router.get("/ler/{id}")
@@ -446,7 +493,7 @@ async def ler_artigo(
 ):
     """Exibe um artigo completo (somente para usuários autenticados)."""
     assert usuario_logado is not None
-    artigo = artigo_repo.obter_por_id(id)
+    artigo = await executar_db(artigo_repo.obter_por_id, id)
 
     if not artigo:
         informar_erro(request, "Artigo não encontrado.")
@@ -465,8 +512,9 @@ async def ler_artigo(
             )
 
     # Incrementa visualizações apenas para artigos publicados
+    # (acumuladas em memória e gravadas em lote pelo contador)
     if artigo.status == StatusArtigo.PUBLICADO.value:
-        artigo_repo.incrementar_visualizacoes(id)
+        contador_visualizacoes.registrar(id)
         artigo.qtde_visualizacoes = (artigo.qtde_visualizacoes or 0) + 1
 
     return templates.TemplateResponse(
@@ -22,11 +22,12 @@ from repo import usuario_repo
 # Utilities
 from util.auth_decorator import criar_sessao
 from util.datetime_util import agora
+from util.db_async import executar_db
 from util.email_service import servico_email
 from util.exceptions import ErroValidacaoFormulario
 from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente, registro_limiters
 from util.security import (
     criar_hash_senha,
     verificar_senha,
@@ -70,6 +71,8 @@ esqueci_senha_limiter = DynamicRateLimiter(
     nome="esqueci_senha",
 )
 
+registro_limiters.registrar(login_limiter, cadastro_limiter, esqueci_senha_limiter)
+
 
 @router.get("/login")
 async def get_login(request: Request):
@@ -97,7 +100,7 @@ async def post_login(
     try:
         # Rate limiting por IP
         ip = obter_identificador_cliente(request)
-        if not login_limiter.verificar(ip):
+        if not await login_limiter.verificar_async(ip):
             informar_erro(
                 request, "Muitas tentativas de login. Aguarde alguns minutos."
             )
@@ -122,7 +125,7 @@ async def post_login(
         dto = LoginDTO(email=email, senha=senha)
 
         # Buscar usuário
-        usuario = usuario_repo.obter_por_email(dto.email)
+        usuario = await executar_db(usuario_repo.obter_por_email, dto.email)
 
         # Verificar credenciais
         if not usuario or not verificar_senha(dto.senha, usuario.senha):
@@ -189,7 +192,7 @@ async def post_cadastrar(
     try:
         # Rate limiting por IP
         ip = obter_identificador_cliente(request)
-        if not cadastro_limiter.verificar(ip):
+        if not await cadastro_limiter.verificar_async(ip):
             informar_erro(
                 request,
                 f"Muitas tentativas de cadastro. Aguarde {cadastro_limiter.janela_minutos} minuto(s).",
@@ -227,7 +230,7 @@ async def post_cadastrar(
         )
 
         # Inserir no banco
-        usuario_id = usuario_repo.inserir(usuario)
+        usuario_id = await executar_db(usuario_repo.inserir, usuario)
 
         if usuario_id:
             logger.info(f"Novo usuário cadastrado: {usuario.email}")
@@ -266,7 +269,7 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
     try:
         # Rate limiting por IP
         ip = obter_identificador_cliente(request)
-        if not esqueci_senha_limiter.verificar(ip):
+        if not await esqueci_senha_limiter.verificar_async(ip):
             informar_erro(
                 request,
                 f"Muitas tentativas de recuperação de senha. Aguarde {esqueci_senha_limiter.janela_minutos} minuto(s).",
@@ -283,7 +286,7 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
         dto = EsqueciSenhaDTO(email=email)
 
         # Buscar usuário
-        usuario = usuario_repo.obter_por_email(dto.email)
+        usuario = await executar_db(usuario_repo.obter_por_email, dto.email)
 
         if usuario:
             # Gerar token de redefinição
@@ -291,7 +294,7 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
             data_expiracao = obter_data_expiracao_token(horas=1)
 
             # Salvar token no banco
-            usuario_repo.atualizar_token(usuario.email, token, data_expiracao)
+            await executar_db(usuario_repo.atualizar_token, usuario.email, token, data_expiracao)
 
             # Enviar e-mail com link de recuperação
             email_enviado = servico_email.enviar_recuperacao_senha(
@@ -325,7 +328,7 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
 async def get_redefinir_senha(request: Request, token: str):
     """Exibe formulário de redefinição de senha"""
     # Validar token
-    usuario = usuario_repo.obter_por_token(token)
+    usuario = await executar_db(usuario_repo.obter_por_token, token)
 
     if not usuario or not usuario.data_token:
         informar_erro(request, "Token inválido ou expirado")
@@ -368,7 +371,7 @@ async def post_redefinir_senha(
         )
 
         # Validar token e expiração
-        usuario = usuario_repo.obter_por_token(dto.token)
+        usuario = await executar_db(usuario_repo.obter_por_token, dto.token)
 
         if not usuario or not usuario.data_token:
             informar_erro(request, "Token inválido")
@@ -391,10 +394,10 @@ async def post_redefinir_senha(
 
         # Atualizar senha
         senha_hash = criar_hash_senha(dto.senha)
-        usuario_repo.atualizar_senha(usuario.id, senha_hash)
+        await executar_db(usuario_repo.atualizar_senha, usuario.id, senha_hash)
 
         # Limpar token
-        usuario_repo.limpar_token(usuario.id)
+        await executar_db(usuario_repo.limpar_token, usuario.id)
 
         logger.info(f"Senha redefinida com sucesso para usuário: {usuario.email}")
         informar_sucesso(
@@ -36,11 +36,12 @@ from repo import chamado_repo, chamado_interacao_repo
 # Utilities
 from util.auth_decorator import requer_autenticacao
 from util.datetime_util import agora
+from util.db_async import executar_db
 from util.exceptions import ErroValidacaoFormulario
 from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
 from util.permission_helpers import verificar_propriedade
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente, registro_limiters
 from util.repository_helpers import obter_ou_404
 from util.template_util import criar_templates
 
@@ -70,6 +71,8 @@ chamado_responder_limiter = DynamicRateLimiter(
     nome="chamado_responder",
 )
 
+registro_limiters.registrar(chamado_criar_limiter, chamado_responder_limiter)
+
 
 @router.get("/listar")
 @requer_autenticacao()
@@ -78,7 +81,7 @@ async def listar(request: Request, usuario_logado: Optional[UsuarioLogado] = Non
     assert usuario_logado is not None
     # Passa usuario_id para obter_por_usuario - a função já usa esse ID
     # para contar apenas mensagens de OUTROS usuários
-    chamados = chamado_repo.obter_por_usuario(usuario_logado.id)
+    chamados = await executar_db(chamado_repo.obter_por_usuario, usuario_logado.id)
     return templates.TemplateResponse(
         "chamados/listar.html",
         {"request": request, "chamados": chamados}
@@ -109,7 +112,7 @@ async def post_cadastrar(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not chamado_criar_limiter.verificar(ip):
+    if not await chamado_criar_limiter.verificar_async(ip):
         informar_erro(
             request,
             "Muitas tentativas de criação de chamados. Aguarde alguns minutos.",
@@ -149,7 +152,7 @@ async def post_cadastrar(
             usuario_id=usuario_logado.id
         )
 
-        chamado_id = chamado_repo.inserir(chamado)
+        chamado_id = await executar_db(chamado_repo.inserir, chamado)
 
         # Criar interação inicial com a descrição do chamado
         interacao = ChamadoInteracao(
@@ -161,7 +164,7 @@ async def post_cadastrar(
             data_interacao=agora(),
             status_resultante=StatusChamado.ABERTO.value
         )
-        chamado_interacao_repo.inserir(interacao)
+        await executar_db(chamado_interacao_repo.inserir, interacao)
 
         logger.info(
             f"Chamado #{chamado_id} '{dto.titulo}' criado por usuário {usuario_logado.id}"
@@ -187,7 +190,7 @@ async def visualizar(request: Request, id: int, usuario_logado: Optional[Usuario
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await executar_db(chamado_repo.obter_por_id, id),
         request,
         "Chamado não encontrado",
         "/chamados/listar"
@@ -206,10 +209,10 @@ async def visualizar(request: Request, id: int, usuario_logado: Optional[Usuario
         return RedirectResponse("/chamados/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Marcar mensagens como lidas (apenas as de outros usuários)
-    chamado_interacao_repo.marcar_como_lidas(id, usuario_logado.id)
+    await executar_db(chamado_interacao_repo.marcar_como_lidas, id, usuario_logado.id)
 
     # Obter histórico de interações
-    interacoes = chamado_interacao_repo.obter_por_chamado(id)
+    interacoes = await executar_db(chamado_interacao_repo.obter_por_chamado, id)
 
     return templates.TemplateResponse(
         "chamados/visualizar.html",
@@ -230,7 +233,7 @@ async def post_responder(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not chamado_responder_limiter.verificar(ip):
+    if not await chamado_responder_limiter.verificar_async(ip):
         informar_erro(
             request,
             "Muitas tentativas de resposta em chamados. Aguarde alguns minutos.",
@@ -240,7 +243,7 @@ async def post_responder(
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await executar_db(chamado_repo.obter_por_id, id),
         request,
         "Chamado não encontrado",
         "/chamados/listar"
@@ -259,7 +262,7 @@ async def post_responder(
         return RedirectResponse("/chamados/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Armazena os dados do formulário para reexibição em caso de erro
-    interacoes = chamado_interacao_repo.obter_por_chamado(id)
+    interacoes = await executar_db(chamado_interacao_repo.obter_por_chamado, id)
     dados_formulario: dict = {
         "mensagem": mensagem,
         "chamado": chamado,
@@ -280,7 +283,7 @@ async def post_responder(
             data_interacao=agora(),
             status_resultante=chamado.status.value  # Mantém status atual
         )
-        chamado_interacao_repo.inserir(interacao)
+        await executar_db(chamado_interacao_repo.inserir, interacao)
 
         logger.info(
             f"Usuário {usuario_logado.id} respondeu ao chamado {id}"
@@ -306,7 +309,7 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[Usuar
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await executar_db(chamado_repo.obter_por_id, id),
         request,
         "Chamado não encontrado",
         "/chamados/listar"
@@ -333,7 +336,7 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[Usuar
         return RedirectResponse("/chamados/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Verificar se há respostas de administrador
-    if chamado_interacao_repo.tem_resposta_admin(id):
+    if await executar_db(chamado_interacao_repo.tem_resposta_admin, id):
         informar_erro(request, "Não é possível excluir chamados que já possuem resposta do administrador")
         logger.warning(
             f"Usuário {usuario_logado.id} tentou excluir chamado {id} que possui respostas de admin"
@@ -341,7 +344,7 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[Usuar
         return RedirectResponse("/chamados/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Tudo OK, pode excluir
-    chamado_repo.excluir(id)
+    await executar_db(chamado_repo.excluir, id)
     logger.info(f"Chamado {id} excluído por usuário {usuario_logado.id}")
     informar_sucesso(request, "Chamado excluído com sucesso!")
 
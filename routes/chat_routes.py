@@ -8,8 +8,9 @@ Rotas para o sistema de chat em tempo real.
 
 # Standard library
 import json
+import random
 import asyncio
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 # Third-party
 from fastapi import APIRouter, Request, status, HTTPException, Form
@@ -21,6 +22,7 @@ from dtos.chat_dto import CriarSalaDTO, EnviarMensagemDTO
 from model.usuario_logado_model import UsuarioLogado
 
 # Models
+from model.chat_mensagem_model import ChatMensagem
 from model.usuario_logado_model import UsuarioLogado
 
 # Repositories
@@ -28,12 +30,20 @@ from repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo, usu
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
-from util.chat_manager import gerenciador_chat
+from util.chat_escritor import escritor_mensagens
+from util.chat_manager import EVENTO_RESSINCRONIZAR, gerenciador_chat
+from util.config import (
+    CHAT_SSE_HEARTBEAT_SEGUNDOS,
+    CHAT_SSE_LOTE_EVENTOS,
+    CHAT_SSE_REPLAY_MAX,
+    CHAT_SSE_RETRY_MS,
+)
 from util.datetime_util import agora
+from util.db_async import executar_db
 from util.foto_util import obter_caminho_foto_usuario
 from util.logger_config import logger
 from util.perfis import Perfil
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.rate_limiter import DynamicRateLimiter, registro_limiters
 
 # =============================================================================
 # Configuração do Router
@@ -41,6 +51,9 @@ from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
+# Máximo de mensagens por página do histórico
+MAX_MENSAGENS_POR_PAGINA = 100
+
 # =============================================================================
 # Rate Limiters
 # =============================================================================
@@ -74,38 +87,138 @@ chat_listagem_limiter = DynamicRateLimiter(
     nome="chat_listagem",
 )
 
+# Aplicados pelo MiddlewareRateLimit, antes de sessão, CSRF e leitura do formulário
+registro_limiters.definir_politica(
+    chat_sala_limiter, "POST", ["/chat/salas"], formato="json",
+    mensagem="Muitas tentativas de criação de salas. Aguarde alguns minutos.",
+)
+registro_limiters.definir_politica(
+    chat_listagem_limiter, "GET", ["/chat/conversas", "/chat/mensagens/{sala_id}"], formato="json",
+    mensagem="Muitas requisições de listagem. Aguarde alguns minutos.",
+)
+registro_limiters.definir_politica(
+    chat_mensagem_limiter, "POST", ["/chat/mensagens"], formato="json",
+    mensagem="Muitas mensagens enviadas. Aguarde alguns minutos.",
+)
+registro_limiters.definir_politica(
+    busca_usuarios_limiter, "GET", ["/chat/usuarios/buscar"], formato="json",
+    mensagem="Muitas buscas. Aguarde alguns minutos.",
+)
+
+
+def _evento_nova_mensagem(mensagem: ChatMensagem) -> dict:
+    """Monta o evento SSE "nova_mensagem" de uma mensagem."""
+    return {
+        "tipo": "nova_mensagem",
+        "sala_id": mensagem.sala_id,
+        "mensagem": {
+            "id": mensagem.id,
+            "sala_id": mensagem.sala_id,
+            "usuario_id": mensagem.usuario_id,
+            "mensagem": mensagem.mensagem,
+            "data_envio": mensagem.data_envio.isoformat() if mensagem.data_envio else None,
+            "lida_em": mensagem.lida_em.isoformat() if mensagem.lida_em else None,
+        }
+    }
+
+
+def _id_do_evento(evento: dict) -> Optional[int]:
+    """ID SSE do evento: o id da mensagem para "nova_mensagem", None para os demais."""
+    if evento.get("tipo") == "nova_mensagem":
+        return evento["mensagem"]["id"]
+    return None
+
+
+def _formatar_sse(evento: dict, evento_id: Optional[int] = None) -> str:
+    """Formata um evento SSE, com o campo id quando houver."""
+    linha_id = f"id: {evento_id}\n" if evento_id is not None else ""
+    return f"{linha_id}data: {json.dumps(evento)}\n\n"
+
+
+def _ler_last_event_id(valor: Optional[str]) -> Optional[int]:
+    """Converte o cabeçalho Last-Event-ID (ignora valores inválidos)."""
+    try:
+        return int(valor) if valor else None
+    except ValueError:
+        return None
+
+
+async def _stream_eventos(usuario_id: int, ultimo_evento_id: Optional[int]) -> AsyncIterator[str]:
+    """
+    Gera o stream SSE de uma conexão.
+
+    A conexão é registrada antes do reenvio, para que nada publicado
+    durante a consulta se perca; mensagens reenviadas que também chegarem
+    pela fila são ignoradas.
+
+    Args:
+        usuario_id: Dono da conexão
+        ultimo_evento_id: Valor de Last-Event-ID enviado pelo navegador ao reconectar
+    """
+    conexao = await gerenciador_chat.conectar(usuario_id)
+    reenviadas: set[int] = set()
+    try:
+        # Espera com variação: clientes derrubados juntos não reconectam juntos
+        yield f"retry: {CHAT_SSE_RETRY_MS + random.randint(0, CHAT_SSE_RETRY_MS)}\n\n"
+
+        if ultimo_evento_id is not None:
+            # Mensagens perdidas de todas as salas em uma única consulta
+            perdidas = await executar_db(
+                chat_mensagem_repo.listar_posteriores_do_usuario,
+                usuario_id, ultimo_evento_id, CHAT_SSE_REPLAY_MAX + 1,
+            )
+            if len(perdidas) > CHAT_SSE_REPLAY_MAX:
+                # O cliente recarrega tudo: a próxima reconexão parte da mensagem mais recente
+                ultimo_id = await executar_db(chat_mensagem_repo.obter_ultimo_id)
+                yield _formatar_sse(EVENTO_RESSINCRONIZAR, ultimo_id)
+            elif perdidas:
+                reenviadas = {mensagem.id for mensagem in perdidas}
+                yield "".join(
+                    _formatar_sse(_evento_nova_mensagem(mensagem), mensagem.id) for mensagem in perdidas
+                )
+
+        heartbeat = CHAT_SSE_HEARTBEAT_SEGUNDOS if CHAT_SSE_HEARTBEAT_SEGUNDOS > 0 else None
+        # Conexão encerrada por fila cheia: envia o pedido de ressincronização e fecha
+        while not conexao.encerrada or conexao.pendentes:
+            # Aguardar eventos e enviar todos os pendentes em uma única escrita
+            try:
+                eventos = await asyncio.wait_for(conexao.receber_lote(CHAT_SSE_LOTE_EVENTOS), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+
+            blocos = []
+            for evento in eventos:
+                evento_id = _id_do_evento(evento)
+                if evento_id in reenviadas:
+                    continue
+                blocos.append(_formatar_sse(evento, evento_id))
+            if blocos:
+                yield "".join(blocos)
+    except asyncio.CancelledError:
+        logger.info(f"[SSE] Conexão cancelada para usuário {usuario_id}")
+    finally:
+        # Desconectar ao fechar stream
+        await gerenciador_chat.desconectar(conexao)
+
 
 @router.get("/stream")
 @requer_autenticacao()
 async def stream_mensagens(request: Request, usuario_logado: Optional[UsuarioLogado] = None):
     """
     Endpoint SSE para receber mensagens em tempo real.
-    Cada usuário mantém UMA conexão que recebe mensagens de TODAS as suas salas.
+    Cada aba/dispositivo do usuário abre sua própria conexão, que recebe
+    mensagens de TODAS as suas salas.
+
+    Eventos de mensagem levam o id da mensagem. Ao reconectar, o navegador
+    envia Last-Event-ID e as mensagens perdidas são reenviadas antes dos
+    eventos novos.
     """
     usuario_id = usuario_logado.id
-
-    async def event_generator():
-        # Conectar usuário ao GerenciadorChat
-        queue = await gerenciador_chat.conectar(usuario_id)
-        try:
-            while True:
-                # Aguardar mensagem na fila
-                evento = await queue.get()
-
-                # Formatar como SSE
-                sse_data = f"data: {json.dumps(evento)}\n\n"
-                yield sse_data
-
-                # Pequeno delay para não sobrecarregar
-                await asyncio.sleep(0.1)
-        except asyncio.CancelledError:
-            logger.info(f"[SSE] Conexão cancelada para usuário {usuario_id}")
-        finally:
-            # Desconectar ao fechar stream
-            await gerenciador_chat.desconectar(usuario_id)
+    ultimo_evento_id = _ler_last_event_id(request.headers.get("last-event-id"))
 
     return StreamingResponse(
-        event_generator(),
+        _stream_eventos(usuario_id, ultimo_evento_id),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -126,14 +239,6 @@ async def criar_ou_obter_sala(
     Cria ou obtém uma sala de chat entre o usuário logado e outro usuário.
     """
     assert usuario_logado is not None
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not chat_sala_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para criação de sala de chat - IP: {ip}")
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Muitas tentativas de criação de salas. Aguarde alguns minutos."
-        )
 
     try:
         # Validar DTO
@@ -147,7 +252,7 @@ async def criar_ou_obter_sala(
             )
 
         # Verificar se outro usuário existe
-        outro_usuario = usuario_repo.obter_por_id(dto.outro_usuario_id)
+        outro_usuario = await executar_db(usuario_repo.obter_por_id, dto.outro_usuario_id)
         if not outro_usuario:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -155,16 +260,16 @@ async def criar_ou_obter_sala(
             )
 
         # Criar ou obter sala
-        sala = chat_sala_repo.criar_ou_obter_sala(usuario_logado.id, dto.outro_usuario_id)
+        sala = await executar_db(chat_sala_repo.criar_ou_obter_sala, usuario_logado.id, dto.outro_usuario_id)
 
         # Adicionar participantes se sala foi recém-criada
-        participante1 = chat_participante_repo.obter_por_sala_e_usuario(sala.id, usuario_logado.id)
+        participante1 = await executar_db(chat_participante_repo.obter_por_sala_e_usuario, sala.id, usuario_logado.id)
         if not participante1:
-            chat_participante_repo.adicionar_participante(sala.id, usuario_logado.id)
+            await executar_db(chat_participante_repo.adicionar_participante, sala.id, usuario_logado.id)
 
-        participante2 = chat_participante_repo.obter_por_sala_e_usuario(sala.id, dto.outro_usuario_id)
+        participante2 = await executar_db(chat_participante_repo.obter_por_sala_e_usuario, sala.id, dto.outro_usuario_id)
         if not participante2:
-            chat_participante_repo.adicionar_participante(sala.id, dto.outro_usuario_id)
+            await executar_db(chat_participante_repo.adicionar_participante, sala.id, dto.outro_usuario_id)
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -190,74 +295,37 @@ async def listar_conversas(
     Lista conversas do usuário (salas com última mensagem e contador de não lidas).
     """
     assert usuario_logado is not None
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not chat_listagem_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para listagem de conversas - IP: {ip}")
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Muitas requisições de listagem. Aguarde alguns minutos."
-        )
 
     usuario_id = usuario_logado.id
 
-    # Obter todas as participações do usuário
-    participacoes = chat_participante_repo.listar_por_usuario(usuario_id)
-
-    conversas = []
-    for participacao in participacoes:
-        sala = chat_sala_repo.obter_por_id(participacao.sala_id)
-        if not sala:
-            continue
-
-        # Obter o outro participante da sala
-        participantes = chat_participante_repo.listar_por_sala(sala.id)
-        outro_participante = next(
-            (p for p in participantes if p.usuario_id != usuario_id),
-            None
-        )
-
-        if not outro_participante:
-            continue
-
-        # Obter dados do outro usuário
-        outro_usuario = usuario_repo.obter_por_id(outro_participante.usuario_id)
-        if not outro_usuario:
-            continue
-
-        # Obter última mensagem
-        ultima_mensagem = chat_mensagem_repo.obter_ultima_mensagem_sala(sala.id)
-
-        # Contar não lidas
-        nao_lidas = chat_participante_repo.contar_mensagens_nao_lidas(sala.id, usuario_id)
+    # Conversas já ordenadas e paginadas pelo banco (uma única consulta)
+    conversas = await executar_db(
+        chat_participante_repo.listar_conversas, usuario_id, limit, offset
+    )
 
-        conversa = {
-            "sala_id": sala.id,
+    conteudo = [
+        {
+            "sala_id": conversa.sala_id,
             "outro_usuario": {
-                "id": outro_usuario.id,
-                "nome": outro_usuario.nome,
-                "email": outro_usuario.email,
-                "foto_url": obter_caminho_foto_usuario(outro_usuario.id)
+                "id": conversa.outro_usuario_id,
+                "nome": conversa.outro_usuario_nome,
+                "email": conversa.outro_usuario_email,
+                "foto_url": obter_caminho_foto_usuario(conversa.outro_usuario_id)
             },
             "ultima_mensagem": {
-                "mensagem": ultima_mensagem.mensagem,
-                "data_envio": ultima_mensagem.data_envio.isoformat() if ultima_mensagem.data_envio else None,
-                "usuario_id": ultima_mensagem.usuario_id
-            } if ultima_mensagem else None,
-            "nao_lidas": nao_lidas,
-            "ultima_atividade": sala.ultima_atividade.isoformat() if sala.ultima_atividade else ""
+                "mensagem": conversa.ultima_mensagem,
+                "data_envio": conversa.ultima_mensagem_data_envio.isoformat() if conversa.ultima_mensagem_data_envio else None,
+                "usuario_id": conversa.ultima_mensagem_usuario_id
+            } if conversa.ultima_mensagem is not None else None,
+            "nao_lidas": conversa.nao_lidas,
+            "ultima_atividade": conversa.ultima_atividade.isoformat() if conversa.ultima_atividade else ""
         }
-        conversas.append(conversa)
-
-    # Ordenar por última atividade (mais recente primeiro)
-    conversas.sort(key=lambda c: c["ultima_atividade"], reverse=True)
-
-    # Aplicar paginação
-    conversas_paginadas = conversas[offset:offset + limit]
+        for conversa in conversas
+    ]
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
-        content=conversas_paginadas
+        content=conteudo
     )
 
 
@@ -267,27 +335,30 @@ async def listar_mensagens(
     request: Request,
     sala_id: str,
     limit: int = 50,
-    offset: int = 0,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
     usuario_logado: Optional[UsuarioLogado] = None
 ):
     """
-    Lista mensagens de uma sala específica com paginação.
+    Lista mensagens de uma sala específica com paginação por cursor.
+
+    Sem cursor, retorna as mensagens mais recentes; before_id pagina para o
+    passado e after_id busca as posteriores a uma mensagem. A resposta vem
+    sempre em ordem crescente de id.
     """
     assert usuario_logado is not None
 
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not chat_listagem_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para listagem de mensagens - IP: {ip}")
+    usuario_id = usuario_logado.id
+
+    if before_id is not None and after_id is not None:
         raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Muitas requisições de listagem. Aguarde alguns minutos."
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use before_id ou after_id, não ambos."
         )
-
-    usuario_id = usuario_logado.id
+    limit = max(1, min(limit, MAX_MENSAGENS_POR_PAGINA))
 
     # Verificar se usuário participa da sala
-    participante = chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
+    participante = await executar_db(chat_participante_repo.obter_por_sala_e_usuario, sala_id, usuario_id)
     if not participante:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -295,7 +366,7 @@ async def listar_mensagens(
         )
 
     # Obter mensagens
-    mensagens = chat_mensagem_repo.listar_por_sala(sala_id, limit, offset)
+    mensagens = await executar_db(chat_mensagem_repo.listar_por_sala, sala_id, limit, before_id, after_id)
 
     mensagens_json = [
         {
@@ -328,57 +399,28 @@ async def enviar_mensagem(
     """
     assert usuario_logado is not None
 
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not chat_mensagem_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para envio de mensagem no chat - IP: {ip}")
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Muitas mensagens enviadas. Aguarde alguns minutos."
-        )
-
     try:
         # Validar DTO
         dto = EnviarMensagemDTO(sala_id=sala_id, mensagem=mensagem)
 
         usuario_id = usuario_logado.id
 
-        # Verificar se usuário participa da sala
-        participante = chat_participante_repo.obter_por_sala_e_usuario(dto.sala_id, usuario_id)
-        if not participante:
+        # Verificação de acesso, inserção, contador e última atividade em uma
+        # transação, agrupada com envios concorrentes (group commit)
+        nova_mensagem = await escritor_mensagens.enviar(dto.sala_id, usuario_id, dto.mensagem)
+        if nova_mensagem == chat_mensagem_repo.SEM_ACESSO:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Você não tem acesso a esta sala."
             )
-
-        # Verificar se sala existe
-        sala = chat_sala_repo.obter_por_id(dto.sala_id)
-        if not sala:
+        if nova_mensagem == chat_mensagem_repo.SALA_INEXISTENTE:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Sala não encontrada."
             )
 
-        # Inserir mensagem
-        nova_mensagem = chat_mensagem_repo.inserir(dto.sala_id, usuario_id, dto.mensagem)
-
-        # Atualizar última atividade da sala
-        chat_sala_repo.atualizar_ultima_atividade(dto.sala_id)
-
         # Broadcast via SSE para ambos participantes
-        mensagem_sse = {
-            "tipo": "nova_mensagem",
-            "sala_id": nova_mensagem.sala_id,
-            "mensagem": {
-                "id": nova_mensagem.id,
-                "sala_id": nova_mensagem.sala_id,
-                "usuario_id": nova_mensagem.usuario_id,
-                "mensagem": nova_mensagem.mensagem,
-                "data_envio": nova_mensagem.data_envio.isoformat() if nova_mensagem.data_envio else None,
-                "lida_em": None
-            }
-        }
-        await gerenciador_chat.broadcast_para_sala(dto.sala_id, mensagem_sse)
+        await gerenciador_chat.broadcast_para_sala(dto.sala_id, _evento_nova_mensagem(nova_mensagem))
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -412,20 +454,13 @@ async def marcar_como_lidas(
     assert usuario_logado is not None
     usuario_id = usuario_logado.id
 
-    # Verificar se usuário participa da sala
-    participante = chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
-    if not participante:
+    # Participação, mensagens lidas, contador e última leitura em uma transação
+    if not await executar_db(chat_mensagem_repo.registrar_leitura, sala_id, usuario_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Você não tem acesso a esta sala."
         )
 
-    # Marcar mensagens como lidas
-    chat_mensagem_repo.marcar_como_lidas(sala_id, usuario_id)
-
-    # Atualizar última leitura do participante
-    chat_participante_repo.atualizar_ultima_leitura(sala_id, usuario_id)
-
     # Notificar via SSE para atualizar contador
     await gerenciador_chat.broadcast_para_sala(sala_id, {
         "tipo": "atualizar_contador",
@@ -452,15 +487,6 @@ async def buscar_usuarios(
     """
     assert usuario_logado is not None
 
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not busca_usuarios_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para busca de usuários - IP: {ip}")
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Muitas buscas. Aguarde alguns minutos."
-        )
-
     if len(q) < 2:
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -468,7 +494,7 @@ async def buscar_usuarios(
         )
 
     # Buscar usuários
-    usuarios = usuario_repo.buscar_por_termo(q, limit=10)
+    usuarios = await executar_db(usuario_repo.buscar_por_termo, q, limit=10)
 
     # Excluir o próprio usuário e administradores dos resultados
     usuarios_filtrados = [
@@ -504,16 +530,7 @@ async def contar_nao_lidas_total(
     assert usuario_logado is not None
     usuario_id = usuario_logado.id
 
-    # Obter todas as participações do usuário
-    participacoes = chat_participante_repo.listar_por_usuario(usuario_id)
-
-    total_nao_lidas = 0
-    for participacao in participacoes:
-        nao_lidas = chat_participante_repo.contar_mensagens_nao_lidas(
-            participacao.sala_id,
-            usuario_id
-        )
-        total_nao_lidas += nao_lidas
+    total_nao_lidas = await executar_db(chat_participante_repo.somar_nao_lidas, usuario_id)
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -530,7 +547,8 @@ async def chat_health():
         status_code=status.HTTP_200_OK,
         content={
             "status": "healthy",
-            "conexoes_ativas": estatisticas["total_usuarios_ativos"],
+            "conexoes_ativas": estatisticas["total_conexoes"],
+            "usuarios_ativos": estatisticas["total_usuarios_ativos"],
             "timestamp": agora().isoformat()
         }
     )
@@ -1,9 +1,7 @@
-from fastapi import APIRouter, Request, status
+from fastapi import APIRouter, Request
 
 from util.template_util import criar_templates
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
-from util.flash_messages import informar_erro
-from util.logger_config import logger
+from util.rate_limiter import DynamicRateLimiter, registro_limiters
 
 router = APIRouter(prefix="/exemplos")
 templates_public = criar_templates("templates")
@@ -16,6 +14,8 @@ examples_limiter = DynamicRateLimiter(
     padrao_minutos=1,
     nome="examples_pages",
 )
+# Aplicado pelo MiddlewareRateLimit, antes de sessão e CSRF
+registro_limiters.definir_politica(examples_limiter, "GET", ["/exemplos/*"])
 
 
 @router.get("/")
@@ -23,17 +23,6 @@ async def index(request: Request):
     """
     Página inicial de exemplos
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/index.html",
         {"request": request}
@@ -45,17 +34,6 @@ async def form_fields_demo(request: Request):
     """
     Página de demonstração da macro de campos de formulário
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/demo_campos_formulario.html",
         {"request": request}
@@ -67,17 +45,6 @@ async def cards_grid_demo(request: Request):
     """
     Página de demonstração de grid de cards responsivo
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/grade_cartoes.html",
         {"request": request}
@@ -89,17 +56,6 @@ async def bootswatch_demo(request: Request):
     """
     Página de demonstração de temas Bootswatch
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/bootswatch.html",
         {"request": request}
@@ -111,17 +67,6 @@ async def product_detail_demo(request: Request):
     """
     Página de demonstração de detalhes de produto e-commerce
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/detalhes_produto.html",
         {"request": request}
@@ -133,17 +78,6 @@ async def service_detail_demo(request: Request):
     """
     Página de demonstração de detalhes de serviço profissional
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/detalhes_servico.html",
         {"request": request}
@@ -155,17 +89,6 @@ async def profile_detail_demo(request: Request):
     """
     Página de demonstração de perfil de pessoa
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/detalhes_perfil.html",
         {"request": request}
@@ -177,17 +100,6 @@ async def property_detail_demo(request: Request):
     """
     Página de demonstração de detalhes de imóvel
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/detalhes_imovel.html",
         {"request": request}
@@ -199,17 +111,6 @@ async def table_list_demo(request: Request):
     """
     Página de demonstração de tabela com listagem de dados
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     # Dados mockados para demonstração
     produtos = [
         {
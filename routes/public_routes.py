@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Request, status
+from fastapi import APIRouter, Request
 
 from util.template_util import criar_templates
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
-from util.flash_messages import informar_erro
-from util.logger_config import logger
+from util.rate_limiter import DynamicRateLimiter, registro_limiters
 from util.auth_decorator import obter_usuario_logado
+from util.db_async import executar_db
+from util.cache_paginas import cache_paginas
 from repo import artigo_repo, categoria_repo
 
 router = APIRouter()
@@ -18,6 +18,8 @@ public_limiter = DynamicRateLimiter(
     padrao_minutos=1,
     nome="public_pages",
 )
+# Aplicado pelo MiddlewareRateLimit, antes de sessão e CSRF
+registro_limiters.definir_politica(public_limiter, "GET", ["/", "/index", "/sobre"])
 
 
 @router.get("/")
@@ -25,23 +27,16 @@ async def home(request: Request):
     """
     Rota inicial - Landing Page pública com os últimos artigos
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not public_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página pública - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
+    # Visitantes anônimos recebem a página já renderizada
+    if (resposta := cache_paginas.obter_resposta(request)) is not None:
+        return resposta
 
     # Obtém os 6 últimos artigos publicados
-    ultimos_artigos = artigo_repo.obter_ultimos_publicados(6)
-    categorias = categoria_repo.obter_todos()
+    ultimos_artigos = await executar_db(artigo_repo.obter_ultimos_publicados, 6)
+    categorias = await executar_db(categoria_repo.obter_todos)
     usuario_logado = obter_usuario_logado(request)
 
-    return templates_public.TemplateResponse(
+    resposta = templates_public.TemplateResponse(
         "index.html",
         {
             "request": request,
@@ -50,6 +45,8 @@ async def home(request: Request):
             "categorias": categorias,
         }
     )
+    cache_paginas.armazenar_resposta(request, resposta)
+    return resposta
 
 
 @router.get("/index")
@@ -58,23 +55,16 @@ async def index(request: Request):
     Página pública inicial (Landing Page)
     Sempre exibe a página pública, independentemente de autenticação
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not public_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página pública - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
+    # Visitantes anônimos recebem a página já renderizada
+    if (resposta := cache_paginas.obter_resposta(request)) is not None:
+        return resposta
 
     # Obtém os 6 últimos artigos publicados
-    ultimos_artigos = artigo_repo.obter_ultimos_publicados(6)
-    categorias = categoria_repo.obter_todos()
+    ultimos_artigos = await executar_db(artigo_repo.obter_ultimos_publicados, 6)
+    categorias = await executar_db(categoria_repo.obter_todos)
     usuario_logado = obter_usuario_logado(request)
 
-    return templates_public.TemplateResponse(
+    resposta = templates_public.TemplateResponse(
         "index.html",
         {
             "request": request,
@@ -83,6 +73,8 @@ async def index(request: Request):
             "categorias": categorias,
         }
     )
+    cache_paginas.armazenar_resposta(request, resposta)
+    return resposta
 
 
 @router.get("/sobre")
@@ -90,17 +82,6 @@ async def sobre(request: Request):
     """
     Página "Sobre" com informações do projeto acadêmico
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not public_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página pública - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "sobre.html",
         {"request": request}
@@ -22,11 +22,12 @@ from repo import usuario_repo, chamado_repo, artigo_repo
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
+from util.db_async import executar_db
 from util.exceptions import ErroValidacaoFormulario
 from util.flash_messages import informar_sucesso, informar_erro
 from util.foto_util import salvar_foto_cropada_usuario
 from util.logger_config import logger
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente, registro_limiters
 from util.repository_helpers import obter_ou_404
 from util.security import criar_hash_senha, verificar_senha
 from util.template_util import criar_templates
@@ -65,6 +66,8 @@ form_get_limiter = DynamicRateLimiter(
     nome="form_get",
 )
 
+registro_limiters.registrar(upload_foto_limiter, alterar_senha_limiter, form_get_limiter)
+
 
 @router.get("/usuario")
 @requer_autenticacao()
@@ -84,15 +87,16 @@ async def dashboard(request: Request, usuario_logado: Optional[UsuarioLogado] =
     # Adicionar contador de chamados conforme perfil
     if usuario_logado.is_admin():
         # Admin vê total de chamados pendentes no sistema
-        context["chamados_pendentes"] = chamado_repo.contar_pendentes()
+        context["chamados_pendentes"] = await executar_db(chamado_repo.contar_pendentes)
     else:
         # Usuário comum vê seus próprios chamados em aberto
-        context["chamados_abertos"] = chamado_repo.contar_abertos_por_usuario(usuario_logado.id)
+        context["chamados_abertos"] = await executar_db(chamado_repo.contar_abertos_por_usuario, usuario_logado.id)
 
     # Adicionar contador de artigos para autores
     if usuario_logado.perfil == "Autor":
-        artigos = artigo_repo.obter_por_usuario(usuario_logado.id)
-        context["total_artigos"] = len(artigos) if artigos else 0
+        context["total_artigos"] = await executar_db(
+            artigo_repo.obter_quantidade_por_usuario, usuario_logado.id
+        )
 
     return templates_usuario.TemplateResponse("dashboard.html", context)
 
@@ -105,7 +109,7 @@ async def get_visualizar_perfil(request: Request, usuario_logado: Optional[Usuar
 
     # Obter usuário ou redirecionar para logout
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(usuario_logado.id),
+        await executar_db(usuario_repo.obter_por_id, usuario_logado.id),
         request,
         "Usuário não encontrado!",
         "/logout"
@@ -123,7 +127,7 @@ async def get_visualizar_perfil(request: Request, usuario_logado: Optional[Usuar
 async def get_editar_perfil(request: Request, usuario_logado: Optional[UsuarioLogado] = None):
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not form_get_limiter.verificar(ip):
+    if not await form_get_limiter.verificar_async(ip):
         informar_erro(request, f"Muitas requisições. Aguarde {form_get_limiter.janela_minutos} minuto(s).")
         logger.warning(f"Rate limit excedido para formulário GET - IP: {ip}")
         return RedirectResponse("/usuario", status_code=status.HTTP_303_SEE_OTHER)
@@ -132,7 +136,7 @@ async def get_editar_perfil(request: Request, usuario_logado: Optional[UsuarioLo
 
     # Obter usuário ou redirecionar para logout
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(usuario_logado.id),
+        await executar_db(usuario_repo.obter_por_id, usuario_logado.id),
         request,
         "Usuário não encontrado!",
         "/logout"
@@ -158,7 +162,7 @@ async def post_editar_perfil(
 
     # Obter usuário ou redirecionar para logout
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(usuario_logado.id),
+        await executar_db(usuario_repo.obter_por_id, usuario_logado.id),
         request,
         "Usuário não encontrado!",
         "/logout"
@@ -192,7 +196,7 @@ async def post_editar_perfil(
         usuario.email = dto.email
 
         # Salvar no banco
-        if usuario_repo.alterar(usuario):
+        if await executar_db(usuario_repo.alterar, usuario):
             # Atualizar sessão
             request.session["usuario_logado"]["nome"] = usuario.nome
             request.session["usuario_logado"]["email"] = usuario.email
@@ -235,7 +239,7 @@ async def get_alterar_senha(request: Request, usuario_logado: Optional[UsuarioLo
     """Formulário para alterar senha"""
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not form_get_limiter.verificar(ip):
+    if not await form_get_limiter.verificar_async(ip):
         informar_erro(request, f"Muitas requisições. Aguarde {form_get_limiter.janela_minutos} minuto(s).")
         logger.warning(f"Rate limit excedido para formulário GET - IP: {ip}")
         return RedirectResponse("/usuario", status_code=status.HTTP_303_SEE_OTHER)
@@ -258,7 +262,7 @@ async def post_alterar_senha(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not alterar_senha_limiter.verificar(ip):
+    if not await alterar_senha_limiter.verificar_async(ip):
         informar_erro(
             request,
             f"Muitas tentativas de alteração de senha. Aguarde {alterar_senha_limiter.janela_minutos} minuto(s).",
@@ -283,7 +287,7 @@ async def post_alterar_senha(
 
         # Obter usuário ou redirecionar para logout
         usuario = obter_ou_404(
-            usuario_repo.obter_por_id(usuario_logado.id),
+            await executar_db(usuario_repo.obter_por_id, usuario_logado.id),
             request,
             "Usuário não encontrado!",
             "/logout"
@@ -320,7 +324,7 @@ async def post_alterar_senha(
 
         # Atualizar senha
         senha_hash = criar_hash_senha(dto.senha_nova)
-        if usuario_repo.atualizar_senha(usuario.id, senha_hash):
+        if await executar_db(usuario_repo.atualizar_senha, usuario.id, senha_hash):
             logger.info(f"Senha alterada com sucesso - Usuário ID: {usuario.id}")
             informar_sucesso(request, "Senha alterada com sucesso!")
             return RedirectResponse(
@@ -361,7 +365,7 @@ async def post_atualizar_foto(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not upload_foto_limiter.verificar(ip):
+    if not await upload_foto_limiter.verificar_async(ip):
         informar_erro(
             request,
             f"Muitas tentativas de upload de foto. Aguarde {upload_foto_limiter.janela_minutos} minuto(s).",
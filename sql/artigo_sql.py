@@ -20,10 +20,17 @@ CRIAR_TABELA = """
     )
 """
 
-# Insere um novo artigo
+# Insere um novo artigo (já publicado recebe data_publicacao)
 INSERIR = """
-    INSERT INTO artigo (titulo, resumo, conteudo, status, usuario_id, categoria_id)
-    VALUES (?, ?, ?, ?, ?, ?)
+    INSERT INTO artigo (titulo, resumo, conteudo, status, usuario_id, categoria_id, data_publicacao)
+    VALUES (?, ?, ?, ?, ?, ?, CASE WHEN ? = 'Publicado' THEN CURRENT_TIMESTAMP END)
+"""
+
+# Preenche data_publicacao de artigos publicados sem data (chave da paginação)
+PREENCHER_DATA_PUBLICACAO = """
+    UPDATE artigo
+    SET data_publicacao = COALESCE(data_atualizacao, data_cadastro, CURRENT_TIMESTAMP)
+    WHERE status = 'Publicado' AND data_publicacao IS NULL
 """
 
 # Atualiza um artigo existente
@@ -47,13 +54,18 @@ EXCLUIR = """
     DELETE FROM artigo WHERE id=?
 """
 
+# Listagens usam a projeção resumida (sem o conteúdo completo): o texto
+# integral só é lido em OBTER_POR_ID. "previa" traz o início do conteúdo
+# apenas para artigos sem resumo.
+
 # Busca todos os artigos ordenados por data de cadastro (mais recentes primeiro)
 OBTER_TODOS = """
-    SELECT a.id, a.titulo, a.resumo, a.conteudo, a.status, a.usuario_id, a.categoria_id,
+    SELECT a.id, a.titulo, a.resumo, a.status, a.usuario_id, a.categoria_id,
            a.qtde_visualizacoes, a.data_cadastro, a.data_atualizacao,
            a.data_publicacao, a.data_pausa,
            u.nome as usuario_nome, u.email as usuario_email,
-           c.nome as categoria_nome
+           c.nome as categoria_nome,
+           CASE WHEN COALESCE(a.resumo, '') = '' THEN substr(a.conteudo, 1, 200) END as previa
     FROM artigo a
     LEFT JOIN usuario u ON a.usuario_id = u.id
     LEFT JOIN categoria c ON a.categoria_id = c.id
@@ -62,11 +74,12 @@ OBTER_TODOS = """
 
 # Busca artigos por usuário (autor)
 OBTER_POR_USUARIO = """
-    SELECT a.id, a.titulo, a.resumo, a.conteudo, a.status, a.usuario_id, a.categoria_id,
+    SELECT a.id, a.titulo, a.resumo, a.status, a.usuario_id, a.categoria_id,
            a.qtde_visualizacoes, a.data_cadastro, a.data_atualizacao,
            a.data_publicacao, a.data_pausa,
            u.nome as usuario_nome, u.email as usuario_email,
-           c.nome as categoria_nome
+           c.nome as categoria_nome,
+           CASE WHEN COALESCE(a.resumo, '') = '' THEN substr(a.conteudo, 1, 200) END as previa
     FROM artigo a
     LEFT JOIN usuario u ON a.usuario_id = u.id
     LEFT JOIN categoria c ON a.categoria_id = c.id
@@ -76,11 +89,12 @@ OBTER_POR_USUARIO = """
 
 # Busca artigos publicados (para exibição pública)
 OBTER_PUBLICADOS = """
-    SELECT a.id, a.titulo, a.resumo, a.conteudo, a.status, a.usuario_id, a.categoria_id,
+    SELECT a.id, a.titulo, a.resumo, a.status, a.usuario_id, a.categoria_id,
            a.qtde_visualizacoes, a.data_cadastro, a.data_atualizacao,
            a.data_publicacao, a.data_pausa,
            u.nome as usuario_nome, u.email as usuario_email,
-           c.nome as categoria_nome
+           c.nome as categoria_nome,
+           CASE WHEN COALESCE(a.resumo, '') = '' THEN substr(a.conteudo, 1, 200) END as previa
     FROM artigo a
     LEFT JOIN usuario u ON a.usuario_id = u.id
     LEFT JOIN categoria c ON a.categoria_id = c.id
@@ -90,11 +104,12 @@ OBTER_PUBLICADOS = """
 
 # Busca os últimos N artigos publicados
 OBTER_ULTIMOS_PUBLICADOS = """
-    SELECT a.id, a.titulo, a.resumo, a.conteudo, a.status, a.usuario_id, a.categoria_id,
+    SELECT a.id, a.titulo, a.resumo, a.status, a.usuario_id, a.categoria_id,
            a.qtde_visualizacoes, a.data_cadastro, a.data_atualizacao,
            a.data_publicacao, a.data_pausa,
            u.nome as usuario_nome, u.email as usuario_email,
-           c.nome as categoria_nome
+           c.nome as categoria_nome,
+           CASE WHEN COALESCE(a.resumo, '') = '' THEN substr(a.conteudo, 1, 200) END as previa
     FROM artigo a
     LEFT JOIN usuario u ON a.usuario_id = u.id
     LEFT JOIN categoria c ON a.categoria_id = c.id
@@ -103,6 +118,59 @@ OBTER_ULTIMOS_PUBLICADOS = """
     LIMIT ?
 """
 
+# Paginação por cursor (keyset) dos artigos publicados.
+# Placeholders preenchidos pelo repositório apenas com os fragmentos abaixo:
+#   {coluna}/{direcao}: chave de ordenação (desempate por a.id)
+#   {filtro}: FILTRO_CATEGORIA e/ou FILTRO_CURSOR
+# chave_ordem vem como texto (sem conversão de tipo) para compor o cursor.
+LISTAR_PUBLICADOS_PAGINA = """
+    SELECT a.id, a.titulo, a.resumo, a.status, a.usuario_id, a.categoria_id,
+           a.qtde_visualizacoes, a.data_cadastro, a.data_atualizacao,
+           a.data_publicacao, a.data_pausa,
+           u.nome as usuario_nome, u.email as usuario_email,
+           c.nome as categoria_nome,
+           CASE WHEN COALESCE(a.resumo, '') = '' THEN substr(a.conteudo, 1, 200) END as previa,
+           CAST({coluna} AS TEXT) as chave_ordem
+    FROM artigo a
+    LEFT JOIN usuario u ON a.usuario_id = u.id
+    LEFT JOIN categoria c ON a.categoria_id = c.id
+    WHERE a.status = 'Publicado' {filtro}
+    ORDER BY {coluna} {direcao}, a.id {direcao}
+    LIMIT ?
+"""
+
+# Artigos de um autor, do mais recente para o mais antigo, por cursor
+LISTAR_POR_USUARIO_PAGINA = """
+    SELECT a.id, a.titulo, a.resumo, a.status, a.usuario_id, a.categoria_id,
+           a.qtde_visualizacoes, a.data_cadastro, a.data_atualizacao,
+           a.data_publicacao, a.data_pausa,
+           u.nome as usuario_nome, u.email as usuario_email,
+           c.nome as categoria_nome,
+           CASE WHEN COALESCE(a.resumo, '') = '' THEN substr(a.conteudo, 1, 200) END as previa,
+           CAST({coluna} AS TEXT) as chave_ordem
+    FROM artigo a
+    LEFT JOIN usuario u ON a.usuario_id = u.id
+    LEFT JOIN categoria c ON a.categoria_id = c.id
+    WHERE a.usuario_id = ? {filtro}
+    ORDER BY {coluna} {direcao}, a.id {direcao}
+    LIMIT ?
+"""
+
+# Ordenações aceitas na listagem pública: nome -> (coluna, direção)
+ORDENACOES_PUBLICADOS = {
+    "recentes": ("a.data_publicacao", "DESC"),
+    "antigos": ("a.data_publicacao", "ASC"),
+    "visualizacoes": ("a.qtde_visualizacoes", "DESC"),
+}
+
+# Ordenação fixa de "Meus artigos"
+ORDENACAO_POR_USUARIO = ("a.data_cadastro", "DESC")
+
+FILTRO_CATEGORIA = "AND a.categoria_id = ?"
+
+# Row value: continua após (ou antes de) (valor da chave, id) do cursor
+FILTRO_CURSOR = "AND ({coluna}, a.id) {operador} (?, ?)"
+
 # Busca um artigo por ID
 OBTER_POR_ID = """
     SELECT a.id, a.titulo, a.resumo, a.conteudo, a.status, a.usuario_id, a.categoria_id,
@@ -116,13 +184,89 @@ OBTER_POR_ID = """
     WHERE a.id = ?
 """
 
+# Índice de busca textual (FTS5) sobre título, resumo e conteúdo.
+# Tabela de conteúdo externo: o texto fica só em artigo, o FTS guarda o índice.
+# remove_diacritics 2 torna a busca insensível a acentos ("acao" encontra "ação").
+CRIAR_TABELA_FTS = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS artigo_fts USING fts5(
+        titulo, resumo, conteudo,
+        content='artigo',
+        content_rowid='id',
+        tokenize="unicode61 remove_diacritics 2",
+        prefix='2 3'
+    )
+"""
+
+# Triggers que mantêm artigo_fts sincronizado com artigo
+CRIAR_TRIGGER_FTS_INSERT = """
+    CREATE TRIGGER IF NOT EXISTS artigo_fts_insert AFTER INSERT ON artigo BEGIN
+        INSERT INTO artigo_fts(rowid, titulo, resumo, conteudo)
+        VALUES (new.id, new.titulo, new.resumo, new.conteudo);
+    END
+"""
+
+CRIAR_TRIGGER_FTS_DELETE = """
+    CREATE TRIGGER IF NOT EXISTS artigo_fts_delete AFTER DELETE ON artigo BEGIN
+        INSERT INTO artigo_fts(artigo_fts, rowid, titulo, resumo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.resumo, old.conteudo);
+    END
+"""
+
+# Só dispara quando o texto muda (visualizações/status não reindexam)
+CRIAR_TRIGGER_FTS_UPDATE = """
+    CREATE TRIGGER IF NOT EXISTS artigo_fts_update AFTER UPDATE OF titulo, resumo, conteudo ON artigo BEGIN
+        INSERT INTO artigo_fts(artigo_fts, rowid, titulo, resumo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.resumo, old.conteudo);
+        INSERT INTO artigo_fts(rowid, titulo, resumo, conteudo)
+        VALUES (new.id, new.titulo, new.resumo, new.conteudo);
+    END
+"""
+
+# Verifica se o índice de busca já existe
+VERIFICAR_TABELA_FTS = """
+    SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'artigo_fts'
+"""
+
+# Reconstrói o índice de busca a partir da tabela artigo
+RECONSTRUIR_FTS = """
+    INSERT INTO artigo_fts(artigo_fts) VALUES ('rebuild')
+"""
+
+# Busca textual em artigos publicados, ordenada por relevância (BM25).
+# Pesos: título 10, resumo 5, conteúdo 1. O trecho destacado usa os
+# delimitadores char(2)/char(3), convertidos em <mark> no template.
+BUSCAR = """
+    SELECT a.id, a.titulo, a.resumo, a.status, a.usuario_id, a.categoria_id,
+           a.qtde_visualizacoes, a.data_cadastro, a.data_atualizacao,
+           a.data_publicacao, a.data_pausa,
+           u.nome as usuario_nome, u.email as usuario_email,
+           c.nome as categoria_nome,
+           snippet(artigo_fts, -1, char(2), char(3), '…', 24) as trecho_destacado
+    FROM artigo_fts
+    JOIN artigo a ON a.id = artigo_fts.rowid
+    LEFT JOIN usuario u ON a.usuario_id = u.id
+    LEFT JOIN categoria c ON a.categoria_id = c.id
+    WHERE artigo_fts MATCH ? AND a.status = 'Publicado'
+    ORDER BY bm25(artigo_fts, 10.0, 5.0, 1.0)
+    LIMIT ? OFFSET ?
+"""
+
+# Total de resultados da busca textual (para paginação)
+CONTAR_BUSCA = """
+    SELECT COUNT(*) as quantidade
+    FROM artigo_fts
+    JOIN artigo a ON a.id = artigo_fts.rowid
+    WHERE artigo_fts MATCH ? AND a.status = 'Publicado'
+"""
+
 # Busca artigos por título (busca parcial)
 BUSCAR_POR_TITULO = """
-    SELECT a.id, a.titulo, a.resumo, a.conteudo, a.status, a.usuario_id, a.categoria_id,
+    SELECT a.id, a.titulo, a.resumo, a.status, a.usuario_id, a.categoria_id,
            a.qtde_visualizacoes, a.data_cadastro, a.data_atualizacao,
            a.data_publicacao, a.data_pausa,
            u.nome as usuario_nome, u.email as usuario_email,
-           c.nome as categoria_nome
+           c.nome as categoria_nome,
+           CASE WHEN COALESCE(a.resumo, '') = '' THEN substr(a.conteudo, 1, 200) END as previa
     FROM artigo a
     LEFT JOIN usuario u ON a.usuario_id = u.id
     LEFT JOIN categoria c ON a.categoria_id = c.id
@@ -132,11 +276,12 @@ BUSCAR_POR_TITULO = """
 
 # Busca artigos por categoria
 OBTER_POR_CATEGORIA = """
-    SELECT a.id, a.titulo, a.resumo, a.conteudo, a.status, a.usuario_id, a.categoria_id,
+    SELECT a.id, a.titulo, a.resumo, a.status, a.usuario_id, a.categoria_id,
            a.qtde_visualizacoes, a.data_cadastro, a.data_atualizacao,
            a.data_publicacao, a.data_pausa,
            u.nome as usuario_nome, u.email as usuario_email,
-           c.nome as categoria_nome
+           c.nome as categoria_nome,
+           CASE WHEN COALESCE(a.resumo, '') = '' THEN substr(a.conteudo, 1, 200) END as previa
     FROM artigo a
     LEFT JOIN usuario u ON a.usuario_id = u.id
     LEFT JOIN categoria c ON a.categoria_id = c.id
@@ -149,11 +294,21 @@ INCREMENTAR_VISUALIZACOES = """
     UPDATE artigo SET qtde_visualizacoes = qtde_visualizacoes + 1 WHERE id = ?
 """
 
+# Soma um lote de visualizações acumuladas (contador write-behind)
+SOMAR_VISUALIZACOES = """
+    UPDATE artigo SET qtde_visualizacoes = qtde_visualizacoes + ? WHERE id = ?
+"""
+
 # Conta quantidade de artigos
 OBTER_QUANTIDADE = """
     SELECT COUNT(*) as quantidade FROM artigo
 """
 
+# Conta quantidade de artigos de um autor
+OBTER_QUANTIDADE_POR_USUARIO = """
+    SELECT COUNT(*) as quantidade FROM artigo WHERE usuario_id = ?
+"""
+
 # Conta quantidade de artigos publicados
 OBTER_QUANTIDADE_PUBLICADOS = """
     SELECT COUNT(*) as quantidade FROM artigo WHERE status = 'Publicado'
@@ -11,6 +11,26 @@ CRIAR_TABELA = """
     )
 """
 
+# Triggers que incrementam a versão das categorias em versao_dados
+# (invalidam o cache de categorias de todos os processos)
+CRIAR_TRIGGER_VERSAO_INSERT = """
+    CREATE TRIGGER IF NOT EXISTS categoria_versao_insert AFTER INSERT ON categoria BEGIN
+        UPDATE versao_dados SET versao = versao + 1 WHERE nome = 'categoria';
+    END
+"""
+
+CRIAR_TRIGGER_VERSAO_UPDATE = """
+    CREATE TRIGGER IF NOT EXISTS categoria_versao_update AFTER UPDATE ON categoria BEGIN
+        UPDATE versao_dados SET versao = versao + 1 WHERE nome = 'categoria';
+    END
+"""
+
+CRIAR_TRIGGER_VERSAO_DELETE = """
+    CREATE TRIGGER IF NOT EXISTS categoria_versao_delete AFTER DELETE ON categoria BEGIN
+        UPDATE versao_dados SET versao = versao + 1 WHERE nome = 'categoria';
+    END
+"""
+
 # Insere uma nova categoria
 INSERIR = """
     INSERT INTO categoria (nome, descricao)
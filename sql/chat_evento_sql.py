@@ -0,0 +1,46 @@
+# Queries SQL para os eventos de chat compartilhados entre workers
+#
+# Com CHAT_BACKPLANE=sqlite, cada broadcast_para_sala grava uma linha aqui.
+# Cada worker guarda o último id que já entregou e consulta periodicamente
+# os eventos posteriores (busca por faixa na chave primária), entregando-os
+# aos usuários conectados nele. Eventos antigos são removidos pela retenção.
+
+# Cria a tabela chat_evento se ela não existir
+CRIAR_TABELA = """
+    CREATE TABLE IF NOT EXISTS chat_evento (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sala_id TEXT NOT NULL,
+        origem TEXT NOT NULL,
+        dados TEXT NOT NULL,
+        criado_em REAL NOT NULL
+    )
+"""
+
+# Índice para a remoção por idade
+CRIAR_INDICE_CRIADO_EM = """
+    CREATE INDEX IF NOT EXISTS idx_chat_evento_criado_em ON chat_evento(criado_em)
+"""
+
+# Publica um evento
+INSERIR = """
+    INSERT INTO chat_evento (sala_id, origem, dados, criado_em) VALUES (?, ?, ?, ?)
+"""
+
+# Eventos posteriores ao último entregue, em ordem de publicação
+LISTAR_POSTERIORES = """
+    SELECT id, sala_id, origem, dados
+    FROM chat_evento
+    WHERE id > ?
+    ORDER BY id
+    LIMIT ?
+"""
+
+# Maior id publicado (ponto de partida de um worker que acabou de iniciar)
+OBTER_ULTIMO_ID = """
+    SELECT COALESCE(MAX(id), 0) AS ultimo_id FROM chat_evento
+"""
+
+# Remove eventos publicados antes do instante indicado
+EXCLUIR_ANTERIORES = """
+    DELETE FROM chat_evento WHERE criado_em < ?
+"""
@@ -16,29 +16,122 @@ CREATE TABLE IF NOT EXISTS chat_mensagem (
 )
 """
 
+# Arquivo das mensagens antigas (política de retenção, ver
+# util/chat_manutencao.py). Mesmas colunas e ids da chat_mensagem: o
+# histórico lê as duas tabelas como se fossem uma
+CRIAR_TABELA_ARQUIVO = """
+CREATE TABLE IF NOT EXISTS chat_mensagem_arquivo (
+    id INTEGER PRIMARY KEY,
+    sala_id TEXT NOT NULL,
+    usuario_id INTEGER NOT NULL,
+    mensagem TEXT NOT NULL,
+    data_envio TIMESTAMP NOT NULL,
+    lida_em TIMESTAMP,
+    arquivada_em TIMESTAMP NOT NULL,
+    FOREIGN KEY (sala_id) REFERENCES chat_sala(id) ON DELETE CASCADE,
+    FOREIGN KEY (usuario_id) REFERENCES usuario(id) ON DELETE CASCADE
+)
+"""
+
 INSERIR = """
 INSERT INTO chat_mensagem (sala_id, usuario_id, mensagem, data_envio, lida_em)
 VALUES (?, ?, ?, ?, ?)
 """
 
+# Verificação de envio (na mesma transação da inserção): participação do
+# remetente e existência da sala
+VERIFICAR_ENVIO = """
+SELECT
+    EXISTS(SELECT 1 FROM chat_participante WHERE sala_id = ? AND usuario_id = ?) AS participante,
+    EXISTS(SELECT 1 FROM chat_sala WHERE id = ?) AS sala
+"""
+
 OBTER_POR_ID = """
-SELECT id, sala_id, usuario_id, mensagem, data_envio[timestamp], lida_em[timestamp]
+SELECT id, sala_id, usuario_id, mensagem, data_envio, lida_em
 FROM chat_mensagem
 WHERE id = ?
+UNION ALL
+SELECT id, sala_id, usuario_id, mensagem, data_envio, lida_em
+FROM chat_mensagem_arquivo
+WHERE id = ?
 """
 
-LISTAR_POR_SALA = """
-SELECT id, sala_id, usuario_id, mensagem, data_envio[timestamp], lida_em[timestamp]
-FROM chat_mensagem
-WHERE sala_id = ?
+# Histórico paginado por cursor (id), sempre pelos índices (sala_id, id) da
+# chat_mensagem e do arquivo: cada página lê só as linhas que devolve, em
+# qualquer ponto do histórico, ao contrário de OFFSET, que percorre as
+# linhas puladas. Cada tabela contribui com até LIMIT linhas e a página é
+# montada pela junção das duas, de modo que a rolagem continua no arquivo
+# sem o cliente perceber.
+# Parâmetros: os da consulta na chat_mensagem, os mesmos no arquivo e o LIMIT final
+
+_COLUNAS_HISTORICO = "id, sala_id, usuario_id, mensagem, data_envio, lida_em"
+
+# Mensagens mais recentes da sala (ordem decrescente; o repositório inverte)
+LISTAR_RECENTES_POR_SALA = f"""
+SELECT * FROM (
+    SELECT {_COLUNAS_HISTORICO} FROM chat_mensagem
+    WHERE sala_id = ? ORDER BY id DESC LIMIT ?
+)
+UNION ALL
+SELECT * FROM (
+    SELECT {_COLUNAS_HISTORICO} FROM chat_mensagem_arquivo
+    WHERE sala_id = ? ORDER BY id DESC LIMIT ?
+)
+ORDER BY id DESC
+LIMIT ?
+"""
+
+# Mensagens anteriores a um id (rolagem para o passado; ordem decrescente)
+LISTAR_ANTERIORES_POR_SALA = f"""
+SELECT * FROM (
+    SELECT {_COLUNAS_HISTORICO} FROM chat_mensagem
+    WHERE sala_id = ? AND id < ? ORDER BY id DESC LIMIT ?
+)
+UNION ALL
+SELECT * FROM (
+    SELECT {_COLUNAS_HISTORICO} FROM chat_mensagem_arquivo
+    WHERE sala_id = ? AND id < ? ORDER BY id DESC LIMIT ?
+)
+ORDER BY id DESC
+LIMIT ?
+"""
+
+# Mensagens posteriores a um id (atualização; ordem crescente)
+LISTAR_POSTERIORES_POR_SALA = f"""
+SELECT * FROM (
+    SELECT {_COLUNAS_HISTORICO} FROM chat_mensagem
+    WHERE sala_id = ? AND id > ? ORDER BY id ASC LIMIT ?
+)
+UNION ALL
+SELECT * FROM (
+    SELECT {_COLUNAS_HISTORICO} FROM chat_mensagem_arquivo
+    WHERE sala_id = ? AND id > ? ORDER BY id ASC LIMIT ?
+)
 ORDER BY id ASC
-LIMIT ? OFFSET ?
+LIMIT ?
+"""
+
+# Mensagens de todas as salas do usuário posteriores a um id (retomada do SSE).
+# Para cada sala do usuário (idx_chat_participante_usuario), busca por faixa
+# de id em idx_chat_mensagem_sala (sala_id, id)
+LISTAR_POSTERIORES_DO_USUARIO = """
+SELECT m.id, m.sala_id, m.usuario_id, m.mensagem, m.data_envio, m.lida_em
+FROM chat_participante p
+JOIN chat_mensagem m ON m.sala_id = p.sala_id AND m.id > ?
+WHERE p.usuario_id = ?
+ORDER BY m.id ASC
+LIMIT ?
+"""
+
+# Maior id de mensagem (as do arquivo são sempre mais antigas)
+OBTER_ULTIMO_ID = """
+SELECT MAX(id) AS ultimo_id FROM chat_mensagem
 """
 
 CONTAR_POR_SALA = """
-SELECT COUNT(*) as total
-FROM chat_mensagem
-WHERE sala_id = ?
+SELECT
+    (SELECT COUNT(*) FROM chat_mensagem WHERE sala_id = ?)
+    + (SELECT COUNT(*) FROM chat_mensagem_arquivo WHERE sala_id = ?) AS total
 """
 
 MARCAR_COMO_LIDAS = """
@@ -50,7 +143,7 @@ WHERE sala_id = ?
 """
 
 OBTER_ULTIMA_MENSAGEM_SALA = """
-SELECT id, sala_id, usuario_id, mensagem, data_envio[timestamp], lida_em[timestamp]
+SELECT id, sala_id, usuario_id, mensagem, data_envio, lida_em
 FROM chat_mensagem
 WHERE sala_id = ?
 ORDER BY id DESC
@@ -61,3 +154,43 @@ EXCLUIR = """
 DELETE FROM chat_mensagem
 WHERE id = ?
 """
+
+# Retenção: mensagens elegíveis para o arquivo. Só mensagens já lidas (o
+# contador de não lidas e a recontagem continuam exatos) e nunca a última
+# mensagem da sala (resumo da lista de conversas). A varredura segue a
+# ordem do id, em que as mensagens antigas vêm primeiro.
+# Parâmetros: data de corte e tamanho do lote
+_CONDICAO_ARQUIVAMENTO = """
+    m.data_envio < ?
+    AND m.lida_em IS NOT NULL
+    AND m.id < (SELECT MAX(id) FROM chat_mensagem WHERE sala_id = m.sala_id)
+"""
+
+# Faixa de ids do próximo lote a arquivar
+OBTER_FAIXA_LOTE_ARQUIVAMENTO = f"""
+SELECT MIN(id) AS inicio, MAX(id) AS fim FROM (
+    SELECT m.id FROM chat_mensagem m
+    WHERE {_CONDICAO_ARQUIVAMENTO}
+    ORDER BY m.id
+    LIMIT ?
+)
+"""
+
+# Copia o lote para o arquivo. Parâmetros: arquivada_em, faixa de ids, data de corte
+COPIAR_PARA_ARQUIVO = f"""
+INSERT INTO chat_mensagem_arquivo
+    (id, sala_id, usuario_id, mensagem, data_envio, lida_em, arquivada_em)
+SELECT m.id, m.sala_id, m.usuario_id, m.mensagem, m.data_envio, m.lida_em, ?
+FROM chat_mensagem m
+WHERE m.id BETWEEN ? AND ? AND {_CONDICAO_ARQUIVAMENTO}
+"""
+
+# Remove da tabela principal o que já está no arquivo. Parâmetros: faixa de ids
+EXCLUIR_ARQUIVADAS = """
+DELETE FROM chat_mensagem
+WHERE id IN (SELECT id FROM chat_mensagem_arquivo WHERE id BETWEEN ? AND ?)
+"""
+
+CONTAR_ARQUIVADAS = """
+SELECT COUNT(*) AS total FROM chat_mensagem_arquivo
+"""
@@ -8,31 +8,37 @@ CREATE TABLE IF NOT EXISTS chat_participante (
     sala_id TEXT NOT NULL,
     usuario_id INTEGER NOT NULL,
     ultima_leitura TIMESTAMP,
+    nao_lidas INTEGER NOT NULL DEFAULT 0,
     PRIMARY KEY (sala_id, usuario_id),
     FOREIGN KEY (sala_id) REFERENCES chat_sala(id) ON DELETE CASCADE,
     FOREIGN KEY (usuario_id) REFERENCES usuario(id) ON DELETE CASCADE
 )
 """
 
+# Migração de bancos criados antes do contador de não lidas
+ADICIONAR_COLUNA_NAO_LIDAS = """
+ALTER TABLE chat_participante ADD COLUMN nao_lidas INTEGER NOT NULL DEFAULT 0
+"""
+
 INSERIR = """
 INSERT INTO chat_participante (sala_id, usuario_id, ultima_leitura)
 VALUES (?, ?, ?)
 """
 
 OBTER_POR_SALA_E_USUARIO = """
-SELECT sala_id, usuario_id, ultima_leitura[timestamp]
+SELECT sala_id, usuario_id, ultima_leitura[timestamp], nao_lidas
 FROM chat_participante
 WHERE sala_id = ? AND usuario_id = ?
 """
 
 LISTAR_POR_SALA = """
-SELECT sala_id, usuario_id, ultima_leitura[timestamp]
+SELECT sala_id, usuario_id, ultima_leitura[timestamp], nao_lidas
 FROM chat_participante
 WHERE sala_id = ?
 """
 
 LISTAR_POR_USUARIO = """
-SELECT sala_id, usuario_id, ultima_leitura[timestamp]
+SELECT sala_id, usuario_id, ultima_leitura[timestamp], nao_lidas
 FROM chat_participante
 WHERE usuario_id = ?
 """
@@ -43,20 +49,88 @@ SET ultima_leitura = ?
 WHERE sala_id = ? AND usuario_id = ?
 """
 
+# Contador desnormalizado: incrementado a cada mensagem recebida e zerado
+# quando o usuário marca a sala como lida (ver chat_mensagem_repo)
 CONTAR_MENSAGENS_NAO_LIDAS = """
-SELECT COUNT(*) as total
-FROM chat_mensagem m
-WHERE m.sala_id = ?
-  AND m.usuario_id != ?
-  AND (
-    (SELECT cp.ultima_leitura
-     FROM chat_participante cp
-     WHERE cp.sala_id = m.sala_id AND cp.usuario_id = ?) IS NULL
-    OR
-    (SELECT cp.ultima_leitura
-     FROM chat_participante cp
-     WHERE cp.sala_id = m.sala_id AND cp.usuario_id = ?) < m.data_envio
-  )
+SELECT nao_lidas AS total
+FROM chat_participante
+WHERE sala_id = ? AND usuario_id = ?
+"""
+
+SOMAR_NAO_LIDAS_POR_USUARIO = """
+SELECT COALESCE(SUM(nao_lidas), 0) AS total
+FROM chat_participante
+WHERE usuario_id = ? AND nao_lidas > 0
+"""
+
+INCREMENTAR_NAO_LIDAS = """
+UPDATE chat_participante
+SET nao_lidas = nao_lidas + 1
+WHERE sala_id = ? AND usuario_id != ?
+"""
+
+ZERAR_NAO_LIDAS = """
+UPDATE chat_participante
+SET nao_lidas = 0
+WHERE sala_id = ? AND usuario_id = ? AND nao_lidas != 0
+"""
+
+# Recalcula o contador a partir das mensagens (corrige divergências).
+# Atualiza somente as linhas cujo contador está errado.
+RECONTAR_NAO_LIDAS = """
+UPDATE chat_participante
+SET nao_lidas = (
+    SELECT COUNT(*)
+    FROM chat_mensagem m
+    WHERE m.sala_id = chat_participante.sala_id
+      AND m.usuario_id != chat_participante.usuario_id
+      AND (chat_participante.ultima_leitura IS NULL
+           OR chat_participante.ultima_leitura < m.data_envio)
+)
+WHERE nao_lidas != (
+    SELECT COUNT(*)
+    FROM chat_mensagem m
+    WHERE m.sala_id = chat_participante.sala_id
+      AND m.usuario_id != chat_participante.usuario_id
+      AND (chat_participante.ultima_leitura IS NULL
+           OR chat_participante.ultima_leitura < m.data_envio)
+)
+"""
+
+# Resumo das conversas do usuário em uma única consulta (sem N+1).
+# A CTE "pagina" ordena e pagina apenas as salas do usuário (usando
+# idx_chat_participante_usuario); a última mensagem é buscada só para as
+# salas da página (idx_chat_mensagem_sala) e as não lidas vêm do contador
+# desnormalizado do participante.
+# Parâmetros: usuario_id, limit, offset
+LISTAR_CONVERSAS = """
+WITH pagina AS (
+    SELECT eu.sala_id, eu.nao_lidas,
+           s.ultima_atividade, outro.usuario_id AS outro_usuario_id
+    FROM chat_participante eu
+    JOIN chat_sala s ON s.id = eu.sala_id
+    JOIN chat_participante outro
+      ON outro.sala_id = eu.sala_id AND outro.usuario_id != eu.usuario_id
+    JOIN usuario u ON u.id = outro.usuario_id
+    WHERE eu.usuario_id = ?
+    ORDER BY s.ultima_atividade DESC, eu.sala_id DESC
+    LIMIT ? OFFSET ?
+)
+SELECT
+    p.sala_id,
+    p.ultima_atividade,
+    u.id AS outro_usuario_id,
+    u.nome AS outro_usuario_nome,
+    u.email AS outro_usuario_email,
+    m.mensagem AS ultima_mensagem,
+    m.data_envio AS ultima_mensagem_data_envio,
+    m.usuario_id AS ultima_mensagem_usuario_id,
+    p.nao_lidas
+FROM pagina p
+JOIN usuario u ON u.id = p.outro_usuario_id
+LEFT JOIN chat_mensagem m
+  ON m.id = (SELECT MAX(id) FROM chat_mensagem WHERE sala_id = p.sala_id)
+ORDER BY p.ultima_atividade DESC, p.sala_id DESC
 """
 
 EXCLUIR = """
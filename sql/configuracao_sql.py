@@ -7,6 +7,26 @@ CREATE TABLE IF NOT EXISTS configuracao (
 )
 """
 
+# Triggers que incrementam a versão das configurações em versao_dados
+# (avisam o ConfigCache de todos os workers que houve alteração)
+CRIAR_TRIGGER_VERSAO_INSERT = """
+CREATE TRIGGER IF NOT EXISTS configuracao_versao_insert AFTER INSERT ON configuracao BEGIN
+    UPDATE versao_dados SET versao = versao + 1 WHERE nome = 'configuracao';
+END
+"""
+
+CRIAR_TRIGGER_VERSAO_UPDATE = """
+CREATE TRIGGER IF NOT EXISTS configuracao_versao_update AFTER UPDATE ON configuracao BEGIN
+    UPDATE versao_dados SET versao = versao + 1 WHERE nome = 'configuracao';
+END
+"""
+
+CRIAR_TRIGGER_VERSAO_DELETE = """
+CREATE TRIGGER IF NOT EXISTS configuracao_versao_delete AFTER DELETE ON configuracao BEGIN
+    UPDATE versao_dados SET versao = versao + 1 WHERE nome = 'configuracao';
+END
+"""
+
 INSERIR = "INSERT INTO configuracao (chave, valor, descricao) VALUES (?, ?, ?)"
 
 OBTER_POR_CHAVE = "SELECT * FROM configuracao WHERE chave = ?"
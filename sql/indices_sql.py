@@ -10,8 +10,106 @@ ON usuario(token_redefinicao)
 WHERE token_redefinicao IS NOT NULL
 """
 
+# Índices do chat
+# Salas de um usuário (a PK (sala_id, usuario_id) não atende busca por usuario_id)
+CRIAR_INDICE_CHAT_PARTICIPANTE_USUARIO = """
+CREATE INDEX IF NOT EXISTS idx_chat_participante_usuario
+ON chat_participante(usuario_id, sala_id)
+"""
+
+# Total de não lidas do usuário (parcial e cobrindo: só salas com pendências)
+CRIAR_INDICE_CHAT_PARTICIPANTE_NAO_LIDAS = """
+CREATE INDEX IF NOT EXISTS idx_chat_participante_nao_lidas
+ON chat_participante(usuario_id, nao_lidas)
+WHERE nao_lidas > 0
+"""
+
+# Última mensagem / mensagens de uma sala em ordem de id
+CRIAR_INDICE_CHAT_MENSAGEM_SALA = """
+CREATE INDEX IF NOT EXISTS idx_chat_mensagem_sala
+ON chat_mensagem(sala_id, id)
+"""
+
+# Histórico arquivado de uma sala (rolagem para o passado além da retenção)
+CRIAR_INDICE_CHAT_MENSAGEM_ARQUIVO_SALA = """
+CREATE INDEX IF NOT EXISTS idx_chat_mensagem_arquivo_sala
+ON chat_mensagem_arquivo(sala_id, id)
+"""
+
+# Índices da tabela artigo
+# Listagens públicas: WHERE status = 'Publicado' ORDER BY data_publicacao DESC
+CRIAR_INDICE_ARTIGO_STATUS_PUBLICACAO = """
+CREATE INDEX IF NOT EXISTS idx_artigo_status_publicacao
+ON artigo(status, data_publicacao)
+"""
+
+# Artigos publicados de uma categoria (também atende a FK categoria_id)
+CRIAR_INDICE_ARTIGO_CATEGORIA = """
+CREATE INDEX IF NOT EXISTS idx_artigo_categoria
+ON artigo(categoria_id, status, data_publicacao)
+"""
+
+# Listagem pública "Mais lidos" (paginação por qtde_visualizacoes, id)
+CRIAR_INDICE_ARTIGO_STATUS_VISUALIZACOES = """
+CREATE INDEX IF NOT EXISTS idx_artigo_status_visualizacoes
+ON artigo(status, qtde_visualizacoes)
+"""
+
+# "Mais lidos" dentro de uma categoria
+CRIAR_INDICE_ARTIGO_CATEGORIA_VISUALIZACOES = """
+CREATE INDEX IF NOT EXISTS idx_artigo_categoria_visualizacoes
+ON artigo(categoria_id, status, qtde_visualizacoes)
+"""
+
+# "Meus artigos": WHERE usuario_id = ? ORDER BY data_cadastro DESC
+CRIAR_INDICE_ARTIGO_USUARIO = """
+CREATE INDEX IF NOT EXISTS idx_artigo_usuario
+ON artigo(usuario_id, data_cadastro)
+"""
+
+# Índices da tabela chamado
+# Chamados do usuário e contagem de abertos por usuário (cobrindo)
+CRIAR_INDICE_CHAMADO_USUARIO_STATUS = """
+CREATE INDEX IF NOT EXISTS idx_chamado_usuario_status
+ON chamado(usuario_id, status)
+"""
+
+# Badge de pendências do admin (parcial: só chamados em aberto)
+CRIAR_INDICE_CHAMADO_PENDENTES = """
+CREATE INDEX IF NOT EXISTS idx_chamado_pendentes
+ON chamado(status)
+WHERE status IN ('Aberto', 'Em Análise')
+"""
+
+# Índices da tabela chamado_interacao
+# Histórico do chamado em ordem cronológica
+CRIAR_INDICE_CHAMADO_INTERACAO_CHAMADO = """
+CREATE INDEX IF NOT EXISTS idx_chamado_interacao_chamado
+ON chamado_interacao(chamado_id, data_interacao)
+"""
+
+# Contagem de não lidas por chamado (parcial e cobrindo: só interações não lidas)
+CRIAR_INDICE_CHAMADO_INTERACAO_NAO_LIDAS = """
+CREATE INDEX IF NOT EXISTS idx_chamado_interacao_nao_lidas
+ON chamado_interacao(chamado_id, usuario_id)
+WHERE data_leitura IS NULL
+"""
+
 # Lista de todos os índices para criação
 TODOS_INDICES = [
     CRIAR_INDICE_USUARIO_PERFIL,
     CRIAR_INDICE_USUARIO_TOKEN,
+    CRIAR_INDICE_CHAT_PARTICIPANTE_USUARIO,
+    CRIAR_INDICE_CHAT_PARTICIPANTE_NAO_LIDAS,
+    CRIAR_INDICE_CHAT_MENSAGEM_SALA,
+    CRIAR_INDICE_CHAT_MENSAGEM_ARQUIVO_SALA,
+    CRIAR_INDICE_ARTIGO_STATUS_PUBLICACAO,
+    CRIAR_INDICE_ARTIGO_CATEGORIA,
+    CRIAR_INDICE_ARTIGO_STATUS_VISUALIZACOES,
+    CRIAR_INDICE_ARTIGO_CATEGORIA_VISUALIZACOES,
+    CRIAR_INDICE_ARTIGO_USUARIO,
+    CRIAR_INDICE_CHAMADO_USUARIO_STATUS,
+    CRIAR_INDICE_CHAMADO_PENDENTES,
+    CRIAR_INDICE_CHAMADO_INTERACAO_CHAMADO,
+    CRIAR_INDICE_CHAMADO_INTERACAO_NAO_LIDAS,
 ]
@@ -0,0 +1,81 @@
+# Queries SQL para o estado compartilhado dos rate limiters
+#
+# Cada linha guarda, por limiter e identificador (geralmente IP), os
+# contadores da janela fixa atual e da anterior (ver util/rate_limiter.py).
+# Todos os workers usam a mesma tabela, então o limite vale para a
+# aplicação inteira e sobrevive a reinícios.
+#
+# "inicio" é o instante de início da janela fixa (segundos desde a época).
+# Por ser um instante, e não o número da janela, os contadores continuam
+# válidos quando o tamanho da janela (:janela, em segundos) é alterado.
+# Uma requisição com início menor que o gravado (relógio de outro worker
+# ligeiramente atrasado ou janela aumentada) é tratada como da janela
+# gravada.
+
+# Cria a tabela rate_limit se ela não existir
+CRIAR_TABELA = """
+    CREATE TABLE IF NOT EXISTS rate_limit (
+        limiter TEXT NOT NULL,
+        identificador TEXT NOT NULL,
+        inicio INTEGER NOT NULL,
+        atual INTEGER NOT NULL DEFAULT 0,
+        anterior INTEGER NOT NULL DEFAULT 0,
+        permitido INTEGER NOT NULL DEFAULT 1,
+        PRIMARY KEY (limiter, identificador)
+    ) WITHOUT ROWID
+"""
+
+# Contadores gravados avançados até a janela iniciada em :inicio
+_ATUAL = "CASE WHEN inicio >= :inicio THEN atual ELSE 0 END"
+_ANTERIOR = (
+    "CASE WHEN inicio >= :inicio THEN anterior"
+    " WHEN inicio >= :inicio - :janela THEN atual ELSE 0 END"
+)
+_ABAIXO_DO_LIMITE = f"({_ANTERIOR}) * :peso + ({_ATUAL}) < :max_tentativas"
+
+# Verifica e registra uma tentativa em um único comando (atômico):
+# incrementa apenas se a estimativa da janela deslizante estiver abaixo
+# do máximo e devolve se a tentativa foi permitida
+REGISTRAR_TENTATIVA = f"""
+    INSERT INTO rate_limit (limiter, identificador, inicio, atual, anterior, permitido)
+    VALUES (:limiter, :identificador, :inicio, 1, 0, 1)
+    ON CONFLICT (limiter, identificador) DO UPDATE SET
+        anterior = {_ANTERIOR},
+        atual = {_ATUAL} + CASE WHEN {_ABAIXO_DO_LIMITE} THEN 1 ELSE 0 END,
+        permitido = CASE WHEN {_ABAIXO_DO_LIMITE} THEN 1 ELSE 0 END,
+        inicio = MAX(inicio, :inicio)
+    RETURNING permitido, atual, anterior
+"""
+
+# Contadores de um identificador na janela iniciada em :inicio (sem alterar a linha)
+OBTER_CONTADORES = f"""
+    SELECT {_ATUAL} AS atual, {_ANTERIOR} AS anterior
+    FROM rate_limit
+    WHERE limiter = :limiter AND identificador = :identificador
+"""
+
+# Remove um identificador de um limiter
+EXCLUIR_IDENTIFICADOR = """
+    DELETE FROM rate_limit WHERE limiter = ? AND identificador = ?
+"""
+
+# Remove todos os identificadores de um limiter
+EXCLUIR_LIMITER = """
+    DELETE FROM rate_limit WHERE limiter = ?
+"""
+
+# Remove identificadores sem tentativas na janela atual nem na anterior
+EXCLUIR_EXPIRADOS = """
+    DELETE FROM rate_limit WHERE limiter = ? AND inicio < ?
+"""
+
+# Quantidade de identificadores de um limiter
+OBTER_QUANTIDADE = """
+    SELECT COUNT(*) AS quantidade FROM rate_limit WHERE limiter = ?
+"""
+
+# Tabela da versão anterior (coluna "indice", o número da janela). Os
+# contadores são transitórios, então a tabela é recriada.
+REMOVER_TABELA_ANTIGA = """
+    DROP TABLE rate_limit
+"""
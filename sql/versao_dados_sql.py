@@ -0,0 +1,29 @@
+# Queries SQL para o controle de versão dos dados em cache
+#
+# Cada conjunto de dados cacheado em memória (ex.: categorias) tem uma linha
+# nesta tabela. Triggers na tabela de origem incrementam a versão a cada
+# escrita, e os processos comparam a versão antes de usar o cache. Assim
+# todos os workers enxergam alterações feitas por qualquer um deles.
+
+# Cria a tabela versao_dados se ela não existir
+CRIAR_TABELA = """
+    CREATE TABLE IF NOT EXISTS versao_dados (
+        nome TEXT PRIMARY KEY,
+        versao INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+"""
+
+# Registra um conjunto de dados (mantém a versão se já existir)
+REGISTRAR = """
+    INSERT OR IGNORE INTO versao_dados (nome, versao) VALUES (?, 0)
+"""
+
+# Versão atual de um conjunto de dados
+OBTER_VERSAO = """
+    SELECT versao FROM versao_dados WHERE nome = ?
+"""
+
+# Incrementa a versão manualmente (escritas que não passam por trigger)
+INCREMENTAR = """
+    UPDATE versao_dados SET versao = versao + 1 WHERE nome = ?
+"""
@@ -9,7 +9,7 @@ const chatWidget = (() => {
     let conversaAtual = null;
     let conversasOffset = 0;
     let debounceTimer = null;
-    let mensagensOffset = 0;
+    let mensagemMaisAntigaId = null;
     let carregandoMensagens = false;
     let todasMensagensCarregadas = false;
 
@@ -79,7 +79,11 @@ const chatWidget = (() => {
     function processarMensagemSSE(mensagem) {
         if (mensagem.tipo === 'nova_mensagem') {
             // Se for da conversa atual, adicionar na tela
-            if (conversaAtual && mensagem.sala_id === conversaAtual.sala_id) {
+            // Mensagens reenviadas na reconexão podem já estar na tela
+            const jaExibida = elementos.messagesContainer.querySelector(
+                `[data-mensagem-id="${mensagem.mensagem.id}"]`
+            );
+            if (conversaAtual && mensagem.sala_id === conversaAtual.sala_id && !jaExibida) {
                 renderizarMensagem(mensagem.mensagem, false);
 
                 // Scroll para o final para mostrar nova mensagem
@@ -97,6 +101,16 @@ const chatWidget = (() => {
         } else if (mensagem.tipo === 'atualizar_contador') {
             // Atualizar contador de não lidas
             atualizarContadorNaoLidas();
+        } else if (mensagem.tipo === 'ressincronizar') {
+            // Eventos perdidos (fila cheia no servidor ou reconexão com
+            // mensagens demais para reenviar): recarregar o estado. No caso
+            // da fila cheia o servidor encerra o stream e o EventSource
+            // reconecta sozinho; no reenvio o stream continua aberto.
+            carregarConversas(0);
+            atualizarContadorNaoLidas();
+            if (conversaAtual) {
+                abrirChat(conversaAtual);
+            }
         }
     }
 
@@ -315,7 +329,7 @@ const chatWidget = (() => {
         conversaAtual = conversa;
 
         // Resetar estado de paginação
-        mensagensOffset = 0;
+        mensagemMaisAntigaId = null;
         todasMensagensCarregadas = false;
 
         // Marcar como ativa na lista
@@ -350,8 +364,10 @@ const chatWidget = (() => {
         carregandoMensagens = true;
 
         try {
+            // Página inicial: mensagens mais recentes; depois, as anteriores à mais antiga exibida
             const limit = 24;
-            const response = await fetch(`/chat/mensagens/${salaId}?limit=${limit}&offset=${mensagensOffset}`);
+            const cursor = inicial || mensagemMaisAntigaId === null ? '' : `&before_id=${mensagemMaisAntigaId}`;
+            const response = await fetch(`/chat/mensagens/${salaId}?limit=${limit}${cursor}`);
             const mensagens = await response.json();
 
             // Se retornou menos que o limite, não há mais mensagens
@@ -361,7 +377,6 @@ const chatWidget = (() => {
 
             if (inicial) {
                 elementos.messagesContainer.innerHTML = '';
-                mensagensOffset = 0;
             }
 
             // Salvar posição de scroll antes de adicionar
@@ -387,7 +402,9 @@ const chatWidget = (() => {
                 elementos.messagesContainer.scrollTop = scrollAntes + (alturaDepois - alturaAntes);
             }
 
-            mensagensOffset += mensagens.length;
+            if (mensagens.length > 0) {
+                mensagemMaisAntigaId = mensagens[0].id;
+            }
 
         } catch (error) {
             console.error('[Chat] Erro ao carregar mensagens:', error);
@@ -404,6 +421,7 @@ const chatWidget = (() => {
     function renderizarMensagem(msg, prepend = false) {
         const msgDiv = document.createElement('div');
         msgDiv.className = 'd-flex mb-2';
+        msgDiv.dataset.mensagemId = msg.id;
 
         const isEnviada = msg.usuario_id === parseInt(document.body.dataset.usuarioId || '0');
 
@@ -98,6 +98,36 @@ def limpar_rate_limiter():
         limiter.limpar()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def limpar_cache_paginas():
+    """Descarta páginas em cache (a limpeza do banco não passa pelos repositórios)"""
+    from util.cache_paginas import cache_paginas
+
+    cache_paginas.limpar()
+    yield
+    cache_paginas.limpar()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def limpar_contador_visualizacoes():
+    """Descarta visualizações pendentes (IDs são reaproveitados entre testes)"""
+    from util.contador_visualizacoes import contador_visualizacoes
+
+    contador_visualizacoes.limpar()
+    yield
+    contador_visualizacoes.limpar()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def limpar_config_cache():
+    """Força recarregar as configurações (o banco é limpo entre os testes)"""
+    from util.config_cache import config
+
+    config.limpar()
+    yield
+    config.limpar()
+
+
 @pytest.fixture(scope="function", autouse=True)
 def limpar_banco_dados():
     """Limpa todas as tabelas do banco antes de cada teste para evitar interferência"""
@@ -111,7 +141,8 @@ def limpar_banco_dados():
             # Verificar se tabelas existem antes de limpar
             cursor.execute(
                 "SELECT name FROM sqlite_master WHERE type='table' "
-                "AND name IN ('chamado', 'chamado_interacao', 'usuario', 'configuracao')"
+                "AND name IN ('chamado', 'chamado_interacao', 'artigo', 'categoria', "
+                "'usuario', 'configuracao', 'rate_limit', 'chat_evento')"
             )
             tabelas_existentes = [row[0] for row in cursor.fetchall()]
 
@@ -121,10 +152,19 @@ def limpar_banco_dados():
                 cursor.execute("DELETE FROM chamado_interacao")
             if "chamado" in tabelas_existentes:
                 cursor.execute("DELETE FROM chamado")
+            # Artigos referenciam usuario e categoria (FK sem cascade)
+            if "artigo" in tabelas_existentes:
+                cursor.execute("DELETE FROM artigo")
+            if "categoria" in tabelas_existentes:
+                cursor.execute("DELETE FROM categoria")
             if "usuario" in tabelas_existentes:
                 cursor.execute("DELETE FROM usuario")
             if "configuracao" in tabelas_existentes:
                 cursor.execute("DELETE FROM configuracao")
+            if "rate_limit" in tabelas_existentes:
+                cursor.execute("DELETE FROM rate_limit")
+            if "chat_evento" in tabelas_existentes:
+                cursor.execute("DELETE FROM chat_evento")
 
             # Resetar autoincrement (limpar sqlite_sequence se existir)
             cursor.execute(
@@ -346,3 +346,194 @@ class TestFluxoCompletoBackup:
 
         # Deve ter mais backups
         assert len(backups_2) > len(backups_1)
+
+
+class TestBackupOnline:
+    """Testes do backup online (API de backup do SQLite) em segundo plano"""
+
+    def test_backup_consistente_com_escritas_simultaneas(self, client, monkeypatch):
+        """Escritas durante a cópia não entram no backup nem o corrompem"""
+        import sqlite3
+        import uuid
+        from util import backup_util
+        from util.db_util import obter_conexao
+
+        nome_backup = f"backup_online_{uuid.uuid4().hex}.db"
+
+        with obter_conexao() as conn:
+            conn.execute("CREATE TABLE teste_backup (id INTEGER PRIMARY KEY, texto TEXT)")
+            conn.executemany(
+                "INSERT INTO teste_backup (texto) VALUES (?)", [("x" * 500,) for _ in range(2000)]
+            )
+
+        parciais = []
+
+        def ao_progredir(copiadas: int, total: int) -> None:
+            # Outra conexão grava enquanto a cópia avança
+            with obter_conexao() as conn:
+                conn.execute("INSERT INTO teste_backup (texto) VALUES ('durante')")
+            parciais.append([b.nome_arquivo for b in backup_util.listar_backups()])
+
+        monkeypatch.setattr(backup_util, "BACKUP_PAGINAS_POR_PASSO", 16)
+        sucesso, mensagem = backup_util.criar_backup(
+            nome_arquivo=nome_backup, ao_progredir=ao_progredir
+        )
+
+        assert sucesso, mensagem
+        assert len(parciais) > 1
+        # O arquivo só aparece na listagem depois de completo
+        assert all(nome_backup not in nomes for nomes in parciais)
+
+        copia = sqlite3.connect(backup_util.BACKUP_DIR / nome_backup)
+        try:
+            assert copia.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+            assert copia.execute("SELECT COUNT(*) FROM teste_backup").fetchone()[0] == 2000
+        finally:
+            copia.close()
+            backup_util.excluir_backup(nome_backup)
+        with obter_conexao() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM teste_backup").fetchone()[0]
+            conn.execute("DROP TABLE teste_backup")
+        assert total == 2000 + len(parciais)
+
+    def test_tarefa_em_segundo_plano_reporta_progresso(self, client, monkeypatch):
+        """iniciar_backup devolve a tarefa e ela termina com todas as páginas copiadas"""
+        from util import backup_util
+
+        monkeypatch.setattr(backup_util, "BACKUP_PAGINAS_POR_PASSO", 1)
+        monkeypatch.setattr(backup_util, "BACKUP_PAUSA_MS", 20)
+        tarefa = backup_util.iniciar_backup()
+        # Com um backup em andamento, um novo pedido acompanha o mesmo
+        assert backup_util.iniciar_backup() is tarefa
+
+        backup_util._futuros[tarefa.id].result(timeout=30)
+
+        assert tarefa.status == "concluido"
+        assert tarefa.progresso == 100
+        assert tarefa.paginas_total > 0
+        assert tarefa.paginas_copiadas == tarefa.paginas_total
+        assert backup_util.obter_tarefa_em_andamento() is None
+        assert tarefa.nome_arquivo in [b.nome_arquivo for b in backup_util.listar_backups()]
+
+    def test_criar_nao_aguarda_backups_demorados(self, admin_autenticado, monkeypatch):
+        """Sem tempo para terminar, a rota responde e o status é consultado por JSON"""
+        import time
+        from routes import admin_backups_routes
+        from util import backup_util
+
+        monkeypatch.setattr(admin_backups_routes, "BACKUP_ESPERA_SEGUNDOS", 0)
+        monkeypatch.setattr(backup_util, "BACKUP_PAGINAS_POR_PASSO", 1)
+        monkeypatch.setattr(backup_util, "BACKUP_PAUSA_MS", 20)
+
+        response = admin_autenticado.post("/admin/backups/criar", follow_redirects=False)
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+
+        tarefa = backup_util.obter_tarefa_em_andamento()
+        assert tarefa is not None
+        response = admin_autenticado.get("/admin/backups/listar")
+        assert "tarefa-backup" in response.text
+
+        for _ in range(300):
+            dados = admin_autenticado.get(f"/admin/backups/tarefas/{tarefa.id}").json()
+            if dados["finalizada"]:
+                break
+            time.sleep(0.05)
+
+        assert dados["status"] == "concluido", dados["mensagem"]
+        assert dados["progresso"] == 100
+        assert dados["nome_arquivo"] in [b.nome_arquivo for b in backup_util.listar_backups()]
+
+    def test_status_de_tarefa_inexistente(self, admin_autenticado):
+        """ID desconhecido retorna 404"""
+        response = admin_autenticado.get("/admin/backups/tarefas/inexistente")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_status_requer_admin(self, cliente_autenticado):
+        """Não admin não consulta o status dos backups"""
+        response = cliente_autenticado.get(
+            "/admin/backups/tarefas/qualquer", follow_redirects=False
+        )
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+
+
+class TestRestauracaoOnline:
+    """Testes da restauração pela API de backup, com o banco em uso"""
+
+    def test_restaurar_com_conexoes_abertas(self, client):
+        """Conexões abertas passam a ver o banco restaurado, ainda em WAL e íntegro"""
+        from util import backup_util
+        from util.db_util import obter_conexao
+
+        with obter_conexao() as conn:
+            conn.execute("CREATE TABLE teste_restauracao (id INTEGER PRIMARY KEY)")
+            conn.execute("INSERT INTO teste_restauracao DEFAULT VALUES")
+        sucesso, _ = backup_util.criar_backup(nome_arquivo="backup_teste_restauracao.db")
+        assert sucesso
+        with obter_conexao() as conn:
+            conn.execute("INSERT INTO teste_restauracao DEFAULT VALUES")
+
+        try:
+            # Conexão do pool aberta durante toda a restauração
+            with obter_conexao() as conn:
+                sucesso, mensagem, _ = backup_util.restaurar_backup(
+                    "backup_teste_restauracao.db", criar_backup_antes=False
+                )
+                assert sucesso, mensagem
+                assert conn.execute("SELECT COUNT(*) FROM teste_restauracao").fetchone()[0] == 1
+                assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+                assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+                conn.execute("DROP TABLE teste_restauracao")
+        finally:
+            backup_util.excluir_backup("backup_teste_restauracao.db")
+
+    def test_nao_restaura_durante_backup(self, client, criar_backup, monkeypatch):
+        """Com um backup em andamento, a restauração não é iniciada"""
+        from util import backup_util
+
+        sucesso, _ = criar_backup()
+        assert sucesso
+        nome = backup_util.listar_backups()[0].nome_arquivo
+
+        monkeypatch.setattr(backup_util, "BACKUP_PAGINAS_POR_PASSO", 1)
+        monkeypatch.setattr(backup_util, "BACKUP_PAUSA_MS", 20)
+        tarefa = backup_util.iniciar_backup()
+        try:
+            restauracao, mensagem = backup_util.iniciar_restauracao(nome)
+            assert restauracao is None
+            assert "backup em andamento" in mensagem
+            assert backup_util.obter_tarefa_em_andamento() is tarefa
+        finally:
+            backup_util._futuros[tarefa.id].result(timeout=30)
+
+    def test_restauracao_em_segundo_plano(self, admin_autenticado, criar_backup, monkeypatch):
+        """A rota não espera a restauração; o progresso é consultado por JSON"""
+        import time
+        from routes import admin_backups_routes
+        from util import backup_util
+
+        sucesso, _ = criar_backup()
+        assert sucesso
+        nome = backup_util.listar_backups()[0].nome_arquivo
+
+        monkeypatch.setattr(admin_backups_routes, "BACKUP_ESPERA_SEGUNDOS", 0)
+        monkeypatch.setattr(backup_util, "BACKUP_PAGINAS_POR_PASSO", 1)
+        monkeypatch.setattr(backup_util, "BACKUP_PAUSA_MS", 20)
+
+        response = admin_autenticado.post(f"/admin/backups/restaurar/{nome}", follow_redirects=False)
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+
+        tarefa = backup_util.obter_tarefa_em_andamento()
+        assert tarefa is not None and tarefa.operacao == "restauracao"
+        # Enquanto restaura, um novo backup não é iniciado
+        assert backup_util.iniciar_backup() is tarefa
+        assert "Restauração" in admin_autenticado.get("/admin/backups/listar").text
+
+        for _ in range(600):
+            dados = admin_autenticado.get(f"/admin/backups/tarefas/{tarefa.id}").json()
+            if dados["finalizada"]:
+                break
+            time.sleep(0.05)
+
+        assert dados["status"] == "concluido", dados["mensagem"]
+        assert dados["progresso"] == 100
+        assert dados["backup_seguranca"] in [b.nome_arquivo for b in backup_util.listar_backups()]
@@ -0,0 +1,540 @@
+"""
+Testes dos artigos
+
+Cobre:
+- Busca textual (FTS5): acentos, relevância, sincronização por triggers
+- Destaque seguro dos trechos encontrados
+- Paginação da busca em /artigos?q=
+"""
+import time
+
+import pytest
+from fastapi import status
+
+
+@pytest.fixture
+def autor_e_categoria(client):
+    """
+    Cria um autor e uma categoria diretamente nos repositórios.
+
+    Returns:
+        Tupla (usuario_id, categoria_id)
+    """
+    from model.categoria_model import Categoria
+    from model.usuario_model import Usuario
+    from repo import categoria_repo, usuario_repo
+    from util.perfis import Perfil
+
+    usuario_id = usuario_repo.inserir(Usuario(
+        id=0,
+        nome="Autor Teste",
+        email="autor@example.com",
+        senha="hash",
+        perfil=Perfil.AUTOR.value,
+    ))
+    categoria = categoria_repo.inserir(Categoria(nome="Tecnologia"))
+    return usuario_id, categoria.id
+
+
+@pytest.fixture
+def publicar_artigo(autor_e_categoria):
+    """Retorna uma função que cria e publica um artigo"""
+    from model.artigo_model import Artigo, StatusArtigo
+    from repo import artigo_repo
+
+    usuario_id, categoria_id = autor_e_categoria
+
+    def _publicar(titulo: str, conteudo: str, resumo: str = "") -> int:
+        artigo_id = artigo_repo.inserir(Artigo(
+            id=0,
+            titulo=titulo,
+            resumo=resumo,
+            conteudo=conteudo,
+            status=StatusArtigo.RASCUNHO.value,
+            usuario_id=usuario_id,
+            categoria_id=categoria_id,
+        ))
+        artigo_repo.alterar_status(artigo_id, StatusArtigo.PUBLICADO.value)
+        return artigo_id
+
+    return _publicar
+
+
+class TestBuscaTextual:
+    """Testes de artigo_repo.buscar"""
+
+    def test_busca_ignora_acentos(self, publicar_artigo):
+        """'programacao' deve encontrar 'Programação'"""
+        from repo import artigo_repo
+
+        artigo_id = publicar_artigo("Programação funcional", "Texto qualquer")
+
+        artigos, total = artigo_repo.buscar("programacao")
+
+        assert total == 1
+        assert artigos[0].id == artigo_id
+
+    def test_busca_no_conteudo_e_resumo(self, publicar_artigo):
+        """A busca não deve se limitar ao título"""
+        from repo import artigo_repo
+
+        publicar_artigo("Artigo A", "Fala sobre bancos de dados relacionais")
+        publicar_artigo("Artigo B", "Outro assunto", resumo="Resumo sobre relacionais")
+
+        _, total = artigo_repo.buscar("relacionais")
+
+        assert total == 2
+
+    def test_titulo_tem_mais_relevancia(self, publicar_artigo):
+        """Termo no título deve ranquear acima de termo só no conteúdo"""
+        from repo import artigo_repo
+
+        no_conteudo = publicar_artigo("Introdução", "Um parágrafo que cita SQLite de passagem")
+        no_titulo = publicar_artigo("Guia de SQLite", "Conteúdo do guia")
+
+        artigos, _ = artigo_repo.buscar("sqlite")
+
+        assert [a.id for a in artigos] == [no_titulo, no_conteudo]
+
+    def test_indice_acompanha_alteracao_e_exclusao(self, publicar_artigo):
+        """Triggers devem manter o índice sincronizado"""
+        from repo import artigo_repo
+
+        artigo_id = publicar_artigo("Título original", "Conteúdo original")
+        artigo = artigo_repo.obter_por_id(artigo_id)
+        artigo.titulo = "Título revisado"
+        artigo_repo.alterar(artigo)
+
+        assert artigo_repo.buscar("original")[1] == 1  # ainda no conteúdo
+        assert artigo_repo.buscar("revisado")[1] == 1
+
+        artigo_repo.excluir(artigo_id)
+        assert artigo_repo.buscar("revisado")[1] == 0
+
+    def test_ignora_rascunhos(self, autor_e_categoria):
+        """Somente artigos publicados aparecem na busca"""
+        from model.artigo_model import Artigo, StatusArtigo
+        from repo import artigo_repo
+
+        usuario_id, categoria_id = autor_e_categoria
+        artigo_repo.inserir(Artigo(
+            id=0, titulo="Rascunho secreto", conteudo="...",
+            status=StatusArtigo.RASCUNHO.value,
+            usuario_id=usuario_id, categoria_id=categoria_id,
+        ))
+
+        assert artigo_repo.buscar("secreto") == ([], 0)
+
+    def test_sintaxe_fts_do_usuario_nao_quebra(self, publicar_artigo):
+        """Aspas e operadores digitados não devem gerar erro"""
+        from repo import artigo_repo
+
+        publicar_artigo("Python e SQL", "Conteúdo")
+
+        assert artigo_repo.buscar('"python" (sql*')[1] == 1
+        assert artigo_repo.buscar('python NEAR(') == ([], 0)
+        assert artigo_repo.buscar('"" * ()') == ([], 0)
+
+    def test_trecho_destacado_e_escapado(self, publicar_artigo):
+        """O trecho deve destacar o termo sem permitir HTML do conteúdo"""
+        from repo import artigo_repo
+        from util.template_util import destacar_busca
+
+        publicar_artigo("Artigo", "Antes <script>alert(1)</script> do termo procurado")
+
+        artigos, _ = artigo_repo.buscar("procurado")
+        html = str(destacar_busca(artigos[0].trecho_destacado))
+
+        assert "<mark>procurado</mark>" in html
+        assert "<script>" not in html
+        assert "&lt;script&gt;" in html
+
+
+class TestRotaBusca:
+    """Testes de /artigos?q="""
+
+    def test_busca_paginada(self, client, publicar_artigo):
+        """Busca deve paginar os resultados"""
+        from routes.artigos_routes import ARTIGOS_POR_PAGINA
+
+        for i in range(ARTIGOS_POR_PAGINA + 2):
+            publicar_artigo(f"Receita {i}", "Conteúdo sobre culinária")
+
+        pagina1 = client.get("/artigos", params={"q": "culinaria"})
+        pagina2 = client.get("/artigos", params={"q": "culinaria", "pagina": 2})
+
+        assert pagina1.status_code == status.HTTP_200_OK
+        assert f"{ARTIGOS_POR_PAGINA + 2} artigo(s) encontrado(s)" in pagina1.text
+        assert "Página 1 de 2" in pagina1.text
+        assert pagina1.text.count("<mark>") == ARTIGOS_POR_PAGINA
+        assert pagina2.text.count("<mark>") == 2
+
+
+class TestPaginacaoCursor:
+    """Testes da paginação keyset das listagens de artigos"""
+
+    def _percorrer(self, **filtros) -> list[int]:
+        """Percorre todas as páginas pelo cursor_proximo e retorna os IDs"""
+        from repo import artigo_repo
+
+        ids, apos = [], None
+        while True:
+            pagina = artigo_repo.obter_publicados_pagina(limite=3, apos=apos, **filtros)
+            ids.extend(a.id for a in pagina.itens)
+            if not pagina.cursor_proximo:
+                return ids
+            apos = pagina.cursor_proximo
+
+    def test_percorre_todas_as_paginas_sem_repetir(self, publicar_artigo):
+        """Mesma data de publicação: desempate por id, sem perder nem repetir"""
+        ids = [publicar_artigo(f"Artigo {i}", "Conteúdo") for i in range(8)]
+
+        assert self._percorrer() == sorted(ids, reverse=True)
+        assert self._percorrer(ordem="antigos") == sorted(ids)
+
+    def test_ordem_por_visualizacoes_no_banco(self, publicar_artigo):
+        """'Mais lidos' deve vir ordenado pelo banco, com desempate por id"""
+        from repo import artigo_repo
+
+        ids = [publicar_artigo(f"Artigo {i}", "Conteúdo") for i in range(5)]
+        for _ in range(3):
+            artigo_repo.incrementar_visualizacoes(ids[1])
+        artigo_repo.incrementar_visualizacoes(ids[3])
+
+        esperado = [ids[1], ids[3], ids[4], ids[2], ids[0]]
+        assert self._percorrer(ordem="visualizacoes") == esperado
+
+    def test_voltar_pagina(self, publicar_artigo):
+        """cursor_anterior deve reproduzir a página anterior"""
+        from repo import artigo_repo
+
+        for i in range(7):
+            publicar_artigo(f"Artigo {i}", "Conteúdo")
+
+        primeira = artigo_repo.obter_publicados_pagina(limite=3)
+        segunda = artigo_repo.obter_publicados_pagina(limite=3, apos=primeira.cursor_proximo)
+        de_volta = artigo_repo.obter_publicados_pagina(limite=3, antes=segunda.cursor_anterior)
+
+        assert primeira.cursor_anterior is None
+        assert [a.id for a in de_volta.itens] == [a.id for a in primeira.itens]
+        assert de_volta.cursor_anterior is None
+        assert de_volta.cursor_proximo == primeira.cursor_proximo
+
+    def test_filtro_por_categoria(self, publicar_artigo, autor_e_categoria):
+        """Somente artigos da categoria devem ser listados"""
+        from model.artigo_model import Artigo
+        from model.categoria_model import Categoria
+        from repo import artigo_repo, categoria_repo
+
+        usuario_id, categoria_id = autor_e_categoria
+        outra = categoria_repo.inserir(Categoria(nome="Outra"))
+        publicar_artigo("Na categoria", "Conteúdo")
+        outro_id = artigo_repo.inserir(Artigo(
+            id=0, titulo="Fora da categoria", conteudo="...", status="Rascunho",
+            usuario_id=usuario_id, categoria_id=outra.id,
+        ))
+        artigo_repo.alterar_status(outro_id, "Publicado")
+
+        assert len(self._percorrer(categoria_id=categoria_id)) == 1
+        assert self._percorrer(categoria_id=outra.id) == [outro_id]
+
+    def test_cursor_invalido_volta_ao_inicio(self, publicar_artigo):
+        """Cursor adulterado não gera erro: retorna a primeira página"""
+        from repo import artigo_repo
+
+        artigo_id = publicar_artigo("Artigo", "Conteúdo")
+
+        pagina = artigo_repo.obter_publicados_pagina(apos="nao-e-um-cursor")
+
+        assert [a.id for a in pagina.itens] == [artigo_id]
+
+    def test_publicado_na_insercao_recebe_data(self, autor_e_categoria):
+        """Artigo inserido já publicado precisa de data_publicacao (chave do cursor)"""
+        from model.artigo_model import Artigo
+        from repo import artigo_repo
+
+        usuario_id, categoria_id = autor_e_categoria
+        artigo_id = artigo_repo.inserir(Artigo(
+            id=0, titulo="Direto", conteudo="...", status="Publicado",
+            usuario_id=usuario_id, categoria_id=categoria_id,
+        ))
+
+        assert artigo_repo.obter_por_id(artigo_id).data_publicacao is not None
+
+    def test_rota_expoe_cursores(self, client, publicar_artigo):
+        """/artigos deve paginar e oferecer o link da próxima página"""
+        from routes.artigos_routes import ARTIGOS_POR_PAGINA
+
+        for i in range(ARTIGOS_POR_PAGINA + 1):
+            publicar_artigo(f"Artigo {i}", "Conteúdo")
+
+        response = client.get("/artigos", params={"ordem": "antigos"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "Artigo 0" in response.text
+        assert f"Artigo {ARTIGOS_POR_PAGINA}<" not in response.text
+        assert "&apos=" in response.text
+
+    def test_cursor_ida_e_volta(self):
+        """Codificação do cursor deve ser reversível"""
+        from util.paginacao import codificar_cursor, decodificar_cursor
+
+        cursor = codificar_cursor("2025-01-01 10:00:00", 42)
+
+        assert decodificar_cursor(cursor) == ("2025-01-01 10:00:00", 42)
+        assert decodificar_cursor("") is None
+        assert decodificar_cursor("!!!") is None
+
+
+class TestProjecaoResumo:
+    """Listagens carregam apenas a projeção resumida do artigo"""
+
+    def test_listagens_nao_carregam_conteudo(self, publicar_artigo):
+        """Nenhuma listagem deve trazer o corpo do artigo"""
+        from model.artigo_model import ArtigoResumo
+        from repo import artigo_repo
+
+        artigo_id = publicar_artigo("Artigo longo", "x" * 100_000, resumo="Resumo curto")
+        usuario_id = artigo_repo.obter_por_id(artigo_id).usuario_id
+
+        listagens = [
+            artigo_repo.obter_todos(),
+            artigo_repo.obter_publicados(),
+            artigo_repo.obter_ultimos_publicados(6),
+            artigo_repo.obter_por_usuario(usuario_id),
+            artigo_repo.obter_publicados_pagina().itens,
+            artigo_repo.obter_por_usuario_pagina(usuario_id).itens,
+            artigo_repo.buscar("longo")[0],
+        ]
+        for artigos in listagens:
+            assert len(artigos) == 1
+            assert isinstance(artigos[0], ArtigoResumo)
+            assert not hasattr(artigos[0], "conteudo")
+            assert artigos[0].previa is None
+
+    def test_previa_quando_nao_ha_resumo(self, publicar_artigo):
+        """Sem resumo, a listagem traz só o início do conteúdo"""
+        from repo import artigo_repo
+
+        publicar_artigo("Sem resumo", "Começo do texto " + "y" * 10_000)
+
+        artigo = artigo_repo.obter_ultimos_publicados(1)[0]
+
+        assert artigo.previa.startswith("Começo do texto")
+        assert len(artigo.previa) == 200
+
+    def test_leitura_carrega_conteudo_completo(self, publicar_artigo):
+        """obter_por_id (usado em /artigos/ler) continua trazendo o corpo"""
+        from repo import artigo_repo
+
+        artigo_id = publicar_artigo("Completo", "z" * 50_000)
+
+        assert len(artigo_repo.obter_por_id(artigo_id).conteudo) == 50_000
+
+    def test_pagina_inicial_exibe_previa(self, client, publicar_artigo):
+        """A home deve exibir a prévia dos artigos sem resumo"""
+        publicar_artigo("Na home", "Texto de abertura do artigo")
+
+        response = client.get("/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "Texto de abertura do artigo" in response.text
+
+
+class TestContadorVisualizacoes:
+    """Testes do contador de visualizações com gravação em lote"""
+
+    def _gravadas(self, artigo_id: int) -> int:
+        """Valor de qtde_visualizacoes no banco, sem as pendentes"""
+        from util.db_util import obter_conexao
+
+        with obter_conexao(somente_leitura=True) as conn:
+            return conn.execute(
+                "SELECT qtde_visualizacoes FROM artigo WHERE id = ?", (artigo_id,)
+            ).fetchone()[0]
+
+    def test_registro_nao_grava_e_leitura_soma_pendentes(self, publicar_artigo):
+        """Visualizações ficam em memória, mas as leituras já as incluem"""
+        from repo import artigo_repo
+        from util.contador_visualizacoes import contador_visualizacoes
+
+        artigo_id = publicar_artigo("Artigo", "Conteúdo")
+        for _ in range(3):
+            contador_visualizacoes.registrar(artigo_id)
+
+        assert self._gravadas(artigo_id) == 0
+        assert artigo_repo.obter_por_id(artigo_id).qtde_visualizacoes == 3
+        assert artigo_repo.obter_ultimos_publicados(1)[0].qtde_visualizacoes == 3
+
+    def test_descarregar_grava_lote(self, publicar_artigo):
+        """Uma gravação deve somar os pendentes de todos os artigos"""
+        from repo import artigo_repo
+        from util.contador_visualizacoes import ContadorVisualizacoes
+
+        id1 = publicar_artigo("Artigo 1", "Conteúdo")
+        id2 = publicar_artigo("Artigo 2", "Conteúdo")
+        contador = ContadorVisualizacoes(intervalo_segundos=0, limite_pendentes=1000)
+        for _ in range(5):
+            contador.registrar(id1)
+        contador.registrar(id2, 2)
+
+        assert contador.descarregar() == 7
+        assert self._gravadas(id1) == 5
+        assert self._gravadas(id2) == 2
+        assert contador.pendentes(id1) == 0
+        assert contador.obter_estatisticas()["gravacoes"] == 1
+        assert artigo_repo.obter_por_id(id1).qtde_visualizacoes == 5
+
+    def test_limite_antecipa_gravacao(self, publicar_artigo):
+        """Ao atingir o limite, a gravação acontece sem esperar o intervalo"""
+        import time
+        from util.contador_visualizacoes import ContadorVisualizacoes
+
+        artigo_id = publicar_artigo("Artigo", "Conteúdo")
+        contador = ContadorVisualizacoes(intervalo_segundos=0, limite_pendentes=3)
+        for _ in range(3):
+            contador.registrar(artigo_id)
+
+        limite = time.monotonic() + 5
+        while contador.obter_estatisticas()["gravacoes"] == 0 and time.monotonic() < limite:
+            time.sleep(0.01)
+
+        assert self._gravadas(artigo_id) == 3
+        assert contador.obter_estatisticas()["pendentes"] == 0
+
+    def test_limite_nao_grava_na_chamada(self, publicar_artigo, monkeypatch):
+        """Sem thread periódica, a gravação antecipada roda fora de quem registrou"""
+        import threading
+        from repo import artigo_repo
+        from util.contador_visualizacoes import ContadorVisualizacoes
+
+        artigo_id = publicar_artigo("Artigo", "Conteúdo")
+        contador = ContadorVisualizacoes(intervalo_segundos=0, limite_pendentes=2)
+        original = artigo_repo.incrementar_visualizacoes_em_lote
+        threads = []
+
+        def gravar(lote, ao_confirmar=None):
+            threads.append(threading.current_thread())
+            return original(lote, ao_confirmar)
+
+        monkeypatch.setattr(artigo_repo, "incrementar_visualizacoes_em_lote", gravar)
+        contador.registrar(artigo_id, 2)
+        contador.parar()
+
+        assert threads and threading.current_thread() not in threads
+        assert self._gravadas(artigo_id) == 2
+
+    def test_pendentes_nao_conta_lote_ja_gravado(self, publicar_artigo, monkeypatch):
+        """Logo após o commit do lote, pendentes() já não inclui o que foi gravado"""
+        from repo import artigo_repo
+        from util.contador_visualizacoes import ContadorVisualizacoes
+
+        artigo_id = publicar_artigo("Artigo", "Conteúdo")
+        contador = ContadorVisualizacoes(intervalo_segundos=0, limite_pendentes=1000)
+        contador.registrar(artigo_id, 3)
+        original = artigo_repo.incrementar_visualizacoes_em_lote
+        observado = []
+
+        def gravar(lote, ao_confirmar=None):
+            resultado = original(lote, ao_confirmar)
+            # Antes de descarregar() retomar o lock, o banco já tem o lote
+            observado.append(self._gravadas(artigo_id) + contador.pendentes(artigo_id))
+            return resultado
+
+        monkeypatch.setattr(artigo_repo, "incrementar_visualizacoes_em_lote", gravar)
+        assert contador.descarregar() == 3
+        assert observado == [3]
+
+    def test_falha_devolve_pendentes(self, publicar_artigo, monkeypatch):
+        """Se o lote não for gravado, as visualizações não se perdem"""
+        from repo import artigo_repo
+        from util.contador_visualizacoes import ContadorVisualizacoes
+
+        artigo_id = publicar_artigo("Artigo", "Conteúdo")
+        contador = ContadorVisualizacoes(intervalo_segundos=0, limite_pendentes=1000)
+        contador.registrar(artigo_id, 4)
+
+        monkeypatch.setattr(artigo_repo, "incrementar_visualizacoes_em_lote", lambda lote, ao_confirmar=None: False)
+        assert contador.descarregar() == 0
+        assert contador.pendentes(artigo_id) == 4
+        assert contador.obter_estatisticas()["falhas"] == 1
+
+        monkeypatch.undo()
+        assert contador.descarregar() == 4
+        assert self._gravadas(artigo_id) == 4
+
+    def test_parar_grava_pendentes(self, publicar_artigo):
+        """No encerramento, as visualizações pendentes são gravadas"""
+        from util.contador_visualizacoes import ContadorVisualizacoes
+
+        artigo_id = publicar_artigo("Artigo", "Conteúdo")
+        contador = ContadorVisualizacoes(intervalo_segundos=60, limite_pendentes=1000)
+        contador.iniciar()
+        contador.registrar(artigo_id, 2)
+        contador.parar()
+
+        assert self._gravadas(artigo_id) == 2
+        assert contador.obter_estatisticas()["ativo"] is False
+
+    def test_leitura_registra_visualizacao(self, cliente_autenticado, publicar_artigo):
+        """GET /artigos/ler/{id} conta a visualização pelo contador"""
+        from util.contador_visualizacoes import contador_visualizacoes
+
+        artigo_id = publicar_artigo("Artigo lido", "Conteúdo")
+
+        response = cliente_autenticado.get(f"/artigos/ler/{artigo_id}")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert contador_visualizacoes.pendentes(artigo_id) == 1
+        assert self._gravadas(artigo_id) == 0
+
+
+@pytest.mark.slow
+class TestBenchmarkBusca:
+    """Benchmark: latência da busca com 100 mil artigos"""
+
+    def test_latencia_com_100_mil_artigos(self):
+        """Consultas devem ficar na casa de poucos milissegundos"""
+        import random
+        import sqlite3
+
+        from repo.artigo_repo import _montar_consulta_fts
+        from sql import artigo_sql, categoria_sql, usuario_sql
+
+        conn = sqlite3.connect(":memory:")
+        for comando in (
+            usuario_sql.CRIAR_TABELA, categoria_sql.CRIAR_TABELA, artigo_sql.CRIAR_TABELA,
+            artigo_sql.CRIAR_TABELA_FTS, artigo_sql.CRIAR_TRIGGER_FTS_INSERT,
+        ):
+            conn.execute(comando)
+
+        vocabulario = [
+            "python", "dados", "programação", "banco", "índice", "consulta", "ação",
+            "função", "servidor", "rede", "segurança", "desempenho", "memória",
+        ] + [f"palavra{i}" for i in range(2000)]
+        aleatorio = random.Random(42)
+        conn.executemany(
+            "INSERT INTO artigo (titulo, resumo, conteudo, status, usuario_id, categoria_id) "
+            "VALUES (?, ?, ?, 'Publicado', 1, 1)",
+            (
+                (
+                    f"Artigo {i} " + " ".join(aleatorio.choices(vocabulario, k=4)),
+                    " ".join(aleatorio.choices(vocabulario, k=15)),
+                    " ".join(aleatorio.choices(vocabulario, k=120)),
+                )
+                for i in range(100_000)
+            ),
+        )
+        conn.commit()
+
+        tempos = []
+        for termo in ["python", "programacao dados", "seguranca", "palavra123", "desemp"]:
+            consulta = _montar_consulta_fts(termo)
+            inicio = time.perf_counter()
+            conn.execute(artigo_sql.CONTAR_BUSCA, (consulta,)).fetchone()
+            conn.execute(artigo_sql.BUSCAR, (consulta, 12, 0)).fetchall()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+
+        print(f"\nBusca FTS5 (100k artigos): {', '.join(f'{t:.1f}ms' for t in tempos)}")
+        conn.close()
+        assert sorted(tempos)[len(tempos) // 2] < 200
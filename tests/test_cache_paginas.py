@@ -0,0 +1,181 @@
+"""
+Testes do cache de páginas públicas (util/cache_paginas.py)
+
+Cobre:
+- Hits/misses para visitantes anônimos
+- Invalidação após escritas em artigos e categorias
+- Páginas personalizadas (usuário logado, mensagens flash) nunca cacheadas
+- Expiração por TTL e limite de entradas
+"""
+import time
+
+from fastapi import status
+from starlette.requests import Request
+
+
+def _requisicao(caminho: str = "/", query: str = "", sessao: dict | None = None) -> Request:
+    """Cria um Request mínimo com sessão, sem passar pela aplicação"""
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": caminho,
+        "query_string": query.encode(),
+        "headers": [],
+        "session": sessao or {},
+    })
+
+
+class TestCachePaginas:
+    """Testes unitários da classe CachePaginas"""
+
+    def test_chave_ignora_ordem_dos_parametros(self):
+        """Mesmos parâmetros em ordem diferente devem gerar a mesma chave"""
+        from util.cache_paginas import CachePaginas
+
+        chave1 = CachePaginas.chave_requisicao(_requisicao("/artigos", "ordem=antigos&categoria=2"))
+        chave2 = CachePaginas.chave_requisicao(_requisicao("/artigos", "categoria=2&ordem=antigos"))
+
+        assert chave1 == chave2
+        assert chave1 != CachePaginas.chave_requisicao(_requisicao("/artigos", "categoria=3"))
+
+    def test_nao_cacheia_paginas_personalizadas(self):
+        """Usuário logado ou mensagem flash pendente tornam a página pessoal"""
+        from util.cache_paginas import CachePaginas
+
+        assert CachePaginas.pode_cachear(_requisicao())
+        assert not CachePaginas.pode_cachear(_requisicao(sessao={"usuario_logado": {"id": 1}}))
+        assert not CachePaginas.pode_cachear(_requisicao(sessao={"mensagens": [{"texto": "x"}]}))
+
+    def test_expira_apos_ttl(self):
+        """Entrada vencida conta como miss e é descartada"""
+        from fastapi.responses import HTMLResponse
+        from util.cache_paginas import CachePaginas
+
+        cache = CachePaginas(ttl_segundos=0.05, max_entradas=10)
+        requisicao = _requisicao()
+        cache.armazenar_resposta(requisicao, HTMLResponse("<p>pagina</p>"))
+
+        assert cache.obter_resposta(requisicao).body == b"<p>pagina</p>"
+        time.sleep(0.06)
+        assert cache.obter_resposta(requisicao) is None
+        assert cache.obter_estatisticas()["entradas"] == 0
+
+    def test_descarta_menos_usadas_acima_do_limite(self):
+        """Acima de max_entradas, a entrada menos usada é descartada"""
+        from fastapi.responses import HTMLResponse
+        from util.cache_paginas import CachePaginas
+
+        cache = CachePaginas(ttl_segundos=60, max_entradas=2)
+        for pagina in ("1", "2", "3"):
+            cache.armazenar_resposta(_requisicao("/artigos", f"pagina={pagina}"), HTMLResponse(pagina))
+
+        assert cache.obter_resposta(_requisicao("/artigos", "pagina=1")) is None
+        assert cache.obter_resposta(_requisicao("/artigos", "pagina=3")).body == b"3"
+
+    def test_nao_armazena_erros(self):
+        """Somente respostas 200 entram no cache"""
+        from fastapi.responses import HTMLResponse
+        from util.cache_paginas import CachePaginas
+
+        cache = CachePaginas(ttl_segundos=60, max_entradas=10)
+        cache.armazenar_resposta(_requisicao(), HTMLResponse("erro", status_code=500))
+
+        assert cache.obter_estatisticas()["entradas"] == 0
+
+    def test_invalidacao_durante_renderizacao_descarta_pagina(self):
+        """Página renderizada antes de uma invalidação não entra no cache"""
+        from fastapi.responses import HTMLResponse
+        from util.cache_paginas import CachePaginas
+
+        cache = CachePaginas(ttl_segundos=60, max_entradas=10)
+        requisicao = _requisicao()
+        assert cache.obter_resposta(requisicao) is None
+        # Escrita (ex.: publicação) entre a leitura dos dados e o armazenamento
+        cache.invalidar()
+        cache.armazenar_resposta(requisicao, HTMLResponse("<p>anterior</p>"))
+
+        assert cache.obter_estatisticas()["entradas"] == 0
+        outra = _requisicao()
+        assert cache.obter_resposta(outra) is None
+        cache.armazenar_resposta(outra, HTMLResponse("<p>atual</p>"))
+        assert cache.obter_resposta(_requisicao()).body == b"<p>atual</p>"
+
+
+class TestCacheNasRotas:
+    """Testes do cache aplicado às rotas públicas"""
+
+    def _criar_artigo_publicado(self, titulo: str) -> int:
+        from model.artigo_model import Artigo
+        from model.categoria_model import Categoria
+        from model.usuario_model import Usuario
+        from repo import artigo_repo, categoria_repo, usuario_repo
+        from util.perfis import Perfil
+
+        usuario_id = usuario_repo.inserir(Usuario(
+            id=0, nome="Autor", email=f"{titulo.lower().replace(' ', '')}@example.com",
+            senha="hash", perfil=Perfil.AUTOR.value,
+        ))
+        categoria = categoria_repo.inserir(Categoria(nome=f"Categoria de {titulo.split()[0]}"))
+        artigo_id = artigo_repo.inserir(Artigo(
+            id=0, titulo=titulo, conteudo="Conteúdo", status="Rascunho",
+            usuario_id=usuario_id, categoria_id=categoria.id,
+        ))
+        artigo_repo.alterar_status(artigo_id, "Publicado")
+        return artigo_id
+
+    def test_segunda_visita_anonima_e_hit(self, client):
+        """A mesma página anônima deve ser servida do cache"""
+        from util.cache_paginas import cache_paginas
+
+        primeira = client.get("/")
+        segunda = client.get("/")
+
+        assert primeira.status_code == segunda.status_code == status.HTTP_200_OK
+        assert primeira.text == segunda.text
+        estatisticas = cache_paginas.obter_estatisticas()
+        assert estatisticas["misses"] == 1
+        assert estatisticas["hits"] == 1
+
+    def test_publicacao_invalida_cache(self, client):
+        """Publicar um artigo deve refletir imediatamente na home e em /artigos"""
+        client.get("/")
+        client.get("/artigos")
+
+        self._criar_artigo_publicado("Novidade Publicada")
+
+        assert "Novidade Publicada" in client.get("/").text
+        assert "Novidade Publicada" in client.get("/artigos").text
+
+    def test_exclusao_de_artigo_invalida_cache(self, client):
+        """Excluir um artigo deve removê-lo da página em cache"""
+        from repo import artigo_repo
+
+        artigo_id = self._criar_artigo_publicado("Artigo Removido")
+        assert "Artigo Removido" in client.get("/").text
+
+        artigo_repo.excluir(artigo_id)
+
+        assert "Artigo Removido" not in client.get("/").text
+
+    def test_usuario_logado_nao_usa_cache(self, cliente_autenticado):
+        """Páginas de usuário logado são sempre renderizadas"""
+        from util.cache_paginas import cache_paginas
+
+        cliente_autenticado.get("/index")
+        cliente_autenticado.get("/index")
+
+        estatisticas = cache_paginas.obter_estatisticas()
+        assert estatisticas["hits"] == 0
+        assert estatisticas["entradas"] == 0
+
+    def test_estatisticas_no_health(self, admin_autenticado):
+        """Hits/misses do cache devem aparecer no /health/detalhes"""
+        from fastapi.testclient import TestClient
+        from main import app
+
+        # Visitante anônimo (o admin logado não usa o cache)
+        TestClient(app).get("/")
+
+        dados = admin_autenticado.get("/health/detalhes").json()
+
+        assert dados["cache_paginas"]["misses"] == 1
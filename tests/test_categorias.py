@@ -0,0 +1,67 @@
+"""
+Testes do cache de categorias (repo/categoria_repo.py + util/cache_versionado.py)
+
+Cobre:
+- Reuso da lista em memória enquanto a versão não muda
+- Invalidação pelas escritas do repositório
+- Invalidação por escritas de outro processo (triggers em versao_dados)
+- Mapa id -> nome
+"""
+
+
+class TestCacheCategorias:
+    """Testes de categoria_repo.obter_todos com cache versionado"""
+
+    def test_leituras_repetidas_usam_cache(self, client):
+        """Sem escritas, a segunda leitura não recarrega do banco"""
+        from model.categoria_model import Categoria
+        from repo import categoria_repo
+
+        categoria_repo.inserir(Categoria(nome="Tecnologia"))
+        categoria_repo.obter_todos()
+        recargas = categoria_repo.obter_estatisticas_cache()["recargas"]
+
+        categorias = categoria_repo.obter_todos()
+
+        assert [c.nome for c in categorias] == ["Tecnologia"]
+        assert categoria_repo.obter_estatisticas_cache()["recargas"] == recargas
+
+    def test_escritas_do_repositorio_invalidam(self, client):
+        """inserir/alterar/excluir devem refletir na próxima leitura"""
+        from model.categoria_model import Categoria
+        from repo import categoria_repo
+
+        categoria = categoria_repo.inserir(Categoria(nome="Esportes"))
+        assert [c.nome for c in categoria_repo.obter_todos()] == ["Esportes"]
+
+        categoria.nome = "Futebol"
+        categoria_repo.alterar(categoria)
+        assert [c.nome for c in categoria_repo.obter_todos()] == ["Futebol"]
+
+        categoria_repo.excluir(categoria.id)
+        assert categoria_repo.obter_todos() == []
+
+    def test_escrita_de_outro_processo_invalida(self, client):
+        """Escrita direta no banco (outro worker) muda a versão via trigger"""
+        from repo import categoria_repo, versao_dados_repo
+        from util.db_util import obter_conexao
+
+        assert categoria_repo.obter_todos() == []
+        versao = versao_dados_repo.obter_versao("categoria")
+
+        # Simula outro processo: SQL direto, sem passar pelo repositório
+        with obter_conexao() as conn:
+            conn.execute("INSERT INTO categoria (nome) VALUES ('Criada em outro worker')")
+
+        assert versao_dados_repo.obter_versao("categoria") == versao + 1
+        assert [c.nome for c in categoria_repo.obter_todos()] == ["Criada em outro worker"]
+
+    def test_lista_retornada_pode_ser_alterada(self, client):
+        """Alterar a lista devolvida não afeta o cache"""
+        from model.categoria_model import Categoria
+        from repo import categoria_repo
+
+        categoria_repo.inserir(Categoria(nome="Ciência"))
+        categoria_repo.obter_todos().clear()
+
+        assert len(categoria_repo.obter_todos()) == 1
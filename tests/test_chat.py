@@ -0,0 +1,540 @@
+"""
+Testes do sistema de chat
+
+Cobre:
+- Listagem de conversas em uma única consulta (ordenação, paginação,
+  última mensagem e contador de não lidas)
+- Endpoint /chat/conversas
+- Contador desnormalizado de mensagens não lidas
+- Envio e leitura em uma única transação (repositório e endpoints)
+- Stream SSE retomável (Last-Event-ID, reenvio e heartbeat)
+- Histórico paginado por cursor (before_id/after_id)
+- Retenção: arquivamento de mensagens antigas, histórico lendo o arquivo
+  e compactação do banco
+"""
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi import status
+
+
+@pytest.fixture
+def usuarios_chat(client, criar_usuario, fazer_login, usuario_teste):
+    """
+    Cria três contatos e o usuário de teste, deixando-o logado no client.
+
+    Returns:
+        Tupla (id_usuario_logado, [ids_dos_contatos])
+    """
+    from model.usuario_model import Usuario
+    from repo import usuario_repo
+    from util.perfis import Perfil
+
+    # Contatos inseridos direto no repositório (o cadastro tem rate limit)
+    contatos = [
+        usuario_repo.inserir(Usuario(
+            id=0,
+            nome=f"Contato {i}",
+            email=f"contato{i}@example.com",
+            senha="hash",
+            perfil=Perfil.AUTOR.value,
+        ))
+        for i in range(3)
+    ]
+
+    criar_usuario(usuario_teste["nome"], usuario_teste["email"], usuario_teste["senha"])
+    fazer_login(usuario_teste["email"], usuario_teste["senha"])
+    usuario_id = usuario_repo.obter_por_email(usuario_teste["email"]).id
+    return usuario_id, contatos
+
+
+def _abrir_conversa(usuario_id: int, contato_id: int) -> str:
+    """Cria a sala entre dois usuários com os dois participantes."""
+    from repo import chat_sala_repo, chat_participante_repo
+
+    sala = chat_sala_repo.criar_ou_obter_sala(usuario_id, contato_id)
+    for participante_id in (usuario_id, contato_id):
+        if not chat_participante_repo.obter_por_sala_e_usuario(sala.id, participante_id):
+            chat_participante_repo.adicionar_participante(sala.id, participante_id)
+    return sala.id
+
+
+def _enviar(sala_id: str, usuario_id: int, texto: str) -> None:
+    from repo import chat_mensagem_repo, chat_sala_repo
+
+    chat_mensagem_repo.inserir(sala_id, usuario_id, texto)
+    chat_sala_repo.atualizar_ultima_atividade(sala_id)
+
+
+class TestListarConversas:
+    """Testes de chat_participante_repo.listar_conversas"""
+
+    def test_ordena_por_atividade_com_resumo(self, usuarios_chat):
+        """Conversas mais recentes primeiro, com última mensagem e não lidas"""
+        from repo import chat_participante_repo
+
+        usuario_id, contatos = usuarios_chat
+        salas = [_abrir_conversa(usuario_id, contato) for contato in contatos]
+
+        _enviar(salas[0], contatos[0], "primeira")
+        _enviar(salas[2], usuario_id, "minha mensagem")
+        _enviar(salas[1], contatos[1], "oi")
+        _enviar(salas[1], contatos[1], "tudo bem?")
+
+        conversas = chat_participante_repo.listar_conversas(usuario_id)
+
+        assert [c.sala_id for c in conversas] == [salas[1], salas[2], salas[0]]
+        assert conversas[0].outro_usuario_id == contatos[1]
+        assert conversas[0].outro_usuario_nome == "Contato 1"
+        assert conversas[0].ultima_mensagem == "tudo bem?"
+        assert conversas[0].nao_lidas == 2
+        # Mensagens do próprio usuário não contam como não lidas
+        assert conversas[1].nao_lidas == 0
+        assert conversas[2].nao_lidas == 1
+
+    def test_sala_sem_mensagens(self, usuarios_chat):
+        """Sala sem mensagens deve vir sem última mensagem"""
+        from repo import chat_participante_repo
+
+        usuario_id, contatos = usuarios_chat
+        _abrir_conversa(usuario_id, contatos[0])
+
+        conversas = chat_participante_repo.listar_conversas(usuario_id)
+
+        assert len(conversas) == 1
+        assert conversas[0].ultima_mensagem is None
+        assert conversas[0].nao_lidas == 0
+
+    def test_paginacao_no_banco(self, usuarios_chat):
+        """limit/offset devem ser aplicados sobre a lista ordenada"""
+        from repo import chat_participante_repo
+
+        usuario_id, contatos = usuarios_chat
+        salas = [_abrir_conversa(usuario_id, contato) for contato in contatos]
+        for sala_id in salas:
+            _enviar(sala_id, usuario_id, "olá")
+
+        primeira_pagina = chat_participante_repo.listar_conversas(usuario_id, limit=2, offset=0)
+        segunda_pagina = chat_participante_repo.listar_conversas(usuario_id, limit=2, offset=2)
+
+        assert [c.sala_id for c in primeira_pagina] == [salas[2], salas[1]]
+        assert [c.sala_id for c in segunda_pagina] == [salas[0]]
+
+
+class TestEndpointConversas:
+    """Testes do endpoint GET /chat/conversas"""
+
+    def test_retorna_conversas_do_usuario(self, client, usuarios_chat):
+        """Endpoint deve retornar o resumo no formato JSON esperado"""
+        usuario_id, contatos = usuarios_chat
+        sala_id = _abrir_conversa(usuario_id, contatos[0])
+        _enviar(sala_id, contatos[0], "mensagem nova")
+
+        response = client.get("/chat/conversas")
+
+        assert response.status_code == status.HTTP_200_OK
+        conversas = response.json()
+        assert len(conversas) == 1
+        assert conversas[0]["sala_id"] == sala_id
+        assert conversas[0]["outro_usuario"]["id"] == contatos[0]
+        assert conversas[0]["ultima_mensagem"]["mensagem"] == "mensagem nova"
+        assert conversas[0]["nao_lidas"] == 1
+        assert conversas[0]["ultima_atividade"] != ""
+
+
+class TestContadorNaoLidas:
+    """Testes do contador desnormalizado de não lidas"""
+
+    def test_inserir_incrementa_e_marcar_zera(self, usuarios_chat):
+        """Mensagem recebida incrementa; marcar como lidas zera"""
+        from repo import chat_mensagem_repo, chat_participante_repo
+
+        usuario_id, contatos = usuarios_chat
+        sala_id = _abrir_conversa(usuario_id, contatos[0])
+
+        _enviar(sala_id, contatos[0], "um")
+        _enviar(sala_id, contatos[0], "dois")
+        _enviar(sala_id, usuario_id, "resposta")
+
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, usuario_id) == 2
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, contatos[0]) == 1
+
+        chat_mensagem_repo.marcar_como_lidas(sala_id, usuario_id)
+
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, usuario_id) == 0
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, contatos[0]) == 1
+
+    def test_total_soma_todas_as_salas(self, client, usuarios_chat):
+        """Endpoint de total deve somar os contadores de todas as salas"""
+        usuario_id, contatos = usuarios_chat
+        for contato in contatos[:2]:
+            sala_id = _abrir_conversa(usuario_id, contato)
+            _enviar(sala_id, contato, "olá")
+            _enviar(sala_id, contato, "alguém aí?")
+
+        response = client.get("/chat/mensagens/nao-lidas/total")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"total": 4}
+
+    def test_recontar_corrige_divergencia(self, usuarios_chat):
+        """Recontagem deve restaurar o valor a partir das mensagens"""
+        from repo import chat_participante_repo
+        from util.db_util import obter_conexao
+
+        usuario_id, contatos = usuarios_chat
+        sala_id = _abrir_conversa(usuario_id, contatos[0])
+        _enviar(sala_id, contatos[0], "mensagem")
+
+        with obter_conexao() as conn:
+            conn.execute(
+                "UPDATE chat_participante SET nao_lidas = 99 WHERE sala_id = ? AND usuario_id = ?",
+                (sala_id, usuario_id),
+            )
+
+        assert chat_participante_repo.recontar_nao_lidas() == 1
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, usuario_id) == 1
+        assert chat_participante_repo.recontar_nao_lidas() == 0
+
+
+def _ler_coluna(tabela: str, coluna: str, where: str, parametros: tuple):
+    from util.db_util import obter_conexao
+
+    with obter_conexao(somente_leitura=True) as conn:
+        return conn.execute(f"SELECT {coluna} FROM {tabela} WHERE {where}", parametros).fetchone()[0]
+
+
+class TestEnvioMensagem:
+    """Testes do envio e da leitura em uma única transação"""
+
+    def test_lote_grava_e_recusa_por_pedido(self, usuarios_chat):
+        """Pedidos recusados no lote não impedem a gravação dos demais"""
+        from repo import chat_mensagem_repo, chat_participante_repo
+        from util.db_util import obter_conexao
+
+        usuario_id, contatos = usuarios_chat
+        sala_id = _abrir_conversa(usuario_id, contatos[0])
+        atividade_anterior = _ler_coluna("chat_sala", "ultima_atividade", "id = ?", (sala_id,))
+        # Participante sem sala (registro órfão, gravado sem checar chaves estrangeiras)
+        with obter_conexao() as conn:
+            conn.execute("PRAGMA foreign_keys = OFF")
+            try:
+                chat_participante_repo.adicionar_participante("sala_removida", usuario_id)
+            finally:
+                conn.commit()
+                conn.execute("PRAGMA foreign_keys = ON")
+
+        resultados = chat_mensagem_repo.enviar_em_lote([
+            (sala_id, usuario_id, "oi"),
+            (sala_id, contatos[1], "intruso"),
+            ("sala_removida", usuario_id, "perdida"),
+            (sala_id, contatos[0], "olá"),
+        ])
+
+        assert resultados[1] == chat_mensagem_repo.SEM_ACESSO
+        assert resultados[2] == chat_mensagem_repo.SALA_INEXISTENTE
+        assert [m.mensagem for m in chat_mensagem_repo.listar_por_sala(sala_id)] == ["oi", "olá"]
+        assert resultados[3].id == chat_mensagem_repo.listar_por_sala(sala_id)[-1].id
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, usuario_id) == 1
+        assert _ler_coluna("chat_sala", "ultima_atividade", "id = ?", (sala_id,)) >= atividade_anterior
+
+    def test_registrar_leitura(self, usuarios_chat):
+        """Leitura marca as mensagens, zera o contador e recusa quem não participa"""
+        from repo import chat_mensagem_repo, chat_participante_repo
+
+        usuario_id, contatos = usuarios_chat
+        sala_id = _abrir_conversa(usuario_id, contatos[0])
+        _enviar(sala_id, contatos[0], "um")
+
+        assert not chat_mensagem_repo.registrar_leitura(sala_id, contatos[1])
+        assert chat_mensagem_repo.registrar_leitura(sala_id, usuario_id)
+
+        assert _ler_coluna(
+            "chat_participante", "ultima_leitura", "sala_id = ? AND usuario_id = ?", (sala_id, usuario_id)
+        ) is not None
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, usuario_id) == 0
+        assert chat_mensagem_repo.listar_por_sala(sala_id)[0].lida_em is not None
+
+    def test_endpoints_de_envio_e_leitura(self, client, usuarios_chat):
+        """POST /chat/mensagens grava pelo escritor e as lidas zeram o contador"""
+        from repo import chat_mensagem_repo, chat_participante_repo
+        from util.chat_escritor import escritor_mensagens
+
+        usuario_id, contatos = usuarios_chat
+        sala_id = _abrir_conversa(usuario_id, contatos[0])
+        sala_alheia = _abrir_conversa(contatos[1], contatos[2])
+
+        response = client.post("/chat/mensagens", data={"sala_id": sala_id, "mensagem": "oi"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["mensagem"] == "oi"
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, contatos[0]) == 1
+
+        # 403 vira redirecionamento para o login (handler de exceções)
+        response = client.post(
+            "/chat/mensagens", data={"sala_id": sala_alheia, "mensagem": "oi"}, follow_redirects=False
+        )
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+        assert chat_mensagem_repo.listar_por_sala(sala_alheia) == []
+        response = client.post(f"/chat/mensagens/lidas/{sala_alheia}", follow_redirects=False)
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+
+        _enviar(sala_id, contatos[0], "resposta")
+        assert client.post(f"/chat/mensagens/lidas/{sala_id}").json() == {"sucesso": True}
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, usuario_id) == 0
+        assert escritor_mensagens.obter_estatisticas()["mensagens"] >= 1
+
+
+@pytest.fixture
+def stream_isolado(monkeypatch):
+    """Substitui o gerenciador global por um novo, isolando as conexões do teste."""
+    from routes import chat_routes
+    from util.chat_manager import GerenciadorChat
+
+    gerenciador = GerenciadorChat()
+    monkeypatch.setattr(chat_routes, "gerenciador_chat", gerenciador)
+    return gerenciador
+
+
+class TestStreamRetomavel:
+    """Testes do reenvio de mensagens perdidas ao reconectar o SSE"""
+
+    def test_lista_posteriores_de_todas_as_salas(self, usuarios_chat):
+        """Uma consulta traz as mensagens após o id em todas as salas do usuário"""
+        from repo import chat_mensagem_repo
+
+        usuario_id, contatos = usuarios_chat
+        sala1 = _abrir_conversa(usuario_id, contatos[0])
+        sala2 = _abrir_conversa(usuario_id, contatos[1])
+        sala_alheia = _abrir_conversa(contatos[1], contatos[2])
+
+        _enviar(sala1, contatos[0], "antiga")
+        ultimo_id = chat_mensagem_repo.obter_ultima_mensagem_sala(sala1).id
+        _enviar(sala2, contatos[1], "nova 1")
+        _enviar(sala_alheia, contatos[2], "não é do usuário")
+        _enviar(sala1, usuario_id, "nova 2")
+
+        mensagens = chat_mensagem_repo.listar_posteriores_do_usuario(usuario_id, ultimo_id, 10)
+
+        assert [m.mensagem for m in mensagens] == ["nova 1", "nova 2"]
+        assert mensagens[0].data_envio is not None
+
+    async def test_reconexao_reenvia_com_ids_e_ignora_duplicadas(self, usuarios_chat, stream_isolado):
+        """Mensagens perdidas saem com id: e não se repetem quando chegam pela fila"""
+        from repo import chat_mensagem_repo
+        from routes.chat_routes import _evento_nova_mensagem, _stream_eventos
+
+        usuario_id, contatos = usuarios_chat
+        sala_id = _abrir_conversa(usuario_id, contatos[0])
+        _enviar(sala_id, contatos[0], "vista")
+        ultimo_id = chat_mensagem_repo.obter_ultima_mensagem_sala(sala_id).id
+        _enviar(sala_id, contatos[0], "perdida")
+        perdida = chat_mensagem_repo.obter_ultima_mensagem_sala(sala_id)
+
+        stream = _stream_eventos(usuario_id, ultimo_id)
+        assert (await stream.__anext__()).startswith("retry: ")
+        reenvio = await stream.__anext__()
+        assert reenvio.startswith(f"id: {perdida.id}\ndata: ")
+        assert "perdida" in reenvio
+
+        # A mesma mensagem chegando pela fila não é enviada de novo
+        await stream_isolado.broadcast_para_sala(sala_id, _evento_nova_mensagem(perdida))
+        await stream_isolado.broadcast_para_sala(sala_id, {"tipo": "atualizar_contador", "sala_id": sala_id})
+        seguinte = await asyncio.wait_for(stream.__anext__(), timeout=5)
+        assert seguinte == f'data: {{"tipo": "atualizar_contador", "sala_id": "{sala_id}"}}\n\n'
+        await stream.aclose()
+
+    async def test_muitas_perdidas_pede_ressincronizacao(self, usuarios_chat, stream_isolado, monkeypatch):
+        """Acima de CHAT_SSE_REPLAY_MAX, o cliente recebe ressincronizar em vez do reenvio"""
+        from repo import chat_mensagem_repo
+        from routes import chat_routes
+
+        monkeypatch.setattr(chat_routes, "CHAT_SSE_REPLAY_MAX", 2)
+        usuario_id, contatos = usuarios_chat
+        sala_id = _abrir_conversa(usuario_id, contatos[0])
+        for i in range(5):
+            _enviar(sala_id, contatos[0], f"mensagem {i}")
+        ultima = chat_mensagem_repo.obter_ultima_mensagem_sala(sala_id)
+
+        stream = chat_routes._stream_eventos(usuario_id, 0)
+        await stream.__anext__()
+        evento = await stream.__anext__()
+        await stream.aclose()
+
+        assert '"tipo": "ressincronizar"' in evento
+        # A próxima reconexão parte da mensagem mais recente, não da que estourou o limite
+        assert evento.startswith(f"id: {ultima.id}\n")
+
+    async def test_heartbeat_em_stream_ocioso(self, stream_isolado, monkeypatch):
+        """Sem eventos, o stream envia comentários de heartbeat"""
+        from routes import chat_routes
+
+        monkeypatch.setattr(chat_routes, "CHAT_SSE_HEARTBEAT_SEGUNDOS", 0.01)
+        stream = chat_routes._stream_eventos(1, None)
+        await stream.__anext__()
+
+        assert await asyncio.wait_for(stream.__anext__(), timeout=5) == ": heartbeat\n\n"
+        await stream.aclose()
+        assert not stream_isolado.esta_conectado(1)
+
+    def test_last_event_id_invalido_e_ignorado(self):
+        """Cabeçalho ausente ou inválido não causa reenvio"""
+        from routes.chat_routes import _ler_last_event_id
+
+        assert _ler_last_event_id("42") == 42
+        assert _ler_last_event_id(None) is None
+        assert _ler_last_event_id("abc") is None
+
+
+class TestHistoricoCursor:
+    """Testes da paginação do histórico por id de mensagem"""
+
+    def _sala_com_mensagens(self, usuarios_chat, quantidade: int) -> tuple[str, list[int]]:
+        from repo import chat_mensagem_repo
+
+        usuario_id, contatos = usuarios_chat
+        sala_id = _abrir_conversa(usuario_id, contatos[0])
+        ids = []
+        for i in range(quantidade):
+            ids.append(chat_mensagem_repo.inserir(sala_id, contatos[0], f"mensagem {i}").id)
+        return sala_id, ids
+
+    def test_sem_cursor_retorna_as_mais_recentes(self, usuarios_chat):
+        """A primeira página traz as N mais recentes, em ordem crescente"""
+        from repo import chat_mensagem_repo
+
+        sala_id, ids = self._sala_com_mensagens(usuarios_chat, 10)
+
+        mensagens = chat_mensagem_repo.listar_por_sala(sala_id, 4)
+
+        assert [m.id for m in mensagens] == ids[-4:]
+        assert mensagens[0].data_envio is not None
+
+    def test_before_id_e_after_id(self, usuarios_chat):
+        """Cursores retornam as vizinhas imediatas, sem lacunas nem repetições"""
+        from repo import chat_mensagem_repo
+
+        sala_id, ids = self._sala_com_mensagens(usuarios_chat, 10)
+
+        anteriores = chat_mensagem_repo.listar_por_sala(sala_id, 4, antes_de_id=ids[6])
+        posteriores = chat_mensagem_repo.listar_por_sala(sala_id, 4, depois_de_id=ids[1])
+        inicio = chat_mensagem_repo.listar_por_sala(sala_id, 4, antes_de_id=ids[2])
+
+        assert [m.id for m in anteriores] == ids[2:6]
+        assert [m.id for m in posteriores] == ids[2:6]
+        assert [m.id for m in inicio] == ids[:2]
+
+    def test_endpoint_percorre_o_historico(self, client, usuarios_chat):
+        """Rolando com before_id, o endpoint percorre todo o histórico uma vez"""
+        sala_id, ids = self._sala_com_mensagens(usuarios_chat, 7)
+
+        vistos = []
+        resposta = client.get(f"/chat/mensagens/{sala_id}?limit=3").json()
+        while resposta:
+            vistos = [m["id"] for m in resposta] + vistos
+            resposta = client.get(f"/chat/mensagens/{sala_id}?limit=3&before_id={resposta[0]['id']}").json()
+
+        assert vistos == ids
+
+    def test_endpoint_rejeita_dois_cursores(self, client, usuarios_chat):
+        """before_id e after_id juntos são inválidos"""
+        sala_id, ids = self._sala_com_mensagens(usuarios_chat, 2)
+
+        response = client.get(f"/chat/mensagens/{sala_id}?before_id={ids[1]}&after_id={ids[0]}")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestRetencao:
+    """Testes do arquivamento de mensagens antigas (util/chat_manutencao.py)"""
+
+    def _sala_antiga(self, usuarios_chat, quantidade: int, texto: str = "") -> tuple[str, list[int]]:
+        """Sala com mensagens lidas enviadas há 100 dias, uma não lida e uma recente."""
+        from repo import chat_mensagem_repo
+        from util.datetime_util import agora
+        from util.db_util import obter_conexao
+
+        usuario_id, contatos = usuarios_chat
+        sala_id = _abrir_conversa(usuario_id, contatos[0])
+        ids = [chat_mensagem_repo.inserir(sala_id, contatos[0], f"antiga {i} {texto}").id for i in range(quantidade)]
+        chat_mensagem_repo.registrar_leitura(sala_id, usuario_id)
+        ids.append(chat_mensagem_repo.inserir(sala_id, usuario_id, "antiga sem leitura").id)
+        with obter_conexao() as conn:
+            conn.execute(
+                "UPDATE chat_mensagem SET data_envio = ? WHERE sala_id = ?",
+                (agora() - timedelta(days=100), sala_id),
+            )
+        ids.append(chat_mensagem_repo.inserir(sala_id, contatos[0], "recente").id)
+        return sala_id, ids
+
+    def test_arquiva_so_mensagens_lidas_e_antigas(self, usuarios_chat):
+        """Lidas além da retenção vão para o arquivo; não lidas e a última ficam"""
+        from repo import chat_mensagem_repo, chat_participante_repo
+        from util.chat_manutencao import AgendadorRetencaoChat
+
+        usuario_id, contatos = usuarios_chat
+        sala_id, ids = self._sala_antiga(usuarios_chat, 20)
+        nao_lidas = chat_participante_repo.contar_mensagens_nao_lidas(sala_id, contatos[0])
+
+        agendador = AgendadorRetencaoChat(dias=30, lote=7)
+        assert agendador.executar() == 20
+        assert agendador.executar() == 0
+
+        assert chat_mensagem_repo.contar_arquivadas() == 20
+        assert _ler_coluna("chat_mensagem", "COUNT(*)", "sala_id = ?", (sala_id,)) == 2
+        assert chat_mensagem_repo.contar_por_sala(sala_id) == 22
+        arquivada = chat_mensagem_repo.obter_por_id(ids[0])
+        assert arquivada.mensagem.startswith("antiga 0")
+        assert arquivada.data_envio is not None
+        assert arquivada.lida_em is not None
+        # Contadores e resumo das conversas não mudam
+        assert chat_participante_repo.recontar_nao_lidas() == 0
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, contatos[0]) == nao_lidas
+        conversa = chat_participante_repo.listar_conversas(usuario_id)[0]
+        assert conversa.ultima_mensagem == "recente"
+        assert chat_mensagem_repo.obter_ultima_mensagem_sala(sala_id).data_envio is not None
+        assert agendador.obter_estatisticas()["arquivadas"] == 20
+
+    def test_historico_continua_no_arquivo(self, client, usuarios_chat):
+        """Rolando com before_id, o endpoint passa do histórico recente para o arquivo"""
+        from util.chat_manutencao import AgendadorRetencaoChat
+
+        sala_id, ids = self._sala_antiga(usuarios_chat, 8)
+        AgendadorRetencaoChat(dias=30).executar()
+
+        vistos = []
+        resposta = client.get(f"/chat/mensagens/{sala_id}?limit=3").json()
+        while resposta:
+            vistos = [m["id"] for m in resposta] + vistos
+            resposta = client.get(f"/chat/mensagens/{sala_id}?limit=3&before_id={resposta[0]['id']}").json()
+
+        assert vistos == ids
+        posteriores = client.get(f"/chat/mensagens/{sala_id}?limit=3&after_id={ids[1]}").json()
+        assert [m["id"] for m in posteriores] == ids[2:5]
+
+    def test_compacta_o_banco(self, usuarios_chat):
+        """Após arquivar, as páginas livres da tabela principal voltam ao sistema"""
+        from util.chat_manutencao import AgendadorRetencaoChat
+
+        self._sala_antiga(usuarios_chat, 300, texto="x" * 2000)
+
+        agendador = AgendadorRetencaoChat(dias=30, vacuum_paginas=0)
+        agendador.executar()
+
+        compactacao = agendador.obter_estatisticas()["ultima_execucao"]["compactacao"]
+        assert compactacao["operacao"] == "incremental_vacuum"
+        assert compactacao["paginas_livres_antes"] > 0
+        assert compactacao["paginas_livres_depois"] == 0
+
+    def test_retencao_desativada(self, usuarios_chat):
+        """Com dias=0 nada é arquivado e o agendador não inicia"""
+        from repo import chat_mensagem_repo
+        from util.chat_manutencao import AgendadorRetencaoChat
+
+        self._sala_antiga(usuarios_chat, 3)
+        agendador = AgendadorRetencaoChat(dias=0)
+        agendador.iniciar()
+
+        assert agendador.executar() == 0
+        assert chat_mensagem_repo.contar_arquivadas() == 0
+        assert not agendador.obter_estatisticas()["ativo"]
@@ -0,0 +1,184 @@
+"""
+Testes do backplane do chat (util/chat_backplane.py)
+
+Cobre:
+- Entrega no próprio processo com o backplane local
+- Vários workers simulados compartilhando a tabela chat_evento
+- Ordem de entrega, ponto de partida ao iniciar e retenção
+- Workers em processos separados recebendo eventos publicados por outro
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def _iniciar_workers(quantidade: int) -> list:
+    """Cria gerenciadores independentes, como se cada um fosse um worker."""
+    from util.chat_backplane import BackplaneSQLite
+    from util.chat_manager import GerenciadorChat
+
+    workers = [GerenciadorChat(BackplaneSQLite(intervalo_segundos=0.01)) for _ in range(quantidade)]
+    for worker in workers:
+        await worker.iniciar()
+    return workers
+
+
+async def _parar_workers(workers: list) -> None:
+    for worker in workers:
+        await worker.parar()
+
+
+class TestBackplaneLocal:
+    """Testes do backplane padrão (um único processo)"""
+
+    async def test_entrega_aos_participantes_conectados(self):
+        """broadcast_para_sala entrega direto nas filas do processo"""
+        from util.chat_manager import GerenciadorChat
+
+        gerenciador = GerenciadorChat()
+        conexao1 = await gerenciador.conectar(1)
+        conexao2 = await gerenciador.conectar(2)
+        conexao3 = await gerenciador.conectar(3)
+
+        await gerenciador.broadcast_para_sala("1_2", {"tipo": "nova_mensagem"})
+
+        assert gerenciador.backplane.tipo == "local"
+        assert await conexao1.receber_lote(10) == [{"tipo": "nova_mensagem"}]
+        assert await conexao2.receber_lote(10) == [{"tipo": "nova_mensagem"}]
+        assert conexao3.pendentes == 0
+
+
+class TestBackplaneSQLite:
+    """Testes com vários workers simulados no mesmo processo"""
+
+    async def test_mensagem_chega_ao_worker_do_destinatario(self, client):
+        """Evento publicado no worker A é entregue ao usuário conectado no worker B"""
+        worker_a, worker_b, worker_c = await _iniciar_workers(3)
+        try:
+            remetente = await worker_a.conectar(1)
+            destinatario = await worker_b.conectar(2)
+            outro = await worker_c.conectar(3)
+
+            await worker_a.broadcast_para_sala("1_2", {"tipo": "nova_mensagem", "texto": "oi"})
+
+            eventos = await asyncio.wait_for(destinatario.receber_lote(10), timeout=5)
+            assert eventos == [{"tipo": "nova_mensagem", "texto": "oi"}]
+            # O remetente recebe uma única vez (entrega local, sem eco da consulta)
+            assert await remetente.receber_lote(10) == eventos
+            await worker_a.backplane.receber()
+            assert remetente.pendentes == 0
+            await worker_c.backplane.receber()
+            assert outro.pendentes == 0
+        finally:
+            await _parar_workers([worker_a, worker_b, worker_c])
+
+    async def test_ordem_de_entrega_preservada(self, client):
+        """Eventos de vários workers chegam na ordem de publicação"""
+        worker_a, worker_b, destino = await _iniciar_workers(3)
+        try:
+            conexao = await destino.conectar(2)
+            for i in range(30):
+                origem = worker_a if i % 2 == 0 else worker_b
+                await origem.broadcast_para_sala("1_2", {"tipo": "nova_mensagem", "n": i})
+
+            recebidos = []
+            while len(recebidos) < 30:
+                lote = await asyncio.wait_for(conexao.receber_lote(10), timeout=5)
+                recebidos.extend(evento["n"] for evento in lote)
+            assert recebidos == list(range(30))
+            assert destino.backplane.obter_estatisticas()["recebidos"] == 30
+        finally:
+            await _parar_workers([worker_a, worker_b, destino])
+
+    async def test_worker_novo_nao_reentrega_eventos_antigos(self, client):
+        """Ao iniciar, o worker parte do último evento publicado"""
+        (worker_a,) = await _iniciar_workers(1)
+        await worker_a.broadcast_para_sala("1_2", {"tipo": "antigo"})
+
+        (worker_b,) = await _iniciar_workers(1)
+        try:
+            conexao = await worker_b.conectar(2)
+            await worker_b.backplane.receber()
+            assert conexao.pendentes == 0
+
+            await worker_a.broadcast_para_sala("1_2", {"tipo": "novo"})
+            assert await asyncio.wait_for(conexao.receber_lote(10), timeout=5) == [{"tipo": "novo"}]
+        finally:
+            await _parar_workers([worker_a, worker_b])
+
+    async def test_retencao_remove_eventos_antigos(self, client):
+        """remover_antigos apaga os eventos além da retenção"""
+        from repo import chat_evento_repo
+        from util.chat_backplane import BackplaneSQLite
+        from util.chat_manager import GerenciadorChat
+
+        backplane = BackplaneSQLite(retencao_segundos=0)
+        gerenciador = GerenciadorChat(backplane)
+        await gerenciador.broadcast_para_sala("1_2", {"tipo": "nova_mensagem"})
+
+        assert await backplane.remover_antigos() == 1
+        assert chat_evento_repo.listar_posteriores(0, 10) == []
+
+    async def test_estatisticas_no_health(self, admin_autenticado):
+        """O backplane em uso aparece no /health/detalhes"""
+        dados = admin_autenticado.get("/health/detalhes").json()
+
+        assert dados["chat"]["backplane"]["backplane"] == "local"
+
+
+# Worker em processo separado: conecta um usuário, avisa que está pronto e
+# imprime o primeiro evento recebido pelo backplane
+_SCRIPT_WORKER = """
+import asyncio, json, sys
+from util.chat_backplane import BackplaneSQLite
+from util.chat_manager import GerenciadorChat
+
+async def main():
+    gerenciador = GerenciadorChat(BackplaneSQLite(intervalo_segundos=0.02))
+    conexao = await gerenciador.conectar(int(sys.argv[1]))
+    await gerenciador.iniciar()
+    print("pronto", flush=True)
+    eventos = await asyncio.wait_for(conexao.receber_lote(1), timeout=20)
+    print(json.dumps(eventos[0]), flush=True)
+    await gerenciador.parar()
+
+asyncio.run(main())
+"""
+
+
+class TestBackplaneMultiProcesso:
+    """Harness com workers em processos separados compartilhando o banco"""
+
+    async def test_evento_chega_aos_workers_em_outros_processos(self, client):
+        """Uma mensagem publicada aqui chega aos dois participantes em outros processos"""
+        from util.chat_backplane import BackplaneSQLite
+        from util.chat_manager import GerenciadorChat
+
+        workers = [
+            subprocess.Popen(
+                [sys.executable, "-c", _SCRIPT_WORKER, str(usuario_id)],
+                cwd=RAIZ_PROJETO, stdout=subprocess.PIPE, text=True,
+            )
+            for usuario_id in (1, 2)
+        ]
+        try:
+            for worker in workers:
+                linha = await asyncio.wait_for(asyncio.to_thread(worker.stdout.readline), timeout=30)
+                assert linha.strip() == "pronto"
+
+            publicador = GerenciadorChat(BackplaneSQLite())
+            await publicador.broadcast_para_sala("1_2", {"tipo": "nova_mensagem", "texto": "oi"})
+
+            for worker in workers:
+                linha = await asyncio.wait_for(asyncio.to_thread(worker.stdout.readline), timeout=30)
+                assert json.loads(linha) == {"tipo": "nova_mensagem", "texto": "oi"}
+                assert worker.wait(timeout=10) == 0
+        finally:
+            for worker in workers:
+                if worker.poll() is None:
+                    worker.kill()
+                worker.stdout.close()
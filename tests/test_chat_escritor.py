@@ -0,0 +1,169 @@
+"""
+Testes do escritor de mensagens com group commit (util/chat_escritor.py)
+
+Cobre:
+- Envios concorrentes agrupados na mesma transação
+- Resultado individual de cada pedido do lote (gravado ou recusado)
+- Gravação dos pendentes ao parar e envio direto sem a tarefa
+- Benchmark de vazão (mensagens/s): transação por envio x group commit
+"""
+import asyncio
+import time
+
+import pytest
+
+
+def _criar_salas(quantidade: int) -> list:
+    """
+    Cria pares de usuários com uma sala cada.
+
+    Returns:
+        Lista de (sala_id, remetente_id, destinatario_id)
+    """
+    from model.usuario_model import Usuario
+    from repo import chat_participante_repo, chat_sala_repo, usuario_repo
+    from util.perfis import Perfil
+
+    salas = []
+    for i in range(quantidade):
+        remetente, destinatario = (
+            usuario_repo.inserir(Usuario(
+                id=0, nome=f"Usuário {i}-{lado}", email=f"escritor{i}{lado}@example.com",
+                senha="hash", perfil=Perfil.AUTOR.value,
+            ))
+            for lado in "ab"
+        )
+        sala = chat_sala_repo.criar_ou_obter_sala(remetente, destinatario)
+        chat_participante_repo.adicionar_participante(sala.id, remetente)
+        chat_participante_repo.adicionar_participante(sala.id, destinatario)
+        salas.append((sala.id, remetente, destinatario))
+    return salas
+
+
+class TestEscritorMensagens:
+    """Testes do agrupamento de envios em transações"""
+
+    async def test_envios_concorrentes_no_mesmo_lote(self, client):
+        """Envios simultâneos dividem transações e cada um recebe sua mensagem"""
+        from model.chat_mensagem_model import ChatMensagem
+        from repo import chat_mensagem_repo, chat_participante_repo
+        from util.chat_escritor import EscritorMensagens
+
+        salas = _criar_salas(10)
+        escritor = EscritorMensagens(max_lote=64)
+        await escritor.iniciar()
+        try:
+            resultados = await asyncio.gather(*(
+                escritor.enviar(sala_id, remetente, f"mensagem {n}")
+                for n in range(5)
+                for sala_id, remetente, _ in salas
+            ))
+        finally:
+            await escritor.parar()
+
+        assert all(isinstance(resultado, ChatMensagem) for resultado in resultados)
+        assert len({resultado.id for resultado in resultados}) == 50
+        sala_id, remetente, destinatario = salas[0]
+        assert [m.mensagem for m in chat_mensagem_repo.listar_por_sala(sala_id)] == [
+            f"mensagem {n}" for n in range(5)
+        ]
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, destinatario) == 5
+
+        estatisticas = escritor.obter_estatisticas()
+        assert estatisticas["mensagens"] == 50
+        assert estatisticas["maior_lote"] > 1
+        assert estatisticas["lotes"] < 50
+        assert not estatisticas["ativo"]
+
+    async def test_pedido_recusado_nao_afeta_o_lote(self, client):
+        """Remetente sem acesso recebe SEM_ACESSO e os demais são gravados"""
+        from repo import chat_mensagem_repo
+        from util.chat_escritor import EscritorMensagens
+
+        (sala_id, remetente, _), (_, intruso, _) = _criar_salas(2)
+        escritor = EscritorMensagens()
+        await escritor.iniciar()
+        try:
+            gravada, recusada = await asyncio.gather(
+                escritor.enviar(sala_id, remetente, "oi"),
+                escritor.enviar(sala_id, intruso, "oi"),
+            )
+        finally:
+            await escritor.parar()
+
+        assert gravada.sala_id == sala_id
+        assert recusada == chat_mensagem_repo.SEM_ACESSO
+        assert len(chat_mensagem_repo.listar_por_sala(sala_id)) == 1
+
+    async def test_sem_tarefa_grava_diretamente(self, client):
+        """Sem iniciar(), o envio é gravado na hora em transação própria"""
+        from repo import chat_mensagem_repo
+        from util.chat_escritor import EscritorMensagens
+
+        ((sala_id, remetente, _),) = _criar_salas(1)
+        escritor = EscritorMensagens()
+
+        mensagem = await escritor.enviar(sala_id, remetente, "direta")
+
+        assert chat_mensagem_repo.obter_por_id(mensagem.id).mensagem == "direta"
+        assert escritor.obter_estatisticas()["lotes"] == 0
+
+    async def test_parar_grava_pendentes(self, client):
+        """Envios enfileirados antes de parar() ainda são gravados"""
+        from repo import chat_mensagem_repo
+        from util.chat_escritor import EscritorMensagens
+
+        ((sala_id, remetente, _),) = _criar_salas(1)
+        escritor = EscritorMensagens(max_lote=2)
+        await escritor.iniciar()
+        envios = [asyncio.create_task(escritor.enviar(sala_id, remetente, f"m{n}")) for n in range(5)]
+        await asyncio.sleep(0)
+
+        await escritor.parar()
+
+        assert all(envio.done() for envio in envios)
+        assert len(chat_mensagem_repo.listar_por_sala(sala_id)) == 5
+
+
+@pytest.mark.slow
+class TestBenchmarkVazao:
+    """Benchmark: mensagens por segundo com muitos remetentes simultâneos"""
+
+    async def test_group_commit_aumenta_a_vazao(self, client):
+        """Agrupar envios em uma transação grava mais mensagens por segundo"""
+        from repo import chat_mensagem_repo
+        from util.chat_escritor import EscritorMensagens
+        from util.db_async import executar_db
+
+        salas = _criar_salas(50)
+        rodadas = 20
+        total = rodadas * len(salas)
+
+        async def medir(enviar) -> float:
+            inicio = time.perf_counter()
+            for n in range(rodadas):
+                await asyncio.gather(*(enviar(sala_id, remetente, f"msg {n}") for sala_id, remetente, _ in salas))
+            return total / (time.perf_counter() - inicio)
+
+        async def transacao_por_envio(sala_id, remetente, texto):
+            return await executar_db(chat_mensagem_repo.enviar, sala_id, remetente, texto)
+
+        escritor = EscritorMensagens()
+        await escritor.iniciar()
+        try:
+            vazao_individual = await medir(transacao_por_envio)
+            vazao_agrupada = await medir(escritor.enviar)
+        finally:
+            await escritor.parar()
+
+        estatisticas = escritor.obter_estatisticas()
+        print(
+            f"\nVazão do chat ({len(salas)} remetentes simultâneos): "
+            f"transação por envio={vazao_individual:.0f} msg/s, "
+            f"group commit={vazao_agrupada:.0f} msg/s "
+            f"(média {estatisticas['media_por_lote']} por lote)"
+        )
+
+        assert estatisticas["mensagens"] == total
+        assert estatisticas["media_por_lote"] > 1
+        assert vazao_agrupada > vazao_individual
@@ -0,0 +1,195 @@
+"""
+Testes do gerenciador de conexões SSE do chat (util/chat_manager.py)
+
+Cobre:
+- Várias conexões simultâneas por usuário (abas/dispositivos)
+- Desconexão de uma conexão sem afetar as outras
+- Filas limitadas: descarte dos mais antigos, ressincronização e
+  agrupamento de atualizar_contador
+- Envio em lotes e métricas de atraso por conexão
+- Estatísticas de memória por conexão
+- Carga com 10 mil streams simultâneos
+"""
+import asyncio
+import time
+
+
+class TestConexoesMultiplas:
+    """Testes de várias conexões por usuário"""
+
+    async def test_todas_as_abas_recebem(self):
+        """O evento chega a todas as conexões de cada participante"""
+        from util.chat_manager import GerenciadorChat
+
+        gerenciador = GerenciadorChat()
+        aba1 = await gerenciador.conectar(1)
+        aba2 = await gerenciador.conectar(1)
+        celular = await gerenciador.conectar(2)
+
+        await gerenciador.broadcast_para_sala("1_2", {"tipo": "nova_mensagem"})
+
+        assert aba1.id != aba2.id
+        for conexao in (aba1, aba2, celular):
+            assert await conexao.receber_lote(10) == [{"tipo": "nova_mensagem"}]
+        assert len(gerenciador.obter_conexoes(1)) == 2
+
+    async def test_fechar_uma_aba_mantem_as_outras(self):
+        """Desconectar uma conexão não desconecta o usuário"""
+        from util.chat_manager import GerenciadorChat
+
+        gerenciador = GerenciadorChat()
+        aba1 = await gerenciador.conectar(1)
+        aba2 = await gerenciador.conectar(1)
+
+        await gerenciador.desconectar(aba1)
+        assert gerenciador.esta_conectado(1)
+
+        await gerenciador.broadcast_para_sala("1_2", {"tipo": "nova_mensagem"})
+        assert aba2.pendentes == 1
+        assert aba1.pendentes == 0
+
+        await gerenciador.desconectar(aba2)
+        assert not gerenciador.esta_conectado(1)
+        # Desconectar de novo é inofensivo
+        await gerenciador.desconectar(aba2)
+        assert gerenciador.obter_estatisticas()["total_conexoes"] == 0
+
+    async def test_estatisticas_de_memoria(self):
+        """Estatísticas trazem memória total e por conexão"""
+        from util.chat_manager import GerenciadorChat
+
+        gerenciador = GerenciadorChat()
+        for usuario_id in (1, 1, 2):
+            await gerenciador.conectar(usuario_id)
+        await gerenciador.broadcast_para_sala("1_2", {"tipo": "nova_mensagem"})
+
+        estatisticas = gerenciador.obter_estatisticas()
+
+        assert estatisticas["total_conexoes"] == 3
+        assert estatisticas["total_usuarios_ativos"] == 2
+        assert estatisticas["eventos_pendentes"] == 3
+        assert estatisticas["memoria_media_por_conexao_bytes"] > 0
+        assert estatisticas["memoria_estimada_bytes"] >= 3 * estatisticas["memoria_media_por_conexao_bytes"]
+
+
+class TestBackpressure:
+    """Testes das filas limitadas e do envio em lotes"""
+
+    async def test_descartar_antigos_mantem_os_mais_recentes(self):
+        """Com descartar_antigos, o cliente lento perde os eventos mais antigos"""
+        from util.chat_manager import GerenciadorChat
+
+        gerenciador = GerenciadorChat(max_eventos_fila=3, politica_fila="descartar_antigos")
+        lenta = await gerenciador.conectar(1)
+        rapida = await gerenciador.conectar(2)
+
+        for i in range(5):
+            await gerenciador.broadcast_para_sala("1_2", {"n": i})
+            await rapida.receber_lote(10)
+
+        assert [evento["n"] for evento in await lenta.receber_lote(10)] == [2, 3, 4]
+        assert lenta.descartados == 2
+        assert rapida.descartados == 0
+        assert gerenciador.obter_estatisticas()["eventos_descartados"] == 2
+
+    async def test_ressincronizar_encerra_a_conexao(self):
+        """Com ressincronizar, a fila cheia vira um único pedido de ressincronização"""
+        from util.chat_manager import EVENTO_RESSINCRONIZAR, GerenciadorChat
+
+        gerenciador = GerenciadorChat(max_eventos_fila=3, politica_fila="ressincronizar")
+        lenta = await gerenciador.conectar(1)
+
+        for i in range(6):
+            await gerenciador.broadcast_para_sala("1_2", {"n": i})
+
+        assert lenta.encerrada
+        assert await lenta.receber_lote(10) == [EVENTO_RESSINCRONIZAR]
+        assert lenta.pendentes == 0
+        estatisticas = gerenciador.obter_estatisticas()
+        assert estatisticas["ressincronizacoes"] == 1
+        assert estatisticas["eventos_descartados"] == 4
+
+    async def test_atualizar_contador_agrupado(self):
+        """atualizar_contador pendente da mesma sala não é enfileirado de novo"""
+        from util.chat_manager import GerenciadorChat
+
+        gerenciador = GerenciadorChat()
+        conexao = await gerenciador.conectar(1)
+
+        for _ in range(5):
+            await gerenciador.broadcast_para_sala("1_2", {"tipo": "atualizar_contador", "sala_id": "1_2"})
+            await gerenciador.broadcast_para_sala("1_3", {"tipo": "atualizar_contador", "sala_id": "1_3"})
+
+        assert conexao.pendentes == 2
+        assert conexao.agrupados == 8
+
+        # Após o envio, um novo contador volta a ser enfileirado
+        await conexao.receber_lote(10)
+        await gerenciador.broadcast_para_sala("1_2", {"tipo": "atualizar_contador", "sala_id": "1_2"})
+        assert conexao.pendentes == 1
+
+    async def test_lote_e_metricas_de_atraso(self):
+        """Pendentes saem em lotes e o atraso do mais antigo é medido"""
+        from util.chat_manager import GerenciadorChat
+
+        gerenciador = GerenciadorChat()
+        conexao = await gerenciador.conectar(1)
+        for i in range(50):
+            await gerenciador.broadcast_para_sala("1_2", {"n": i})
+        await asyncio.sleep(0.02)
+
+        atrasadas = gerenciador.obter_estatisticas()["conexoes_mais_atrasadas"]
+        assert atrasadas[0]["conexao_id"] == conexao.id
+        assert atrasadas[0]["atraso_atual_ms"] >= 20
+
+        primeiro = await conexao.receber_lote(30)
+        segundo = await conexao.receber_lote(30)
+        assert [len(primeiro), len(segundo)] == [30, 20]
+        assert conexao.atraso_max >= 0.02
+        assert conexao.obter_estatisticas()["enviados"] == 50
+
+
+class TestCargaConexoes:
+    """Carga com muitos streams SSE simultâneos em um processo"""
+
+    async def test_dez_mil_streams_simultaneos(self):
+        """10 mil conexões (5 mil usuários com 2 dispositivos) recebem todas as mensagens"""
+        from util.chat_manager import GerenciadorChat
+
+        gerenciador = GerenciadorChat()
+        usuarios = 5000
+        conexoes = [await gerenciador.conectar(u) for u in range(1, usuarios + 1) for _ in range(2)]
+        recebidos = [0]
+
+        async def stream(conexao, esperados: int):
+            # Mesmo consumo do endpoint /chat/stream: um lote por escrita
+            pendentes = esperados
+            while pendentes:
+                lote = await conexao.receber_lote(esperados)
+                pendentes -= len(lote)
+                recebidos[0] += len(lote)
+
+        # Cada usuário conversa com um par: salas "u_(u+metade)"
+        metade = usuarios // 2
+        salas = [f"{u}_{u + metade}" for u in range(1, metade + 1)]
+        mensagens_por_sala = 3
+
+        tarefas = [asyncio.create_task(stream(c, mensagens_por_sala)) for c in conexoes]
+        inicio = time.perf_counter()
+        for n in range(mensagens_por_sala):
+            for sala_id in salas:
+                await gerenciador.broadcast_para_sala(sala_id, {"tipo": "nova_mensagem", "n": n})
+        await asyncio.wait_for(asyncio.gather(*tarefas), timeout=60)
+        duracao = time.perf_counter() - inicio
+
+        estatisticas = gerenciador.obter_estatisticas()
+        assert recebidos[0] == len(conexoes) * mensagens_por_sala
+        assert estatisticas["total_conexoes"] == 10000
+        assert estatisticas["eventos_descartados"] == 0
+        # Conexão ociosa ocupa poucos KB (objeto, deque, conjunto e evento)
+        assert estatisticas["memoria_media_por_conexao_bytes"] < 4096
+        assert duracao < 30
+
+        for conexao in conexoes:
+            await gerenciador.desconectar(conexao)
+        assert gerenciador.obter_estatisticas()["total_usuarios_ativos"] == 0
@@ -0,0 +1,198 @@
+"""
+Testes do cache de configurações (util/config_cache.py)
+
+Cobre:
+- Carga de todas as chaves de uma vez
+- Recarga quando outro processo altera a tabela (versão em versao_dados)
+- Intervalo mínimo entre verificações de versão (TTL padrão e por chave)
+- Stale-while-revalidate e backoff após erros do banco
+- Conversão tipada feita uma única vez por carga
+"""
+import sqlite3
+
+
+def _inserir_configuracao(chave: str, valor: str) -> None:
+    """Grava direto no banco, como faria outro worker"""
+    from util.db_util import obter_conexao
+
+    with obter_conexao() as conn:
+        conn.execute(
+            "INSERT INTO configuracao (chave, valor) VALUES (?, ?) "
+            "ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor",
+            (chave, valor),
+        )
+
+
+class TestConfigCache:
+    """Testes da classe ConfigCache"""
+
+    def test_precarregar_carrega_todas_as_chaves(self, client):
+        """precarregar deve trazer todas as configurações em uma consulta"""
+        from util.config_cache import config
+
+        _inserir_configuracao("chave_a", "1")
+        _inserir_configuracao("chave_b", "2")
+
+        assert config.precarregar()
+        cargas = config.obter_estatisticas()["cargas"]
+
+        assert config.obter("chave_a") == "1"
+        assert config.obter("chave_b") == "2"
+        assert config.obter("inexistente", "padrao") == "padrao"
+        assert config.obter_estatisticas()["cargas"] == cargas
+
+    def test_alteracao_de_outro_processo_recarrega(self, client, monkeypatch):
+        """Escrita direta no banco muda a versão e o cache recarrega"""
+        from util import config_cache
+        from util.config_cache import config
+
+        monkeypatch.setattr(config_cache, "CONFIG_VERSAO_INTERVALO_SEGUNDOS", 0)
+        _inserir_configuracao("limite", "10")
+        assert config.obter_int("limite", 0) == 10
+
+        _inserir_configuracao("limite", "20")
+
+        # TTL vencido: valor antigo servido enquanto revalida em segundo plano
+        assert config.obter_int("limite", 0) == 10
+        config.aguardar_revalidacao()
+        assert config.obter_int("limite", 0) == 20
+        assert config.obter_estatisticas()["obsoletos"] >= 1
+
+    def test_fora_da_janela_stale_revalida_na_chamada(self, client, monkeypatch):
+        """Valor vencido há mais que CONFIG_STALE_SEGUNDOS não é servido"""
+        from util import config_cache
+        from util.config_cache import config
+
+        monkeypatch.setattr(config_cache, "CONFIG_VERSAO_INTERVALO_SEGUNDOS", 0)
+        monkeypatch.setattr(config_cache, "CONFIG_STALE_SEGUNDOS", 0)
+        _inserir_configuracao("limite", "10")
+        assert config.obter("limite") == "10"
+
+        _inserir_configuracao("limite", "20")
+
+        assert config.obter("limite") == "20"
+
+    def test_ttl_por_chave(self, client, monkeypatch):
+        """definir_ttl faz a chave conferir o banco com outra frequência"""
+        from util import config_cache
+        from util.config_cache import config
+
+        monkeypatch.setattr(config_cache, "CONFIG_VERSAO_INTERVALO_SEGUNDOS", 60)
+        monkeypatch.setattr(config_cache, "CONFIG_STALE_SEGUNDOS", 0)
+        monkeypatch.setattr(config, "_ttls", {})
+        config.definir_ttl("volatil", 0)
+        _inserir_configuracao("volatil", "a")
+        _inserir_configuracao("estavel", "a")
+        assert config.obter("volatil") == "a"
+
+        _inserir_configuracao("volatil", "b")
+
+        assert config.obter("volatil") == "b"
+        # Chaves sem TTL próprio continuam servidas da memória
+        verificacoes = config.obter_estatisticas()["verificacoes"]
+        assert config.obter("estavel") == "a"
+        assert config.obter_estatisticas()["verificacoes"] == verificacoes
+
+    def test_erro_no_banco_serve_ultimo_valor_com_backoff(self, client, monkeypatch):
+        """Com o banco travado, o último valor é servido sem novas consultas"""
+        from repo import configuracao_repo
+        from util import config_cache
+        from util.config_cache import config
+
+        _inserir_configuracao("limite", "10")
+        assert config.obter_int("limite", 0) == 10
+
+        consultas = []
+
+        def banco_travado():
+            consultas.append(1)
+            raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(config_cache, "CONFIG_VERSAO_INTERVALO_SEGUNDOS", 0)
+        monkeypatch.setattr(config_cache, "CONFIG_STALE_SEGUNDOS", 0)
+        monkeypatch.setattr(configuracao_repo, "obter_todos", banco_travado)
+        _inserir_configuracao("limite", "20")
+        antes = config.obter_estatisticas()
+
+        for _ in range(10):
+            assert config.obter_int("limite", 0) == 10
+
+        depois = config.obter_estatisticas()
+        assert len(consultas) == 1
+        assert depois["erros"] - antes["erros"] == 1
+        assert depois["backoff"] - antes["backoff"] == 9
+        assert depois["em_backoff"]
+
+    def test_chave_ausente_nao_consulta_banco(self, client, monkeypatch):
+        """Chaves inexistentes são respondidas pelo snapshot em memória"""
+        from util import config_cache
+        from util.config_cache import config
+
+        monkeypatch.setattr(config_cache, "CONFIG_VERSAO_INTERVALO_SEGUNDOS", 60)
+        config.precarregar()
+        cargas = config.obter_estatisticas()["cargas"]
+
+        for _ in range(5):
+            assert config.obter_int("nao_existe", 3) == 3
+
+        estatisticas = config.obter_estatisticas()
+        assert estatisticas["ausentes"] >= 5
+        assert estatisticas["cargas"] == cargas
+
+    def test_versao_consultada_no_maximo_uma_vez_por_intervalo(self, client, monkeypatch):
+        """Dentro do intervalo, leituras não consultam o banco"""
+        from util import config_cache
+        from util.config_cache import config
+
+        monkeypatch.setattr(config_cache, "CONFIG_VERSAO_INTERVALO_SEGUNDOS", 60)
+        _inserir_configuracao("limite", "10")
+        assert config.obter("limite") == "10"
+        verificacoes = config.obter_estatisticas()["verificacoes"]
+
+        _inserir_configuracao("limite", "20")
+
+        # Valor antigo até o fim do intervalo...
+        assert config.obter("limite") == "10"
+        assert config.obter_estatisticas()["verificacoes"] == verificacoes
+        # ...ou até limpar() ser chamado explicitamente
+        config.limpar()
+        assert config.obter("limite") == "20"
+
+    def test_conversao_tipada_feita_uma_vez(self, client, monkeypatch):
+        """obter_int repetido reaproveita o valor convertido"""
+        from util import config_cache
+        from util.config_cache import config
+
+        _inserir_configuracao("numero", "42")
+        chamadas = []
+        original = config_cache.logger.error
+        monkeypatch.setattr(config_cache.logger, "error", lambda msg: chamadas.append(msg) or original(msg))
+
+        assert config.obter_int("numero", 0) == 42
+        assert config.obter_int("numero", 0) == 42
+        assert ("numero", "int") in config._tipados
+
+        _inserir_configuracao("invalido", "abc")
+        config.limpar()
+        assert config.obter_int("invalido", 7) == 7
+        assert config.obter_int("invalido", 7) == 7
+        # Valor inválido registrado no log uma única vez
+        assert len([m for m in chamadas if "invalido" in m]) == 1
+
+    def test_obter_bool(self, client):
+        """Valores verdadeiros aceitos em português e inglês"""
+        from util.config_cache import config
+
+        _inserir_configuracao("ativo", "sim")
+        _inserir_configuracao("inativo", "false")
+
+        assert config.obter_bool("ativo", False) is True
+        assert config.obter_bool("inativo", True) is False
+        assert config.obter_bool("ausente", True) is True
+
+    def test_estatisticas_no_health(self, admin_autenticado):
+        """Métricas do cache devem aparecer no /health/detalhes"""
+        dados = admin_autenticado.get("/health/detalhes").json()
+
+        for campo in ("versao", "cargas", "hits", "misses", "erros"):
+            assert campo in dados["config_cache"]
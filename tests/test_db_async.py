@@ -0,0 +1,121 @@
+"""
+Testes do acesso assíncrono ao banco (util/db_async.py)
+Testa execução fora do event loop, propagação de erros e latência
+"""
+import asyncio
+import time
+
+import pytest
+
+
+# Consulta propositalmente lenta (~0,1-0,3s) para simular uma listagem pesada
+CONSULTA_LENTA = """
+    WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 300000)
+    SELECT SUM(x) FROM c
+"""
+
+
+def _consulta_lenta() -> int:
+    from util.db_util import obter_conexao
+
+    with obter_conexao(somente_leitura=True) as conn:
+        return conn.execute(CONSULTA_LENTA).fetchone()[0]
+
+
+def _percentil(valores: list[float], percentil: float) -> float:
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(percentil / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+async def _medir_latencia_chat(carga, duracao: float = 1.0, intervalo: float = 0.005) -> list[float]:
+    """
+    Mede o atraso do event loop (como um stream SSE perceberia) enquanto
+    `carga` executa requisições de página em paralelo.
+    """
+    atrasos: list[float] = []
+    fim = time.perf_counter() + duracao
+
+    async def tick_chat():
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            await asyncio.sleep(intervalo)
+            atrasos.append(time.perf_counter() - inicio - intervalo)
+
+    async def paginas():
+        while time.perf_counter() < fim:
+            await carga()
+
+    await asyncio.gather(tick_chat(), paginas())
+    return atrasos
+
+
+class TestExecutarDb:
+    """Testes da função executar_db"""
+
+    async def test_retorna_resultado_da_funcao(self):
+        """Deve repassar argumentos e devolver o retorno da função"""
+        from util.db_async import executar_db
+
+        def somar(a, b, extra=0):
+            return a + b + extra
+
+        assert await executar_db(somar, 1, 2, extra=3) == 6
+
+    async def test_propaga_excecao(self):
+        """Exceções da função devem chegar ao chamador"""
+        from util.db_async import executar_db, obter_estatisticas_executor
+
+        def falhar():
+            raise ValueError("erro simulado")
+
+        falhas_antes = obter_estatisticas_executor()["falhas"]
+        with pytest.raises(ValueError):
+            await executar_db(falhar)
+        assert obter_estatisticas_executor()["falhas"] == falhas_antes + 1
+
+    async def test_executa_fora_do_event_loop(self):
+        """A função deve rodar em uma thread do executor dedicado"""
+        import threading
+        from util.db_async import executar_db
+
+        nome_thread = await executar_db(lambda: threading.current_thread().name)
+        assert nome_thread.startswith("db")
+
+    async def test_repositorio_via_executor(self):
+        """Funções de repositório devem funcionar normalmente pelo executor"""
+        from util.db_async import executar_db
+        from repo import usuario_repo
+
+        usuario_repo.criar_tabela()
+        assert await executar_db(usuario_repo.obter_por_email, "inexistente@teste.com") is None
+
+
+@pytest.mark.slow
+class TestBenchmarkLatencia:
+    """Benchmark: latência p99 do chat sob carga de páginas"""
+
+    async def test_p99_do_chat_com_executor(self):
+        """Consultas pelo executor não devem travar o chat como chamadas diretas"""
+        from util.db_async import executar_db
+
+        async def pagina_bloqueante():
+            _consulta_lenta()
+            await asyncio.sleep(0)
+
+        async def pagina_assincrona():
+            await asyncio.gather(*(executar_db(_consulta_lenta) for _ in range(2)))
+
+        atrasos_bloqueante = await _medir_latencia_chat(pagina_bloqueante)
+        atrasos_assincrono = await _medir_latencia_chat(pagina_assincrona)
+
+        p99_bloqueante = _percentil(atrasos_bloqueante, 99) * 1000
+        p99_assincrono = _percentil(atrasos_assincrono, 99) * 1000
+        print(
+            f"\nLatência p99 do chat: chamada direta={p99_bloqueante:.1f}ms, "
+            f"executor={p99_assincrono:.1f}ms "
+            f"(ticks: {len(atrasos_bloqueante)} vs {len(atrasos_assincrono)})"
+        )
+
+        assert p99_assincrono < p99_bloqueante / 2
+        assert len(atrasos_assincrono) > len(atrasos_bloqueante)
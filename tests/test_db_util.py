@@ -0,0 +1,188 @@
+"""
+Testes do pool de conexões SQLite (util/db_util.py)
+Testa reutilização de conexões, separação leitura/escrita e métricas
+"""
+import sqlite3
+
+import pytest
+
+
+class TestPoolConexoes:
+    """Testes da classe PoolConexoes"""
+
+    def test_conexao_de_leitura_e_reutilizada(self, tmp_path):
+        """Segunda aquisição deve reutilizar a conexão devolvida (hit)"""
+        from util.db_util import PoolConexoes
+
+        pool = PoolConexoes(str(tmp_path / "pool.db"), tamanho=2)
+
+        conn1 = pool.adquirir(somente_leitura=True)
+        pool.devolver(conn1, somente_leitura=True)
+        conn2 = pool.adquirir(somente_leitura=True)
+        pool.devolver(conn2, somente_leitura=True)
+
+        assert conn1 is conn2
+        estatisticas = pool.obter_estatisticas()
+        assert estatisticas["misses"] == 1
+        assert estatisticas["hits"] == 1
+        pool.fechar_todas()
+
+    def test_conexao_de_leitura_rejeita_escrita(self, tmp_path):
+        """Conexões de leitura usam query_only e não aceitam escrita"""
+        from util.db_util import PoolConexoes
+
+        pool = PoolConexoes(str(tmp_path / "pool.db"), tamanho=1)
+
+        conn = pool.adquirir(somente_leitura=True)
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("CREATE TABLE teste (id INTEGER)")
+        pool.devolver(conn, somente_leitura=True)
+        pool.fechar_todas()
+
+    def test_pool_esgotado_gera_timeout(self, tmp_path):
+        """Sem conexões livres, a aquisição deve falhar após o timeout"""
+        from util.db_util import PoolConexoes
+
+        pool = PoolConexoes(str(tmp_path / "pool.db"), tamanho=1, timeout=0.05)
+
+        conn = pool.adquirir(somente_leitura=True)
+        with pytest.raises(sqlite3.OperationalError):
+            pool.adquirir(somente_leitura=True)
+
+        assert pool.obter_estatisticas()["timeouts"] == 1
+        pool.devolver(conn, somente_leitura=True)
+        pool.fechar_todas()
+
+    def test_conexao_de_escrita_e_unica(self, tmp_path):
+        """A conexão de escrita é única e reaproveitada entre aquisições"""
+        from util.db_util import PoolConexoes
+
+        pool = PoolConexoes(str(tmp_path / "pool.db"), tamanho=1)
+
+        conn1 = pool.adquirir()
+        pool.devolver(conn1)
+        conn2 = pool.adquirir()
+        pool.devolver(conn2)
+
+        assert conn1 is conn2
+        pool.fechar_todas()
+
+
+class TestObterConexao:
+    """Testes do context manager obter_conexao"""
+
+    def test_chamada_aninhada_reutiliza_conexao(self):
+        """Chamadas aninhadas na mesma thread reutilizam a conexão externa"""
+        from util.db_util import obter_conexao
+
+        with obter_conexao() as externa:
+            with obter_conexao(somente_leitura=True) as interna:
+                assert interna is externa
+
+    def test_rollback_em_caso_de_erro(self):
+        """Exceção dentro do contexto deve desfazer a transação"""
+        from util.db_util import obter_conexao
+
+        with obter_conexao() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS teste_pool (valor TEXT)")
+            conn.execute("DELETE FROM teste_pool")
+
+        with pytest.raises(RuntimeError):
+            with obter_conexao() as conn:
+                conn.execute("INSERT INTO teste_pool (valor) VALUES ('x')")
+                raise RuntimeError("falha simulada")
+
+        with obter_conexao(somente_leitura=True) as conn:
+            total = conn.execute("SELECT COUNT(*) FROM teste_pool").fetchone()[0]
+        assert total == 0
+
+    def test_estatisticas_expostas(self):
+        """Métricas do pool global devem estar disponíveis"""
+        from util.db_util import obter_conexao, obter_estatisticas_pool
+
+        with obter_conexao(somente_leitura=True):
+            pass
+        estatisticas = obter_estatisticas_pool()
+        for chave in ("hits", "misses", "esperas", "timeouts", "tamanho"):
+            assert chave in estatisticas
+
+
+class TestPerfilPragmas:
+    """Testes do perfil de PRAGMAs e do checkpoint do WAL"""
+
+    def test_conexoes_do_pool_recebem_perfil(self, tmp_path):
+        """Cada conexão nova deve receber os PRAGMAs por conexão"""
+        from util.db_util import PoolConexoes, obter_perfil_pragmas
+
+        perfil = obter_perfil_pragmas()
+        pool = PoolConexoes(str(tmp_path / "pool.db"), tamanho=1)
+
+        conn = pool.adquirir(somente_leitura=True)
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == perfil["busy_timeout"]
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == perfil["cache_size"]
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        pool.devolver(conn, somente_leitura=True)
+        pool.fechar_todas()
+
+    def test_aplicar_perfil_ativa_wal(self):
+        """O startup deve colocar o banco em modo WAL"""
+        from util.db_util import aplicar_perfil_pragmas
+
+        efetivo = aplicar_perfil_pragmas()
+        assert efetivo["journal_mode"] == "WAL"
+        assert efetivo["synchronous"] == 1  # NORMAL
+
+    def test_valor_de_pragma_invalido(self):
+        """Valores fora da lista permitida não podem chegar ao SQL"""
+        from util.db_util import checkpoint_wal
+
+        with pytest.raises(ValueError):
+            checkpoint_wal("TRUNCATE; DROP TABLE usuario")
+
+    def test_agendador_registra_checkpoint(self):
+        """Checkpoint manual do agendador deve ser contabilizado"""
+        from util.db_util import AgendadorCheckpoint, aplicar_perfil_pragmas
+
+        aplicar_perfil_pragmas()
+        agendador = AgendadorCheckpoint(intervalo_segundos=0, limite_bytes=0)
+        resultado = agendador.executar()
+
+        assert resultado is not None
+        estatisticas = agendador.obter_estatisticas()
+        assert estatisticas["execucoes"] == 1
+        assert estatisticas["ativo"] is False
+
+    def test_vacuum_completo_so_ao_converter_o_modo(self, monkeypatch):
+        """Com o auto_vacuum já no modo configurado (NONE), não há VACUUM a cada compactação"""
+        from util import db_util
+        from util.db_util import compactar_banco, obter_conexao
+
+        def liberar_paginas():
+            with obter_conexao() as conn:
+                conn.execute("CREATE TABLE teste_vacuum (dados TEXT)")
+                conn.executemany("INSERT INTO teste_vacuum VALUES (?)", [("x" * 2000,)] * 100)
+            with obter_conexao() as conn:
+                conn.execute("DROP TABLE teste_vacuum")
+
+        def aplicar_modo(modo):
+            with obter_conexao() as conn:
+                conn.execute(f"PRAGMA auto_vacuum = {modo}")
+                conn.execute("VACUUM")
+
+        configurado = db_util.DB_AUTO_VACUUM
+        aplicar_modo("NONE")
+        try:
+            monkeypatch.setattr(db_util, "DB_AUTO_VACUUM", "NONE")
+            liberar_paginas()
+            compactacao = compactar_banco()
+            assert compactacao["operacao"] is None
+            assert compactacao["paginas_livres_depois"] == compactacao["paginas_livres_antes"] > 0
+
+            # Banco em NONE com INCREMENTAL configurado: conversão única
+            monkeypatch.setattr(db_util, "DB_AUTO_VACUUM", "INCREMENTAL")
+            assert compactar_banco()["operacao"] == "vacuum"
+            liberar_paginas()
+            assert compactar_banco()["operacao"] == "incremental_vacuum"
+        finally:
+            # O banco fica no modo configurado, como após qualquer compactação
+            aplicar_modo(configurado)
@@ -0,0 +1,145 @@
+"""
+Testes de regressão dos índices (sql/indices_sql.py)
+
+Para cada consulta frequente, verifica via EXPLAIN QUERY PLAN que o SQLite
+usa o índice esperado e não cai em varredura completa da tabela.
+"""
+import re
+import sqlite3
+
+import pytest
+
+from sql import (
+    artigo_sql,
+    categoria_sql,
+    chamado_interacao_sql,
+    chamado_sql,
+    chat_mensagem_sql,
+    chat_participante_sql,
+    chat_sala_sql,
+    configuracao_sql,
+    indices_sql,
+    usuario_sql,
+)
+
+
+def _pagina_publicados(ordem: str, categoria_id: int = 0) -> str:
+    """Consulta keyset como montada pelo repositório (página após um cursor)"""
+    coluna, direcao = artigo_sql.ORDENACOES_PUBLICADOS[ordem]
+    operador = "<" if direcao == "DESC" else ">"
+    filtro = artigo_sql.FILTRO_CATEGORIA if categoria_id else ""
+    filtro += " " + artigo_sql.FILTRO_CURSOR.format(coluna=coluna, operador=operador)
+    return artigo_sql.LISTAR_PUBLICADOS_PAGINA.format(coluna=coluna, direcao=direcao, filtro=filtro)
+
+
+def _pagina_por_usuario() -> str:
+    coluna, direcao = artigo_sql.ORDENACAO_POR_USUARIO
+    filtro = artigo_sql.FILTRO_CURSOR.format(coluna=coluna, operador="<")
+    return artigo_sql.LISTAR_POR_USUARIO_PAGINA.format(coluna=coluna, direcao=direcao, filtro=filtro)
+
+
+# (descrição, consulta, parâmetros, índice esperado)
+CONSULTAS_FREQUENTES = [
+    ("artigos publicados", artigo_sql.OBTER_PUBLICADOS, (), "idx_artigo_status_publicacao"),
+    ("últimos publicados", artigo_sql.OBTER_ULTIMOS_PUBLICADOS, (6,), "idx_artigo_status_publicacao"),
+    # Qualquer índice iniciado por status serve (o planejador escolhe o menor)
+    ("quantidade de publicados", artigo_sql.OBTER_QUANTIDADE_PUBLICADOS, (), "idx_artigo_status_"),
+    ("artigos por categoria", artigo_sql.OBTER_POR_CATEGORIA, (1,), "idx_artigo_categoria"),
+    ("artigos do autor", artigo_sql.OBTER_POR_USUARIO, (1,), "idx_artigo_usuario"),
+    ("página de recentes", _pagina_publicados("recentes"), ("x", 1, 13), "idx_artigo_status_publicacao"),
+    ("página de antigos", _pagina_publicados("antigos"), ("x", 1, 13), "idx_artigo_status_publicacao"),
+    ("página de mais lidos", _pagina_publicados("visualizacoes"), (5, 1, 13), "idx_artigo_status_visualizacoes"),
+    ("página da categoria", _pagina_publicados("recentes", 1), (1, "x", 1, 13), "idx_artigo_categoria"),
+    ("mais lidos da categoria", _pagina_publicados("visualizacoes", 1), (1, 5, 1, 13), "idx_artigo_categoria_visualizacoes"),
+    ("página do autor", _pagina_por_usuario(), (1, "x", 1, 13), "idx_artigo_usuario"),
+    ("chamados do usuário", chamado_sql.OBTER_POR_USUARIO, (1,), "idx_chamado_usuario_status"),
+    ("chamados abertos do usuário", chamado_sql.CONTAR_ABERTOS_POR_USUARIO, (1,), "idx_chamado_usuario_status"),
+    ("chamados pendentes", chamado_sql.CONTAR_PENDENTES, (), "idx_chamado_pendentes"),
+    ("histórico do chamado", chamado_interacao_sql.OBTER_POR_CHAMADO, (1,), "idx_chamado_interacao_chamado"),
+    ("resposta do admin", chamado_interacao_sql.TEM_RESPOSTA_ADMIN, (1,), "idx_chamado_interacao_chamado"),
+    ("interações não lidas", chamado_interacao_sql.CONTAR_NAO_LIDAS_POR_CHAMADO, (1,), "idx_chamado_interacao_nao_lidas"),
+    ("marcar interações lidas", chamado_interacao_sql.MARCAR_COMO_LIDAS, ("x", 1, 1), "idx_chamado_interacao_nao_lidas"),
+    ("mensagens recentes da sala", chat_mensagem_sql.LISTAR_RECENTES_POR_SALA, ("1_2", 50) * 2 + (50,), "idx_chat_mensagem_sala"),
+    ("mensagens anteriores", chat_mensagem_sql.LISTAR_ANTERIORES_POR_SALA, ("1_2", 100, 50) * 2 + (50,), "idx_chat_mensagem_sala"),
+    ("mensagens posteriores", chat_mensagem_sql.LISTAR_POSTERIORES_POR_SALA, ("1_2", 100, 50) * 2 + (50,), "idx_chat_mensagem_sala"),
+    ("arquivo: recentes da sala", chat_mensagem_sql.LISTAR_RECENTES_POR_SALA, ("1_2", 50) * 2 + (50,), "idx_chat_mensagem_arquivo_sala"),
+    ("arquivo: anteriores", chat_mensagem_sql.LISTAR_ANTERIORES_POR_SALA, ("1_2", 100, 50) * 2 + (50,), "idx_chat_mensagem_arquivo_sala"),
+    ("mensagens perdidas no SSE", chat_mensagem_sql.LISTAR_POSTERIORES_DO_USUARIO, (100, 1, 50), "idx_chat_mensagem_sala"),
+    ("última mensagem da sala", chat_mensagem_sql.OBTER_ULTIMA_MENSAGEM_SALA, ("1_2",), "idx_chat_mensagem_sala"),
+    ("marcar mensagens lidas", chat_mensagem_sql.MARCAR_COMO_LIDAS, ("x", "1_2", 1), "idx_chat_mensagem_sala"),
+    ("salas do usuário", chat_participante_sql.LISTAR_POR_USUARIO, (1,), "idx_chat_participante_usuario"),
+    ("conversas do usuário", chat_participante_sql.LISTAR_CONVERSAS, (1, 12, 0), "idx_chat_participante_usuario"),
+    ("total de não lidas", chat_participante_sql.SOMAR_NAO_LIDAS_POR_USUARIO, (1,), "idx_chat_participante_nao_lidas"),
+    ("usuários por perfil", "SELECT id FROM usuario WHERE perfil = ?", ("Admin",), "idx_usuario_perfil"),
+]
+
+
+TABELAS = (
+    "usuario", "configuracao", "categoria", "artigo", "chamado",
+    "chamado_interacao", "chat_sala", "chat_participante", "chat_mensagem",
+    "chat_mensagem_arquivo",
+)
+
+
+@pytest.fixture(scope="module")
+def banco_com_indices():
+    """Banco em memória com todas as tabelas e índices da aplicação"""
+    conn = sqlite3.connect(":memory:")
+    for modulo in (
+        usuario_sql, configuracao_sql, categoria_sql, artigo_sql, chamado_sql,
+        chamado_interacao_sql, chat_sala_sql, chat_participante_sql, chat_mensagem_sql,
+    ):
+        conn.execute(modulo.CRIAR_TABELA)
+    conn.execute(chat_mensagem_sql.CRIAR_TABELA_ARQUIVO)
+    for indice in indices_sql.TODOS_INDICES:
+        conn.execute(indice)
+    yield conn
+    conn.close()
+
+
+def _plano(conn: sqlite3.Connection, consulta: str, parametros: tuple) -> list[str]:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {consulta}", parametros)]
+
+
+def _nomes_de_tabela(consulta: str) -> set[str]:
+    """Nomes e aliases que se referem a tabelas reais (exclui CTEs)."""
+    nomes = set(TABELAS)
+    for tabela in TABELAS:
+        for alias in re.findall(rf"\b{tabela}\s+(?:AS\s+)?(\w+)", consulta, re.IGNORECASE):
+            if alias.upper() not in ("ON", "WHERE", "SET", "JOIN", "LEFT", "INNER", "ORDER", "GROUP"):
+                nomes.add(alias)
+    return nomes
+
+
+class TestIndices:
+    """Testes do conjunto de índices"""
+
+    def test_todos_os_indices_sao_criados(self, banco_com_indices):
+        """Cada comando de TODOS_INDICES deve gerar um índice no banco"""
+        nomes_declarados = {
+            re.search(r"IF NOT EXISTS (\w+)", indice).group(1)
+            for indice in indices_sql.TODOS_INDICES
+        }
+        nomes_criados = {
+            row[0] for row in banco_com_indices.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'"
+            )
+        }
+        assert nomes_declarados == nomes_criados
+
+    @pytest.mark.parametrize(
+        "descricao,consulta,parametros,indice",
+        CONSULTAS_FREQUENTES,
+        ids=[c[0] for c in CONSULTAS_FREQUENTES],
+    )
+    def test_consulta_usa_indice(self, banco_com_indices, descricao, consulta, parametros, indice):
+        """Consulta frequente deve usar o índice esperado, sem varredura completa"""
+        plano = _plano(banco_com_indices, consulta, parametros)
+
+        assert any(indice in passo for passo in plano), f"{descricao}: {plano}"
+        tabelas = _nomes_de_tabela(consulta)
+        varreduras = [
+            passo for passo in plano
+            if (varredura := re.match(r"SCAN (\w+)$", passo)) and varredura.group(1) in tabelas
+        ]
+        assert not varreduras, f"{descricao} faz varredura completa: {varreduras}"
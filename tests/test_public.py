@@ -135,6 +135,27 @@ class TestHealthCheck:
         response = client.get("/health")
         assert response.status_code == status.HTTP_200_OK
 
+    def test_health_nao_expoe_metricas_internas(self, client):
+        """O /health público traz só o status; os detalhes exigem admin"""
+        assert client.get("/health").json() == {"status": "healthy"}
+
+        response = client.get("/health/detalhes", follow_redirects=False)
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+
+    def test_health_detalhes_para_admin(self, admin_autenticado):
+        """Admin vê as métricas de pool, executor, caches, limiters e chat"""
+        response = admin_autenticado.get("/health/detalhes")
+
+        assert response.status_code == status.HTTP_200_OK
+        dados = response.json()
+        for chave in ("pool_conexoes", "executor_db", "rate_limiters", "chat", "chat_escritor"):
+            assert chave in dados
+
+    def test_health_detalhes_nega_autor(self, cliente_autenticado):
+        """Autor comum não vê as métricas internas"""
+        response = cliente_autenticado.get("/health/detalhes", follow_redirects=False)
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+
 
 class TestErros:
     """Testes de páginas de erro"""
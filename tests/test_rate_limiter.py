@@ -0,0 +1,440 @@
+"""
+Testes do rate limiter (util/rate_limiter.py)
+
+Cobre:
+- Bloqueio ao atingir o máximo na janela deslizante
+- Ponderação da janela anterior e tempo até o reset
+- Limite de identificadores em memória (descarte do usado há mais tempo)
+- Remoção de identificadores expirados e estatísticas no registro
+- Armazenamento SQLite compartilhado entre workers
+"""
+import threading
+
+import pytest
+
+
+class _Relogio:
+    """Relógio controlado pelos testes (segundos)"""
+
+    def __init__(self, inicio: float = 0.0):
+        self.momento = inicio
+
+    def __call__(self) -> float:
+        return self.momento
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    from util import rate_limiter
+
+    relogio = _Relogio()
+    monkeypatch.setattr(rate_limiter, "_agora", relogio)
+    return relogio
+
+
+class TestRateLimiter:
+    """Testes da janela deslizante por contadores"""
+
+    def test_bloqueia_ao_atingir_maximo(self, relogio):
+        """A tentativa além do máximo é bloqueada"""
+        from util.rate_limiter import RateLimiter
+
+        limiter = RateLimiter(max_tentativas=3, janela_minutos=1, nome="teste_maximo")
+
+        assert [limiter.verificar("1.1.1.1") for _ in range(4)] == [True, True, True, False]
+        assert limiter.verificar("2.2.2.2")
+        assert limiter.obter_tentativas_restantes("1.1.1.1") == 0
+        assert limiter.obter_tentativas_restantes("3.3.3.3") == 3
+
+    def test_janela_anterior_conta_proporcionalmente(self, relogio):
+        """Metade da janela anterior ainda dentro da janela deslizante conta pela metade"""
+        from util.rate_limiter import RateLimiter
+
+        limiter = RateLimiter(max_tentativas=4, janela_minutos=1, nome="teste_ponderacao")
+        for _ in range(4):
+            assert limiter.verificar("ip")
+
+        # Metade da janela seguinte: 4 * 0.5 = 2 tentativas ainda contam
+        relogio.momento = 90
+        assert limiter.obter_tentativas_restantes("ip") == 2
+        assert limiter.verificar("ip")
+        assert limiter.verificar("ip")
+        assert not limiter.verificar("ip")
+
+        # Duas janelas depois, tudo expirou
+        relogio.momento = 180
+        assert limiter.obter_tentativas_restantes("ip") == 4
+
+    def test_tempo_reset(self, relogio):
+        """Tempo até reset indica quando uma nova tentativa será aceita"""
+        from util.rate_limiter import RateLimiter
+
+        limiter = RateLimiter(max_tentativas=2, janela_minutos=1, nome="teste_reset")
+        relogio.momento = 30
+        limiter.verificar("ip")
+        limiter.verificar("ip")
+
+        tempo = limiter.obter_tempo_reset("ip")
+
+        assert tempo is not None
+        relogio.momento += tempo.total_seconds() + 0.01
+        assert limiter.verificar("ip")
+        assert limiter.obter_tempo_reset("outro") is None
+
+    def test_limite_de_identificadores(self, relogio):
+        """Acima de max_identificadores, o usado há mais tempo é descartado"""
+        from util.rate_limiter import RateLimiter
+
+        limiter = RateLimiter(
+            max_tentativas=1, janela_minutos=1, nome="teste_capacidade", max_identificadores=3
+        )
+        for ip in ("a", "b", "c"):
+            limiter.verificar(ip)
+        limiter.verificar("a")  # "a" passa a ser o mais recente
+        limiter.verificar("d")
+
+        estatisticas = limiter.obter_estatisticas()
+        assert estatisticas["identificadores_ativos"] == 3
+        assert estatisticas["descartados_capacidade"] == 1
+        # "b" foi descartado e "a" continua bloqueado
+        assert limiter.obter_tentativas_restantes("b") == 1
+        assert not limiter.verificar("a")
+
+    def test_remover_expirados(self, relogio):
+        """Identificadores sem tentativas nas duas últimas janelas são removidos"""
+        from util.rate_limiter import RateLimiter
+
+        limiter = RateLimiter(max_tentativas=5, janela_minutos=1, nome="teste_expirados")
+        limiter.verificar("antigo")
+        relogio.momento = 60
+        limiter.verificar("recente")
+
+        assert limiter.remover_expirados() == 0
+        relogio.momento = 125
+        assert limiter.remover_expirados() == 1
+        assert limiter.identificadores_ativos == 1
+
+
+class TestArmazenamentoSQLite:
+    """Testes do armazenamento compartilhado na tabela rate_limit"""
+
+    def _limiter(self, nome: str, max_tentativas: int = 3):
+        from util.rate_limit_armazenamento import ArmazenamentoSQLite
+        from util.rate_limiter import RateLimiter
+
+        return RateLimiter(
+            max_tentativas=max_tentativas, janela_minutos=1, nome=nome,
+            armazenamento=ArmazenamentoSQLite(nome),
+        )
+
+    def test_workers_compartilham_o_limite(self, client, relogio):
+        """Dois processos com o mesmo limiter dividem o mesmo orçamento"""
+        worker1 = self._limiter("teste_compartilhado")
+        worker2 = self._limiter("teste_compartilhado")
+
+        assert worker1.verificar("ip")
+        assert worker2.verificar("ip")
+        assert worker1.verificar("ip")
+        assert not worker2.verificar("ip")
+        assert worker1.obter_tentativas_restantes("ip") == 0
+
+    def test_mesma_semantica_da_memoria(self, client, relogio):
+        """Janela anterior ponderada e reset funcionam como no armazenamento em memória"""
+        limiter = self._limiter("teste_sqlite_ponderacao", max_tentativas=4)
+        for _ in range(4):
+            assert limiter.verificar("ip")
+        assert not limiter.verificar("ip")
+        assert limiter.obter_tempo_reset("ip") is not None
+
+        relogio.momento = 90
+        assert limiter.obter_tentativas_restantes("ip") == 2
+        assert limiter.verificar("ip")
+        assert limiter.verificar("ip")
+        assert not limiter.verificar("ip")
+
+    def test_verificacao_atomica_entre_threads(self, client):
+        """Verificações concorrentes nunca ultrapassam o máximo"""
+        limiter = self._limiter("teste_concorrencia", max_tentativas=5)
+        resultados = []
+
+        def tentar():
+            for _ in range(5):
+                resultados.append(limiter.verificar("ip"))
+
+        threads = [threading.Thread(target=tentar) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert resultados.count(True) == 5
+
+    def test_limpar_e_remover_expirados(self, client, relogio):
+        """limpar e remover_expirados apagam as linhas do limiter"""
+        limiter = self._limiter("teste_sqlite_limpeza")
+        limiter.verificar("a")
+        limiter.verificar("b")
+        limiter.limpar("a")
+        assert limiter.identificadores_ativos == 1
+
+        relogio.momento = 600
+        assert limiter.remover_expirados() == 1
+        assert limiter.obter_estatisticas()["armazenamento"] == "sqlite"
+
+    def test_dynamic_rate_limiter_com_sqlite(self, client, relogio):
+        """DynamicRateLimiter continua lendo os limites da configuração"""
+        from util.config_cache import config
+        from util.db_util import obter_conexao
+        from util.rate_limit_armazenamento import ArmazenamentoSQLite
+        from util.rate_limiter import DynamicRateLimiter
+
+        with obter_conexao() as conn:
+            conn.execute("INSERT INTO configuracao (chave, valor) VALUES ('teste_max', '2')")
+        config.limpar()
+
+        limiter = DynamicRateLimiter(
+            "teste_max", "teste_minutos", padrao_max=10, padrao_minutos=1,
+            nome="teste_dinamico_sqlite", armazenamento=ArmazenamentoSQLite("teste_dinamico_sqlite"),
+        )
+
+        assert limiter.verificar("ip")
+        assert limiter.verificar("ip")
+        assert not limiter.verificar("ip")
+
+
+class TestDynamicRateLimiter:
+    """Testes da alteração dos limites pela configuração"""
+
+    @pytest.mark.parametrize("tipo", ["memoria", "sqlite"])
+    def test_mudar_janela_mantem_bloqueio(self, client, relogio, tipo):
+        """Alterar a janela não zera os contadores: o bloqueado continua bloqueado"""
+        from util.config_cache import config
+        from util.db_util import obter_conexao
+        from util.rate_limit_armazenamento import ArmazenamentoMemoria, ArmazenamentoSQLite
+        from util.rate_limiter import DynamicRateLimiter
+
+        nome = f"teste_janela_{tipo}"
+        with obter_conexao() as conn:
+            conn.execute("INSERT INTO configuracao (chave, valor) VALUES ('teste_janela_max', '2')")
+            conn.execute("INSERT INTO configuracao (chave, valor) VALUES ('teste_janela_minutos', '1')")
+        config.limpar()
+        armazenamento = ArmazenamentoSQLite(nome) if tipo == "sqlite" else ArmazenamentoMemoria(100)
+        limiter = DynamicRateLimiter(
+            "teste_janela_max", "teste_janela_minutos", nome=nome, armazenamento=armazenamento,
+        )
+
+        relogio.momento = 130
+        assert limiter.verificar("bloqueado")
+        assert limiter.verificar("bloqueado")
+        assert not limiter.verificar("bloqueado")
+        assert limiter.verificar("outro")
+
+        with obter_conexao() as conn:
+            conn.execute("UPDATE configuracao SET valor = '5' WHERE chave = 'teste_janela_minutos'")
+        config.limpar()
+
+        assert not limiter.verificar("bloqueado")
+        assert limiter.obter_tempo_reset("bloqueado") is not None
+        assert limiter.obter_tentativas_restantes("outro") == 1
+        assert limiter.identificadores_ativos == 2
+
+        # Os contadores expiram conforme a nova janela de 5 minutos
+        relogio.momento = 300 + 150
+        assert limiter.obter_tentativas_restantes("bloqueado") == 1
+        relogio.momento = 600
+        assert limiter.verificar("bloqueado")
+        assert limiter.remover_expirados() == 1
+
+
+class TestRegistroLimiters:
+    """Testes do registro global de limiters"""
+
+    def test_limiters_das_rotas_registrados(self):
+        """Os limiters de módulo aparecem no registro global"""
+        from routes.auth_routes import login_limiter
+        from util.rate_limiter import registro_limiters
+
+        assert registro_limiters.obter("login") is login_limiter
+
+    def test_instancias_avulsas_nao_se_registram(self):
+        """Criar um limiter não o coloca no registro global"""
+        from util.rate_limiter import DynamicRateLimiter, registro_limiters
+
+        DynamicRateLimiter("chave_teste_max", "chave_teste_minutos", nome="teste_registro")
+
+        assert registro_limiters.obter("teste_registro") is None
+
+    def test_nome_duplicado_nao_substitui(self):
+        """Outra instância com o mesmo nome é recusada e a registrada é mantida"""
+        from util.rate_limiter import RateLimiter, RegistroLimiters
+
+        registro = RegistroLimiters()
+        original = RateLimiter(nome="teste_duplicado")
+        registro.definir_politica(original, "GET", ["/duplicado"])
+
+        assert registro.registrar(original)
+        assert not registro.registrar(RateLimiter(nome="teste_duplicado"))
+        assert registro.obter("teste_duplicado") is original
+        with pytest.raises(ValueError):
+            registro.definir_politica(RateLimiter(nome="teste_duplicado"), "GET", ["/outra"])
+        assert registro.obter_politica("GET", "/outra") is None
+
+    def test_estatisticas_de_memoria(self, relogio):
+        """Estatísticas trazem identificadores e memória por limiter e no total"""
+        from util.rate_limiter import RateLimiter, RegistroLimiters
+
+        registro = RegistroLimiters()
+        limiter = RateLimiter(max_tentativas=5, janela_minutos=1, nome="teste_estatisticas")
+        registro.registrar(limiter)
+        for i in range(10):
+            limiter.verificar(f"10.0.0.{i}")
+
+        estatisticas = registro.obter_estatisticas()
+        dados = estatisticas["limiters"]["teste_estatisticas"]
+
+        assert dados["identificadores_ativos"] == 10
+        assert dados["memoria_estimada_bytes"] > 0
+        assert estatisticas["identificadores_ativos"] == 10
+
+    def test_remocao_em_todos_os_limiters(self, relogio):
+        """remover_expirados percorre todos os limiters registrados"""
+        from util.rate_limiter import RateLimiter, RegistroLimiters
+
+        registro = RegistroLimiters()
+        limiters = [RateLimiter(max_tentativas=5, janela_minutos=1, nome=f"teste_remocao_{i}") for i in range(2)]
+        registro.registrar(*limiters)
+        for limiter in limiters:
+            limiter.verificar("ip")
+        relogio.momento = 600
+
+        assert registro.remover_expirados() == 2
+        assert all(limiter.identificadores_ativos == 0 for limiter in limiters)
+
+    def test_estatisticas_no_health(self, admin_autenticado):
+        """Estatísticas dos limiters devem aparecer no /health/detalhes"""
+        dados = admin_autenticado.get("/health/detalhes").json()
+
+        assert "memoria_estimada_bytes" in dados["rate_limiters"]
+        assert "login" in dados["rate_limiters"]["limiters"]
+
+
+class TestMiddlewareRateLimit:
+    """Testes das políticas por rota aplicadas pelo middleware"""
+
+    def _definir_limite(self, chave: str, valor: str) -> None:
+        from util.config_cache import config
+        from util.db_util import obter_conexao
+
+        with obter_conexao() as conn:
+            conn.execute("INSERT INTO configuracao (chave, valor) VALUES (?, ?)", (chave, valor))
+        config.limpar()
+
+    def test_politica_casa_padroes_de_rota(self):
+        """Parâmetros casam um segmento e "*" qualquer sufixo"""
+        from util.rate_limiter import registro_limiters
+
+        assert registro_limiters.obter_politica("GET", "/chat/mensagens/abc").limiter == "chat_listagem"
+        assert registro_limiters.obter_politica("GET", "/chat/mensagens/nao-lidas/total") is None
+        assert registro_limiters.obter_politica("GET", "/exemplos/bootswatch").limiter == "examples_pages"
+        assert registro_limiters.obter_politica("POST", "/") is None
+
+    def test_pagina_bloqueada_retorna_429_com_retry_after(self, client):
+        """Acima do limite, a página pública responde 429 sem chegar ao handler"""
+        self._definir_limite("rate_limit_public_max", "2")
+
+        assert client.get("/sobre").status_code == 200
+        assert client.get("/sobre").status_code == 200
+        resposta = client.get("/sobre")
+
+        assert resposta.status_code == 429
+        assert "Muitas Requisições" in resposta.text
+        assert 1 <= int(resposta.headers["Retry-After"]) <= 60
+
+    def test_api_bloqueada_antes_de_autenticacao_e_csrf(self, client):
+        """POST bloqueado responde JSON 429 sem ler o formulário nem checar CSRF"""
+        self._definir_limite("rate_limit_chat_sala_max", "1")
+
+        primeira = client.post("/chat/salas", data={"outro_usuario_id": "1"}, follow_redirects=False)
+        segunda = client.post("/chat/salas", data={"outro_usuario_id": "1"}, follow_redirects=False)
+
+        assert primeira.status_code != 429
+        assert segunda.status_code == 429
+        assert segunda.json()["detail"].startswith("Muitas tentativas")
+        assert int(segunda.headers["Retry-After"]) >= 1
+
+    def test_rotas_sem_politica_nao_sao_limitadas(self, client):
+        """Rotas sem política declarada passam direto pelo middleware"""
+        self._definir_limite("rate_limit_public_max", "1")
+
+        for _ in range(3):
+            assert client.get("/health").status_code == 200
+
+    def test_retry_after_do_sqlite_fora_do_event_loop(self, client):
+        """Com armazenamento SQLite, o tempo de reset do 429 é lido fora do event loop"""
+        import asyncio
+        from starlette.applications import Starlette
+        from starlette.responses import PlainTextResponse
+        from starlette.routing import Route
+        from starlette.testclient import TestClient
+        from util.rate_limit_armazenamento import ArmazenamentoSQLite
+        from util.rate_limit_middleware import MiddlewareRateLimit
+        from util.rate_limiter import RateLimiter, RegistroLimiters
+
+        chamadas_no_loop = []
+
+        class LimiterObservado(RateLimiter):
+            def obter_tempo_reset(self, identificador):
+                try:
+                    asyncio.get_running_loop()
+                    chamadas_no_loop.append(True)
+                except RuntimeError:
+                    chamadas_no_loop.append(False)
+                return super().obter_tempo_reset(identificador)
+
+        registro = RegistroLimiters()
+        limiter = LimiterObservado(
+            max_tentativas=1, janela_minutos=1, nome="teste_middleware_sqlite",
+            armazenamento=ArmazenamentoSQLite("teste_middleware_sqlite"),
+        )
+        registro.definir_politica(limiter, "GET", ["/limitada"])
+        app = Starlette(routes=[Route("/limitada", lambda request: PlainTextResponse("ok"))])
+        app.add_middleware(MiddlewareRateLimit, registro=registro)
+
+        with TestClient(app) as cliente:
+            assert cliente.get("/limitada").status_code == 200
+            resposta = cliente.get("/limitada")
+
+        assert resposta.status_code == 429
+        assert int(resposta.headers["Retry-After"]) >= 1
+        assert chamadas_no_loop == [False]
+
+    def test_verificacao_do_sqlite_no_handler_fora_do_event_loop(self, client, monkeypatch):
+        """Checagens feitas nos handlers (login) também não bloqueiam o event loop"""
+        import asyncio
+        from routes import auth_routes
+        from util.rate_limit_armazenamento import ArmazenamentoSQLite
+        from util.rate_limiter import RateLimiter
+
+        chamadas_no_loop = []
+
+        class LimiterObservado(RateLimiter):
+            def verificar(self, identificador):
+                try:
+                    asyncio.get_running_loop()
+                    chamadas_no_loop.append(True)
+                except RuntimeError:
+                    chamadas_no_loop.append(False)
+                return super().verificar(identificador)
+
+        limiter = LimiterObservado(
+            max_tentativas=1, janela_minutos=1, nome="teste_handler_sqlite",
+            armazenamento=ArmazenamentoSQLite("teste_handler_sqlite"),
+        )
+        monkeypatch.setattr(auth_routes, "login_limiter", limiter)
+
+        dados = {"email": "inexistente@teste.com", "senha": "Senha@123"}
+        client.post("/login", data=dados)
+        resposta = client.post("/login", data=dados)
+
+        assert "Muitas tentativas de login" in resposta.text
+        assert chamadas_no_loop == [False, False]
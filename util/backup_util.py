@@ -3,15 +3,41 @@ Módulo de gerenciamento de backups do banco de dados SQLite.
 
 Fornece funções para criar, listar, restaurar e excluir backups do banco de dados.
 Os backups são armazenados no diretório 'backups/' com nomenclatura padronizada.
+
+Os backups são online: a cópia usa a API de backup do SQLite
+(sqlite3.Connection.backup) dentro de uma transação de leitura, em passos
+de BACKUP_PAGINAS_POR_PASSO páginas. O resultado é um retrato consistente
+do banco no início da cópia, mesmo com escritas simultâneas (no modo WAL
+as escritas não esperam a cópia terminar). O arquivo é gravado com nome
+temporário e renomeado só no fim, para que um backup pela metade nunca
+apareça na listagem.
+
+A restauração usa a mesma API no sentido inverso: o backup escolhido é
+copiado para o banco em uso, sem substituir arquivos que outras conexões
+(pool, threads de fundo, outros workers) mantêm abertos.
+
+Pela interface administrativa, iniciar_backup() e iniciar_restauracao()
+executam a operação em uma thread própria e devolvem uma TarefaBackup,
+cujo progresso é consultado por GET /admin/backups/tarefas/{id}.
 """
-import shutil
+import asyncio
 import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List
+from typing import Callable, Optional, List
 from dataclasses import dataclass
 
-from util.config import DATABASE_PATH
+from util.config import BACKUP_PAGINAS_POR_PASSO, BACKUP_PAUSA_MS, DB_BUSY_TIMEOUT_MS
+from util.db_util import DATABASE_PATH
+from util.contador_visualizacoes import contador_visualizacoes
+from util.cache_paginas import cache_paginas
+from util.cache_versionado import invalidar_caches_versionados
+from util.config_cache import config
 from util.logger_config import logger
 from util.datetime_util import agora
 
@@ -38,6 +64,62 @@ class BackupInfo:
     tipo: str  # "manual" ou "automático"
 
 
+@dataclass
+class TarefaBackup:
+    """Backup ou restauração em segundo plano (ver iniciar_backup e iniciar_restauracao)"""
+    id: str
+    nome_arquivo: str
+    tipo: str  # "manual" ou "automático"
+    operacao: str = "backup"  # "backup" ou "restauracao"
+    status: str = "pendente"  # "pendente", "executando", "concluido" ou "erro"
+    paginas_copiadas: int = 0
+    paginas_total: int = 0
+    mensagem: str = ""
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
+    backup_seguranca: Optional[str] = None  # criado antes de uma restauração
+
+    @property
+    def finalizada(self) -> bool:
+        return self.status in ("concluido", "erro")
+
+    @property
+    def progresso(self) -> float:
+        """Percentual de páginas copiadas (0 a 100)"""
+        if self.status == "concluido":
+            return 100.0
+        if not self.paginas_total:
+            return 0.0
+        return round(100 * self.paginas_copiadas / self.paginas_total, 1)
+
+    def para_dict(self) -> dict:
+        """Representação JSON usada pela página de backups"""
+        return {
+            "id": self.id,
+            "nome_arquivo": self.nome_arquivo,
+            "tipo": self.tipo,
+            "operacao": self.operacao,
+            "status": self.status,
+            "finalizada": self.finalizada,
+            "progresso": self.progresso,
+            "paginas_copiadas": self.paginas_copiadas,
+            "paginas_total": self.paginas_total,
+            "mensagem": self.mensagem,
+            "iniciado_em": self.iniciado_em.isoformat() if self.iniciado_em else None,
+            "concluido_em": self.concluido_em.isoformat() if self.concluido_em else None,
+            "backup_seguranca": self.backup_seguranca,
+        }
+
+
+# Tarefas recentes (a mais antiga é descartada acima do limite)
+MAX_TAREFAS_HISTORICO = 20
+_tarefas: "OrderedDict[str, TarefaBackup]" = OrderedDict()
+_futuros: dict[str, Future] = {}
+_tarefas_lock = threading.Lock()
+# Uma thread: backups e restaurações são executados um de cada vez, fora do pool do banco
+_executor_backup: Optional[ThreadPoolExecutor] = None
+
+
 def _formatar_tamanho(bytes: int) -> str:
     """
     Formata tamanho em bytes para formato legível
@@ -188,13 +270,107 @@ def _verificar_database_pos_restauracao() -> bool:
     return valido
 
 
-def criar_backup(automatico: bool = False) -> tuple[bool, str]:
+def _copiar_para_banco_em_uso(
+    origem: Path,
+    ao_progredir: Optional[Callable[[int, int], None]] = None,
+) -> None:
+    """
+    Copia o banco origem sobre o banco em uso pela API de backup do SQLite.
+
+    A cópia é uma única transação de escrita no banco da aplicação, e nenhum
+    arquivo é substituído ou removido. Conexões abertas (pool, threads de
+    fundo, outros workers) continuam válidas: quem tem uma leitura em
+    andamento termina com o retrato anterior, e as próximas transações já
+    veem o conteúdo restaurado. Escritores concorrentes esperam o
+    busy_timeout.
+
+    Args:
+        origem: Caminho do arquivo de backup
+        ao_progredir: Chamada após cada passo com (paginas_copiadas, paginas_total)
+    """
+
+    def _progresso(status: int, restantes: int, total: int) -> None:
+        if ao_progredir is not None:
+            ao_progredir(total - restantes, total)
+
+    fonte = sqlite3.connect(origem)
+    try:
+        destino = sqlite3.connect(DATABASE_PATH, timeout=DB_BUSY_TIMEOUT_MS / 1000)
+        try:
+            # Sem pausa entre os passos: o banco em uso fica travado para escrita até o fim
+            fonte.backup(destino, pages=max(1, BACKUP_PAGINAS_POR_PASSO), progress=_progresso)
+        finally:
+            destino.close()
+    finally:
+        fonte.close()
+
+    # O banco restaurado pode ter a mesma versão de dados com conteúdo diferente
+    invalidar_caches_versionados()
+    cache_paginas.invalidar()
+    config.limpar()
+
+
+def _gerar_nome_backup(automatico: bool) -> str:
+    """Gera o nome do arquivo de backup com o timestamp atual"""
+    formato = BACKUP_AUTO_FILENAME_FORMAT if automatico else BACKUP_FILENAME_FORMAT
+    return agora().strftime(formato)
+
+
+def _copiar_banco_online(
+    destino: Path,
+    ao_progredir: Optional[Callable[[int, int], None]] = None,
+) -> None:
+    """
+    Copia o banco para destino com a API de backup do SQLite.
+
+    A conexão de origem é própria (não ocupa o pool) e mantém uma transação
+    de leitura aberta durante toda a cópia: os passos copiam sempre o mesmo
+    retrato do banco e a cópia não recomeça quando há escritas. A cópia é
+    gravada em um arquivo temporário e renomeada ao final.
+
+    Args:
+        destino: Caminho final do arquivo de backup
+        ao_progredir: Chamada após cada passo com (paginas_copiadas, paginas_total)
+    """
+    temporario = destino.with_name(f".{destino.name}.parcial")
+
+    def _progresso(status: int, restantes: int, total: int) -> None:
+        if ao_progredir is not None:
+            ao_progredir(total - restantes, total)
+        if BACKUP_PAUSA_MS > 0:
+            time.sleep(BACKUP_PAUSA_MS / 1000)
+
+    origem = sqlite3.connect(DATABASE_PATH, timeout=DB_BUSY_TIMEOUT_MS / 1000)
+    try:
+        # Transação de leitura: fixa o retrato do banco para todos os passos
+        origem.execute("BEGIN")
+        origem.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        copia = sqlite3.connect(temporario)
+        try:
+            origem.backup(copia, pages=max(1, BACKUP_PAGINAS_POR_PASSO), progress=_progresso)
+        finally:
+            copia.close()
+        origem.rollback()
+        temporario.replace(destino)
+    finally:
+        origem.close()
+        if temporario.exists():
+            temporario.unlink()
+
+
+def criar_backup(
+    automatico: bool = False,
+    nome_arquivo: Optional[str] = None,
+    ao_progredir: Optional[Callable[[int, int], None]] = None,
+) -> tuple[bool, str]:
     """
-    Cria um novo backup do banco de dados
+    Cria um novo backup do banco de dados (online, na thread atual)
 
     Args:
         automatico: Se True, cria backup automático (prefixo "backup_auto_"),
                    se False, cria backup manual (prefixo "backup_")
+        nome_arquivo: Nome do arquivo (gerado com o timestamp atual se omitido)
+        ao_progredir: Chamada após cada passo com (paginas_copiadas, paginas_total)
 
     Returns:
         Tupla (sucesso: bool, mensagem: str)
@@ -211,12 +387,11 @@ def criar_backup(automatico: bool = False) -> tuple[bool, str]:
             return False, mensagem
 
         # Gerar nome do arquivo de backup com timestamp
-        formato = BACKUP_AUTO_FILENAME_FORMAT if automatico else BACKUP_FILENAME_FORMAT
-        nome_backup = agora().strftime(formato)
+        nome_backup = nome_arquivo or _gerar_nome_backup(automatico)
         caminho_backup = BACKUP_DIR / nome_backup
 
-        # Copiar arquivo do banco de dados
-        shutil.copy2(db_path, caminho_backup)
+        # Copiar o banco em passos, sem interromper as escritas
+        _copiar_banco_online(caminho_backup, ao_progredir)
 
         # Obter tamanho do backup
         tamanho = caminho_backup.stat().st_size
@@ -234,6 +409,175 @@ def criar_backup(automatico: bool = False) -> tuple[bool, str]:
         return False, mensagem
 
 
+def _obter_executor_backup() -> ThreadPoolExecutor:
+    global _executor_backup
+    if _executor_backup is None:
+        _executor_backup = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup")
+    return _executor_backup
+
+
+def _progresso_da_tarefa(tarefa: TarefaBackup) -> Callable[[int, int], None]:
+    """Callback de progresso que atualiza as páginas da tarefa"""
+
+    def _atualizar_progresso(copiadas: int, total: int) -> None:
+        tarefa.paginas_copiadas = copiadas
+        tarefa.paginas_total = total
+
+    return _atualizar_progresso
+
+
+def _executar_tarefa(tarefa: TarefaBackup, automatico: bool) -> None:
+    """Executa o backup da tarefa, atualizando status e progresso"""
+    tarefa.status = "executando"
+    tarefa.iniciado_em = agora()
+    sucesso, mensagem = criar_backup(automatico, tarefa.nome_arquivo, _progresso_da_tarefa(tarefa))
+    tarefa.mensagem = mensagem
+    tarefa.concluido_em = agora()
+    tarefa.status = "concluido" if sucesso else "erro"
+
+
+def _executar_restauracao(tarefa: TarefaBackup, criar_backup_antes: bool) -> None:
+    """Executa a restauração da tarefa, atualizando status e progresso"""
+    tarefa.status = "executando"
+    tarefa.iniciado_em = agora()
+    sucesso, mensagem, nome_backup_automatico = restaurar_backup(
+        tarefa.nome_arquivo, criar_backup_antes, _progresso_da_tarefa(tarefa)
+    )
+    tarefa.backup_seguranca = nome_backup_automatico
+    tarefa.mensagem = mensagem
+    tarefa.concluido_em = agora()
+    tarefa.status = "concluido" if sucesso else "erro"
+
+
+def _registrar_tarefa(tarefa: TarefaBackup, executar: Callable[..., None], *args) -> None:
+    """Agenda a tarefa no executor de backups (chamar com _tarefas_lock adquirido)"""
+    _tarefas[tarefa.id] = tarefa
+    _futuros[tarefa.id] = _obter_executor_backup().submit(executar, tarefa, *args)
+
+    # Descartar as tarefas finalizadas mais antigas
+    while len(_tarefas) > MAX_TAREFAS_HISTORICO:
+        antiga_id, antiga = next(iter(_tarefas.items()))
+        if not antiga.finalizada:
+            break
+        del _tarefas[antiga_id]
+        _futuros.pop(antiga_id, None)
+
+
+def iniciar_backup(automatico: bool = False) -> TarefaBackup:
+    """
+    Inicia um backup em segundo plano
+
+    Só uma tarefa é executada por vez: se já houver um backup ou uma
+    restauração em andamento, essa tarefa é retornada em vez de iniciar outra.
+
+    Args:
+        automatico: Se True, cria backup automático
+
+    Returns:
+        TarefaBackup para acompanhar o progresso (ver obter_tarefa)
+    """
+    with _tarefas_lock:
+        for tarefa in _tarefas.values():
+            if not tarefa.finalizada:
+                return tarefa
+
+        tarefa = TarefaBackup(
+            id=uuid.uuid4().hex,
+            nome_arquivo=_gerar_nome_backup(automatico),
+            tipo="automático" if automatico else "manual",
+        )
+        _registrar_tarefa(tarefa, _executar_tarefa, automatico)
+
+    logger.info(f"Backup iniciado em segundo plano: {tarefa.nome_arquivo}")
+    return tarefa
+
+
+def iniciar_restauracao(
+    nome_arquivo: str,
+    criar_backup_antes: bool = True,
+) -> tuple[Optional[TarefaBackup], str]:
+    """
+    Inicia a restauração de um backup em segundo plano
+
+    A verificação de tarefa em andamento e o agendamento acontecem sob o
+    mesmo lock: nenhum backup começa entre os dois, e um backup iniciado
+    depois espera a restauração terminar (executor de uma thread).
+
+    Args:
+        nome_arquivo: Nome do arquivo de backup a restaurar
+        criar_backup_antes: Se True, cria backup do estado atual antes de restaurar
+
+    Returns:
+        Tupla (tarefa, mensagem): tarefa None e o motivo quando há um backup
+        ou uma restauração em andamento
+    """
+    with _tarefas_lock:
+        for tarefa in _tarefas.values():
+            if not tarefa.finalizada:
+                # O backup em andamento copiaria um banco prestes a ser sobrescrito
+                operacao = "uma restauração" if tarefa.operacao == "restauracao" else "um backup"
+                mensagem = (
+                    f"Há {operacao} em andamento ({tarefa.nome_arquivo}). "
+                    f"Aguarde a conclusão para restaurar."
+                )
+                logger.warning(mensagem)
+                return None, mensagem
+
+        tarefa = TarefaBackup(
+            id=uuid.uuid4().hex,
+            nome_arquivo=nome_arquivo,
+            tipo=_detectar_tipo_backup(nome_arquivo),
+            operacao="restauracao",
+        )
+        _registrar_tarefa(tarefa, _executar_restauracao, criar_backup_antes)
+
+    logger.info(f"Restauração iniciada em segundo plano: {nome_arquivo}")
+    return tarefa, ""
+
+
+def obter_tarefa(tarefa_id: str) -> Optional[TarefaBackup]:
+    """
+    Obtém uma tarefa de backup pelo ID
+
+    Args:
+        tarefa_id: ID retornado por iniciar_backup
+
+    Returns:
+        TarefaBackup ou None se não encontrada
+    """
+    with _tarefas_lock:
+        return _tarefas.get(tarefa_id)
+
+
+def obter_tarefa_em_andamento() -> Optional[TarefaBackup]:
+    """Retorna o backup ou a restauração em execução (ou aguardando), se houver"""
+    with _tarefas_lock:
+        for tarefa in _tarefas.values():
+            if not tarefa.finalizada:
+                return tarefa
+    return None
+
+
+async def aguardar_tarefa(tarefa_id: str, timeout: float) -> Optional[TarefaBackup]:
+    """
+    Aguarda a conclusão de uma tarefa por até timeout segundos, sem bloquear o event loop
+
+    Args:
+        tarefa_id: ID da tarefa
+        timeout: Tempo máximo de espera em segundos
+
+    Returns:
+        TarefaBackup (finalizada ou não) ou None se não encontrada
+    """
+    futuro = _futuros.get(tarefa_id)
+    if futuro is not None and timeout > 0:
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(futuro)), timeout)
+        except asyncio.TimeoutError:
+            pass
+    return obter_tarefa(tarefa_id)
+
+
 def listar_backups() -> List[BackupInfo]:
     """
     Lista todos os backups disponíveis
@@ -285,17 +629,27 @@ def listar_backups() -> List[BackupInfo]:
         return []
 
 
-def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tuple[bool, str, Optional[str]]:
+def restaurar_backup(
+    nome_arquivo: str,
+    criar_backup_antes: bool = True,
+    ao_progredir: Optional[Callable[[int, int], None]] = None,
+) -> tuple[bool, str, Optional[str]]:
     """
     Restaura um backup do banco de dados com validação de integridade
 
     IMPORTANTE: Esta operação sobrescreve o banco de dados atual!
     Por padrão, cria um backup automático antes de restaurar e valida
-    a integridade do backup antes de aplicar.
+    a integridade do backup antes de aplicar. O conteúdo é copiado para o
+    banco em uso (ver _copiar_para_banco_em_uso), sem substituir arquivos
+    com conexões abertas.
+
+    Executa na thread atual. Pela interface administrativa use
+    iniciar_restauracao, que não deixa a restauração coincidir com um backup.
 
     Args:
         nome_arquivo: Nome do arquivo de backup a restaurar
         criar_backup_antes: Se True, cria backup do estado atual antes de restaurar
+        ao_progredir: Chamada após cada passo da cópia com (paginas_copiadas, paginas_total)
 
     Returns:
         Tupla (sucesso: bool, mensagem: str, nome_backup_automatico: Optional[str])
@@ -326,24 +680,24 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
 
         logger.info(f"Validação de integridade OK: {nome_arquivo}")
 
+        # Visualizações ainda em memória entram no banco atual (e no backup de segurança)
+        contador_visualizacoes.descarregar()
+
         # Criar backup de segurança do estado atual antes de restaurar
         nome_backup_automatico = None
         if criar_backup_antes:
-            sucesso, msg = criar_backup(automatico=True)
+            nome_seguranca = _gerar_nome_backup(automatico=True)
+            sucesso, msg = criar_backup(automatico=True, nome_arquivo=nome_seguranca)
             if sucesso:
-                # Obter o último backup criado (que acabamos de criar)
-                backups = listar_backups()
-                if backups and backups[0].tipo == "automático":
-                    nome_backup_automatico = backups[0].nome_arquivo
-                    caminho_backup_seguranca = BACKUP_DIR / nome_backup_automatico
-                    logger.info(f"Backup de segurança criado: {nome_backup_automatico}")
+                nome_backup_automatico = nome_seguranca
+                caminho_backup_seguranca = BACKUP_DIR / nome_backup_automatico
+                logger.info(f"Backup de segurança criado: {nome_backup_automatico}")
             else:
                 logger.warning(f"Falha ao criar backup de segurança: {msg}")
                 # Continua mesmo se falhar o backup automático
 
-        # Restaurar backup (copiar sobre o arquivo atual)
-        db_path = Path(DATABASE_PATH)
-        shutil.copy2(caminho_backup, db_path)
+        # Restaurar backup (copiar para o banco em uso)
+        _copiar_para_banco_em_uso(caminho_backup, ao_progredir)
 
         # VALIDAÇÃO PÓS-RESTAURAÇÃO: Verificar se banco restaurado está válido
         logger.info("Verificando integridade do banco após restauração...")
@@ -352,7 +706,7 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
             logger.error("Banco corrompido após restauração! Executando rollback...")
 
             if caminho_backup_seguranca and caminho_backup_seguranca.exists():
-                shutil.copy2(caminho_backup_seguranca, db_path)
+                _copiar_para_banco_em_uso(caminho_backup_seguranca)
                 mensagem = (
                     f"Restauração falhou! Banco revertido para estado anterior. "
                     f"Backup '{nome_arquivo}' pode estar corrompido."
@@ -379,8 +733,7 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
         # Tentar rollback em caso de exceção
         if caminho_backup_seguranca and caminho_backup_seguranca.exists():
             try:
-                db_path = Path(DATABASE_PATH)
-                shutil.copy2(caminho_backup_seguranca, db_path)
+                _copiar_para_banco_em_uso(caminho_backup_seguranca)
                 logger.info("Rollback executado com sucesso após exceção")
                 mensagem += " (Banco revertido para estado anterior)"
             except Exception as rollback_error:
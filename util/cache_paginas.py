@@ -0,0 +1,161 @@
+"""
+Cache de páginas públicas renderizadas.
+
+A landing page (/ e /index) e a listagem /artigos recebem a maior parte do
+tráfego anônimo e, sem cache, consultam o banco e renderizam o template a
+cada requisição. Para visitantes anônimos o HTML é idêntico entre
+requisições, então guardamos o corpo já renderizado por rota + parâmetros.
+
+Regras:
+    - Só cacheia GET de visitantes anônimos sem mensagens flash pendentes
+      (a página de usuário logado e os toasts variam por sessão).
+    - Cada entrada expira após CACHE_PAGINAS_TTL_SEGUNDOS.
+    - Escritas em artigo_repo/categoria_repo chamam invalidar(), que descarta
+      todas as entradas do processo. Em múltiplos workers, o TTL limita o
+      tempo em que outro processo pode servir a versão anterior.
+    - Uma página só é guardada se nenhuma invalidação aconteceu entre o miss
+      em obter_resposta() e armazenar_resposta(): ela pode ter sido
+      renderizada com os dados anteriores à escrita.
+
+Uso na rota:
+
+    if (resposta := cache_paginas.obter_resposta(request)) is not None:
+        return resposta
+    resposta = templates.TemplateResponse(...)
+    cache_paginas.armazenar_resposta(request, resposta)
+    return resposta
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+
+from util.config import CACHE_PAGINAS_MAX_ENTRADAS, CACHE_PAGINAS_TTL_SEGUNDOS
+
+
+class CachePaginas:
+    """
+    Cache LRU com TTL de respostas HTML, seguro entre threads.
+
+    Attributes:
+        ttl_segundos: Validade de cada entrada (0 desativa o cache)
+        max_entradas: Limite de entradas (as menos usadas são descartadas)
+    """
+
+    def __init__(self, ttl_segundos: float, max_entradas: int):
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self._entradas: OrderedDict[str, tuple[float, bytes, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidacoes = 0
+        # Incrementada a cada invalidação; o miss guarda o valor em request.state
+        self._geracao = 0
+
+    @staticmethod
+    def pode_cachear(request: Request) -> bool:
+        """
+        Indica se a resposta desta requisição é igual para qualquer visitante.
+
+        Returns:
+            True para GET anônimo sem mensagens flash na sessão
+        """
+        if request.method != "GET":
+            return False
+        sessao = request.session
+        return not sessao.get("usuario_logado") and not sessao.get("mensagens")
+
+    @staticmethod
+    def chave_requisicao(request: Request) -> str:
+        """Chave da página: caminho + parâmetros de query em ordem estável."""
+        parametros = sorted(request.query_params.multi_items())
+        return request.url.path + "?" + "&".join(f"{k}={v}" for k, v in parametros)
+
+    def obter_resposta(self, request: Request) -> Optional[Response]:
+        """
+        Retorna a página em cache para a requisição, se houver.
+
+        Returns:
+            HTMLResponse com o corpo em cache ou None (miss / não cacheável)
+        """
+        if self.ttl_segundos <= 0 or not self.pode_cachear(request):
+            return None
+
+        chave = self.chave_requisicao(request)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada[0] <= time.monotonic():
+                if entrada is not None:
+                    del self._entradas[chave]
+                self._misses += 1
+                request.state.cache_paginas_geracao = self._geracao
+                return None
+            self._entradas.move_to_end(chave)
+            self._hits += 1
+            _, corpo, status_code = entrada
+
+        return HTMLResponse(content=corpo, status_code=status_code)
+
+    def armazenar_resposta(self, request: Request, response: Response) -> None:
+        """
+        Guarda o corpo renderizado de uma resposta 200 cacheável.
+
+        A resposta é descartada se o cache foi invalidado depois do miss desta
+        requisição em obter_resposta().
+        """
+        if (
+            self.ttl_segundos <= 0
+            or response.status_code != 200
+            or not self.pode_cachear(request)
+        ):
+            return
+
+        geracao = getattr(request.state, "cache_paginas_geracao", None)
+        chave = self.chave_requisicao(request)
+        expira_em = time.monotonic() + self.ttl_segundos
+        with self._lock:
+            if geracao is not None and geracao != self._geracao:
+                return
+            self._entradas[chave] = (expira_em, bytes(response.body), response.status_code)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self) -> None:
+        """Descarta todas as páginas (chamado após escritas de conteúdo)."""
+        with self._lock:
+            self._entradas.clear()
+            self._invalidacoes += 1
+            self._geracao += 1
+
+    def limpar(self) -> None:
+        """Descarta as páginas e zera as estatísticas."""
+        with self._lock:
+            self._entradas.clear()
+            self._hits = self._misses = self._invalidacoes = 0
+            self._geracao += 1
+
+    def obter_estatisticas(self) -> dict:
+        """Retorna hits, misses, invalidações e ocupação do cache."""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "taxa_acerto": round(self._hits / total, 3) if total else 0.0,
+                "invalidacoes": self._invalidacoes,
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "ttl_segundos": self.ttl_segundos,
+            }
+
+
+# Instância global usada pelas rotas públicas e pelos repositórios
+cache_paginas = CachePaginas(
+    ttl_segundos=CACHE_PAGINAS_TTL_SEGUNDOS,
+    max_entradas=CACHE_PAGINAS_MAX_ENTRADAS,
+)
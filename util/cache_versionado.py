@@ -0,0 +1,89 @@
+"""
+Cache em processo validado por versão no banco.
+
+Para dados lidos em quase toda página e alterados raramente (categorias,
+configurações), guardar o resultado em memória elimina a consulta, mas um
+cache apenas local fica desatualizado nos outros workers do uvicorn.
+
+CacheVersionado guarda o valor junto com a versão do conjunto de dados em
+versao_dados (incrementada por triggers a cada escrita). Cada leitura faz
+apenas a consulta da versão, por chave primária; se ela mudou, o valor é
+recarregado. Escritas no próprio processo também chamam invalidar() para
+descartar o valor imediatamente.
+"""
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+from util.logger_config import logger
+
+T = TypeVar("T")
+
+# Todas as instâncias, para invalidação em massa (ex.: restauração de backup)
+_caches: list["CacheVersionado"] = []
+
+
+class CacheVersionado(Generic[T]):
+    """
+    Valor carregado do banco e reutilizado enquanto a versão não mudar.
+
+    Attributes:
+        nome: Nome do conjunto de dados em versao_dados
+        carregar: Função que lê o valor do banco (exceções não são cacheadas)
+    """
+
+    def __init__(self, nome: str, carregar: Callable[[], T]):
+        self.nome = nome
+        self.carregar = carregar
+        self._valor: Optional[T] = None
+        self._versao: Optional[int] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._recargas = 0
+        self._invalidacoes = 0
+        _caches.append(self)
+
+    def obter(self) -> T:
+        """
+        Retorna o valor em cache, recarregando se a versão no banco mudou.
+
+        Sem versão disponível (tabela ausente ou erro), o valor é sempre
+        recarregado, preservando a consistência.
+        """
+        from repo import versao_dados_repo
+
+        versao = versao_dados_repo.obter_versao(self.nome)
+        with self._lock:
+            if self._valor is not None and versao is not None and versao == self._versao:
+                self._hits += 1
+                return self._valor
+
+        valor = self.carregar()
+        with self._lock:
+            self._valor = valor
+            self._versao = versao
+            self._recargas += 1
+        logger.debug(f"Cache '{self.nome}' recarregado (versão {versao})")
+        return valor
+
+    def invalidar(self) -> None:
+        """Descarta o valor em cache (próxima leitura recarrega)."""
+        with self._lock:
+            self._valor = None
+            self._versao = None
+            self._invalidacoes += 1
+
+    def obter_estatisticas(self) -> dict:
+        """Retorna hits, recargas, invalidações e a versão em cache."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "recargas": self._recargas,
+                "invalidacoes": self._invalidacoes,
+                "versao": self._versao,
+            }
+
+
+def invalidar_caches_versionados() -> None:
+    """Descarta o valor de todos os caches versionados do processo."""
+    for cache in _caches:
+        cache.invalidar()
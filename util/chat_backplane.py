@@ -0,0 +1,234 @@
+"""
+Backplanes do chat: distribuição de eventos entre workers.
+
+O GerenciadorChat (util/chat_manager.py) guarda as conexões SSE do próprio
+processo. Com vários workers do uvicorn, a mensagem enviada em um worker
+precisa chegar ao destinatário cujo stream está em outro; o backplane
+recebe cada broadcast_para_sala e o entrega em todos os workers.
+
+Implementações:
+    - BackplaneLocal: entrega direto no próprio processo (padrão). Só
+      serve para um único worker.
+    - BackplaneSQLite: grava o evento na tabela chat_evento e entrega
+      localmente na hora; uma tarefa de cada worker consulta os eventos
+      com id maior que o último visto e entrega os publicados pelos
+      outros workers. A latência entre workers é de até
+      CHAT_BACKPLANE_INTERVALO_SEGUNDOS.
+
+Um broker em socket Unix ou o pub/sub do Redis implementaria a mesma
+interface: publicar() envia ao broker e uma tarefa de leitura chama a
+função de entrega para cada evento recebido.
+
+O tipo usado por padrão vem de CHAT_BACKPLANE ("local" ou "sqlite").
+"""
+import asyncio
+import sqlite3
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from util.config import (
+    CHAT_BACKPLANE,
+    CHAT_BACKPLANE_INTERVALO_SEGUNDOS,
+    CHAT_BACKPLANE_LOTE,
+    CHAT_BACKPLANE_RETENCAO_SEGUNDOS,
+)
+from util.db_async import executar_db
+from util.logger_config import logger
+
+# Função que entrega um evento às conexões do próprio processo
+FuncaoEntrega = Callable[[str, dict], Awaitable[None]]
+
+
+class BackplaneChat:
+    """
+    Interface dos backplanes do chat (um por GerenciadorChat).
+
+    O gerenciador chama vincular() com sua função de entrega local, e
+    iniciar()/parar() no ciclo de vida da aplicação.
+    """
+
+    tipo = "base"
+
+    def __init__(self):
+        self._entregar: Optional[FuncaoEntrega] = None
+
+    def vincular(self, entregar: FuncaoEntrega) -> None:
+        """Define a função que entrega eventos às conexões deste processo."""
+        self._entregar = entregar
+
+    async def publicar(self, sala_id: str, evento: dict) -> None:
+        """
+        Publica um evento para os participantes da sala em todos os workers.
+
+        Args:
+            sala_id: ID da sala
+            evento: Dados do evento SSE
+        """
+        raise NotImplementedError
+
+    async def iniciar(self) -> None:
+        """Inicia a recepção de eventos de outros workers (se houver)."""
+
+    async def parar(self) -> None:
+        """Interrompe a recepção de eventos."""
+
+    def obter_estatisticas(self) -> dict:
+        """Retorna contadores de eventos publicados e recebidos."""
+        return {"backplane": self.tipo}
+
+
+class BackplaneLocal(BackplaneChat):
+    """Entrega os eventos somente no próprio processo."""
+
+    tipo = "local"
+
+    async def publicar(self, sala_id: str, evento: dict) -> None:
+        await self._entregar(sala_id, evento)
+
+
+class BackplaneSQLite(BackplaneChat):
+    """
+    Eventos compartilhados pela tabela chat_evento.
+
+    Cada instância tem uma origem única; eventos da própria origem já foram
+    entregues ao publicar e são ignorados na consulta. Ao iniciar, o worker
+    parte do maior id existente (não reentrega eventos antigos). Se a
+    gravação falhar, o evento ainda é entregue localmente e o erro é
+    registrado.
+
+    Attributes:
+        intervalo_segundos: Intervalo entre consultas quando não há eventos novos
+        lote: Máximo de eventos por consulta
+        retencao_segundos: Idade a partir da qual os eventos são removidos
+    """
+
+    tipo = "sqlite"
+
+    def __init__(
+        self,
+        intervalo_segundos: float = CHAT_BACKPLANE_INTERVALO_SEGUNDOS,
+        lote: int = CHAT_BACKPLANE_LOTE,
+        retencao_segundos: float = CHAT_BACKPLANE_RETENCAO_SEGUNDOS,
+    ):
+        super().__init__()
+        self.intervalo_segundos = intervalo_segundos
+        self.lote = lote
+        self.retencao_segundos = retencao_segundos
+        self.origem = uuid.uuid4().hex
+        self._ultimo_id = 0
+        self._ultima_limpeza = 0.0
+        self._tarefa: Optional[asyncio.Task] = None
+        self._publicados = 0
+        self._recebidos = 0
+        self._consultas = 0
+        self._removidos = 0
+        self._erros = 0
+
+    def _registrar_erro(self, operacao: str, erro: Exception) -> None:
+        self._erros += 1
+        logger.error(f"[ChatBackplane] Erro ao {operacao}: {erro}")
+
+    async def publicar(self, sala_id: str, evento: dict) -> None:
+        from repo import chat_evento_repo
+
+        try:
+            await executar_db(chat_evento_repo.inserir, sala_id, self.origem, evento)
+            self._publicados += 1
+        except sqlite3.Error as e:
+            self._registrar_erro("publicar evento", e)
+        await self._entregar(sala_id, evento)
+
+    async def receber(self) -> int:
+        """
+        Consulta e entrega um lote de eventos publicados por outros workers.
+
+        Returns:
+            Quantidade de eventos lidos (incluindo os da própria origem)
+        """
+        from repo import chat_evento_repo
+
+        self._consultas += 1
+        eventos = await executar_db(chat_evento_repo.listar_posteriores, self._ultimo_id, self.lote)
+        for evento_id, sala_id, origem, evento in eventos:
+            self._ultimo_id = evento_id
+            if origem != self.origem:
+                self._recebidos += 1
+                await self._entregar(sala_id, evento)
+        return len(eventos)
+
+    async def remover_antigos(self) -> int:
+        """Remove os eventos mais antigos que a retenção."""
+        from repo import chat_evento_repo
+
+        removidos = await executar_db(
+            chat_evento_repo.excluir_anteriores, time.time() - self.retencao_segundos
+        )
+        self._removidos += removidos
+        self._ultima_limpeza = time.monotonic()
+        return removidos
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                lidos = await self.receber()
+                if time.monotonic() - self._ultima_limpeza >= self.retencao_segundos:
+                    await self.remover_antigos()
+            except Exception as e:
+                self._registrar_erro("consultar eventos", e)
+                lidos = 0
+            # Lote cheio: ainda há eventos pendentes, consultar de novo sem esperar
+            if lidos < self.lote:
+                await asyncio.sleep(self.intervalo_segundos)
+
+    async def iniciar(self) -> None:
+        """Inicia a tarefa de consulta a partir do último evento existente (idempotente)."""
+        from repo import chat_evento_repo
+
+        if self._tarefa is not None and not self._tarefa.done():
+            return
+
+        self._ultimo_id = await executar_db(chat_evento_repo.obter_ultimo_id)
+        self._ultima_limpeza = time.monotonic()
+        self._tarefa = asyncio.create_task(self._loop(), name="chat-backplane")
+        logger.info(f"Backplane do chat iniciado (consulta a cada {self.intervalo_segundos}s)")
+
+    async def parar(self) -> None:
+        """Cancela a tarefa de consulta."""
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+
+    def obter_estatisticas(self) -> dict:
+        return {
+            "backplane": self.tipo,
+            "origem": self.origem,
+            "ativo": self._tarefa is not None and not self._tarefa.done(),
+            "ultimo_id": self._ultimo_id,
+            "publicados": self._publicados,
+            "recebidos": self._recebidos,
+            "consultas": self._consultas,
+            "removidos": self._removidos,
+            "erros": self._erros,
+        }
+
+
+def criar_backplane(tipo: str = CHAT_BACKPLANE) -> BackplaneChat:
+    """
+    Cria o backplane do chat conforme o tipo configurado.
+
+    Args:
+        tipo: "local" ou "sqlite"
+
+    Returns:
+        Instância do backplane
+    """
+    if tipo == "sqlite":
+        return BackplaneSQLite()
+    if tipo != "local":
+        logger.warning(f"CHAT_BACKPLANE desconhecido '{tipo}', usando local")
+    return BackplaneLocal()
@@ -0,0 +1,156 @@
+"""
+Escritor de mensagens do chat com group commit.
+
+Cada envio (verificação de acesso, inserção, contador de não lidas e última
+atividade da sala) já é uma única transação em
+chat_mensagem_repo.enviar(). Sob carga, porém, cada transação paga seu
+próprio commit (fsync do WAL) e disputa o lock de escrita do SQLite com as
+demais.
+
+O EscritorMensagens enfileira os envios concorrentes e uma única tarefa os
+grava em lotes: tudo o que chegou enquanto o lote anterior era gravado vai
+na próxima transação (até CHAT_ESCRITA_LOTE_MAX envios). Com pouca carga o
+lote tem um envio e não há espera extra; com muitos usuários, vários envios
+dividem o mesmo commit.
+
+Se o lote falhar, cada envio é gravado de novo isoladamente, para que um
+pedido inválido não derrube os demais.
+"""
+import asyncio
+from typing import Optional, Union
+
+from model.chat_mensagem_model import ChatMensagem
+from util.config import CHAT_ESCRITA_LOTE_MAX
+from util.db_async import executar_db
+from util.logger_config import logger
+
+
+class EscritorMensagens:
+    """
+    Grava envios de mensagens concorrentes em transações compartilhadas.
+
+    Attributes:
+        max_lote: Máximo de envios por transação
+    """
+
+    def __init__(self, max_lote: int = CHAT_ESCRITA_LOTE_MAX):
+        self.max_lote = max(1, max_lote)
+        self._fila: Optional[asyncio.Queue] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self._lotes = 0
+        self._mensagens = 0
+        self._maior_lote = 0
+        self._erros = 0
+
+    @property
+    def ativo(self) -> bool:
+        return self._tarefa is not None and not self._tarefa.done()
+
+    async def iniciar(self) -> None:
+        """Inicia a tarefa de gravação no loop atual (idempotente)."""
+        if self.ativo:
+            return
+        # A fila é criada aqui para ficar vinculada ao loop em execução
+        self._fila = asyncio.Queue()
+        self._tarefa = asyncio.create_task(self._loop(), name="chat-escritor")
+        logger.info(f"Escritor de mensagens do chat iniciado (lote máximo {self.max_lote})")
+
+    async def parar(self) -> None:
+        """Grava os envios pendentes e encerra a tarefa."""
+        if not self.ativo:
+            return
+        await self._fila.put(None)
+        await self._tarefa
+        self._tarefa = None
+        self._fila = None
+
+    async def enviar(self, sala_id: str, usuario_id: int, mensagem: str) -> Union[ChatMensagem, str]:
+        """
+        Envia uma mensagem, agrupando a gravação com envios concorrentes.
+
+        Sem a tarefa em execução, grava diretamente em uma transação própria.
+
+        Args:
+            sala_id: ID da sala
+            usuario_id: ID do remetente
+            mensagem: Conteúdo da mensagem
+
+        Returns:
+            ChatMensagem criado ou chat_mensagem_repo.SEM_ACESSO /
+            chat_mensagem_repo.SALA_INEXISTENTE
+        """
+        from repo import chat_mensagem_repo
+
+        if not self.ativo:
+            return await executar_db(chat_mensagem_repo.enviar, sala_id, usuario_id, mensagem)
+
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put(((sala_id, usuario_id, mensagem), futuro))
+        return await futuro
+
+    async def _gravar(self, itens: list) -> None:
+        from repo import chat_mensagem_repo
+
+        try:
+            resultados = await executar_db(chat_mensagem_repo.enviar_em_lote, [pedido for pedido, _ in itens])
+        except Exception as e:
+            self._erros += 1
+            logger.error(f"[ChatEscritor] Erro ao gravar lote de {len(itens)} mensagens: {e}")
+            # O lote foi desfeito; grava cada envio isoladamente
+            for pedido, futuro in itens:
+                try:
+                    resultado = await executar_db(chat_mensagem_repo.enviar, *pedido)
+                except Exception as erro:
+                    if not futuro.done():
+                        futuro.set_exception(erro)
+                else:
+                    if not futuro.done():
+                        futuro.set_result(resultado)
+            return
+
+        self._lotes += 1
+        self._mensagens += len(itens)
+        self._maior_lote = max(self._maior_lote, len(itens))
+        for (_, futuro), resultado in zip(itens, resultados):
+            # O cliente pode ter desistido (requisição cancelada)
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+    async def _loop(self) -> None:
+        encerrar = False
+        while not encerrar:
+            item = await self._fila.get()
+            if item is None:
+                break
+            itens = [item]
+            # Tudo o que chegou durante a gravação anterior entra neste lote
+            while len(itens) < self.max_lote and not self._fila.empty():
+                proximo = self._fila.get_nowait()
+                if proximo is None:
+                    encerrar = True
+                    break
+                itens.append(proximo)
+            await self._gravar(itens)
+
+        # Envios que chegaram depois do pedido de parada
+        while not self._fila.empty():
+            item = self._fila.get_nowait()
+            if item is not None:
+                await self._gravar([item])
+
+    def obter_estatisticas(self) -> dict:
+        """Retorna lotes gravados, mensagens, maior lote e erros."""
+        return {
+            "ativo": self.ativo,
+            "max_lote": self.max_lote,
+            "pendentes": self._fila.qsize() if self._fila is not None else 0,
+            "lotes": self._lotes,
+            "mensagens": self._mensagens,
+            "maior_lote": self._maior_lote,
+            "media_por_lote": round(self._mensagens / self._lotes, 2) if self._lotes else 0,
+            "erros": self._erros,
+        }
+
+
+# Instância global usada pelas rotas do chat
+escritor_mensagens = EscritorMensagens()
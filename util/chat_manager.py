@@ -1,69 +1,279 @@
 """
 Gerenciador de conexões SSE do chat.
 Mantém conexões ativas e faz broadcast de mensagens para usuários conectados.
+Com vários workers, o broadcast passa pelo backplane (util/chat_backplane.py),
+que entrega o evento nos workers onde os participantes estão conectados.
 """
 import asyncio
-from typing import Dict, Set
+import heapq
+import itertools
+import sys
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from util.chat_backplane import BackplaneChat, criar_backplane
+from util.config import CHAT_FILA_MAX_EVENTOS, CHAT_FILA_POLITICA
 from util.logger_config import logger
 
+# Enviado quando a fila transborda com a política "ressincronizar": o cliente
+# recarrega conversas e contadores e o stream é encerrado (o EventSource reconecta)
+EVENTO_RESSINCRONIZAR = {"tipo": "ressincronizar"}
+
+POLITICAS_FILA = ("ressincronizar", "descartar_antigos")
+
+
+class ConexaoChat:
+    """
+    Uma conexão SSE (uma aba ou dispositivo) de um usuário.
+
+    Os eventos ficam em uma fila limitada com o instante de chegada, usado
+    para medir o atraso até o envio. Eventos "atualizar_contador" de uma
+    sala que já tem um pendente são agrupados (só o contador mais recente
+    importa). Com a fila cheia, aplica a política:
+
+        - "ressincronizar": descarta os pendentes, enfileira apenas
+          EVENTO_RESSINCRONIZAR e marca a conexão como encerrada
+        - "descartar_antigos": descarta o evento mais antigo pendente
+
+    Attributes:
+        id: Identificador da conexão, único no processo
+        usuario_id: Dono da conexão
+        max_eventos: Capacidade da fila
+        politica: Política aplicada com a fila cheia
+        encerrada: Verdadeiro após transbordar com a política "ressincronizar"
+        entregues: Eventos colocados na fila
+        enviados: Eventos retirados pelo stream
+        descartados: Eventos perdidos por fila cheia
+        agrupados: Eventos atualizar_contador agrupados a um pendente
+        atraso_ultimo: Atraso (s) do evento mais antigo do último lote enviado
+        atraso_max: Maior atraso (s) já observado na conexão
+    """
+    __slots__ = (
+        "id", "usuario_id", "max_eventos", "politica", "conectado_em", "encerrada",
+        "entregues", "enviados", "descartados", "agrupados", "atraso_ultimo", "atraso_max",
+        "_fila", "_contadores_pendentes", "_sinal",
+    )
+
+    def __init__(self, conexao_id: int, usuario_id: int, max_eventos: int, politica: str):
+        self.id = conexao_id
+        self.usuario_id = usuario_id
+        self.max_eventos = max_eventos
+        self.politica = politica
+        self.conectado_em = time.monotonic()
+        self.encerrada = False
+        self.entregues = 0
+        self.enviados = 0
+        self.descartados = 0
+        self.agrupados = 0
+        self.atraso_ultimo = 0.0
+        self.atraso_max = 0.0
+        # (instante de chegada, evento)
+        self._fila: deque = deque()
+        # Salas com atualizar_contador na fila
+        self._contadores_pendentes: set = set()
+        self._sinal = asyncio.Event()
+
+    @property
+    def pendentes(self) -> int:
+        """Eventos aguardando envio."""
+        return len(self._fila)
+
+    def atraso_atual(self) -> float:
+        """Há quanto tempo (s) o evento mais antigo pendente espera."""
+        return time.monotonic() - self._fila[0][0] if self._fila else 0.0
+
+    def enfileirar(self, evento: dict) -> None:
+        """
+        Coloca um evento na fila aplicando agrupamento e a política de transbordo.
+
+        Args:
+            evento: Evento SSE
+        """
+        if self.encerrada:
+            return
+
+        sala_contador = evento.get("sala_id") if evento.get("tipo") == "atualizar_contador" else None
+        if sala_contador is not None and sala_contador in self._contadores_pendentes:
+            self.agrupados += 1
+            return
+
+        if len(self._fila) >= self.max_eventos:
+            if self.politica == "ressincronizar":
+                self.descartados += len(self._fila) + 1
+                self._fila.clear()
+                self._contadores_pendentes.clear()
+                self._fila.append((time.monotonic(), EVENTO_RESSINCRONIZAR))
+                self.encerrada = True
+                self._sinal.set()
+                return
+            _, antigo = self._fila.popleft()
+            if antigo.get("tipo") == "atualizar_contador":
+                self._contadores_pendentes.discard(antigo.get("sala_id"))
+            self.descartados += 1
+
+        self._fila.append((time.monotonic(), evento))
+        if sala_contador is not None:
+            self._contadores_pendentes.add(sala_contador)
+        self.entregues += 1
+        self._sinal.set()
+
+    async def receber_lote(self, max_eventos: int) -> list[dict]:
+        """
+        Aguarda ao menos um evento e retira até max_eventos pendentes.
+
+        Args:
+            max_eventos: Tamanho máximo do lote
+
+        Returns:
+            Eventos em ordem de chegada
+        """
+        while not self._fila:
+            self._sinal.clear()
+            await self._sinal.wait()
+
+        agora = time.monotonic()
+        self.atraso_ultimo = agora - self._fila[0][0]
+        self.atraso_max = max(self.atraso_max, self.atraso_ultimo)
+
+        lote = []
+        while self._fila and len(lote) < max_eventos:
+            _, evento = self._fila.popleft()
+            if evento.get("tipo") == "atualizar_contador":
+                self._contadores_pendentes.discard(evento.get("sala_id"))
+            lote.append(evento)
+        self.enviados += len(lote)
+        return lote
+
+    def memoria_estimada(self) -> int:
+        """Bytes estimados da conexão, da fila e dos eventos pendentes."""
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self._fila)
+            + sys.getsizeof(self._contadores_pendentes)
+            + sys.getsizeof(self._sinal)
+            + sum(sys.getsizeof(evento) for _, evento in self._fila)
+        )
+
+    def obter_estatisticas(self) -> dict:
+        """Métricas de atraso e volume da conexão."""
+        return {
+            "conexao_id": self.id,
+            "pendentes": len(self._fila),
+            "atraso_atual_ms": round(self.atraso_atual() * 1000, 1),
+            "atraso_ultimo_ms": round(self.atraso_ultimo * 1000, 1),
+            "atraso_max_ms": round(self.atraso_max * 1000, 1),
+            "entregues": self.entregues,
+            "enviados": self.enviados,
+            "descartados": self.descartados,
+            "agrupados": self.agrupados,
+            "encerrada": self.encerrada,
+        }
+
 
 class GerenciadorChat:
     """
     Gerencia conexões SSE para o sistema de chat.
 
-    Cada usuário tem UMA conexão SSE que recebe mensagens de TODAS as suas salas.
-    Quando uma mensagem é enviada em uma sala, o GerenciadorChat faz broadcast
-    para ambos os participantes da sala (se estiverem conectados).
+    Cada usuário pode ter várias conexões SSE ao mesmo tempo (abas,
+    dispositivos), e cada uma recebe mensagens de TODAS as suas salas.
+    Quando uma mensagem é enviada em uma sala, o GerenciadorChat faz
+    broadcast para todas as conexões dos dois participantes da sala.
+
+    As filas são limitadas: um cliente lento não acumula memória
+    indefinidamente; ao transbordar, a fila segue a política configurada
+    (ver ConexaoChat).
+
+    Attributes:
+        backplane: Distribui os broadcasts entre workers (padrão: CHAT_BACKPLANE)
+        max_eventos_fila: Capacidade da fila de cada conexão
+        politica_fila: "ressincronizar" ou "descartar_antigos"
     """
 
-    def __init__(self):
-        # Dicionário de filas: usuario_id -> asyncio.Queue
-        self._connections: Dict[int, asyncio.Queue] = {}
-        # Set de usuários com conexão ativa
-        self._active_connections: Set[int] = set()
+    def __init__(
+        self,
+        backplane: Optional[BackplaneChat] = None,
+        max_eventos_fila: int = CHAT_FILA_MAX_EVENTOS,
+        politica_fila: str = CHAT_FILA_POLITICA,
+    ):
+        if politica_fila not in POLITICAS_FILA:
+            logger.warning(f"CHAT_FILA_POLITICA desconhecida '{politica_fila}', usando ressincronizar")
+            politica_fila = "ressincronizar"
+        # usuario_id -> {conexao_id: ConexaoChat}
+        self._connections: Dict[int, Dict[int, ConexaoChat]] = {}
+        self._ids = itertools.count(1)
+        self._total_conexoes = 0
+        self._descartados = 0
+        self._agrupados = 0
+        self._ressincronizacoes = 0
+        self.max_eventos_fila = max_eventos_fila
+        self.politica_fila = politica_fila
+        self.backplane = backplane or criar_backplane()
+        self.backplane.vincular(self._entregar_local)
 
-    async def conectar(self, usuario_id: int) -> asyncio.Queue:
+    async def iniciar(self):
+        """Inicia a recepção de eventos de outros workers."""
+        await self.backplane.iniciar()
+
+    async def parar(self):
+        """Interrompe a recepção de eventos de outros workers."""
+        await self.backplane.parar()
+
+    async def conectar(self, usuario_id: int) -> ConexaoChat:
         """
         Registra nova conexão SSE para um usuário.
 
+        Conexões anteriores do mesmo usuário continuam ativas.
+
         Args:
             usuario_id: ID do usuário conectando
 
         Returns:
-            Queue para envio de mensagens SSE
+            Conexão criada; o stream lê os eventos com conexao.receber_lote()
         """
-        queue = asyncio.Queue()
-        self._connections[usuario_id] = queue
-        self._active_connections.add(usuario_id)
+        conexao = ConexaoChat(next(self._ids), usuario_id, self.max_eventos_fila, self.politica_fila)
+        self._connections.setdefault(usuario_id, {})[conexao.id] = conexao
+        self._total_conexoes += 1
 
         logger.info(
-            f"[GerenciadorChat] Usuário {usuario_id} conectado. "
-            f"Total conexões: {len(self._active_connections)}"
+            f"[GerenciadorChat] Usuário {usuario_id} conectado (conexão {conexao.id}). "
+            f"Total conexões: {self._total_conexoes}"
         )
 
-        return queue
+        return conexao
 
-    async def desconectar(self, usuario_id: int):
+    async def desconectar(self, conexao: ConexaoChat):
         """
-        Remove conexão SSE de um usuário.
+        Remove uma conexão SSE; o usuário segue conectado se tiver outras.
 
         Args:
-            usuario_id: ID do usuário desconectando
+            conexao: Conexão retornada por conectar()
         """
-        if usuario_id in self._connections:
-            del self._connections[usuario_id]
-
-        if usuario_id in self._active_connections:
-            self._active_connections.remove(usuario_id)
+        conexoes_usuario = self._connections.get(conexao.usuario_id)
+        if conexoes_usuario is not None and conexoes_usuario.pop(conexao.id, None) is not None:
+            self._total_conexoes -= 1
+            if not conexoes_usuario:
+                del self._connections[conexao.usuario_id]
 
         logger.info(
-            f"[GerenciadorChat] Usuário {usuario_id} desconectado. "
-            f"Total conexões: {len(self._active_connections)}"
+            f"[GerenciadorChat] Usuário {conexao.usuario_id} desconectado (conexão {conexao.id}). "
+            f"Total conexões: {self._total_conexoes}"
         )
 
     async def broadcast_para_sala(self, sala_id: str, mensagem_dict: dict):
         """
-        Envia mensagem SSE para ambos os participantes de uma sala.
+        Envia mensagem SSE para ambos os participantes de uma sala,
+        em qualquer worker em que estejam conectados.
+
+        Args:
+            sala_id: ID da sala (formato: "menor_id_maior_id")
+            mensagem_dict: Dicionário com dados da mensagem a enviar
+        """
+        await self.backplane.publicar(sala_id, mensagem_dict)
+
+    async def _entregar_local(self, sala_id: str, mensagem_dict: dict):
+        """
+        Entrega o evento a todas as conexões dos participantes neste processo.
 
         Args:
             sala_id: ID da sala (formato: "menor_id_maior_id")
@@ -82,13 +292,23 @@ class GerenciadorChat:
             logger.error(f"[ChatManager] Erro ao parsear IDs do sala_id: {sala_id}")
             return
 
-        # Enviar para cada participante se estiver conectado
-        for usuario_id in [usuario1_id, usuario2_id]:
-            if usuario_id in self._connections:
-                await self._connections[usuario_id].put(mensagem_dict)
-                logger.debug(f"[ChatManager] Mensagem enviada para usuário {usuario_id} via SSE")
-            else:
+        # Enviar para cada conexão de cada participante conectado
+        for usuario_id in (usuario1_id, usuario2_id):
+            conexoes_usuario = self._connections.get(usuario_id)
+            if not conexoes_usuario:
                 logger.debug(f"[ChatManager] Usuário {usuario_id} não está conectado (não receberá via SSE)")
+                continue
+            for conexao in conexoes_usuario.values():
+                descartados, agrupados, encerrada = conexao.descartados, conexao.agrupados, conexao.encerrada
+                conexao.enfileirar(mensagem_dict)
+                self._descartados += conexao.descartados - descartados
+                self._agrupados += conexao.agrupados - agrupados
+                if conexao.encerrada and not encerrada:
+                    self._ressincronizacoes += 1
+                    logger.warning(
+                        f"[ChatManager] Fila cheia na conexão {conexao.id} do usuário {usuario_id}; "
+                        f"cliente será ressincronizado"
+                    )
 
     def esta_conectado(self, usuario_id: int) -> bool:
         """
@@ -98,9 +318,13 @@ class GerenciadorChat:
             usuario_id: ID do usuário
 
         Returns:
-            True se conectado, False caso contrário
+            True se tem ao menos uma conexão, False caso contrário
         """
-        return usuario_id in self._active_connections
+        return usuario_id in self._connections
+
+    def obter_conexoes(self, usuario_id: int) -> list[ConexaoChat]:
+        """Retorna as conexões ativas de um usuário neste processo."""
+        return list(self._connections.get(usuario_id, {}).values())
 
     def obter_estatisticas(self) -> dict:
         """
@@ -109,10 +333,30 @@ class GerenciadorChat:
         Returns:
             Dicionário com estatísticas
         """
+        memoria = 0
+        pendentes = 0
+        conexoes = []
+        for conexoes_usuario in self._connections.values():
+            for conexao in conexoes_usuario.values():
+                memoria += conexao.memoria_estimada()
+                pendentes += conexao.pendentes
+                conexoes.append(conexao)
+        mais_atrasadas = heapq.nlargest(10, conexoes, key=ConexaoChat.atraso_atual)
+
         return {
-            "total_conexoes": len(self._connections),
-            "usuarios_ativos": list(self._active_connections),
-            "total_usuarios_ativos": len(self._active_connections)
+            "total_conexoes": self._total_conexoes,
+            "total_usuarios_ativos": len(self._connections),
+            "eventos_pendentes": pendentes,
+            "eventos_descartados": self._descartados,
+            "eventos_agrupados": self._agrupados,
+            "ressincronizacoes": self._ressincronizacoes,
+            "max_eventos_fila": self.max_eventos_fila,
+            "politica_fila": self.politica_fila,
+            "atraso_max_ms": round(mais_atrasadas[0].atraso_atual() * 1000, 1) if mais_atrasadas else 0.0,
+            "conexoes_mais_atrasadas": [c.obter_estatisticas() for c in mais_atrasadas if c.pendentes],
+            "memoria_estimada_bytes": memoria,
+            "memoria_media_por_conexao_bytes": memoria // self._total_conexoes if self._total_conexoes else 0,
+            "backplane": self.backplane.obter_estatisticas(),
         }
 
 
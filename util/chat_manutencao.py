@@ -0,0 +1,177 @@
+"""
+Rotinas de manutenção do chat.
+
+Uso (na raiz do projeto):
+    python -m util.chat_manutencao recontar-nao-lidas
+    python -m util.chat_manutencao arquivar-mensagens
+"""
+import sys
+import threading
+import time
+from datetime import timedelta
+from typing import Optional
+
+from repo import chat_mensagem_repo, chat_participante_repo
+from util.config import (
+    CHAT_RETENCAO_DIAS,
+    CHAT_RETENCAO_INTERVALO_SEGUNDOS,
+    CHAT_RETENCAO_LOTE,
+    CHAT_RETENCAO_VACUUM_PAGINAS,
+)
+from util.datetime_util import agora
+from util.db_util import compactar_banco
+from util.logger_config import logger
+
+
+def recontar_nao_lidas() -> int:
+    """
+    Recalcula os contadores de mensagens não lidas de todos os participantes.
+
+    Returns:
+        Quantidade de contadores corrigidos
+    """
+    corrigidos = chat_participante_repo.recontar_nao_lidas()
+    logger.info(f"Recontagem de não lidas concluída: {corrigidos} contador(es) corrigido(s)")
+    return corrigidos
+
+
+class AgendadorRetencaoChat:
+    """
+    Arquiva periodicamente as mensagens antigas do chat em uma thread de fundo.
+
+    A cada execução, move para chat_mensagem_arquivo as mensagens lidas
+    enviadas há mais de `dias` dias, em lotes (uma transação curta por
+    lote), e compacta o banco para que o espaço liberado na chat_mensagem
+    volte ao sistema. O histórico de /chat/mensagens continua lendo o
+    arquivo normalmente.
+
+    Attributes:
+        dias: Idade a partir da qual as mensagens são arquivadas (0 desativa)
+        intervalo_segundos: Intervalo entre execuções
+        lote: Mensagens movidas por transação
+        vacuum_paginas: Páginas livres devolvidas por execução (0 = todas)
+    """
+
+    def __init__(
+        self,
+        dias: int = CHAT_RETENCAO_DIAS,
+        intervalo_segundos: int = CHAT_RETENCAO_INTERVALO_SEGUNDOS,
+        lote: int = CHAT_RETENCAO_LOTE,
+        vacuum_paginas: int = CHAT_RETENCAO_VACUUM_PAGINAS,
+    ):
+        self.dias = dias
+        self.intervalo_segundos = intervalo_segundos
+        self.lote = max(1, lote)
+        self.vacuum_paginas = vacuum_paginas
+        self._thread: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+        self._execucoes = 0
+        self._arquivadas = 0
+        self._falhas = 0
+        self._ultima_execucao: Optional[dict] = None
+
+    def executar(self) -> int:
+        """
+        Arquiva as mensagens elegíveis imediatamente e compacta o banco.
+
+        Returns:
+            Quantidade de mensagens arquivadas
+        """
+        if self.dias <= 0:
+            return 0
+
+        inicio = time.perf_counter()
+        corte = agora() - timedelta(days=self.dias)
+        arquivadas = 0
+        compactacao = None
+        try:
+            while not self._parar.is_set():
+                movidas = chat_mensagem_repo.arquivar_lote(corte, self.lote)
+                arquivadas += movidas
+                if movidas < self.lote:
+                    break
+            if arquivadas:
+                compactacao = compactar_banco(self.vacuum_paginas)
+        except Exception as e:
+            self._falhas += 1
+            logger.warning(f"Falha no arquivamento de mensagens do chat: {e}")
+
+        self._execucoes += 1
+        self._arquivadas += arquivadas
+        self._ultima_execucao = {
+            "arquivadas": arquivadas,
+            "duracao_ms": round((time.perf_counter() - inicio) * 1000, 1),
+            "compactacao": compactacao,
+        }
+        if arquivadas:
+            logger.info(f"Retenção do chat: {arquivadas} mensagem(ns) arquivada(s)")
+        return arquivadas
+
+    def _loop(self) -> None:
+        while not self._parar.wait(self.intervalo_segundos):
+            self.executar()
+
+    def iniciar(self) -> None:
+        """Inicia a thread de arquivamento (idempotente)."""
+        if self.intervalo_segundos <= 0 or self.dias <= 0:
+            logger.info("Retenção de mensagens do chat desativada")
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, name="chat-retencao", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Retenção do chat iniciada (mensagens com mais de {self.dias} dias, "
+            f"a cada {self.intervalo_segundos}s)"
+        )
+
+    def parar(self) -> None:
+        """Interrompe a thread (um lote em andamento termina antes)."""
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._thread.join(timeout=30)
+        self._thread = None
+
+    def obter_estatisticas(self) -> dict:
+        """Retorna métricas do agendador e da última execução."""
+        return {
+            "ativo": self._thread is not None and self._thread.is_alive(),
+            "dias": self.dias,
+            "intervalo_segundos": self.intervalo_segundos,
+            "execucoes": self._execucoes,
+            "arquivadas": self._arquivadas,
+            "falhas": self._falhas,
+            "ultima_execucao": self._ultima_execucao,
+        }
+
+
+# Instância global do agendador de retenção
+agendador_retencao_chat = AgendadorRetencaoChat()
+
+
+def arquivar_mensagens() -> int:
+    """
+    Arquiva agora as mensagens além da retenção (CHAT_RETENCAO_DIAS).
+
+    Returns:
+        Quantidade de mensagens arquivadas
+    """
+    return AgendadorRetencaoChat().executar()
+
+
+COMANDOS = {
+    "recontar-nao-lidas": recontar_nao_lidas,
+    "arquivar-mensagens": arquivar_mensagens,
+}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in COMANDOS:
+        print(f"Uso: python -m util.chat_manutencao [{' | '.join(COMANDOS)}]")
+        sys.exit(1)
+
+    resultado = COMANDOS[sys.argv[1]]()
+    print(f"{sys.argv[1]}: {resultado}")
@@ -34,6 +34,104 @@ if RUNNING_MODE_CHECK.lower() != "development":
 # === Configurações do Banco de Dados ===
 DATABASE_PATH = os.getenv("DATABASE_PATH", "database.db")
 
+# Pool de conexões (util/db_util.py)
+# Máximo de conexões de leitura abertas simultaneamente (a escrita usa uma conexão dedicada)
+DB_POOL_TAMANHO = int(os.getenv("DB_POOL_TAMANHO", "8"))
+# Tempo máximo (segundos) aguardando uma conexão livre antes de falhar
+DB_POOL_TIMEOUT_SEGUNDOS = float(os.getenv("DB_POOL_TIMEOUT_SEGUNDOS", "10"))
+
+# Perfil de PRAGMAs do SQLite (aplicado no startup e em cada nova conexão)
+# journal_mode: WAL permite leituras simultâneas a uma escrita
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")
+# synchronous: NORMAL é seguro em WAL (pode perder só a última transação em queda de energia)
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+# Cache de páginas por conexão em KB
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+# Tamanho máximo de memory-mapped I/O em bytes (0 desativa)
+DB_MMAP_SIZE_BYTES = int(os.getenv("DB_MMAP_SIZE_BYTES", str(128 * 1024 * 1024)))
+# Onde tabelas/índices temporários são criados (DEFAULT, FILE ou MEMORY)
+DB_TEMP_STORE = os.getenv("DB_TEMP_STORE", "MEMORY")
+# Tempo (ms) que uma conexão aguarda um lock antes de falhar com "database is locked"
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+# auto_vacuum (NONE, FULL ou INCREMENTAL): INCREMENTAL permite devolver ao sistema
+# as páginas livres aos poucos (PRAGMA incremental_vacuum). Vale para bancos novos;
+# bancos existentes são convertidos no primeiro VACUUM (ver CHAT_RETENCAO_*)
+DB_AUTO_VACUUM = os.getenv("DB_AUTO_VACUUM", "INCREMENTAL")
+
+# Checkpoint do WAL
+# Intervalo (segundos) entre checkpoints passivos (0 desativa o agendador)
+DB_WAL_CHECKPOINT_SEGUNDOS = int(os.getenv("DB_WAL_CHECKPOINT_SEGUNDOS", "60"))
+# Acima deste tamanho o arquivo -wal é truncado no próximo checkpoint
+DB_WAL_LIMITE_BYTES = int(os.getenv("DB_WAL_LIMITE_BYTES", str(64 * 1024 * 1024)))
+
+# Acesso assíncrono (util/db_async.py)
+# Threads dedicadas para executar as funções de repo/* fora do event loop
+DB_EXECUTOR_THREADS = int(os.getenv("DB_EXECUTOR_THREADS", str(DB_POOL_TAMANHO)))
+
+# Backups online (util/backup_util.py): cópia pela API de backup do SQLite
+# Páginas copiadas por passo (cada passo atualiza o progresso da tarefa)
+BACKUP_PAGINAS_POR_PASSO = int(os.getenv("BACKUP_PAGINAS_POR_PASSO", "1024"))
+# Pausa entre passos (ms) para dividir o disco com as requisições (0 desativa)
+BACKUP_PAUSA_MS = int(os.getenv("BACKUP_PAUSA_MS", "0"))
+# Quanto tempo POST /admin/backups/criar aguarda a conclusão antes de responder
+# "em andamento" (a página passa a acompanhar o progresso)
+BACKUP_ESPERA_SEGUNDOS = float(os.getenv("BACKUP_ESPERA_SEGUNDOS", "2"))
+
+# Cache de páginas públicas (util/cache_paginas.py)
+# Validade das páginas renderizadas para visitantes anônimos (0 desativa)
+CACHE_PAGINAS_TTL_SEGUNDOS = int(os.getenv("CACHE_PAGINAS_TTL_SEGUNDOS", "60"))
+CACHE_PAGINAS_MAX_ENTRADAS = int(os.getenv("CACHE_PAGINAS_MAX_ENTRADAS", "256"))
+
+# Contador de visualizações (util/contador_visualizacoes.py)
+# Intervalo entre gravações em lote (0 grava só ao atingir o limite/encerrar)
+VISUALIZACOES_FLUSH_SEGUNDOS = float(os.getenv("VISUALIZACOES_FLUSH_SEGUNDOS", "5"))
+# Total de visualizações pendentes que antecipa a gravação
+VISUALIZACOES_FLUSH_LIMITE = int(os.getenv("VISUALIZACOES_FLUSH_LIMITE", "500"))
+
+# Chat entre workers (util/chat_backplane.py)
+# "local" entrega só no próprio processo; "sqlite" publica os eventos na
+# tabela chat_evento e cada worker a consulta para entregar aos seus usuários
+CHAT_BACKPLANE = os.getenv("CHAT_BACKPLANE", "local").lower()
+# Intervalo entre consultas a novos eventos e máximo de eventos por consulta
+CHAT_BACKPLANE_INTERVALO_SEGUNDOS = float(os.getenv("CHAT_BACKPLANE_INTERVALO_SEGUNDOS", "0.25"))
+CHAT_BACKPLANE_LOTE = int(os.getenv("CHAT_BACKPLANE_LOTE", "200"))
+# Por quanto tempo os eventos ficam na tabela antes de serem removidos
+CHAT_BACKPLANE_RETENCAO_SEGUNDOS = float(os.getenv("CHAT_BACKPLANE_RETENCAO_SEGUNDOS", "300"))
+# Eventos pendentes por conexão SSE (cada aba/dispositivo tem sua fila)
+CHAT_FILA_MAX_EVENTOS = int(os.getenv("CHAT_FILA_MAX_EVENTOS", "100"))
+# Fila cheia: "ressincronizar" encerra o stream pedindo ao cliente que recarregue;
+# "descartar_antigos" descarta o evento mais antigo pendente
+CHAT_FILA_POLITICA = os.getenv("CHAT_FILA_POLITICA", "ressincronizar").lower()
+# Máximo de eventos enviados em uma única escrita do stream
+CHAT_SSE_LOTE_EVENTOS = int(os.getenv("CHAT_SSE_LOTE_EVENTOS", "50"))
+# Comentário enviado em streams ociosos para proxies não encerrarem a conexão (0 desativa)
+CHAT_SSE_HEARTBEAT_SEGUNDOS = float(os.getenv("CHAT_SSE_HEARTBEAT_SEGUNDOS", "15"))
+# Espera base do cliente antes de reconectar (recebe variação aleatória de até 100%)
+CHAT_SSE_RETRY_MS = int(os.getenv("CHAT_SSE_RETRY_MS", "3000"))
+# Máximo de mensagens reenviadas na reconexão (acima disso o cliente ressincroniza)
+CHAT_SSE_REPLAY_MAX = int(os.getenv("CHAT_SSE_REPLAY_MAX", "500"))
+# Máximo de envios de mensagem gravados em uma única transação (group commit)
+CHAT_ESCRITA_LOTE_MAX = int(os.getenv("CHAT_ESCRITA_LOTE_MAX", "64"))
+# Retenção (util/chat_manutencao.py): mensagens lidas com mais de N dias vão para
+# a tabela chat_mensagem_arquivo (0 desativa); o histórico continua lendo o arquivo
+CHAT_RETENCAO_DIAS = int(os.getenv("CHAT_RETENCAO_DIAS", "365"))
+# Intervalo entre execuções do arquivamento (0 desativa o agendador)
+CHAT_RETENCAO_INTERVALO_SEGUNDOS = int(os.getenv("CHAT_RETENCAO_INTERVALO_SEGUNDOS", "3600"))
+# Mensagens movidas por transação (transações curtas não seguram a escrita do chat)
+CHAT_RETENCAO_LOTE = int(os.getenv("CHAT_RETENCAO_LOTE", "1000"))
+# Páginas livres devolvidas por execução com incremental_vacuum (0 devolve todas)
+CHAT_RETENCAO_VACUUM_PAGINAS = int(os.getenv("CHAT_RETENCAO_VACUUM_PAGINAS", "2000"))
+
+# === Cache de Configurações ===
+# TTL padrão: intervalo mínimo entre consultas à versão das configurações
+# no banco (alterações feitas em outro worker aparecem em até esse tempo)
+CONFIG_VERSAO_INTERVALO_SEGUNDOS = float(os.getenv("CONFIG_VERSAO_INTERVALO_SEGUNDOS", "2"))
+# Após o TTL, por quanto tempo o valor antigo é servido enquanto revalida em segundo plano
+CONFIG_STALE_SEGUNDOS = float(os.getenv("CONFIG_STALE_SEGUNDOS", "30"))
+# Espera inicial e máxima entre tentativas após erro de acesso ao banco
+CONFIG_ERRO_BACKOFF_SEGUNDOS = float(os.getenv("CONFIG_ERRO_BACKOFF_SEGUNDOS", "1"))
+CONFIG_ERRO_BACKOFF_MAX_SEGUNDOS = float(os.getenv("CONFIG_ERRO_BACKOFF_MAX_SEGUNDOS", "30"))
+
 # === Configurações de Logging ===
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "30"))
@@ -65,6 +163,15 @@ PASSWORD_MAX_LENGTH = int(os.getenv("PASSWORD_MAX_LENGTH", "128"))
 TOAST_AUTO_HIDE_DELAY_MS = int(os.getenv("TOAST_AUTO_HIDE_DELAY_MS", "5000"))
 
 # === Configurações de Rate Limiting ===
+# Onde os contadores ficam: "memoria" (por processo) ou "sqlite"
+# (compartilhado entre workers e preservado ao reiniciar)
+RATE_LIMIT_ARMAZENAMENTO = os.getenv("RATE_LIMIT_ARMAZENAMENTO", "memoria").lower()
+# Máximo de identificadores (IPs) acompanhados por limiter; acima disso,
+# o usado há mais tempo é descartado
+RATE_LIMIT_MAX_IDENTIFICADORES = int(os.getenv("RATE_LIMIT_MAX_IDENTIFICADORES", "10000"))
+# Intervalo da remoção de identificadores expirados (0 desativa)
+RATE_LIMIT_LIMPEZA_SEGUNDOS = float(os.getenv("RATE_LIMIT_LIMPEZA_SEGUNDOS", "60"))
+
 # Autenticação
 RATE_LIMIT_LOGIN_MAX = int(os.getenv("RATE_LIMIT_LOGIN_MAX", "5"))
 RATE_LIMIT_LOGIN_MINUTOS = int(os.getenv("RATE_LIMIT_LOGIN_MINUTOS", "5"))
@@ -1,12 +1,209 @@
-from typing import Dict, Any, List
+"""
+Cache das configurações do sistema (tabela configuracao).
+
+Todas as configurações são carregadas de uma vez (configuracao_repo.obter_todos)
+e servidas da memória. Para que vários workers do uvicorn enxerguem as
+alterações feitas pelo admin em qualquer um deles, triggers na tabela
+configuracao incrementam a versão "configuracao" em versao_dados, e cada
+processo confere essa versão quando o TTL da chave lida expira:
+
+    - dentro do TTL (CONFIG_VERSAO_INTERVALO_SEGUNDOS ou definir_ttl):
+      valor servido da memória, sem acessar o banco;
+    - TTL vencido há menos de CONFIG_STALE_SEGUNDOS: valor atual servido
+      imediatamente e a revalidação feita em segundo plano
+      (stale-while-revalidate);
+    - além disso (ou na primeira leitura): revalidação na própria chamada.
+
+Se o banco falhar (ex.: "database is locked"), o último valor conhecido
+continua sendo servido e novas tentativas só acontecem após um intervalo
+que dobra a cada falha (CONFIG_ERRO_BACKOFF_SEGUNDOS até
+CONFIG_ERRO_BACKOFF_MAX_SEGUNDOS), tirando o banco do caminho das
+requisições. Chaves ausentes também são respondidas pela memória.
+
+Valores tipados (obter_int/obter_bool/obter_float) são convertidos uma única
+vez por carga, e não a cada chamada.
+"""
 import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 from repo import configuracao_repo
+from util.config import (
+    CONFIG_ERRO_BACKOFF_MAX_SEGUNDOS,
+    CONFIG_ERRO_BACKOFF_SEGUNDOS,
+    CONFIG_STALE_SEGUNDOS,
+    CONFIG_VERSAO_INTERVALO_SEGUNDOS,
+)
 from util.logger_config import logger
 
+# Marca valores que não puderam ser convertidos para o tipo pedido
+_INVALIDO = object()
+
 
 class ConfigCache:
     """Cache de configurações do sistema para melhor performance"""
-    _cache: Dict[str, Any] = {}
+    _cache: Dict[str, str] = {}
+    _tipados: Dict[Tuple[str, str], Any] = {}
+    _ttls: Dict[str, float] = {}
+    _carregado: bool = False
+    _versao: Optional[int] = None
+    _ultima_verificacao: float = 0.0
+    _falhas_consecutivas: int = 0
+    _proxima_tentativa: float = 0.0
+    # Incrementada por limpar(); cargas iniciadas antes são descartadas
+    _geracao: int = 0
+    _lock = threading.RLock()
+    _lock_carga = threading.Lock()
+    _thread_revalidacao: Optional[threading.Thread] = None
+    _estatisticas: Dict[str, int] = {
+        "hits": 0, "ausentes": 0, "obsoletos": 0, "misses": 0, "backoff": 0,
+        "cargas": 0, "verificacoes": 0, "erros": 0,
+    }
+
+    @classmethod
+    def definir_ttl(cls, chave: str, ttl_segundos: float) -> None:
+        """
+        Define por quanto tempo o valor de uma chave é servido sem conferir o banco.
+
+        Args:
+            chave: Chave da configuração
+            ttl_segundos: TTL da chave (substitui CONFIG_VERSAO_INTERVALO_SEGUNDOS)
+        """
+        with cls._lock:
+            cls._ttls[chave] = ttl_segundos
+
+    @classmethod
+    def precarregar(cls) -> bool:
+        """
+        Carrega todas as configurações do banco para a memória.
+
+        Chamado no startup e sempre que a versão das configurações muda.
+
+        Returns:
+            True se carregou, False em caso de erro (cache anterior mantido)
+        """
+        return cls._revalidar(forcar_carga=True)
+
+    @classmethod
+    def _revalidar(cls, forcar_carga: bool = False) -> bool:
+        """
+        Confere a versão no banco e recarrega tudo se ela mudou.
+
+        Apenas uma revalidação roda por vez; falhas ativam o backoff.
+
+        Returns:
+            True se o cache está atualizado, False em caso de erro
+        """
+        from repo import versao_dados_repo
+
+        with cls._lock_carga:
+            with cls._lock:
+                geracao = cls._geracao
+                versao_atual = cls._versao if cls._carregado else None
+
+            try:
+                versao = versao_dados_repo.obter_versao("configuracao")
+                # A linha é registrada no startup; sem ela o banco está inacessível
+                if versao is None:
+                    raise sqlite3.OperationalError("versão das configurações indisponível")
+                valores = None
+                if forcar_carga or versao != versao_atual:
+                    valores = {c.chave: c.valor for c in configuracao_repo.obter_todos()}
+            except sqlite3.Error as e:
+                cls._registrar_falha(e)
+                return False
+
+            with cls._lock:
+                if geracao != cls._geracao:
+                    return True
+                cls._ultima_verificacao = time.monotonic()
+                cls._falhas_consecutivas = 0
+                cls._proxima_tentativa = 0.0
+                cls._estatisticas["verificacoes"] += 1
+                if valores is not None:
+                    cls._cache = valores
+                    cls._tipados = {}
+                    cls._versao = versao
+                    cls._carregado = True
+                    cls._estatisticas["cargas"] += 1
+
+        if valores is not None:
+            logger.debug(f"{len(valores)} configurações carregadas (versão {versao})")
+        return True
+
+    @classmethod
+    def _registrar_falha(cls, erro: Exception) -> None:
+        """Conta a falha e adia a próxima tentativa (backoff exponencial)."""
+        with cls._lock:
+            cls._falhas_consecutivas += 1
+            cls._estatisticas["erros"] += 1
+            espera = min(
+                CONFIG_ERRO_BACKOFF_SEGUNDOS * 2 ** (cls._falhas_consecutivas - 1),
+                CONFIG_ERRO_BACKOFF_MAX_SEGUNDOS,
+            )
+            cls._proxima_tentativa = time.monotonic() + espera
+            servindo = "último valor conhecido" if cls._carregado else "valores padrão"
+        logger.error(
+            f"Erro ao carregar configurações do banco: {erro} "
+            f"(usando {servindo}; nova tentativa em {espera:.1f}s)"
+        )
+
+    @classmethod
+    def _revalidar_em_segundo_plano(cls) -> None:
+        """Dispara uma revalidação em thread, se nenhuma estiver em andamento."""
+        with cls._lock:
+            if cls._thread_revalidacao is not None and cls._thread_revalidacao.is_alive():
+                return
+            cls._thread_revalidacao = threading.Thread(
+                target=cls._revalidar, name="config-cache-revalidacao", daemon=True
+            )
+            cls._thread_revalidacao.start()
+
+    @classmethod
+    def aguardar_revalidacao(cls, timeout: float = 5.0) -> None:
+        """Aguarda a revalidação em segundo plano em andamento, se houver."""
+        thread = cls._thread_revalidacao
+        if thread is not None:
+            thread.join(timeout)
+
+    @classmethod
+    def _obter_snapshot(cls, chave: str) -> Tuple[Dict[str, str], Dict[Tuple[str, str], Any]]:
+        """
+        Retorna os valores e conversões a usar na leitura de uma chave.
+
+        Decide entre servir da memória, revalidar em segundo plano ou
+        revalidar na própria chamada. Os dicionários são trocados (e não
+        alterados) a cada carga, então o par devolvido é sempre consistente.
+        """
+        agora = time.monotonic()
+        with cls._lock:
+            snapshot = (cls._cache, cls._tipados)
+            ttl = cls._ttls.get(chave, CONFIG_VERSAO_INTERVALO_SEGUNDOS)
+            idade = agora - cls._ultima_verificacao
+            if cls._carregado and idade < ttl:
+                cls._estatisticas["hits"] += 1
+                return snapshot
+            if agora < cls._proxima_tentativa:
+                cls._estatisticas["backoff"] += 1
+                return snapshot
+            if cls._carregado and idade < ttl + CONFIG_STALE_SEGUNDOS:
+                cls._estatisticas["obsoletos"] += 1
+                revalidar_na_chamada = False
+            else:
+                cls._estatisticas["misses"] += 1
+                revalidar_na_chamada = True
+
+        try:
+            if not revalidar_na_chamada:
+                cls._revalidar_em_segundo_plano()
+                return snapshot
+            cls._revalidar()
+        except Exception as e:
+            logger.critical(f"Erro crítico ao acessar configuração '{chave}': {e}")
+
+        with cls._lock:
+            return cls._cache, cls._tipados
 
     @classmethod
     def obter(cls, chave: str, padrao: str = "") -> str:
@@ -23,29 +220,41 @@ class ConfigCache:
         Raises:
             Nenhuma exceção - retorna padrao em caso de erro
         """
-        # Retorna do cache se disponível
-        if chave in cls._cache:
-            return cls._cache[chave]
+        valores, _ = cls._obter_snapshot(chave)
+        valor = valores.get(chave)
+        if valor is None:
+            with cls._lock:
+                cls._estatisticas["ausentes"] += 1
+            return padrao
+        return valor
 
-        # Tenta buscar do banco com error handling
-        try:
-            config = configuracao_repo.obter_por_chave(chave)
-            if config:
-                cls._cache[chave] = config.valor
-                return config.valor
-            else:
-                cls._cache[chave] = padrao
-                return padrao
+    @classmethod
+    def _obter_tipado(
+        cls, chave: str, padrao: Any, tipo: str, converter: Callable[[str], Any]
+    ) -> Any:
+        """
+        Obtém configuração convertida, reaproveitando a conversão já feita.
 
-        except sqlite3.Error as e:
-            logger.error(f"Erro ao buscar configuração '{chave}' do banco: {e}")
-            # Retorna padrão em vez de crashar a aplicação
+        Valores inválidos são registrados no log uma vez por carga e
+        resultam no padrão.
+        """
+        valores, tipados = cls._obter_snapshot(chave)
+        valor_str = valores.get(chave)
+        if valor_str is None:
+            with cls._lock:
+                cls._estatisticas["ausentes"] += 1
             return padrao
 
-        except Exception as e:
-            logger.critical(f"Erro crítico ao acessar configuração '{chave}': {e}")
-            # Ainda retorna padrão, mas loga como crítico
-            return padrao
+        convertido = tipados.get((chave, tipo))
+        if convertido is None:
+            try:
+                convertido = converter(valor_str)
+            except ValueError as e:
+                logger.error(f"Erro ao converter configuração '{chave}' para {tipo}: {e}")
+                convertido = _INVALIDO
+            with cls._lock:
+                tipados[(chave, tipo)] = convertido
+        return padrao if convertido is _INVALIDO else convertido
 
     @classmethod
     def obter_int(cls, chave: str, padrao: int) -> int:
@@ -62,12 +271,7 @@ class ConfigCache:
         Raises:
             Nenhuma exceção - retorna padrao em caso de erro
         """
-        try:
-            valor_str = cls.obter(chave, str(padrao))
-            return int(valor_str)
-        except ValueError as e:
-            logger.error(f"Erro ao converter configuração '{chave}' para int: {e}")
-            return padrao
+        return cls._obter_tipado(chave, padrao, "int", int)
 
     @classmethod
     def obter_bool(cls, chave: str, padrao: bool) -> bool:
@@ -84,13 +288,11 @@ class ConfigCache:
         Raises:
             Nenhuma exceção - retorna padrao em caso de erro
         """
-        try:
-            valor_str = cls.obter(chave, str(padrao)).lower()
-            # Aceita "true", "1", "yes", "sim" como verdadeiro
-            return valor_str in ("true", "1", "yes", "sim", "verdadeiro")
-        except Exception as e:
-            logger.error(f"Erro ao converter configuração '{chave}' para bool: {e}")
-            return padrao
+        # Aceita "true", "1", "yes", "sim" como verdadeiro
+        return cls._obter_tipado(
+            chave, padrao, "bool",
+            lambda valor: valor.lower() in ("true", "1", "yes", "sim", "verdadeiro"),
+        )
 
     @classmethod
     def obter_float(cls, chave: str, padrao: float) -> float:
@@ -107,12 +309,7 @@ class ConfigCache:
         Raises:
             Nenhuma exceção - retorna padrao em caso de erro
         """
-        try:
-            valor_str = cls.obter(chave, str(padrao))
-            return float(valor_str)
-        except ValueError as e:
-            logger.error(f"Erro ao converter configuração '{chave}' para float: {e}")
-            return padrao
+        return cls._obter_tipado(chave, padrao, "float", float)
 
     @classmethod
     def obter_multiplos(cls, chaves: List[str], padroes: List[str]) -> Dict[str, str]:
@@ -141,14 +338,35 @@ class ConfigCache:
 
     @classmethod
     def limpar(cls):
-        """Limpa todo o cache de configurações"""
-        cls._cache = {}
+        """Limpa todo o cache de configurações (a próxima leitura recarrega do banco)"""
+        with cls._lock:
+            cls._cache = {}
+            cls._tipados = {}
+            cls._carregado = False
+            cls._versao = None
+            cls._ultima_verificacao = 0.0
+            cls._falhas_consecutivas = 0
+            cls._proxima_tentativa = 0.0
+            cls._geracao += 1
 
     @classmethod
     def limpar_chave(cls, chave: str):
-        """Limpa cache de uma chave específica"""
-        if chave in cls._cache:
-            del cls._cache[chave]
+        """Limpa cache de uma chave específica (recarrega todas na próxima leitura)"""
+        cls.limpar()
+
+    @classmethod
+    def obter_estatisticas(cls) -> Dict[str, Any]:
+        """Retorna métricas do cache (hits, misses, erros, backoff, cargas)."""
+        with cls._lock:
+            return {
+                **cls._estatisticas,
+                "chaves": len(cls._cache),
+                "versao": cls._versao,
+                "ttl_segundos": CONFIG_VERSAO_INTERVALO_SEGUNDOS,
+                "stale_segundos": CONFIG_STALE_SEGUNDOS,
+                "falhas_consecutivas": cls._falhas_consecutivas,
+                "em_backoff": time.monotonic() < cls._proxima_tentativa,
+            }
 
 
 # Instância global para uso em toda a aplicação
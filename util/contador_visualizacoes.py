@@ -0,0 +1,205 @@
+"""
+Contador de visualizações com escrita adiada (write-behind).
+
+Cada leitura de /artigos/ler/{id} fazia seu próprio UPDATE em artigo, e um
+artigo muito acessado virava um ponto quente de escrita, disputando a
+conexão de escrita com todas as outras operações. Aqui as visualizações
+são somadas em memória por artigo e gravadas em lote, em uma única
+transação, quando:
+
+    - o intervalo VISUALIZACOES_FLUSH_SEGUNDOS expira (thread de fundo), ou
+    - o total pendente atinge VISUALIZACOES_FLUSH_LIMITE, ou
+    - a aplicação é encerrada (parar() grava o que restou).
+
+As leituras de artigo_repo somam as visualizações pendentes ao valor do
+banco (pendentes()), então os totais exibidos continuam exatos.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from util.config import VISUALIZACOES_FLUSH_LIMITE, VISUALIZACOES_FLUSH_SEGUNDOS
+from util.logger_config import logger
+
+
+class ContadorVisualizacoes:
+    """
+    Agrega incrementos de visualização por artigo e os grava em lote.
+
+    Attributes:
+        intervalo_segundos: Intervalo entre gravações periódicas (0 desativa a thread)
+        limite_pendentes: Total pendente que dispara uma gravação antecipada
+    """
+
+    def __init__(
+        self,
+        intervalo_segundos: float = VISUALIZACOES_FLUSH_SEGUNDOS,
+        limite_pendentes: int = VISUALIZACOES_FLUSH_LIMITE,
+    ):
+        self.intervalo_segundos = intervalo_segundos
+        self.limite_pendentes = limite_pendentes
+        self._pendentes: dict[int, int] = {}
+        self._em_gravacao: dict[int, int] = {}
+        self._total_pendente = 0
+        self._lock = threading.Lock()
+        self._lock_gravacao = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._gravacao_avulsa: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+        self._acordar = threading.Event()
+        self._registradas = 0
+        self._gravacoes = 0
+        self._gravadas = 0
+        self._falhas = 0
+
+    def registrar(self, artigo_id: int, quantidade: int = 1) -> None:
+        """
+        Soma visualizações de um artigo ao buffer (sem acessar o banco).
+
+        Ao atingir limite_pendentes, a gravação é antecipada: pela thread de
+        fundo quando ativa, ou por uma thread avulsa quando não há thread.
+        Nunca grava na própria chamada, que vem de rotas assíncronas.
+        """
+        with self._lock:
+            self._pendentes[artigo_id] = self._pendentes.get(artigo_id, 0) + quantidade
+            self._total_pendente += quantidade
+            self._registradas += quantidade
+            atingiu_limite = self._total_pendente >= self.limite_pendentes
+
+        if atingiu_limite:
+            self._antecipar_gravacao()
+
+    def _antecipar_gravacao(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self._acordar.set()
+            return
+        with self._lock:
+            if self._gravacao_avulsa is not None and self._gravacao_avulsa.is_alive():
+                return
+            self._gravacao_avulsa = threading.Thread(
+                target=self._descarregar_registrando_erro,
+                name="contador-visualizacoes-limite",
+                daemon=True,
+            )
+            self._gravacao_avulsa.start()
+
+    def _descarregar_registrando_erro(self) -> None:
+        try:
+            self.descarregar()
+        except Exception as e:
+            logger.error(f"Erro na gravação de visualizações: {e}")
+
+    def pendentes(self, artigo_id: int) -> int:
+        """Visualizações do artigo ainda não gravadas no banco."""
+        with self._lock:
+            return self._pendentes.get(artigo_id, 0) + self._em_gravacao.get(artigo_id, 0)
+
+    def descarregar(self) -> int:
+        """
+        Grava todas as visualizações pendentes em uma única transação.
+
+        Em caso de falha, os incrementos voltam para o buffer e serão
+        gravados na próxima tentativa.
+
+        Returns:
+            Quantidade de visualizações gravadas
+        """
+        from repo import artigo_repo
+
+        with self._lock_gravacao:
+            with self._lock:
+                if not self._pendentes:
+                    return 0
+                self._em_gravacao = self._pendentes
+                self._pendentes = {}
+                self._total_pendente = 0
+
+            lote = self._em_gravacao
+            gravado = artigo_repo.incrementar_visualizacoes_em_lote(lote, self._confirmar_gravacao())
+
+            with self._lock:
+                if not gravado:
+                    self._em_gravacao = {}
+                    self._falhas += 1
+                    for artigo_id, quantidade in lote.items():
+                        self._pendentes[artigo_id] = self._pendentes.get(artigo_id, 0) + quantidade
+                        self._total_pendente += quantidade
+                    logger.warning(f"Falha ao gravar visualizações de {len(lote)} artigo(s); serão regravadas")
+                    return 0
+                self._gravacoes += 1
+                total = sum(lote.values())
+                self._gravadas += total
+
+        logger.debug(f"Visualizações gravadas: {total} em {len(lote)} artigo(s)")
+        return total
+
+    @contextmanager
+    def _confirmar_gravacao(self) -> Iterator[None]:
+        # O commit do lote acontece dentro deste bloco: quem lê pendentes()
+        # vê o lote no buffer ou no banco, nunca nos dois
+        with self._lock:
+            yield
+            self._em_gravacao = {}
+
+    def _loop(self) -> None:
+        while not self._parar.is_set():
+            self._acordar.wait(self.intervalo_segundos)
+            self._acordar.clear()
+            if self._parar.is_set():
+                break
+            try:
+                self.descarregar()
+            except Exception as e:
+                logger.error(f"Erro na gravação periódica de visualizações: {e}")
+
+    def iniciar(self) -> None:
+        """Inicia a thread de gravação periódica (idempotente)."""
+        if self.intervalo_segundos <= 0:
+            logger.info("Gravação periódica de visualizações desativada")
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._parar.clear()
+        self._acordar.clear()
+        self._thread = threading.Thread(target=self._loop, name="contador-visualizacoes", daemon=True)
+        self._thread.start()
+        logger.info(f"Contador de visualizações iniciado (gravação a cada {self.intervalo_segundos}s)")
+
+    def parar(self) -> None:
+        """Interrompe a thread e grava as visualizações pendentes."""
+        if self._thread is not None:
+            self._parar.set()
+            self._acordar.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._gravacao_avulsa is not None:
+            self._gravacao_avulsa.join(timeout=5)
+            self._gravacao_avulsa = None
+        self.descarregar()
+
+    def limpar(self) -> None:
+        """Descarta as visualizações pendentes e zera as estatísticas."""
+        with self._lock:
+            self._pendentes.clear()
+            self._total_pendente = 0
+            self._registradas = self._gravacoes = self._gravadas = self._falhas = 0
+
+    def obter_estatisticas(self) -> dict:
+        """Retorna métricas do contador."""
+        with self._lock:
+            return {
+                "ativo": self._thread is not None and self._thread.is_alive(),
+                "intervalo_segundos": self.intervalo_segundos,
+                "limite_pendentes": self.limite_pendentes,
+                "pendentes": self._total_pendente,
+                "artigos_pendentes": len(self._pendentes),
+                "registradas": self._registradas,
+                "gravacoes": self._gravacoes,
+                "gravadas": self._gravadas,
+                "falhas": self._falhas,
+            }
+
+
+# Instância global usada pela rota de leitura e por artigo_repo
+contador_visualizacoes = ContadorVisualizacoes()
@@ -0,0 +1,129 @@
+"""
+Acesso assíncrono ao banco de dados.
+
+As funções de repo/* usam sqlite3, que é síncrono. Chamadas diretas dentro
+de rotas `async def` bloqueiam o event loop: enquanto uma consulta lenta
+roda, nenhuma outra requisição (nem os streams SSE do chat) avança.
+
+executar_db() roda a função em um pool de threads dedicado ao banco, separado
+do executor padrão do asyncio, e devolve o resultado como awaitable:
+
+    artigos = await executar_db(artigo_repo.obter_publicados)
+    artigo = await executar_db(artigo_repo.obter_por_id, id)
+"""
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from util.config import DB_EXECUTOR_THREADS
+from util.logger_config import logger
+
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+# Métricas do executor
+_metricas_lock = threading.Lock()
+_em_andamento = 0
+_concluidas = 0
+_falhas = 0
+_tempo_total = 0.0
+
+
+def obter_executor() -> ThreadPoolExecutor:
+    """
+    Retorna o executor dedicado ao banco, criando-o na primeira chamada.
+
+    O executor é recriado após fork (ex.: múltiplos workers) ou após
+    encerrar_executor().
+
+    Returns:
+        ThreadPoolExecutor com DB_EXECUTOR_THREADS threads
+    """
+    global _executor, _executor_pid
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=DB_EXECUTOR_THREADS,
+                thread_name_prefix="db",
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def encerrar_executor() -> None:
+    """Encerra o executor aguardando as tarefas em andamento (usado no shutdown)."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+            logger.info("Executor assíncrono do banco de dados encerrado")
+
+
+def _executar_com_metricas(func: Callable[..., T]) -> T:
+    global _em_andamento, _concluidas, _falhas, _tempo_total
+
+    with _metricas_lock:
+        _em_andamento += 1
+    inicio = time.perf_counter()
+    try:
+        resultado = func()
+    except Exception:
+        with _metricas_lock:
+            _falhas += 1
+        raise
+    finally:
+        duracao = time.perf_counter() - inicio
+        with _metricas_lock:
+            _em_andamento -= 1
+            _concluidas += 1
+            _tempo_total += duracao
+    return resultado
+
+
+async def executar_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Executa uma função síncrona de acesso ao banco sem bloquear o event loop.
+
+    Args:
+        func: Função de repositório (ou qualquer função que use obter_conexao)
+        *args: Argumentos posicionais repassados para func
+        **kwargs: Argumentos nomeados repassados para func
+
+    Returns:
+        O valor retornado por func. Exceções de func são propagadas.
+    """
+    loop = asyncio.get_running_loop()
+    chamada = functools.partial(func, *args, **kwargs)
+    return await loop.run_in_executor(
+        obter_executor(),
+        functools.partial(_executar_com_metricas, chamada),
+    )
+
+
+def obter_estatisticas_executor() -> dict:
+    """
+    Retorna métricas do executor assíncrono.
+
+    Returns:
+        Dicionário com threads, tarefas em andamento, concluídas, falhas
+        e tempo médio de execução em ms
+    """
+    with _metricas_lock:
+        return {
+            "threads": DB_EXECUTOR_THREADS,
+            "em_andamento": _em_andamento,
+            "concluidas": _concluidas,
+            "falhas": _falhas,
+            "tempo_medio_ms": round(_tempo_total / _concluidas * 1000, 3) if _concluidas else 0.0,
+        }
@@ -1,10 +1,29 @@
 import sqlite3
 import os
+import queue
+import threading
+import time
 from contextlib import contextmanager
 from datetime import datetime
+from typing import Optional
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 
+from util.config import (
+    DB_POOL_TAMANHO,
+    DB_POOL_TIMEOUT_SEGUNDOS,
+    DB_JOURNAL_MODE,
+    DB_SYNCHRONOUS,
+    DB_CACHE_SIZE_KB,
+    DB_MMAP_SIZE_BYTES,
+    DB_TEMP_STORE,
+    DB_BUSY_TIMEOUT_MS,
+    DB_AUTO_VACUUM,
+    DB_WAL_CHECKPOINT_SEGUNDOS,
+    DB_WAL_LIMITE_BYTES,
+)
+from util.logger_config import logger
+
 
 load_dotenv()
 
@@ -12,17 +31,560 @@ DATABASE_PATH = os.getenv('DATABASE_PATH', 'dados.db')
 TIMEZONE = os.getenv('TIMEZONE', 'America/Sao_Paulo')
 APP_TIMEZONE = ZoneInfo(TIMEZONE)
 
+# Valores aceitos nos PRAGMAs textuais (PRAGMA não aceita parâmetros "?")
+_VALORES_PRAGMA = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+    "wal_checkpoint": {"PASSIVE", "FULL", "RESTART", "TRUNCATE"},
+    "auto_vacuum": {"NONE", "FULL", "INCREMENTAL"},
+}
+
+# Valor de PRAGMA auto_vacuum para cada modo configurável
+_MODOS_AUTO_VACUUM = {"NONE": 0, "FULL": 1, "INCREMENTAL": 2}
+
+# PRAGMAs que valem por conexão e são aplicados a cada conexão nova do pool
+PRAGMAS_POR_CONEXAO = (
+    "busy_timeout",
+    "synchronous",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+    "journal_size_limit",
+)
+
+
+def _validar_valor_pragma(nome: str, valor: str) -> str:
+    """Normaliza e valida o valor de um PRAGMA textual."""
+    valor_normalizado = str(valor).strip().upper()
+    if valor_normalizado not in _VALORES_PRAGMA[nome]:
+        raise ValueError(
+            f"Valor inválido para PRAGMA {nome}: '{valor}'. "
+            f"Permitidos: {', '.join(sorted(_VALORES_PRAGMA[nome]))}"
+        )
+    return valor_normalizado
+
+
+def obter_perfil_pragmas() -> dict:
+    """
+    Monta o perfil de PRAGMAs a partir das configurações (util/config.py).
+
+    Returns:
+        Dicionário {pragma: valor} validado
+
+    Raises:
+        ValueError: Se algum valor configurado for inválido
+    """
+    return {
+        "journal_mode": _validar_valor_pragma("journal_mode", DB_JOURNAL_MODE),
+        "synchronous": _validar_valor_pragma("synchronous", DB_SYNCHRONOUS),
+        # Valor negativo em cache_size significa KB (e não número de páginas)
+        "cache_size": -abs(int(DB_CACHE_SIZE_KB)),
+        "mmap_size": max(0, int(DB_MMAP_SIZE_BYTES)),
+        "temp_store": _validar_valor_pragma("temp_store", DB_TEMP_STORE),
+        "busy_timeout": max(0, int(DB_BUSY_TIMEOUT_MS)),
+        "journal_size_limit": max(0, int(DB_WAL_LIMITE_BYTES)),
+        "auto_vacuum": _validar_valor_pragma("auto_vacuum", DB_AUTO_VACUUM),
+    }
+
+
+class PoolConexoes:
+    """
+    Pool de conexões SQLite de longa duração.
+
+    Evita o custo de abrir, configurar e fechar uma conexão a cada chamada
+    de repositório. As conexões são separadas por papel:
+
+    - Leitura: até `tamanho` conexões reutilizáveis, abertas com
+      PRAGMA query_only (qualquer escrita acidental falha imediatamente)
+    - Escrita: uma única conexão, serializada por lock, pois o SQLite
+      aceita apenas um escritor por vez
+
+    Chamadas aninhadas de obter_conexao() na mesma thread reutilizam a
+    conexão já adquirida (uma conexão por thread), evitando deadlock no
+    lock de escrita e transações paralelas dentro da mesma requisição.
+
+    Attributes:
+        caminho: Caminho do arquivo do banco de dados
+        tamanho: Número máximo de conexões de leitura
+        timeout: Segundos aguardando uma conexão livre antes de falhar
+    """
+
+    def __init__(self, caminho: str, tamanho: int = DB_POOL_TAMANHO, timeout: float = DB_POOL_TIMEOUT_SEGUNDOS):
+        if tamanho <= 0:
+            raise ValueError("tamanho do pool deve ser positivo")
+
+        self.caminho = caminho
+        self.tamanho = tamanho
+        self.timeout = timeout
+        self.pid = os.getpid()
+
+        self._leitura_livres: queue.LifoQueue = queue.LifoQueue()
+        self._leitura_abertas = 0
+        self._escrita: Optional[sqlite3.Connection] = None
+        self._lock_escrita = threading.Lock()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._esperas = 0
+        self._tempo_espera_total = 0.0
+        self._timeouts = 0
+        self._descartadas = 0
+
+        self._pragmas = obter_perfil_pragmas()
+        registrar_adaptadores()
+
+    def _criar_conexao(self, somente_leitura: bool) -> sqlite3.Connection:
+        """Abre e configura uma nova conexão (executado apenas em cache miss)."""
+        conn = sqlite3.connect(
+            self.caminho,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            check_same_thread=False
+        )
+        conn.execute("PRAGMA foreign_keys = ON")
+        for nome in PRAGMAS_POR_CONEXAO:
+            conn.execute(f"PRAGMA {nome} = {self._pragmas[nome]}")
+        if somente_leitura:
+            conn.execute("PRAGMA query_only = ON")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _registrar_espera(self, inicio: float) -> None:
+        with self._lock:
+            self._esperas += 1
+            self._tempo_espera_total += time.monotonic() - inicio
+
+    def adquirir(self, somente_leitura: bool = False) -> sqlite3.Connection:
+        """
+        Obtém uma conexão do pool.
+
+        Args:
+            somente_leitura: True para conexão de leitura, False para a de escrita
+
+        Returns:
+            Conexão pronta para uso
+
+        Raises:
+            sqlite3.OperationalError: Se nenhuma conexão ficar livre dentro do timeout
+        """
+        if somente_leitura:
+            return self._adquirir_leitura()
+        return self._adquirir_escrita()
+
+    def _adquirir_leitura(self) -> sqlite3.Connection:
+        try:
+            conn = self._leitura_livres.get_nowait()
+            with self._lock:
+                self._hits += 1
+            return conn
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            pode_criar = self._leitura_abertas < self.tamanho
+            if pode_criar:
+                self._leitura_abertas += 1
+                self._misses += 1
+
+        if pode_criar:
+            try:
+                return self._criar_conexao(somente_leitura=True)
+            except Exception:
+                with self._lock:
+                    self._leitura_abertas -= 1
+                raise
+
+        # Pool esgotado: aguardar devolução de uma conexão
+        inicio = time.monotonic()
+        try:
+            conn = self._leitura_livres.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise sqlite3.OperationalError(
+                f"Tempo esgotado ({self.timeout}s) aguardando conexão de leitura do pool"
+            )
+        self._registrar_espera(inicio)
+        with self._lock:
+            self._hits += 1
+        return conn
+
+    def _adquirir_escrita(self) -> sqlite3.Connection:
+        if not self._lock_escrita.acquire(blocking=False):
+            inicio = time.monotonic()
+            if not self._lock_escrita.acquire(timeout=self.timeout):
+                with self._lock:
+                    self._timeouts += 1
+                raise sqlite3.OperationalError(
+                    f"Tempo esgotado ({self.timeout}s) aguardando conexão de escrita do pool"
+                )
+            self._registrar_espera(inicio)
+
+        try:
+            if self._escrita is None:
+                self._escrita = self._criar_conexao(somente_leitura=False)
+                with self._lock:
+                    self._misses += 1
+            else:
+                with self._lock:
+                    self._hits += 1
+            return self._escrita
+        except Exception:
+            self._lock_escrita.release()
+            raise
+
+    def devolver(self, conn: sqlite3.Connection, somente_leitura: bool = False) -> None:
+        """
+        Devolve uma conexão ao pool.
+
+        Transações pendentes são desfeitas. Conexões que falham nessa
+        limpeza são descartadas e recriadas sob demanda.
+
+        Args:
+            conn: Conexão obtida via adquirir()
+            somente_leitura: Mesmo valor usado em adquirir()
+        """
+        saudavel = True
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            saudavel = False
+
+        if somente_leitura:
+            if saudavel and os.getpid() == self.pid:
+                self._leitura_livres.put(conn)
+            else:
+                self._descartar(conn)
+                with self._lock:
+                    self._leitura_abertas -= 1
+            return
+
+        if not saudavel:
+            self._descartar(conn)
+            self._escrita = None
+        self._lock_escrita.release()
+
+    def _descartar(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._descartadas += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def fechar_todas(self) -> None:
+        """
+        Fecha todas as conexões ociosas do pool.
+
+        Conexões em uso continuam válidas e são fechadas/descartadas quando
+        devolvidas. Útil no shutdown e após substituir o arquivo do banco
+        (ex: restauração de backup).
+        """
+        while True:
+            try:
+                conn = self._leitura_livres.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            with self._lock:
+                self._leitura_abertas -= 1
+
+        if self._lock_escrita.acquire(timeout=self.timeout):
+            try:
+                if self._escrita is not None:
+                    try:
+                        self._escrita.close()
+                    except sqlite3.Error:
+                        pass
+                    self._escrita = None
+            finally:
+                self._lock_escrita.release()
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna métricas de uso do pool.
+
+        Returns:
+            Dicionário com hits (conexão reutilizada), misses (conexão criada),
+            esperas (pool esgotado ou escritor ocupado), tempos e timeouts
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "tamanho": self.tamanho,
+                "conexoes_leitura_abertas": self._leitura_abertas,
+                "conexoes_leitura_livres": self._leitura_livres.qsize(),
+                "conexao_escrita_aberta": self._escrita is not None,
+                "hits": self._hits,
+                "misses": self._misses,
+                "taxa_acerto": round(self._hits / total, 4) if total else 0.0,
+                "esperas": self._esperas,
+                "tempo_medio_espera_ms": (
+                    round(self._tempo_espera_total / self._esperas * 1000, 3) if self._esperas else 0.0
+                ),
+                "timeouts": self._timeouts,
+                "descartadas": self._descartadas,
+            }
+
+
+_pool: Optional[PoolConexoes] = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def obter_pool() -> PoolConexoes:
+    """
+    Retorna o pool global, criando-o sob demanda.
+
+    Um novo pool é criado se o processo foi bifurcado (uvicorn --workers)
+    ou se DATABASE_PATH mudou, pois conexões SQLite não podem ser
+    compartilhadas entre processos.
+    """
+    global _pool
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid() and pool.caminho == DATABASE_PATH:
+        return pool
+
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid() or _pool.caminho != DATABASE_PATH:
+            if _pool is not None and _pool.pid == os.getpid():
+                _pool.fechar_todas()
+            _pool = PoolConexoes(DATABASE_PATH)
+        return _pool
+
+
+def fechar_conexoes() -> None:
+    """Fecha as conexões ociosas do pool global (shutdown, restauração de backup)."""
+    if _pool is not None and _pool.pid == os.getpid():
+        _pool.fechar_todas()
+
+
+def obter_estatisticas_pool() -> dict:
+    """Retorna as métricas do pool global de conexões."""
+    return obter_pool().obter_estatisticas()
+
+
+def aplicar_perfil_pragmas() -> dict:
+    """
+    Aplica o perfil de PRAGMAs ao banco de dados.
+
+    Deve ser chamado no startup, antes de criar as tabelas. O journal_mode
+    WAL é persistente no arquivo do banco; os demais PRAGMAs valem por
+    conexão e também são aplicados a cada conexão criada pelo pool. O
+    auto_vacuum só vale de imediato em bancos sem tabelas; nos demais fica
+    pendente até o próximo VACUUM.
+
+    Returns:
+        Dicionário com os valores efetivamente em vigor
+    """
+    perfil = obter_perfil_pragmas()
+
+    with obter_conexao() as conn:
+        conn.execute(f"PRAGMA auto_vacuum = {perfil['auto_vacuum']}")
+        modo = conn.execute(f"PRAGMA journal_mode = {perfil['journal_mode']}").fetchone()[0]
+        efetivo = {"journal_mode": str(modo).upper()}
+        for nome in PRAGMAS_POR_CONEXAO:
+            efetivo[nome] = conn.execute(f"PRAGMA {nome}").fetchone()[0]
+        efetivo["auto_vacuum"] = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+    if efetivo["journal_mode"] != perfil["journal_mode"]:
+        logger.warning(
+            f"journal_mode solicitado '{perfil['journal_mode']}' não aplicado "
+            f"(em vigor: '{efetivo['journal_mode']}')"
+        )
+
+    logger.info(f"Perfil de PRAGMAs do SQLite aplicado: {efetivo}")
+    return efetivo
+
+
+def checkpoint_wal(modo: str = "PASSIVE") -> Optional[tuple[int, int, int]]:
+    """
+    Executa um checkpoint do WAL, transferindo páginas para o arquivo principal.
+
+    Args:
+        modo: PASSIVE (não bloqueia), FULL, RESTART ou TRUNCATE (zera o -wal)
+
+    Returns:
+        Tupla (ocupado, paginas_no_wal, paginas_transferidas) ou None.
+        Fora do modo WAL o SQLite retorna (0, -1, -1).
+    """
+    modo = _validar_valor_pragma("wal_checkpoint", modo)
+    with obter_conexao() as conn:
+        row = conn.execute(f"PRAGMA wal_checkpoint({modo})").fetchone()
+    return (row[0], row[1], row[2]) if row else None
+
+
+def compactar_banco(paginas: int = 0) -> dict:
+    """
+    Devolve ao sistema as páginas livres do banco (após exclusões em massa).
+
+    Com auto_vacuum INCREMENTAL roda incremental_vacuum, que só move as
+    páginas livres para o fim do arquivo e o trunca, sem reescrever o
+    banco. Quando o modo do banco difere do DB_AUTO_VACUUM configurado
+    (bancos criados antes dele), roda uma única vez um VACUUM completo,
+    que aplica o modo: as próximas compactações passam a ser incrementais.
+    Com DB_AUTO_VACUUM=NONE (ou FULL) já aplicado, nada é feito: o VACUUM
+    completo reescreveria o banco inteiro a cada chamada.
+
+    Args:
+        paginas: Máximo de páginas liberadas pelo incremental_vacuum (0 = todas)
+
+    Returns:
+        Dicionário com a operação executada e as páginas livres antes e depois
+    """
+    desejado = obter_perfil_pragmas()["auto_vacuum"]
+    with obter_conexao() as conn:
+        modo = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        livres_antes = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        operacao = None
+        if modo == 2:  # INCREMENTAL
+            # Cada passo da instrução libera uma página e execute() dá um único
+            # passo; executescript() executa até o fim
+            conn.executescript(f"PRAGMA incremental_vacuum({max(0, int(paginas))});")
+            operacao = "incremental_vacuum"
+        elif livres_antes > 0 and modo != _MODOS_AUTO_VACUUM[desejado]:
+            conn.execute(f"PRAGMA auto_vacuum = {desejado}")
+            conn.execute("VACUUM")
+            operacao = "vacuum"
+        livres_depois = conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    if operacao:
+        logger.info(f"Banco compactado ({operacao}): páginas livres {livres_antes} -> {livres_depois}")
+    elif livres_antes > 0:
+        logger.debug(f"Compactação desativada (auto_vacuum={desejado}): {livres_antes} página(s) livre(s)")
+    return {
+        "operacao": operacao,
+        "paginas_livres_antes": livres_antes,
+        "paginas_livres_depois": livres_depois,
+    }
+
+
+class AgendadorCheckpoint:
+    """
+    Executa checkpoints periódicos do WAL em uma thread de fundo.
+
+    Sob escrita contínua o checkpoint automático do SQLite raramente
+    consegue reiniciar o WAL, e o arquivo -wal cresce sem limite. O
+    agendador roda um checkpoint PASSIVE a cada intervalo e um TRUNCATE
+    quando o -wal ultrapassa o limite configurado.
+
+    Attributes:
+        intervalo_segundos: Intervalo entre checkpoints
+        limite_bytes: Tamanho do -wal a partir do qual ele é truncado
+    """
+
+    def __init__(
+        self,
+        intervalo_segundos: int = DB_WAL_CHECKPOINT_SEGUNDOS,
+        limite_bytes: int = DB_WAL_LIMITE_BYTES,
+    ):
+        self.intervalo_segundos = intervalo_segundos
+        self.limite_bytes = limite_bytes
+        self._thread: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+        self._execucoes = 0
+        self._truncamentos = 0
+        self._falhas = 0
+        self._ultimo_resultado: Optional[tuple[int, int, int]] = None
+
+    def _tamanho_wal(self) -> int:
+        try:
+            return os.path.getsize(f"{DATABASE_PATH}-wal")
+        except OSError:
+            return 0
+
+    def executar(self) -> Optional[tuple[int, int, int]]:
+        """Executa um checkpoint imediatamente (PASSIVE ou TRUNCATE conforme o tamanho do -wal)."""
+        modo = "TRUNCATE" if self._tamanho_wal() > self.limite_bytes else "PASSIVE"
+        try:
+            resultado = checkpoint_wal(modo)
+        except Exception as e:
+            self._falhas += 1
+            logger.warning(f"Falha no checkpoint do WAL ({modo}): {e}")
+            return None
+
+        self._execucoes += 1
+        if modo == "TRUNCATE":
+            self._truncamentos += 1
+        self._ultimo_resultado = resultado
+        logger.debug(f"Checkpoint do WAL ({modo}) executado: {resultado}")
+        return resultado
+
+    def _loop(self) -> None:
+        while not self._parar.wait(self.intervalo_segundos):
+            self.executar()
+
+    def iniciar(self) -> None:
+        """Inicia a thread de checkpoint (idempotente)."""
+        if self.intervalo_segundos <= 0:
+            logger.info("Agendador de checkpoint do WAL desativado")
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, name="checkpoint-wal", daemon=True)
+        self._thread.start()
+        logger.info(f"Agendador de checkpoint do WAL iniciado (a cada {self.intervalo_segundos}s)")
+
+    def parar(self) -> None:
+        """Interrompe a thread de checkpoint e executa um checkpoint final."""
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+        self.executar()
+
+    def obter_estatisticas(self) -> dict:
+        """Retorna métricas do agendador e o tamanho atual do -wal."""
+        return {
+            "ativo": self._thread is not None and self._thread.is_alive(),
+            "intervalo_segundos": self.intervalo_segundos,
+            "execucoes": self._execucoes,
+            "truncamentos": self._truncamentos,
+            "falhas": self._falhas,
+            "ultimo_resultado": list(self._ultimo_resultado) if self._ultimo_resultado else None,
+            "tamanho_wal_bytes": self._tamanho_wal(),
+        }
+
+
+# Instância global do agendador de checkpoint
+agendador_checkpoint = AgendadorCheckpoint()
+
 
 @contextmanager
-def obter_conexao():
-    """Context manager para conexão com banco de dados"""
-    registrar_adaptadores()
-    conn = sqlite3.connect(
-        DATABASE_PATH,
-        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
-    )
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.row_factory = sqlite3.Row
+def obter_conexao(somente_leitura: bool = False):
+    """
+    Context manager para conexão com banco de dados.
+
+    As conexões vêm do pool global e são devolvidas ao final. Commit é
+    executado ao sair sem erro e rollback em caso de exceção.
+
+    Args:
+        somente_leitura: Use True em consultas (SELECT) para usar o pool de
+                         leitura em vez da conexão de escrita
+
+    Note:
+        Se a thread já possui uma conexão aberta por um obter_conexao()
+        externo, ela é reutilizada e o commit/rollback fica a cargo do
+        contexto mais externo.
+    """
+    conexao_atual = getattr(_local, "conexao", None)
+    if conexao_atual is not None and (somente_leitura or not _local.somente_leitura):
+        yield conexao_atual
+        return
+
+    pool = obter_pool()
+    conn = pool.adquirir(somente_leitura)
+    anterior = (conexao_atual, getattr(_local, "somente_leitura", False))
+    _local.conexao = conn
+    _local.somente_leitura = somente_leitura
     try:
         yield conn
         conn.commit()
@@ -30,7 +592,8 @@ def obter_conexao():
         conn.rollback()
         raise e
     finally:
-        conn.close()
+        _local.conexao, _local.somente_leitura = anterior
+        pool.devolver(conn, somente_leitura)
 
 
 def adaptar_datetime(dt: datetime) -> str:
@@ -0,0 +1,55 @@
+"""
+Cursores para paginação keyset.
+
+Em vez de LIMIT/OFFSET (cujo custo cresce com a profundidade da página),
+a consulta continua a partir da chave do último registro exibido:
+
+    WHERE (data_publicacao, id) < (?, ?) ORDER BY data_publicacao DESC, id DESC
+
+O cursor é o par (valor da chave de ordenação, id) serializado em JSON e
+codificado em base64 url-safe, para trafegar como parâmetro de URL.
+"""
+import base64
+import binascii
+import json
+from typing import Any, Optional
+
+
+def codificar_cursor(valor: Any, id: int) -> str:
+    """
+    Codifica a posição (chave de ordenação, id) em um cursor opaco.
+
+    Args:
+        valor: Valor da coluna de ordenação do registro
+        id: ID do registro (desempate)
+
+    Returns:
+        Cursor em base64 url-safe, sem padding
+    """
+    dados = json.dumps([valor, id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(dados).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: Optional[str]) -> Optional[tuple[Any, int]]:
+    """
+    Decodifica um cursor gerado por codificar_cursor.
+
+    Cursores vazios, adulterados ou malformados são tratados como ausentes
+    (a listagem volta para a primeira página em vez de gerar erro).
+
+    Args:
+        cursor: Cursor recebido na requisição
+
+    Returns:
+        Tupla (valor, id) ou None se o cursor for inválido
+    """
+    if not cursor:
+        return None
+    try:
+        dados = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valor, id = json.loads(dados)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+    if not isinstance(id, int) or isinstance(valor, (list, dict)):
+        return None
+    return valor, id
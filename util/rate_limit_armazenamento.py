@@ -0,0 +1,293 @@
+"""
+Armazenamentos do estado dos rate limiters.
+
+O RateLimiter (util/rate_limiter.py) calcula a janela e a estimativa da
+janela deslizante; o armazenamento guarda, por identificador, os
+contadores da janela fixa atual e da anterior e faz a verificação com
+incremento de forma atômica.
+
+Implementações:
+    - ArmazenamentoMemoria: dicionário do próprio processo (padrão). Cada
+      worker do uvicorn tem seu próprio limite e o estado se perde ao
+      reiniciar.
+    - ArmazenamentoSQLite: tabela rate_limit no banco da aplicação,
+      compartilhada por todos os workers. A verificação com incremento é um
+      único INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+
+Um backend compatível com Redis implementaria a mesma interface guardando
+um hash por (limiter, identificador) e fazendo registrar() em um script
+Lua (EVAL), também em uma única ida ao servidor.
+
+O tipo usado por padrão vem de RATE_LIMIT_ARMAZENAMENTO ("memoria" ou
+"sqlite").
+"""
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from util.config import RATE_LIMIT_ARMAZENAMENTO
+from util.logger_config import logger
+
+
+class ArmazenamentoRateLimit:
+    """
+    Interface dos armazenamentos de rate limit (um por limiter).
+
+    As janelas fixas são identificadas pelo instante de início (segundos
+    desde a época), não pelo número da janela: assim os contadores gravados
+    continuam válidos se o tamanho da janela mudar.
+
+    Os contadores são sempre devolvidos já avançados até a janela pedida:
+    se a última tentativa foi na janela anterior (ou, após uma mudança de
+    tamanho, em uma janela iniciada há menos de uma janela), "atual" passa
+    a ser "anterior"; se foi antes disso, ambos são zero.
+    """
+
+    tipo = "base"
+
+    def registrar(
+        self, identificador: str, inicio: int, janela: int, peso: float, max_tentativas: int
+    ) -> tuple[bool, int, int]:
+        """
+        Verifica e registra uma tentativa atomicamente.
+
+        A tentativa é contada somente se anterior * peso + atual for menor
+        que max_tentativas.
+
+        Args:
+            identificador: Identificador do cliente (geralmente IP)
+            inicio: Início da janela fixa atual (segundos desde a época)
+            janela: Tamanho da janela em segundos
+            peso: Fração da janela anterior ainda dentro da janela deslizante
+            max_tentativas: Máximo de tentativas na janela deslizante
+
+        Returns:
+            (permitido, atual, anterior) após a operação
+        """
+        raise NotImplementedError
+
+    def obter(self, identificador: str, inicio: int, janela: int) -> Optional[tuple[int, int]]:
+        """
+        Retorna (atual, anterior) do identificador na janela iniciada em inicio.
+
+        Returns:
+            Contadores ou None se o identificador não tem registro
+        """
+        raise NotImplementedError
+
+    def limpar(self, identificador: Optional[str] = None) -> None:
+        """Remove um identificador, ou todos se identificador for None."""
+        raise NotImplementedError
+
+    def remover_expirados(self, inicio_minimo: int) -> int:
+        """
+        Remove identificadores sem tentativas em janelas iniciadas a partir de inicio_minimo.
+
+        Returns:
+            Quantidade de identificadores removidos
+        """
+        raise NotImplementedError
+
+    def obter_estatisticas(self) -> dict:
+        """Retorna quantidade de identificadores e uso de memória."""
+        raise NotImplementedError
+
+
+class _Janela:
+    """
+    Contadores de um identificador: janela fixa atual e a anterior.
+
+    Ocupa tamanho constante, independente do número de tentativas.
+    """
+    __slots__ = ("inicio", "atual", "anterior")
+
+    def __init__(self, inicio: int):
+        self.inicio = inicio
+        self.atual = 0
+        self.anterior = 0
+
+    def avancar(self, inicio: int, janela: int) -> None:
+        """Leva os contadores até a janela iniciada em inicio."""
+        if inicio > self.inicio:
+            # A janela atual vira a anterior; mais de uma janela sem uso zera ambas
+            self.anterior = self.atual if self.inicio >= inicio - janela else 0
+            self.atual = 0
+            self.inicio = inicio
+
+
+class ArmazenamentoMemoria(ArmazenamentoRateLimit):
+    """
+    Contadores em memória, limitados a max_identificadores.
+
+    Os identificadores ficam em ordem de último uso; acima do limite, o
+    usado há mais tempo é descartado.
+    """
+
+    tipo = "memoria"
+
+    def __init__(self, max_identificadores: int):
+        self.max_identificadores = max_identificadores
+        self._janelas: OrderedDict[str, _Janela] = OrderedDict()
+        self._lock = threading.Lock()
+        self._descartados_capacidade = 0
+
+    def _janela(self, identificador: str, inicio: int, janela_segundos: int, criar: bool) -> Optional[_Janela]:
+        """Contadores do identificador avançados até inicio (com self._lock)."""
+        janela = self._janelas.get(identificador)
+        if janela is None:
+            if not criar:
+                return None
+            janela = _Janela(inicio)
+            self._janelas[identificador] = janela
+            if len(self._janelas) > self.max_identificadores:
+                self._janelas.popitem(last=False)
+                self._descartados_capacidade += 1
+        else:
+            self._janelas.move_to_end(identificador)
+            janela.avancar(inicio, janela_segundos)
+        return janela
+
+    def registrar(
+        self, identificador: str, inicio: int, janela: int, peso: float, max_tentativas: int
+    ) -> tuple[bool, int, int]:
+        with self._lock:
+            contadores = self._janela(identificador, inicio, janela, criar=True)
+            permitido = contadores.anterior * peso + contadores.atual < max_tentativas
+            if permitido:
+                contadores.atual += 1
+            return permitido, contadores.atual, contadores.anterior
+
+    def obter(self, identificador: str, inicio: int, janela: int) -> Optional[tuple[int, int]]:
+        with self._lock:
+            contadores = self._janela(identificador, inicio, janela, criar=False)
+            return (contadores.atual, contadores.anterior) if contadores else None
+
+    def limpar(self, identificador: Optional[str] = None) -> None:
+        with self._lock:
+            if identificador:
+                self._janelas.pop(identificador, None)
+            else:
+                self._janelas.clear()
+
+    def remover_expirados(self, inicio_minimo: int) -> int:
+        # Em ordem de último uso, a varredura para no primeiro identificador ativo
+        removidos = 0
+        with self._lock:
+            while self._janelas:
+                identificador, janela = next(iter(self._janelas.items()))
+                if janela.inicio >= inicio_minimo:
+                    break
+                del self._janelas[identificador]
+                removidos += 1
+        return removidos
+
+    def obter_estatisticas(self) -> dict:
+        with self._lock:
+            memoria = sys.getsizeof(self._janelas) + sum(
+                sys.getsizeof(identificador) + sys.getsizeof(janela)
+                for identificador, janela in self._janelas.items()
+            )
+            return {
+                "armazenamento": self.tipo,
+                "identificadores_ativos": len(self._janelas),
+                "max_identificadores": self.max_identificadores,
+                "memoria_estimada_bytes": memoria,
+                "descartados_capacidade": self._descartados_capacidade,
+            }
+
+
+class ArmazenamentoSQLite(ArmazenamentoRateLimit):
+    """
+    Contadores na tabela rate_limit, compartilhados entre workers.
+
+    Se o banco falhar, a tentativa é permitida (fail-open) e o erro é
+    registrado: indisponibilidade do limiter não deve derrubar as rotas.
+    Identificadores expirados são removidos por remover_expirados().
+    """
+
+    tipo = "sqlite"
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self._erros = 0
+
+    def _registrar_erro(self, operacao: str, erro: Exception) -> None:
+        self._erros += 1
+        logger.error(f"Rate limiter [{self.nome}]: erro ao {operacao} no banco: {erro}")
+
+    def registrar(
+        self, identificador: str, inicio: int, janela: int, peso: float, max_tentativas: int
+    ) -> tuple[bool, int, int]:
+        from repo import rate_limit_repo
+
+        try:
+            return rate_limit_repo.registrar_tentativa(
+                self.nome, identificador, inicio, janela, peso, max_tentativas
+            )
+        except sqlite3.Error as e:
+            self._registrar_erro("registrar tentativa", e)
+            return True, 0, 0
+
+    def obter(self, identificador: str, inicio: int, janela: int) -> Optional[tuple[int, int]]:
+        from repo import rate_limit_repo
+
+        try:
+            return rate_limit_repo.obter_contadores(self.nome, identificador, inicio, janela)
+        except sqlite3.Error as e:
+            self._registrar_erro("obter contadores", e)
+            return None
+
+    def limpar(self, identificador: Optional[str] = None) -> None:
+        from repo import rate_limit_repo
+
+        try:
+            rate_limit_repo.excluir(self.nome, identificador)
+        except sqlite3.Error as e:
+            self._registrar_erro("limpar", e)
+
+    def remover_expirados(self, inicio_minimo: int) -> int:
+        from repo import rate_limit_repo
+
+        try:
+            return rate_limit_repo.excluir_expirados(self.nome, inicio_minimo)
+        except sqlite3.Error as e:
+            self._registrar_erro("remover expirados", e)
+            return 0
+
+    def obter_estatisticas(self) -> dict:
+        from repo import rate_limit_repo
+
+        try:
+            quantidade = rate_limit_repo.obter_quantidade(self.nome)
+        except sqlite3.Error as e:
+            self._registrar_erro("contar identificadores", e)
+            quantidade = 0
+        return {
+            "armazenamento": self.tipo,
+            "identificadores_ativos": quantidade,
+            "memoria_estimada_bytes": 0,
+            "erros": self._erros,
+        }
+
+
+def criar_armazenamento(
+    nome: str, max_identificadores: int, tipo: str = RATE_LIMIT_ARMAZENAMENTO
+) -> ArmazenamentoRateLimit:
+    """
+    Cria o armazenamento de um limiter conforme o tipo configurado.
+
+    Args:
+        nome: Nome do limiter (chave no armazenamento compartilhado)
+        max_identificadores: Limite de identificadores em memória
+        tipo: "memoria" ou "sqlite"
+
+    Returns:
+        Instância do armazenamento
+    """
+    if tipo == "sqlite":
+        return ArmazenamentoSQLite(nome)
+    if tipo != "memoria":
+        logger.warning(f"RATE_LIMIT_ARMAZENAMENTO desconhecido '{tipo}', usando memória")
+    return ArmazenamentoMemoria(max_identificadores)
@@ -97,7 +97,7 @@ def aplicar_rate_limit(
             ip = obter_identificador_cliente(request)
 
             # Verificar rate limit
-            if not limiter.verificar(ip):
+            if not await limiter.verificar_async(ip):
                 # Rate limit excedido - bloquear requisição
                 mensagem = mensagem_erro or mensagem_padrao
 
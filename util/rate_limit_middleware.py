@@ -0,0 +1,84 @@
+"""
+Middleware de Rate Limiting
+
+Aplica as políticas declaradas em registro_limiters.definir_politica antes
+de qualquer outro processamento: a requisição bloqueada não passa pela
+decodificação da sessão, pela verificação CSRF nem pela leitura do corpo.
+
+É um middleware ASGI puro (sem BaseHTTPMiddleware) e deve ser o mais
+externo da aplicação, ou seja, o último registrado com add_middleware.
+A resposta de bloqueio é 429 com o cabeçalho Retry-After calculado a
+partir de obter_tempo_reset do limiter.
+"""
+import math
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, JSONResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from util.logger_config import logger
+from util.rate_limiter import PoliticaRateLimit, RateLimiter, RegistroLimiters, registro_limiters
+
+
+class MiddlewareRateLimit:
+    """
+    Middleware que bloqueia requisições acima do limite da rota.
+
+    Attributes:
+        registro: Registro com os limiters e as políticas por rota
+    """
+
+    def __init__(self, app: ASGIApp, registro: RegistroLimiters = registro_limiters):
+        self.app = app
+        self.registro = registro
+        # Página 429 é igual para todos (renderizada sem sessão); guardada após a primeira vez
+        self._pagina_429: Optional[bytes] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        politica = self.registro.obter_politica(scope["method"], scope["path"])
+        limiter = self.registro.obter(politica.limiter) if politica else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        cliente = scope.get("client")
+        identificador = cliente[0] if cliente else "unknown"
+
+        if await limiter.verificar_async(identificador):
+            await self.app(scope, receive, send)
+            return
+
+        logger.warning(
+            f"Rate limit excedido [{limiter.nome}] - IP: {identificador} - "
+            f"{scope['method']} {scope['path']}"
+        )
+        resposta = await self._resposta_bloqueio(scope, politica, limiter, identificador)
+        await resposta(scope, receive, send)
+
+    async def _resposta_bloqueio(
+        self, scope: Scope, politica: PoliticaRateLimit, limiter: RateLimiter, identificador: str
+    ) -> Response:
+        """Monta a resposta 429 no formato da política, com Retry-After."""
+        tempo_reset = await limiter.obter_tempo_reset_async(identificador)
+        segundos = tempo_reset.total_seconds() if tempo_reset else limiter.janela.total_seconds()
+        cabecalhos = {"Retry-After": str(max(1, math.ceil(segundos)))}
+
+        if politica.formato == "json":
+            return JSONResponse({"detail": politica.mensagem}, status_code=429, headers=cabecalhos)
+        return HTMLResponse(self._renderizar_pagina_429(scope), status_code=429, headers=cabecalhos)
+
+    def _renderizar_pagina_429(self, scope: Scope) -> bytes:
+        """Renderiza errors/429.html como para um visitante anônimo."""
+        if self._pagina_429 is None:
+            from util.template_util import criar_templates
+
+            templates = criar_templates("templates")
+            requisicao = Request({**scope, "session": {}})
+            html = templates.get_template("errors/429.html").render(request=requisicao)
+            self._pagina_429 = html.encode("utf-8")
+        return self._pagina_429
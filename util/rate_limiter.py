@@ -9,25 +9,51 @@ Oferece duas classes:
     - DynamicRateLimiter: Rate limiter dinâmico (lê valores do config_cache)
 """
 
-from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import Optional
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Iterable, Optional
 from util.logger_config import logger
 from util.config_cache import config
-from util.datetime_util import agora as obter_agora
+from util.config import RATE_LIMIT_LIMPEZA_SEGUNDOS, RATE_LIMIT_MAX_IDENTIFICADORES
+from util.db_async import executar_db
+from util.rate_limit_armazenamento import ArmazenamentoRateLimit, criar_armazenamento
+
+
+def _agora() -> float:
+    """
+    Relógio das janelas (substituível em testes).
+
+    Usa o horário de parede, e não um relógio monotônico, para que todos
+    os workers que compartilham o armazenamento numerem as janelas igual.
+    """
+    return time.time()
 
 
 class RateLimiter:
     """
-    Rate limiter baseado em janela deslizante (sliding window).
+    Rate limiter baseado em janela deslizante (sliding window counter).
+
+    Em vez de guardar o horário de cada tentativa, guarda por identificador
+    (geralmente IP) apenas a contagem da janela fixa atual e da anterior.
+    A contagem na janela deslizante é estimada ponderando a janela anterior
+    pela fração dela que ainda está dentro da janela deslizante:
 
-    Mantém registro de tentativas por identificador (geralmente IP)
-    e bloqueia se exceder limite em janela de tempo.
+        estimativa = anterior * (1 - decorrido / janela) + atual
+
+    Cada verificação é O(1). Os contadores ficam em um armazenamento
+    (util/rate_limit_armazenamento.py): em memória, com no máximo
+    max_identificadores, ou no SQLite, compartilhado entre workers.
+    Identificadores sem tentativas nas duas últimas janelas são removidos
+    por remover_expirados(), chamado periodicamente pelo registro_limiters.
 
     Attributes:
         max_tentativas: Número máximo de tentativas permitidas
         janela: Timedelta representando janela de tempo
-        tentativas: Dict de identificador -> lista de timestamps
+        armazenamento: Onde os contadores por identificador são guardados
     """
 
     def __init__(
@@ -35,6 +61,8 @@ class RateLimiter:
         max_tentativas: int = 5,
         janela_minutos: int = 5,
         nome: str = "default",
+        max_identificadores: int = RATE_LIMIT_MAX_IDENTIFICADORES,
+        armazenamento: Optional[ArmazenamentoRateLimit] = None,
     ):
         """
         Inicializa rate limiter.
@@ -42,25 +70,51 @@ class RateLimiter:
         Args:
             max_tentativas: Número máximo de tentativas na janela
             janela_minutos: Tamanho da janela em minutos
-            nome: Nome descritivo do limiter (para logs)
+            nome: Nome descritivo do limiter (para logs e chave no armazenamento)
+            max_identificadores: Máximo de identificadores guardados em memória
+            armazenamento: Armazenamento dos contadores (padrão: RATE_LIMIT_ARMAZENAMENTO)
         """
         if max_tentativas <= 0:
             raise ValueError("max_tentativas deve ser positivo")
         if janela_minutos <= 0:
             raise ValueError("janela_minutos deve ser positivo")
+        if max_identificadores <= 0:
+            raise ValueError("max_identificadores deve ser positivo")
 
         self.max_tentativas = max_tentativas
         self.janela = timedelta(minutes=janela_minutos)
         self.janela_minutos = janela_minutos
         self.nome = nome
-        self.tentativas: defaultdict[str, list[datetime]] = defaultdict(list)
+        self.armazenamento = armazenamento or criar_armazenamento(nome, max_identificadores)
+        self._bloqueios = 0
+        self._removidos_expirados = 0
+
+    @property
+    def identificadores_ativos(self) -> int:
+        """Quantidade de identificadores acompanhados no momento."""
+        return self.armazenamento.obter_estatisticas()["identificadores_ativos"]
+
+    @property
+    def _segundos(self) -> int:
+        return int(self.janela.total_seconds())
+
+    def _posicao(self, momento: float) -> tuple[int, float]:
+        """
+        Retorna a janela fixa de momento e o peso da janela anterior.
+
+        Returns:
+            (início da janela em segundos, fração da janela anterior ainda na janela deslizante)
+        """
+        segundos = self._segundos
+        inicio = int(momento // segundos) * segundos
+        return inicio, 1 - (momento - inicio) / segundos
 
     def verificar(self, identificador: str) -> bool:
         """
         Verifica se identificador está dentro do limite.
 
-        Remove tentativas antigas da janela e verifica se está
-        abaixo do máximo. Se estiver, registra nova tentativa.
+        Se estiver abaixo do máximo na janela deslizante, registra a
+        nova tentativa (verificação e registro são atômicos).
 
         Args:
             identificador: Identificador único (geralmente IP)
@@ -69,26 +123,55 @@ class RateLimiter:
             True se dentro do limite (permitido)
             False se excedeu limite (bloqueado)
         """
-        momento_atual = obter_agora()
-
-        # Limpar tentativas antigas (fora da janela)
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if momento_atual - t < self.janela
-        ]
+        inicio, peso = self._posicao(_agora())
+        permitido, atual, anterior = self.armazenamento.registrar(
+            identificador, inicio, self._segundos, peso, self.max_tentativas
+        )
 
         # Verificar se excedeu limite
-        if len(self.tentativas[identificador]) >= self.max_tentativas:
+        if not permitido:
+            self._bloqueios += 1
             logger.warning(
                 f"Rate limit excedido [{self.nome}] - "
                 f"Identificador: {identificador}, "
-                f"Tentativas: {len(self.tentativas[identificador])}/{self.max_tentativas}"
+                f"Tentativas: {math.ceil(anterior * peso + atual)}/{self.max_tentativas}"
             )
             return False
-
-        # Registrar nova tentativa
-        self.tentativas[identificador].append(momento_atual)
         return True
 
+    async def verificar_async(self, identificador: str) -> bool:
+        """
+        verificar() para rotas assíncronas.
+
+        Armazenamentos fora da memória fazem I/O no banco (a conexão de
+        escrita do pool): nesses casos a verificação roda no executor do
+        banco, sem bloquear o event loop.
+
+        Args:
+            identificador: Identificador único (geralmente IP)
+
+        Returns:
+            True se dentro do limite (permitido)
+            False se excedeu limite (bloqueado)
+        """
+        if self.armazenamento.tipo == "memoria":
+            return self.verificar(identificador)
+        return await executar_db(self.verificar, identificador)
+
+    async def obter_tempo_reset_async(self, identificador: str) -> Optional[timedelta]:
+        """
+        obter_tempo_reset() para rotas assíncronas (ver verificar_async).
+
+        Args:
+            identificador: Identificador único
+
+        Returns:
+            Timedelta até reset, ou None se não bloqueado
+        """
+        if self.armazenamento.tipo == "memoria":
+            return self.obter_tempo_reset(identificador)
+        return await executar_db(self.obter_tempo_reset, identificador)
+
     def limpar(self, identificador: Optional[str] = None) -> None:
         """
         Limpa tentativas registradas.
@@ -97,14 +180,24 @@ class RateLimiter:
             identificador: Se fornecido, limpa apenas este identificador.
                           Se None, limpa todos (útil para testes).
         """
+        self.armazenamento.limpar(identificador)
         if identificador:
-            if identificador in self.tentativas:
-                del self.tentativas[identificador]
-                logger.debug(f"Limpo rate limit para identificador: {identificador}")
+            logger.debug(f"Limpo rate limit para identificador: {identificador}")
         else:
-            self.tentativas.clear()
             logger.debug(f"Limpo todos os rate limits [{self.nome}]")
 
+    def remover_expirados(self) -> int:
+        """
+        Remove identificadores sem tentativas na janela atual nem na anterior.
+
+        Returns:
+            Quantidade de identificadores removidos
+        """
+        inicio, _ = self._posicao(_agora())
+        removidos = self.armazenamento.remover_expirados(inicio - self._segundos)
+        self._removidos_expirados += removidos
+        return removidos
+
     def obter_tentativas_restantes(self, identificador: str) -> int:
         """
         Retorna número de tentativas restantes para identificador.
@@ -115,14 +208,13 @@ class RateLimiter:
         Returns:
             Número de tentativas restantes (0 se bloqueado)
         """
-        momento_atual = obter_agora()
-
-        # Limpar tentativas antigas
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if momento_atual - t < self.janela
-        ]
+        inicio, peso = self._posicao(_agora())
+        contadores = self.armazenamento.obter(identificador, inicio, self._segundos)
+        if contadores is None:
+            return self.max_tentativas
 
-        tentativas_atuais = len(self.tentativas[identificador])
+        atual, anterior = contadores
+        tentativas_atuais = math.ceil(anterior * peso + atual)
         return max(0, self.max_tentativas - tentativas_atuais)
 
     def obter_tempo_reset(self, identificador: str) -> Optional[timedelta]:
@@ -135,24 +227,41 @@ class RateLimiter:
         Returns:
             Timedelta até reset, ou None se não bloqueado
         """
-        if identificador not in self.tentativas or not self.tentativas[identificador]:
+        momento_atual = _agora()
+        segundos = self._segundos
+        inicio, peso = self._posicao(momento_atual)
+
+        contadores = self.armazenamento.obter(identificador, inicio, segundos)
+        if contadores is None:
+            return None
+        atual, anterior = contadores
+        if anterior * peso + atual < self.max_tentativas:
             return None
 
-        momento_atual = obter_agora()
+        # Momento em que a estimativa volta a ficar abaixo do máximo
+        if atual >= self.max_tentativas:
+            # Só na próxima janela, quando a atual passar a ser a anterior
+            fracao = 1 - self.max_tentativas / atual
+            liberacao = inicio + (1 + fracao) * segundos
+        else:
+            fracao = 1 - (self.max_tentativas - atual) / anterior
+            liberacao = inicio + fracao * segundos
 
-        # Limpar tentativas antigas
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if momento_atual - t < self.janela
-        ]
+        tempo_reset = liberacao - momento_atual
+        return timedelta(seconds=tempo_reset) if tempo_reset > 0 else None
 
-        # Se ainda está bloqueado, calcular tempo até reset
-        if len(self.tentativas[identificador]) >= self.max_tentativas:
-            # Reset quando a tentativa mais antiga sair da janela
-            tentativa_mais_antiga = self.tentativas[identificador][0]
-            tempo_reset = (tentativa_mais_antiga + self.janela) - momento_atual
-            return tempo_reset if tempo_reset.total_seconds() > 0 else None
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna uso de memória e contadores do limiter.
 
-        return None
+        Returns:
+            Dict com armazenamento, identificadores, memória estimada e bloqueios
+        """
+        return {
+            **self.armazenamento.obter_estatisticas(),
+            "bloqueios": self._bloqueios,
+            "removidos_expirados": self._removidos_expirados,
+        }
 
     def __repr__(self) -> str:
         """Representação string do limiter."""
@@ -185,6 +294,7 @@ class DynamicRateLimiter(RateLimiter):
         padrao_max: int = 5,
         padrao_minutos: int = 5,
         nome: str = "dynamic",
+        armazenamento: Optional[ArmazenamentoRateLimit] = None,
     ):
         """
         Inicializa rate limiter dinâmico.
@@ -195,6 +305,7 @@ class DynamicRateLimiter(RateLimiter):
             padrao_max: Valor padrão para max_tentativas
             padrao_minutos: Valor padrão para janela_minutos
             nome: Nome descritivo do limiter (para logs)
+            armazenamento: Armazenamento dos contadores (padrão: RATE_LIMIT_ARMAZENAMENTO)
         """
         # Validar valores padrão
         if padrao_max <= 0:
@@ -214,7 +325,8 @@ class DynamicRateLimiter(RateLimiter):
         super().__init__(
             max_tentativas=max_tentativas,
             janela_minutos=janela_minutos,
-            nome=nome
+            nome=nome,
+            armazenamento=armazenamento,
         )
 
     def _atualizar_valores(self) -> None:
@@ -242,6 +354,8 @@ class DynamicRateLimiter(RateLimiter):
             )
             self.janela_minutos = janela_minutos
             self.janela = timedelta(minutes=janela_minutos)
+            # Os contadores gravados são mantidos (o armazenamento identifica as
+            # janelas pelo instante de início) e expiram conforme a nova janela
 
     def verificar(self, identificador: str) -> bool:
         """
@@ -315,6 +429,44 @@ def obter_identificador_cliente(request) -> str:
     return "unknown"
 
 
+# =============================================================================
+# Políticas por rota (aplicadas pelo MiddlewareRateLimit)
+# =============================================================================
+
+@dataclass(frozen=True)
+class PoliticaRateLimit:
+    """
+    Associa um padrão de rota a um limiter registrado.
+
+    Attributes:
+        limiter: Nome do limiter em registro_limiters
+        metodo: Método HTTP ("GET", "POST", ...)
+        caminho: Padrão da rota; aceita parâmetros ("/salas/{id}") e
+                 "*" no final para qualquer sufixo ("/exemplos/*")
+        formato: Resposta de bloqueio: "html" (página 429) ou "json"
+        mensagem: Mensagem exibida/retornada ao bloquear
+    """
+    limiter: str
+    metodo: str
+    caminho: str
+    formato: str = "html"
+    mensagem: str = "Muitas requisições. Aguarde alguns minutos."
+
+    @property
+    def expressao(self) -> re.Pattern:
+        """Expressão regular equivalente ao padrão da rota."""
+        return _compilar_caminho(self.caminho)
+
+
+def _compilar_caminho(caminho: str) -> re.Pattern:
+    """Converte "/a/{param}/*" em uma expressão regular ancorada."""
+    qualquer_sufixo = caminho.endswith("*")
+    if qualquer_sufixo:
+        caminho = caminho[:-1]
+    expressao = re.sub(r"\\\{[^/]+?\\\}", "[^/]+", re.escape(caminho))
+    return re.compile(f"^{expressao}{'.*' if qualquer_sufixo else ''}$")
+
+
 # =============================================================================
 # Registry de Rate Limiters
 # =============================================================================
@@ -323,25 +475,106 @@ class RegistroLimiters:
     """
     Registry global para gerenciar e monitorar todos os rate limiters.
 
+    Os limiters de módulo (rotas) são registrados explicitamente com
+    registrar(); instâncias avulsas (testes, scripts) ficam de fora. Cada
+    nome pertence a uma única instância: as políticas por rota resolvem o
+    limiter pelo nome.
+
     Permite:
     - Listar todos os limiters registrados
-    - Obter estatísticas globais
+    - Declarar políticas por rota, aplicadas antes dos handlers
+    - Obter estatísticas globais (identificadores e memória)
+    - Remover periodicamente identificadores expirados (thread de fundo)
     - Limpar todos os limiters de uma vez (útil para testes)
     """
 
-    def __init__(self):
+    def __init__(self, intervalo_limpeza_segundos: float = RATE_LIMIT_LIMPEZA_SEGUNDOS):
         """Inicializa o registry vazio."""
         self._limiters: dict[str, RateLimiter] = {}
+        # Políticas por método, com a expressão do caminho já compilada
+        self._politicas: dict[str, list[tuple[re.Pattern, PoliticaRateLimit]]] = {}
+        self.intervalo_limpeza_segundos = intervalo_limpeza_segundos
+        self._thread: Optional[threading.Thread] = None
+        self._parar = threading.Event()
 
-    def registrar(self, limiter: RateLimiter) -> None:
+    def registrar(self, *limiters: RateLimiter) -> bool:
         """
-        Registra um rate limiter no registry.
+        Registra rate limiters no registry.
+
+        Um nome já registrado por outra instância não é substituído: a
+        nova instância é ignorada com um aviso.
 
         Args:
-            limiter: Instância de RateLimiter ou DynamicRateLimiter
+            limiters: Instâncias de RateLimiter ou DynamicRateLimiter
+
+        Returns:
+            True se todos ficaram registrados (registrar de novo a mesma
+            instância não tem efeito), False se algum nome já era de outra
         """
-        self._limiters[limiter.nome] = limiter
-        logger.debug(f"Rate limiter registrado: {limiter.nome}")
+        todos = True
+        for limiter in limiters:
+            existente = self._limiters.get(limiter.nome)
+            if existente is limiter:
+                continue
+            if existente is not None:
+                logger.warning(
+                    f"Rate limiter '{limiter.nome}' já registrado por outra instância; "
+                    f"novo registro ignorado"
+                )
+                todos = False
+                continue
+            self._limiters[limiter.nome] = limiter
+            logger.debug(f"Rate limiter registrado: {limiter.nome}")
+        return todos
+
+    def definir_politica(
+        self,
+        limiter: RateLimiter,
+        metodo: str,
+        caminhos: Iterable[str],
+        formato: str = "html",
+        mensagem: str = "Muitas requisições. Aguarde alguns minutos.",
+    ) -> None:
+        """
+        Aplica um limiter às rotas indicadas, antes de sessão, CSRF e corpo.
+
+        Args:
+            limiter: Limiter a aplicar (registrado se ainda não estiver)
+            metodo: Método HTTP das rotas
+            caminhos: Padrões das rotas (ver PoliticaRateLimit.caminho)
+            formato: "html" para a página 429 ou "json" para APIs
+            mensagem: Mensagem de bloqueio
+
+        Raises:
+            ValueError: Se o nome do limiter já pertence a outra instância
+        """
+        if not self.registrar(limiter):
+            raise ValueError(f"Rate limiter '{limiter.nome}' já registrado por outra instância")
+        metodo = metodo.upper()
+        politicas = self._politicas.setdefault(metodo, [])
+        for caminho in caminhos:
+            politica = PoliticaRateLimit(limiter.nome, metodo, caminho, formato, mensagem)
+            politicas.append((politica.expressao, politica))
+
+    def obter_politica(self, metodo: str, caminho: str) -> Optional[PoliticaRateLimit]:
+        """
+        Retorna a primeira política que casa com a requisição.
+
+        Args:
+            metodo: Método HTTP da requisição
+            caminho: Caminho da requisição (sem query string)
+
+        Returns:
+            PoliticaRateLimit ou None se a rota não tem limite declarado
+        """
+        for expressao, politica in self._politicas.get(metodo, ()):
+            if expressao.match(caminho):
+                return politica
+        return None
+
+    def listar_politicas(self) -> list[PoliticaRateLimit]:
+        """Lista todas as políticas declaradas."""
+        return [politica for politicas in self._politicas.values() for _, politica in politicas]
 
     def obter(self, nome: str) -> Optional[RateLimiter]:
         """
@@ -376,16 +609,66 @@ class RegistroLimiters:
             "limiters": {}
         }
 
-        for nome, limiter in self._limiters.items():
+        for nome, limiter in list(self._limiters.items()):
             stats["limiters"][nome] = {
                 "max_tentativas": limiter.max_tentativas,
                 "janela_minutos": limiter.janela_minutos,
-                "identificadores_ativos": len(limiter.tentativas),
+                **limiter.obter_estatisticas(),
                 "tipo": "dinamico" if isinstance(limiter, DynamicRateLimiter) else "estatico"
             }
 
+        stats["identificadores_ativos"] = sum(
+            s["identificadores_ativos"] for s in stats["limiters"].values()
+        )
+        stats["memoria_estimada_bytes"] = sum(
+            s["memoria_estimada_bytes"] for s in stats["limiters"].values()
+        )
+        stats["limpeza_ativa"] = self._thread is not None and self._thread.is_alive()
         return stats
 
+    def remover_expirados(self) -> int:
+        """
+        Remove identificadores expirados de todos os limiters.
+
+        Returns:
+            Total de identificadores removidos
+        """
+        removidos = sum(limiter.remover_expirados() for limiter in list(self._limiters.values()))
+        if removidos:
+            logger.debug(f"Rate limiters: {removidos} identificador(es) expirado(s) removido(s)")
+        return removidos
+
+    def _loop_limpeza(self) -> None:
+        while not self._parar.wait(self.intervalo_limpeza_segundos):
+            try:
+                self.remover_expirados()
+            except Exception as e:
+                logger.error(f"Erro na limpeza periódica dos rate limiters: {e}")
+
+    def iniciar_limpeza(self) -> None:
+        """Inicia a thread de remoção periódica de expirados (idempotente)."""
+        if self.intervalo_limpeza_segundos <= 0:
+            logger.info("Limpeza periódica dos rate limiters desativada")
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._parar.clear()
+        self._thread = threading.Thread(
+            target=self._loop_limpeza, name="limpeza-rate-limiters", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Limpeza dos rate limiters iniciada (a cada {self.intervalo_limpeza_segundos}s)"
+        )
+
+    def parar_limpeza(self) -> None:
+        """Interrompe a thread de remoção periódica."""
+        if self._thread is not None:
+            self._parar.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+
     def limpar_todos(self) -> None:
         """
         Limpa tentativas de todos os limiters registrados.
@@ -455,7 +738,7 @@ def com_rate_limit(
 
             # Verificar rate limit
             ip = obter_identificador_cliente(request)
-            if not limiter.verificar(ip):
+            if not await limiter.verificar_async(ip):
                 logger.warning(
                     f"Rate limit excedido [{limiter.nome}] - IP: {ip}"
                 )
@@ -8,6 +8,7 @@ do ambiente Jinja2 para a aplicação FastAPI.
 from typing import Union, Optional
 from datetime import datetime
 from jinja2 import Environment, FileSystemLoader
+from markupsafe import Markup, escape
 from fastapi.templating import Jinja2Templates
 from fastapi import Request
 
@@ -162,6 +163,26 @@ def foto_usuario(id: int) -> str:
     return f"/static/img/usuarios/{id:06d}.jpg"
 
 
+def destacar_busca(trecho: Optional[str]) -> Markup:
+    """
+    Converte o trecho de um resultado de busca em HTML com os termos destacados.
+
+    O trecho vem do FTS5 com os termos entre os delimitadores \\x02 e \\x03.
+    Todo o texto é escapado antes de os delimitadores virarem <mark>, então
+    HTML presente no conteúdo do artigo nunca é interpretado.
+
+    Args:
+        trecho: Trecho retornado por artigo_repo.buscar
+
+    Returns:
+        Markup seguro para exibição no template
+    """
+    if not trecho:
+        return Markup("")
+    texto = str(escape(trecho))
+    return Markup(texto.replace("\x02", "<mark>").replace("\x03", "</mark>"))
+
+
 def csrf_input(request: Optional[Request] = None) -> str:
     """
     Gera input HTML hidden com token CSRF.
@@ -224,6 +245,7 @@ def criar_templates(pasta: str) -> Jinja2Templates:
     env.filters['data_br'] = formatar_data_br
     env.filters['data_hora_br'] = formatar_data_hora_br
     env.filters['foto_usuario'] = foto_usuario
+    env.filters['destacar_busca'] = destacar_busca
 
     # Filtros de formatação de data/hora (em português)
     env.filters['formatar_data'] = formatar_data